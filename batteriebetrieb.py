@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Regelbasierter Batteriebetrieb zur schnellen Vorauswahl von Kapazitäten.
+
+Statt einer Betriebsoptimierung je (PV, Wind, Batterie MWh, Batterie MW)-Kombination
+fährt die Batterie eine einfache Regel: Überschuss laden, Defizit entladen, jeweils
+begrenzt durch Leistung, Wirkungsgrad (``sqrt(eta)`` je Richtung wie im LP) und die
+SoC-Grenzen ``[battery_soc_min_percent * MWh, MWh]``. Restüberschuss wird bei
+positiver Vergütung eingespeist, sonst abgeregelt; Restdefizit wird bezogen.
+
+Der SoC-Verlauf ist eine kumulierte Summe mit Begrenzung. Sie wird für viele
+Kombinationen gleichzeitig fortgeschrieben (ein Vektor über die Kombinationen je
+Zeitschritt, die übrigen Größen blockweise als Matrizen), so dass tausende
+Kombinationen pro Sekunde bewertet werden. Die Kosten enthalten dieselben Terme wie
+die Zielfunktion des LP; die Regel ist eine zulässige, aber nicht optimale
+Betriebsweise, ihre Kosten liegen also (bis auf den Ausgleich des zyklischen SoC)
+über dem LP-Optimum. :func:`screening_gap` misst den Abstand an Stichproben.
+
+    result = greedy_dispatch_costs(profiles, params, pv, wind, batt_mwh, batt_mw)
+    gap = screening_gap(profiles, params, pv, wind, batt_mwh, batt_mw, result, sample=8)
+"""
+import numpy as np
+
+from kostenlandschaft import MIN_BATTERY_SIZE, calculate_total_cost_for_fixed_pv_wind_optimal_battery
+from systemparameter import charge_discharge_factors, cost_coefficients
+
+
+def _capacities(pv_mw, wind_mw, batt_mwh, batt_mw):
+    """Kapazitäten als gleich lange Arrays; zu kleine Batterien gelten wie im LP als nicht vorhanden."""
+    pv, wind, mwh, mw = (np.array(a, dtype=float) for a in np.broadcast_arrays(pv_mw, wind_mw, batt_mwh, batt_mw))
+    pv, wind, mwh, mw = pv.ravel(), wind.ravel(), mwh.ravel(), mw.ravel()
+    no_battery = (mwh < MIN_BATTERY_SIZE) | (mw < MIN_BATTERY_SIZE)
+    mwh[no_battery] = mw[no_battery] = 0.0
+    return pv, wind, mwh, mw
+
+
+def _advance(soc, delta, lo, hi, trajectory=None):
+    """Schreibt den SoC über die Zeilen von ``delta`` fort (in place); optional mit Verlauf."""
+    for k in range(len(delta)):
+        np.add(soc, delta[k], out=soc)
+        np.maximum(soc, lo, out=soc)
+        np.minimum(soc, hi, out=soc)
+        if trajectory is not None: trajectory[k + 1] = soc
+    return soc
+
+
+def greedy_dispatch_costs(profiles, params, pv_mw, wind_mw, batt_mwh, batt_mw, batch_size=2048,
+                          block_timesteps=256, warmup_hours=336):
+    """Gesamtkosten des regelbasierten Betriebs für beliebig viele Kapazitätskombinationen.
+
+    Die vier Kapazitäten werden gegeneinander gebroadcastet und flach bewertet. Der
+    Anfangs-SoC ist der Stand nach ``warmup_hours`` Regelbetrieb am Ende der Zeitreihe
+    (ab SoC-Minimum), damit der Betrieb annähernd zyklisch ist. Liegt der End-SoC
+    darunter, wird die fehlende Ladung zum Strompreis nachgekauft (``soc_deficit_mwh``).
+
+    Gibt ein Dict mit Arrays je Kombination zurück: ``total_cost_eur`` (vergleichbar
+    mit :func:`kostenlandschaft.calculate_total_cost_for_fixed_pv_wind_optimal_battery`),
+    ``fixed_cost_eur``, ``grid_import_mwh``, ``grid_export_mwh``, ``curtailment_mwh``,
+    ``battery_discharge_mwh``, ``soc_deficit_mwh`` sowie ``capacities`` (N x 4).
+    """
+    pv, wind, mwh, mw = _capacities(pv_mw, wind_mw, batt_mwh, batt_mw)
+    demand = np.asarray(profiles['demand_profile_mwh'], dtype=float)
+    spv = np.asarray(profiles['specific_yield_pv_mwh_per_mw'], dtype=float)
+    swind = np.asarray(profiles['specific_yield_wind_mwh_per_mw'], dtype=float)
+    tariff = np.asarray(profiles['feed_in_tariff_profile_eur_per_mwh'], dtype=float)
+    T = len(demand)
+    dt = params['time_resolution_hours']
+    price = params['grid_purchase_price_eur_per_mwh']
+    eff_sqrt, eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+    exported = (tariff > 0).astype(float)
+    warmup = min(T, int(round(warmup_hours / dt)))
+
+    N = len(pv)
+    # Zeitschritt-Gewichte für Summen als Matrixprodukt: Summe, Vergütung, Einspeisung (sonst Abregelung)
+    weights = np.vstack([np.ones(T), tariff * exported, exported])
+    sources = np.column_stack([spv, swind, demand])
+    pos_sums, charge_sums = np.zeros((3, N)), np.zeros((3, N))
+    soc_start, soc_end = np.empty(N), np.empty(N)
+
+    def block(a, b, cols, pmax):
+        """Überschuss ``max(net, 0)`` und SoC-Änderung der Regel ohne SoC-Grenzen, Form (Zeitschritte, Kombinationen)."""
+        net = sources[a:b] @ np.vstack([pv[cols], wind[cols], -np.ones(len(pmax))])
+        surplus = np.maximum(net, 0)
+        # Laden mit sqrt(eta), Entladen mit 1/sqrt(eta): eff_inv * clip + (eff - eff_inv) * min(surplus, pmax)
+        delta = np.clip(net, -pmax, pmax, out=net)
+        delta *= eff_sqrt_inv
+        delta += (eff_sqrt - eff_sqrt_inv) * np.minimum(surplus, pmax)
+        return surplus, delta
+
+    for start in range(0, N, batch_size):
+        cols = slice(start, min(start + batch_size, N))
+        lo, hi, pmax = params['battery_soc_min_percent'] * mwh[cols], mwh[cols], mw[cols] * dt
+        soc = lo.copy()
+        for a in range(T - warmup, T, block_timesteps):
+            _advance(soc, block(a, min(a + block_timesteps, T), cols, pmax)[1], lo, hi)
+        soc_start[cols] = soc
+        for a in range(0, T, block_timesteps):
+            b = min(a + block_timesteps, T)
+            surplus, delta = block(a, b, cols, pmax)
+            trajectory = np.empty((b - a + 1, len(soc)))
+            trajectory[0] = soc
+            _advance(soc, delta, lo, hi, trajectory)
+            # Zunahme des SoC = Laden; Entladen folgt aus der Bilanz End-SoC - Anfangs-SoC
+            rise = np.subtract(trajectory[1:], trajectory[:-1], out=delta)
+            np.maximum(rise, 0, out=rise)
+            pos_sums[:, cols] += weights[:, a:b] @ surplus
+            charge_sums[:, cols] += weights[:, a:b] @ rise
+        soc_end[cols] = soc
+
+    # Netto-Erzeugung ist linear in den Kapazitäten; Defizit = Überschuss - Netto
+    net_sum = spv.sum() * pv + swind.sum() * wind - demand.sum()
+    stored = charge_sums[0] - (soc_end - soc_start)  # SoC-Abnahme durch Entladen
+    charge = charge_sums * eff_sqrt_inv  # Ladeenergie am Netzknoten, gewichtet
+    result = {'battery_discharge_mwh': stored * eff_sqrt}
+    result['grid_import_mwh'] = pos_sums[0] - net_sum - result['battery_discharge_mwh']
+    result['grid_export_mwh'] = pos_sums[2] - charge[2]
+    result['curtailment_mwh'] = pos_sums[0] - charge[0] - result['grid_export_mwh']
+    result['soc_deficit_mwh'] = np.maximum(soc_start - soc_end, 0)
+    result['fixed_cost_eur'] = (pv * costs['pv_eur_per_mw'] + wind * costs['wind_eur_per_mw']
+                                + mwh * costs['battery_eur_per_mwh'] + mw * costs['battery_eur_per_mw'])
+    result['total_cost_eur'] = (result['fixed_cost_eur'] + price * result['grid_import_mwh'] - (pos_sums[1] - charge[1])
+                                + price * eff_sqrt_inv * result['soc_deficit_mwh'])
+    result['capacities'] = np.column_stack([pv, wind, mwh, mw])
+    return result
+
+
+def screening_gap(profiles, params, pv_mw, wind_mw, batt_mwh, batt_mw, result=None, sample=8, seed=0):
+    """Relativer Abstand der Regelkosten zum LP-Optimum an ``sample`` zufälligen Kombinationen.
+
+    ``result`` ist das Ergebnis von :func:`greedy_dispatch_costs` für dieselben
+    Kapazitäten (sonst wird es berechnet). Je Stichprobe wird die Betriebsoptimierung
+    der Kostenlandschaft gelöst. Ein großer Abstand zeigt, dass die Vorauswahl in
+    diesem Bereich eine vollständige Optimierung braucht.
+    """
+    pv, wind, mwh, mw = _capacities(pv_mw, wind_mw, batt_mwh, batt_mw)
+    if result is None: result = greedy_dispatch_costs(profiles, params, pv, wind, mwh, mw)
+    rng = np.random.default_rng(seed)
+    indices = np.sort(rng.choice(len(pv), min(sample, len(pv)), replace=False))
+    greedy = result['total_cost_eur'][indices]
+    optimum = np.array([calculate_total_cost_for_fixed_pv_wind_optimal_battery(profiles, params, pv[i], wind[i], mwh[i], mw[i])
+                        for i in indices])
+    gap = (greedy - optimum) / np.abs(optimum)
+    return {'indices': indices, 'greedy_cost_eur': greedy, 'lp_cost_eur': optimum, 'gap_rel': gap,
+            'max_gap_rel': float(np.max(gap)), 'mean_gap_rel': float(np.mean(gap))}
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Zeitreihendiagramm mit und ohne Ausdünnung über Auflösung und Horizont.
+
+Zeichnet das Diagramm "Lastprofil und EE-Erzeugung" (:func:`systemoptimierung.plot_timeseries`,
+Agg) für kalendergenaue Profile mit synthetischem Wind über ``--years`` Jahre in
+``--resolutions`` Minuten und misst Zeit und Dateigröße je Ausdünnungsverfahren.
+Exit-Code 1, wenn 'minmax' eine Spitze verliert (Maximum/Minimum der ausgedünnten Reihe
+weicht ab) oder die Zeit mit 'minmax' vom kürzesten zum längsten Fall um mehr als den
+Faktor ``--max-growth`` wächst.
+
+    python benchmarks/bench_diagramme.py --years 1 5 --resolutions 15 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import diagramme
+import windsynthese
+from systemoptimierung import plot_timeseries
+from systemparameter import default_params
+from zeitreihen import generate_calendar_profiles
+
+
+def _frame(years, minutes):
+    import pandas as pd
+    params = default_params(time_resolution_hours=minutes / 60)
+    profiles = generate_calendar_profiles(params, years=years, pv_shape='solar')
+    n = len(profiles['demand_profile_mwh'])
+    wind = windsynthese.spezifischer_windertrag(params, -(-n // int(params['hours_in_year'] / params['time_resolution_hours']))).ravel()
+    return pd.DataFrame({'Timestamp': profiles['timestamps'].astype('datetime64[ns]'), 'Bedarf (MWh)': profiles['demand_profile_mwh'],
+                         'PV Erzeugung (MWh)': profiles['specific_yield_pv_mwh_per_mw'] * 20,
+                         'Wind Erzeugung (MWh)': np.resize(wind, n) * 5})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--resolutions', type=float, nargs='+', default=[15, 5], help='Auflösungen in Minuten')
+    parser.add_argument('--methods', nargs='+', choices=diagramme.DECIMATION_METHODS, default=list(diagramme.DECIMATION_METHODS))
+    parser.add_argument('--max-growth', type=float, default=3.0)
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use('Agg')
+    print(f"{'Jahre':>6}{'Auflösung':>11}{'Punkte':>12}" + ''.join(f"{m:>18}" for m in args.methods))
+    results = []; ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # Erster Aufruf lädt Schriften und Backend; nicht mitmessen
+        plot_timeseries(_frame(1, 60), 1.0, os.path.join(tmp, 'warmup.png'), 'save')
+        for years in args.years:
+            for minutes in args.resolutions:
+                frame = _frame(years, minutes)
+                row = {'years': years, 'resolution_min': minutes, 'points': len(frame), 'methods': {}}
+                for method in args.methods:
+                    path = os.path.join(tmp, f"{method}.png")
+                    start = time.perf_counter()
+                    plot_timeseries(frame, minutes / 60, path, 'save', method)
+                    row['methods'][method] = {'seconds': time.perf_counter() - start, 'bytes': os.path.getsize(path)}
+                wind = frame['Wind Erzeugung (MWh)'].to_numpy()
+                _, kept = diagramme.decimate(frame['Timestamp'].to_numpy(), wind, 15 * diagramme.DEFAULT_DPI, 'minmax')
+                row['peaks_kept'] = bool(kept.max() == wind.max() and kept.min() == wind.min())
+                ok &= row['peaks_kept']
+                results.append(row)
+                print(f"{years:>6}{minutes:>9.0f} m{len(frame):>12,}" + ''.join(
+                    f"{row['methods'][m]['seconds']:>9.2f}s {row['methods'][m]['bytes'] / 1024:>5.0f}kB" for m in args.methods))
+
+    if 'minmax' in args.methods and len(results) > 1:
+        times = [r['methods']['minmax']['seconds'] for r in sorted(results, key=lambda r: r['points'])]
+        growth = times[-1] / times[0]
+        ok &= growth <= args.max_growth
+        print(f"'minmax': Faktor {growth:.2f} vom kürzesten zum längsten Fall ({results[0]['points']:,} -> {max(r['points'] for r in results):,} Punkte)")
+    print(f"Spitzen erhalten, Zeit nahezu unabhängig von der Länge: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
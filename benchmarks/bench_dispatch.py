@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: regelbasierter Batteriebetrieb gegen die Betriebsoptimierung je Kombination.
+
+Bewertet ``--combinations`` zufällige (PV, Wind, Batterie MWh, Batterie MW)-Kombinationen
+mit :func:`batteriebetrieb.greedy_dispatch_costs` (Kombinationen pro Sekunde) und löst an
+``--sample`` davon sowie an zwei Kombinationen ohne Batterie das LP
+(:func:`batteriebetrieb.screening_gap`). Exit-Code 1, wenn die Regel ohne Batterie vom LP
+abweicht oder mit Batterie unter dem LP-Optimum liegt.
+
+    python benchmarks/bench_dispatch.py --resolution 15 --combinations 4096 --sample 6
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import batteriebetrieb
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+TOLERANCE = 1e-9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=15, help='Auflösung in Minuten')
+    parser.add_argument('--combinations', type=int, default=4096)
+    parser.add_argument('--sample', type=int, default=6, help='Kombinationen mit LP-Vergleich')
+    parser.add_argument('--batch-size', type=int, default=2048)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    profiles = generate_profiles(params, seed=0)
+    rng = np.random.default_rng(args.seed)
+    n = args.combinations
+    pv, wind = rng.uniform(0, 60, n), rng.uniform(0, 30, n)
+    batt_mwh, batt_mw = rng.uniform(0, 80, n), rng.uniform(0, 20, n)
+    batt_mwh[:2] = batt_mw[:2] = 0.0
+
+    start = time.perf_counter()
+    result = batteriebetrieb.greedy_dispatch_costs(profiles, params, pv, wind, batt_mwh, batt_mw, batch_size=args.batch_size)
+    seconds = time.perf_counter() - start
+    print(f"{len(profiles['demand_profile_mwh']):,} Zeitschritte, {n} Kombinationen in {seconds:.2f} s ({n / seconds:,.0f} pro Sekunde)")
+
+    start = time.perf_counter()
+    with_battery = batteriebetrieb.screening_gap(profiles, params, pv[2:], wind[2:], batt_mwh[2:], batt_mw[2:],
+                                                 {'total_cost_eur': result['total_cost_eur'][2:]}, sample=args.sample, seed=args.seed)
+    lp_seconds = (time.perf_counter() - start) / max(args.sample, 1)
+    without = batteriebetrieb.screening_gap(profiles, params, pv[:2], wind[:2], batt_mwh[:2], batt_mw[:2],
+                                            {'total_cost_eur': result['total_cost_eur'][:2]}, sample=2)
+    print(f"LP je Kombination {lp_seconds:.2f} s; Regel {seconds / n * 1e3:.3f} ms")
+    print(f"{'PV MW':>8}{'Wind MW':>9}{'Batt MWh':>10}{'Batt MW':>9}{'Regel €':>14}{'LP €':>14}{'Abstand':>10}")
+    for gap, offset in ((without, 0), (with_battery, 2)):
+        for k, i in enumerate(gap['indices']):
+            caps = result['capacities'][offset + i]
+            print(f"{caps[0]:>8.1f}{caps[1]:>9.1f}{caps[2]:>10.1f}{caps[3]:>9.1f}"
+                  f"{gap['greedy_cost_eur'][k]:>14,.0f}{gap['lp_cost_eur'][k]:>14,.0f}{gap['gap_rel'][k]:>9.2%}")
+    print(f"Abstand mit Batterie: Mittel {with_battery['mean_gap_rel']:.2%}, Maximum {with_battery['max_gap_rel']:.2%}")
+
+    ok = bool(np.all(np.abs(without['gap_rel']) <= TOLERANCE) and np.all(with_battery['gap_rel'] >= -TOLERANCE))
+    print(f"Ohne Batterie exakt, mit Batterie nicht unter dem Optimum: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'timesteps': len(profiles['demand_profile_mwh']), 'combinations': n, 'seconds': seconds,
+                       'combinations_per_s': n / seconds, 'lp_seconds_per_point': lp_seconds,
+                       'gap_rel': with_battery['gap_rel'].tolist(), 'gap_rel_no_battery': without['gap_rel'].tolist()}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
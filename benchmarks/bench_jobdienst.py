@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Jobdienst unter vielen gleichzeitigen Jobs (Deduplizierung, Ergebnisspeicher, Fortschritt).
+
+Startet :mod:`jobdienst` auf einem freien Port in einem Thread und reicht aus einem
+Thread-Pool ``--jobs`` Ertragsjobs mit nur ``--distinct`` verschiedenen Parametersätzen
+sowie ``--optimizations`` kleine Optimierungsjobs mit Kostenlandschaft gleichzeitig ein.
+Eine zweite Runde derselben Jobs muss vollständig aus dem Speicher kommen. Exit-Code 1,
+wenn ein Job fehlschlägt, ein Parametersatz mehr als einmal gerechnet wird, die zweite
+Runde rechnet oder keine Fortschrittsereignisse der Kostenlandschaft ankommen.
+
+    python benchmarks/bench_jobdienst.py --jobs 500 --distinct 20 --workers 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jobdienst
+
+
+def _start_service(workers, cache_dir):
+    """Dienst im Hintergrund-Thread; gibt die Adresse zurück, sobald er annimmt."""
+    started = threading.Event(); address = []
+    ready = lambda a: (address.append(a), started.set())
+    thread = threading.Thread(target=asyncio.run, args=(jobdienst.serve('127.0.0.1:0', workers, cache_dir, ready=ready),), daemon=True)
+    thread.start()
+    if not started.wait(60): raise RuntimeError("Jobdienst nicht gestartet")
+    return address[0]
+
+
+def _round(address, requests, threads):
+    """Reicht alle Aufträge gleichzeitig ein und wartet je Job auf das Ende; gibt (Sekunden, Jobs, Ereignisse) zurück."""
+    def run(request):
+        job = jobdienst.submit(address, request['kind'], request['params'])
+        events = list(jobdienst.watch(address, job['id']))
+        return job, events
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool: done = list(pool.map(run, requests))
+    return time.perf_counter() - start, done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=500, help='Ertragsjobs je Runde')
+    parser.add_argument('--distinct', type=int, default=20, help='Verschiedene Ertrags-Parametersätze')
+    parser.add_argument('--optimizations', type=int, default=2, help='Optimierungsjobs (240 min, 4x4-Kostenlandschaft)')
+    parser.add_argument('--workers', type=int, default=None, help='Solver-Prozesse des Dienstes')
+    parser.add_argument('--threads', type=int, default=64, help='Gleichzeitige Client-Verbindungen')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    requests = [{'kind': 'yield', 'params': {'k': 1.8 + 0.02 * (i % args.distinct), 'monte_carlo': 2000}} for i in range(args.jobs)]
+    requests += [{'kind': 'optimization', 'params': {'time_resolution_hours': 4, 'seed': s, 'landscape_steps': [4, 4]}}
+                 for s in range(args.optimizations)]
+    distinct = args.distinct + args.optimizations
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        address = _start_service(args.workers, cache_dir)
+        print(f"Jobdienst auf {address}, {len(requests)} Jobs je Runde ({distinct} verschieden), {args.threads} Verbindungen")
+        first_s, first = _round(address, requests, args.threads)
+        stats_first = jobdienst.request(address, 'GET', '/stats')
+        second_s, second = _round(address, requests, args.threads)
+        stats = jobdienst.request(address, 'GET', '/stats')
+
+    failed = [events[-1] for _, events in first + second if events[-1]['status'] != 'done']
+    landscape_events = sum(1 for job, events in first if job['kind'] == 'optimization'
+                           for e in events if (e.get('progress') or {}).get('stage') == 'landscape')
+    outcomes = {}
+    for job, _ in second: outcomes[job['outcome']] = outcomes.get(job['outcome'], 0) + 1
+
+    print(f"{'Runde':<8}{'Zeit':>9}{'Jobs/s':>9}{'gerechnet':>11}{'dedupliziert':>14}{'Speicher':>10}")
+    print(f"{'1':<8}{first_s:>8.2f}s{len(requests) / first_s:>9.0f}{stats_first['computed']:>11}{stats_first['deduplicated']:>14}{stats_first['cache_hits']:>10}")
+    print(f"{'2':<8}{second_s:>8.2f}s{len(requests) / second_s:>9.0f}{stats['computed'] - stats_first['computed']:>11}"
+          f"{stats['deduplicated'] - stats_first['deduplicated']:>14}{stats['cache_hits'] - stats_first['cache_hits']:>10}")
+    print(f"Fortschrittsereignisse der Kostenlandschaft: {landscape_events}, fehlgeschlagen: {len(failed)}")
+
+    ok = (not failed and stats_first['computed'] == distinct and stats['computed'] == distinct
+          and outcomes.get('cached', 0) == len(requests) and landscape_events > 0)
+    print(f"Jeder Parametersatz genau einmal gerechnet, zweite Runde aus dem Speicher: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'jobs': len(requests), 'distinct': distinct, 'first_round_s': first_s, 'second_round_s': second_s,
+                       'stats': stats, 'landscape_events': landscape_events, 'failed': len(failed)}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
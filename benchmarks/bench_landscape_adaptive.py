@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: adaptive Kostenlandschaft gegen das gleichförmige 15x15-Raster.
+
+Referenz ist ein dichtes 33x33-Raster exakter LP-Lösungen. Verglichen werden im
+dargestellten Kostenbereich (bis 2 x Minimum) der Fehler der linearen Interpolation
+des 15x15-Rasters (wie ``contourf``) und des Ersatzmodells der adaptiven Landschaft,
+jeweils in Konturstufen (Minimum / 20), sowie Rasterweite und Abstand am Optimum.
+Exit-Code 1, wenn die adaptive Landschaft mehr als ein Drittel der Lösungen braucht
+oder schlechter ist als das 15x15-Raster.
+
+    python benchmarks/bench_landscape_adaptive.py --resolution 240
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import kostenlandschaft
+import systemoptimierung
+
+REFERENCE_STEPS = 33 # = Gitter der feinsten adaptiven Stufe (5er Startraster, 3 Verfeinerungen)
+
+
+def band_errors(approx, truth, best, cutoff=2.0, levels=20):
+    """Fehler in Konturstufen und Anteil abweichender Stufen im dargestellten Bereich."""
+    spacing = best * (cutoff - 1) / levels
+    shown = truth <= cutoff * best
+    error = np.abs(approx - truth)[shown] / spacing
+    band = lambda x: np.clip(np.floor((x - best) / spacing), -1, levels)
+    return {'max_levels': float(error.max()), 'mean_levels': float(error.mean()),
+            'band_mismatch': float(np.mean(band(approx[shown]) != band(truth[shown])))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=240, help='Auflösung in Minuten')
+    parser.add_argument('--max-solves', type=int, default=None, help='Budget der adaptiven Landschaft (Standard: 225 / 3)')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    from scipy.interpolate import RegularGridInterpolator
+    params = systemoptimierung.default_params(time_resolution_hours=args.resolution / 60)
+    result = systemoptimierung.optimize(params, seed=0)
+    solution = result['solution']
+    batt = (solution['Battery_Capacity_MWh'], solution['Battery_Power_MW'])
+    pv_range, wind_range = systemoptimierung.landscape_ranges(solution)
+    landscape = lambda pv, wind: kostenlandschaft.compute_cost_landscape(
+        result['profiles'], params, pv, wind, *batt, max_workers=1, progress=False, warm_start=True)
+
+    t0 = time.perf_counter()
+    pv_ref = np.linspace(pv_range[0], pv_range[-1], REFERENCE_STEPS)
+    wind_ref = np.linspace(wind_range[0], wind_range[-1], REFERENCE_STEPS)
+    truth = landscape(pv_ref, wind_ref)
+    t1 = time.perf_counter()
+    uniform = landscape(pv_range, wind_range)
+    t2 = time.perf_counter()
+    adaptive = kostenlandschaft.compute_adaptive_landscape(result['profiles'], params, pv_range, wind_range, *batt,
+                                                           max_solves=args.max_solves, output_steps=REFERENCE_STEPS,
+                                                           max_workers=1, progress=False)
+    t3 = time.perf_counter()
+
+    wind_mesh, pv_mesh = np.meshgrid(wind_ref, pv_ref, indexing='ij')
+    uniform_ref = RegularGridInterpolator((wind_range, pv_range), uniform)(np.column_stack([wind_mesh.ravel(), pv_mesh.ravel()])).reshape(truth.shape)
+    best = solution['objective']
+    optimum = np.array([solution['PV_Capacity_MWp'], solution['Wind_Capacity_MW']])
+    sample_best = adaptive['samples'][np.argmin(adaptive['samples'][:, 2])]
+    grid_best = np.unravel_index(np.argmin(uniform), uniform.shape)
+    results = {
+        'timesteps': len(result['profiles']['demand_profile_mwh']), 'reference_s': t1 - t0,
+        'uniform': dict(band_errors(uniform_ref, truth, best), solves=uniform.size, seconds=t2 - t1,
+                        spacing=[float(pv_range[1] - pv_range[0]), float(wind_range[1] - wind_range[0])],
+                        optimum_distance_mw=float(np.linalg.norm([pv_range[grid_best[1]], wind_range[grid_best[0]]] - optimum))),
+        'adaptive': dict(band_errors(adaptive['cost_grid'], truth, best), solves=adaptive['solves'], seconds=t3 - t2,
+                         rounds=adaptive['rounds'], spacing=[float(x) for x in adaptive['spacing_at_minimum']],
+                         optimum_distance_mw=float(np.linalg.norm(sample_best[:2] - optimum))),
+    }
+    print(f"{results['timesteps']} Zeitschritte; Referenz {REFERENCE_STEPS}x{REFERENCE_STEPS} in {t1 - t0:.1f} s; "
+          f"Optimum PV {optimum[0]:.2f} MW, Wind {optimum[1]:.2f} MW")
+    print(f"{'':<10}{'Lösungen':>9}{'Zeit':>8}{'max. Fehler':>13}{'mittl.':>8}{'Stufe falsch':>14}{'Raster am Opt.':>17}{'Abst. Opt.':>12}")
+    for name, r in results.items():
+        if not isinstance(r, dict): continue
+        print(f"{name:<10}{r['solves']:>9}{r['seconds']:>7.1f}s{r['max_levels']:>10.2f} St.{r['mean_levels']:>8.3f}"
+              f"{r['band_mismatch']:>13.1%}{r['spacing'][0]:>9.2f}/{r['spacing'][1]:.2f}{r['optimum_distance_mw']:>10.2f} MW")
+    a, u = results['adaptive'], results['uniform']
+    print(f"Eingesparte LP-Lösungen: {u['solves'] - a['solves']} von {u['solves']}")
+    ok = a['solves'] * 3 <= u['solves'] and a['max_levels'] <= u['max_levels'] and a['band_mismatch'] <= u['band_mismatch']
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: ``get_leistung`` (pandas-Spalten + np.interp) vs. kompilierte Leistungskurve.
+
+Prüft die Gleichheit auf Sonderfällen (NaN, negative Werte, Stützstellen, Werte
+oberhalb der Kurve) und misst den Durchsatz mit und ohne vorgegebenen Ausgabepuffer.
+
+    python benchmarks/bench_leistungskurve.py --n 50000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import leistungskurven
+
+
+def get_leistung(windgeschwindigkeit, leistungskurve_df):
+    """Referenz: unveränderte Implementierung aus windparkohneverlust.py."""
+    min_ws = leistungskurve_df['Windgeschwindigkeit (m/s)'].min()
+    leistung = np.interp(windgeschwindigkeit,
+                         leistungskurve_df['Windgeschwindigkeit (m/s)'],
+                         leistungskurve_df['Leistung (kW)'],
+                         left=0.0,
+                         right=leistungskurve_df['Leistung (kW)'].iloc[-1])
+    leistung[windgeschwindigkeit < min_ws] = 0.0
+    return leistung
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=20_000_000, help='Anzahl Windgeschwindigkeiten')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+    kurve_df = leistungskurven.leistungskurve_winter_df()
+    kurve = leistungskurven.KompilierteLeistungskurve.aus_dataframe(kurve_df)
+    results = {'n': args.n}
+
+    sonderfaelle = np.concatenate([np.array([np.nan, -1.0, 0.0, 2.999999, 3.0, 25.999999, 26.0, 26.5, 40.0, np.inf]),
+                                   np.arange(0, 30, 0.25), np.random.default_rng(1).uniform(-2, 35, 100_000)])
+    referenz = get_leistung(sonderfaelle, kurve_df)
+    gleich = np.array_equal(kurve(sonderfaelle), referenz, equal_nan=True)
+    results['identical'] = gleich
+    print(f"Sonderfälle ({len(sonderfaelle):,} Werte): {'identisch zu get_leistung' if gleich else 'ABWEICHUNG!'}")
+
+    ws = np.random.default_rng(0).weibull(2.0, args.n) * 6.77
+    out = np.empty_like(ws)
+    for name, funktion in [('get_leistung', lambda: get_leistung(ws, kurve_df)),
+                           ('kompiliert', lambda: kurve(ws)),
+                           ('kompiliert (out)', lambda: kurve(ws, out=out))]:
+        funktion()  # Aufwärmen
+        t0 = time.perf_counter(); funktion(); dauer = time.perf_counter() - t0
+        results[name] = {'seconds': dauer, 'values_per_s': args.n / dauer}
+        print(f"{name:17}: {dauer:6.3f} s  ({args.n / dauer / 1e6:7.1f} Mio. Werte/s)")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if gleich else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Modellaufbau PuLP vs. Sparse-Matrix (Aufbauzeit und Peak-RSS).
+
+Jeder Fall läuft in einem eigenen Python-Prozess, damit der Peak-RSS nicht durch
+vorherige Fälle verfälscht wird.
+
+    python benchmarks/bench_lp_build.py                  # 15, 30, 60 min
+    python benchmarks/bench_lp_build.py --solve          # zusätzlich lösen
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+RESOLUTIONS_MIN = [15, 30, 60]
+
+
+def build_system_lp_pulp(profiles, params):
+    """Referenz: Modellaufbau mit PuLP-Einzel-Nebenbedingungen (systemoptimierung.build_pulp_model)."""
+    from systemoptimierung import build_pulp_model
+    return build_pulp_model(profiles, params)[0]
+
+
+def run_case(backend, resolution_min, solve):
+    """Führt einen Fall im aktuellen Prozess aus und gibt die Messwerte zurück."""
+    from systemparameter import default_params
+    from zeitreihen import generate_profiles
+    import lp_matrix  # Importkosten nicht dem Aufbau zurechnen
+    import systemoptimierung
+    import pulp
+    params = default_params(time_resolution_hours=resolution_min / 60)
+    profiles = generate_profiles(params, seed=0)
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    t0 = time.perf_counter()
+    if backend == 'pulp':
+        model = build_system_lp_pulp(profiles, params)
+    else:
+        lp = lp_matrix.build_system_lp(profiles, params)
+    build_s = time.perf_counter() - t0
+    result = {'backend': backend, 'resolution_min': resolution_min, 'num_timesteps': len(profiles['demand_profile_mwh']),
+              'build_s': round(build_s, 3)}
+
+    if solve:
+        t0 = time.perf_counter()
+        if backend == 'pulp':
+            model.solve(pulp.PULP_CBC_CMD(msg=False))
+            result['objective'] = pulp.value(model.objective)
+        else:
+            result['objective'] = lp_matrix.solve_lp(lp)['objective']
+        result['solve_s'] = round(time.perf_counter() - t0, 3)
+
+    rss_peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result['peak_rss_mb'] = round(rss_peak_kb / 1024, 1)
+    result['build_rss_delta_mb'] = round((rss_peak_kb - rss_before_kb) / 1024, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolutions', type=int, nargs='+', default=RESOLUTIONS_MIN, help='Auflösungen in Minuten')
+    parser.add_argument('--backends', nargs='+', default=['pulp', 'matrix'], choices=['pulp', 'matrix'])
+    parser.add_argument('--solve', action='store_true', help='Modelle zusätzlich lösen (CBC bzw. HiGHS)')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    parser.add_argument('--case', nargs=2, metavar=('BACKEND', 'MINUTES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.solve)))
+        return
+
+    results = []
+    print(f"{'Backend':<8} {'Aufl.':>6} {'T':>7} {'Aufbau [s]':>11} {'Peak-RSS [MB]':>14} {'Δ Aufbau [MB]':>14}" + (f" {'Lösen [s]':>10} {'Zielwert':>16}" if args.solve else ''))
+    for resolution_min in args.resolutions:
+        for backend in args.backends:
+            cmd = [sys.executable, os.path.abspath(__file__), '--case', backend, str(resolution_min)] + (['--solve'] if args.solve else [])
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            results.append(r)
+            line = f"{r['backend']:<8} {r['resolution_min']:>4}min {r['num_timesteps']:>7} {r['build_s']:>11.3f} {r['peak_rss_mb']:>14.1f} {r['build_rss_delta_mb']:>14.1f}"
+            if args.solve: line += f" {r['solve_s']:>10.3f} {r['objective']:>16,.2f}"
+            print(line)
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
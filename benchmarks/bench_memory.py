@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Speicherbedarf von Modellaufbau und MPS-Datei über 1, 5 und 10 Jahre.
+
+Verglichen werden PuLP (Modell + ``writeMPS`` wie vor dem CBC-Aufruf), das Matrix-LP
+(:func:`lp_matrix.build_system_lp` + :func:`lp_matrix.write_mps`) und das blockweise
+Schreiben direkt aus den Profilen (:func:`lp_matrix.write_system_mps`). Jeder Fall läuft
+in einem eigenen Prozess; gemessen werden der Zuwachs des Spitzen-RSS über den Stand
+nach dem Erzeugen der Profile und (in einem zweiten Lauf) die tracemalloc-Spitze des
+Aufbaus. Exit-Code 1, wenn die Streaming-Datei von ``write_mps`` abweicht oder ihr
+Speicherbedarf mit dem Horizont wächst (tracemalloc-Spitze > 2 x kürzester Horizont).
+
+    python benchmarks/bench_memory.py --years 1 5 10 --resolution 15
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+CASES = ('stream', 'matrix', 'pulp')
+
+
+def current_rss_mb():
+    """Aktueller RSS aus /proc (Linux), sonst der bisherige Spitzenwert."""
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(case, years, resolution, path, trace):
+    """Im Kindprozess: Profile erzeugen, Modell des Falls aufbauen und als MPS schreiben."""
+    import tracemalloc
+    import lp_matrix
+    from systemparameter import default_params
+    from zeitreihen import generate_calendar_profiles
+    params = default_params(time_resolution_hours=resolution / 60)
+    profiles = generate_calendar_profiles(params, start='2020-01-01', years=years, seed=0)
+    baseline = current_rss_mb()
+    if trace: tracemalloc.start()
+    start = time.perf_counter()
+    if case == 'stream':
+        lp_matrix.write_system_mps(profiles, params, path)
+    elif case == 'matrix':
+        lp_matrix.write_mps(lp_matrix.build_system_lp(profiles, params), path)
+    else:
+        import systemoptimierung
+        model = systemoptimierung.build_pulp_model(profiles, params)[0]
+        model.writeMPS(path)
+    seconds = time.perf_counter() - start
+    result = {'timesteps': len(profiles['demand_profile_mwh']), 'seconds': seconds, 'file_mb': os.path.getsize(path) / 1e6,
+              'profiles_mb': sum(v.nbytes for v in profiles.values() if hasattr(v, 'nbytes')) / 1e6}
+    if trace: result['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+    else: result['rss_increase_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline
+    return result
+
+
+def measure(case, years, resolution, path, trace):
+    """Startet einen Fall in einem neuen Prozess; None, wenn er abbricht (z. B. Speichermangel)."""
+    args = [sys.executable, os.path.abspath(__file__), '--child', case, str(years), str(resolution), path] + (['--trace'] if trace else [])
+    run = subprocess.run(args, capture_output=True, text=True)
+    if run.returncode != 0: return None
+    return json.loads(run.stdout.strip().splitlines()[-1])
+
+
+def digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''): sha.update(block)
+    return sha.hexdigest()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        case, years, resolution, path = sys.argv[2], int(sys.argv[3]), float(sys.argv[4]), sys.argv[5]
+        print(json.dumps(run_case(case, years, resolution, path, '--trace' in sys.argv)))
+        return
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--resolution', type=float, default=15, help='Auflösung in Minuten')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--pulp-years', type=int, default=1, help='PuLP nur bis zu diesem Horizont (Laufzeit und Speicher)')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    print(f"Auflösung {args.resolution:g} min; Zuwachs = Spitzen-RSS über dem Stand nach dem Erzeugen der Profile")
+    print(f"{'Fall':<8}{'Jahre':>6}{'Zeitschritte':>14}{'Profile':>10}{'RSS-Zuwachs':>13}{'tracemalloc':>13}{'Datei':>11}{'Zeit':>9}")
+    results, ok = [], True
+    with tempfile.TemporaryDirectory(prefix='bench_memory_') as workdir:
+        for years in args.years:
+            digests = {}
+            for case in args.cases:
+                if case == 'pulp' and years > args.pulp_years: continue
+                path = os.path.join(workdir, f"{case}.mps")
+                rss, trace = measure(case, years, args.resolution, path, False), measure(case, years, args.resolution, path, True)
+                if rss is None or trace is None:
+                    print(f"{case:<8}{years:>6}  abgebrochen (Speicher oder Fehler)")
+                    results.append({'case': case, 'years': years, 'failed': True}); continue
+                if case != 'pulp': digests[case] = digest(path)
+                r = dict(rss, tracemalloc_peak_mb=trace['tracemalloc_peak_mb'], case=case, years=years)
+                results.append(r)
+                print(f"{case:<8}{years:>6}{r['timesteps']:>14,}{r['profiles_mb']:>8.1f}MB{r['rss_increase_mb']:>11.1f}MB"
+                      f"{r['tracemalloc_peak_mb']:>11.1f}MB{r['file_mb']:>9.0f}MB{r['seconds']:>8.1f}s")
+            if len(digests) == 2 and digests['stream'] != digests['matrix']:
+                ok = False; print(f"  {years} Jahre: Streaming-Datei weicht von write_mps ab")
+    stream = [r for r in results if r['case'] == 'stream' and not r.get('failed')]
+    if len(stream) >= 2:
+        growth = stream[-1]['tracemalloc_peak_mb'] / stream[0]['tracemalloc_peak_mb']
+        ok &= growth <= 2
+        print(f"Streaming: tracemalloc-Spitze {stream[-1]['years']} / {stream[0]['years']} Jahre = {growth:.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
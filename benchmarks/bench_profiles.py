@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: kalendergenaue Profile (mehrjährig, bis 1 Minute) gegen generate_profiles.
+
+Prüft, dass generate_calendar_profiles für 2023 in 15-min-Auflösung identisch zu
+generate_profiles ist und jedes Kalenderjahr den Zielertrag erreicht; misst die
+Erzeugungszeit für lange, feine Profile. Exit-Code 1 bei Abweichungen.
+
+    python benchmarks/bench_profiles.py --years 10 --resolution 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from systemparameter import default_params
+from zeitreihen import generate_calendar_profiles, generate_profiles
+
+KEYS = ('demand_profile_mwh', 'specific_yield_pv_mwh_per_mw', 'specific_yield_wind_mwh_per_mw', 'feed_in_tariff_profile_eur_per_mwh')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--resolution', type=int, default=1, help='Auflösung in Minuten')
+    parser.add_argument('--start', default='2020-01-01')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    ok = True
+    params = default_params()
+    reference, calendar = generate_profiles(params, seed=0), generate_calendar_profiles(params, seed=0)
+    identical = all(np.array_equal(reference[key], calendar[key]) for key in KEYS)
+    ok &= identical
+    print(f"2023, 15 min: identisch zu generate_profiles: {'ja' if identical else 'NEIN'}")
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    results = {'years': args.years, 'resolution_min': args.resolution, 'identical_2023': identical, 'cases': []}
+    for pv_shape in ('box', 'solar'):
+        for dtype in (np.float64, np.float32):
+            t0 = time.perf_counter()
+            profiles = generate_calendar_profiles(params, start=args.start, years=args.years, pv_shape=pv_shape, dtype=dtype, seed=0)
+            elapsed = time.perf_counter() - t0
+            year = profiles['timestamps'].astype('M8[Y]').astype(np.int64)
+            year -= year[0]
+            pv_per_year = np.bincount(year, weights=profiles['specific_yield_pv_mwh_per_mw'])
+            wind_per_year = np.bincount(year, weights=profiles['specific_yield_wind_mwh_per_mw'])
+            rel_error = max(np.max(np.abs(pv_per_year / params['target_annual_specific_yield_pv_mwh_per_mw'] - 1)),
+                            np.max(np.abs(wind_per_year / params['target_annual_specific_yield_wind_mwh_per_mw'] - 1)))
+            megabytes = sum(profiles[key].nbytes for key in KEYS) / 1e6
+            tolerance = 1e-5 if dtype == np.float32 else 1e-9
+            ok &= rel_error < tolerance
+            results['cases'].append({'pv_shape': pv_shape, 'dtype': np.dtype(dtype).name, 'seconds': elapsed,
+                                     'timesteps': len(year), 'megabytes': megabytes, 'annual_rel_error': rel_error})
+            print(f"{pv_shape:<6} {np.dtype(dtype).name:<8} {len(year):>10,} Zeitschritte  {elapsed:6.3f} s  {megabytes:7.1f} MB"
+                  f"  max. Jahresabweichung {rel_error:.1e}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
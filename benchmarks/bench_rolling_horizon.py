@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: rollierender Horizont vs. monolithisches LP über ein Jahr.
+
+Vergleicht Laufzeit und Zielfunktionslücke
+  1. Dispatch mit festen (optimalen) Kapazitäten: monolithisch vs. rollierend,
+  2. Kapazitätsoptimierung: monolithisch vs. Benders über den rollierenden Dispatch.
+
+Zusätzlich wird ein einziges Fenster über den ganzen Horizont gerechnet; es muss die
+Kosten von :func:`kostenlandschaft.calculate_total_cost_for_fixed_pv_wind_optimal_battery`
+exakt treffen, und der rollierende Dispatch muss auch für eine kleine Batterie mit
+geringer Leistung (5/5/20 MWh/0,5 MW) lösbar sein (sonst Exit-Code 1). Die Lücke des
+Benders-Masters ist mit rollierenden Fenstern nur die eines Ersatzmodells (keine Schranke).
+
+    python benchmarks/bench_rolling_horizon.py --resolution 60 --window-days 7 --overlap-days 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import kostenlandschaft
+import lp_matrix
+import rollierender_horizont
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=int, default=60, help='Auflösung in Minuten')
+    parser.add_argument('--window-days', type=int, default=7)
+    parser.add_argument('--overlap-days', type=int, default=1)
+    parser.add_argument('--skip-benders', action='store_true')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    profiles = generate_profiles(params, seed=0)
+    T = len(profiles['demand_profile_mwh'])
+    results = {'resolution_min': args.resolution, 'num_timesteps': T,
+               'window_days': args.window_days, 'overlap_days': args.overlap_days}
+
+    t0 = time.perf_counter()
+    full = lp_matrix.solve_lp(lp_matrix.build_system_lp(profiles, params))
+    results['monolithic_s'] = time.perf_counter() - t0
+    results['monolithic_objective'] = full['objective']
+    capacities = [full[name] for name in lp_matrix.CAPACITY_NAMES]
+
+    t0 = time.perf_counter()
+    rolling = rollierender_horizont.rolling_dispatch(profiles, params, capacities, args.window_days, args.overlap_days)
+    results['rolling_dispatch_s'] = time.perf_counter() - t0
+    results['rolling_dispatch_objective'] = rollierender_horizont.annualized_cost(params, capacities, rolling['operating_cost'], T)
+    results['rolling_dispatch_gap_rel'] = (results['rolling_dispatch_objective'] - full['objective']) / full['objective']
+
+    print(f"Zeitschritte: {T} ({args.resolution} min), Fenster {args.window_days} d + {args.overlap_days} d Überlappung")
+    print(f"Monolithisch (Auslegung + Betrieb): {results['monolithic_s']:8.2f} s  Zielwert {full['objective']:,.2f} €")
+    print(f"Rollierend (Betrieb, feste Kap.):   {results['rolling_dispatch_s']:8.2f} s  Zielwert {results['rolling_dispatch_objective']:,.2f} €  Lücke {results['rolling_dispatch_gap_rel']:.4%}")
+
+    # Ein Fenster über den ganzen Horizont: zyklischer SoC wie im Vollmodell
+    single = rollierender_horizont.rolling_dispatch(profiles, params, capacities, window_days=T // (24 * 60 // args.resolution) + 1, overlap_days=0)
+    single_cost = rollierender_horizont.annualized_cost(params, capacities, single['operating_cost'], T)
+    fixed_cost = kostenlandschaft.calculate_total_cost_for_fixed_pv_wind_optimal_battery(profiles, params, *capacities)
+    results['single_window_gap_rel'] = (single_cost - fixed_cost) / fixed_cost
+    ok = abs(results['single_window_gap_rel']) <= 1e-7
+    print(f"Ein Fenster (zyklisch):             Zielwert {single_cost:,.2f} €  Betrieb fest {fixed_cost:,.2f} €  {'gleich' if ok else 'ABWEICHUNG'}")
+
+    try:
+        small = rollierender_horizont.rolling_dispatch(profiles, params, [5, 5, 20, 0.5], args.window_days, args.overlap_days)
+        results['small_battery_objective'] = rollierender_horizont.annualized_cost(params, [5, 5, 20, 0.5], small['operating_cost'], T)
+        print(f"Kleine Batterie (5/5/20/0,5):       Zielwert {results['small_battery_objective']:,.2f} €")
+    except RuntimeError as e:
+        ok = False
+        print(f"Kleine Batterie (5/5/20/0,5):       NICHT LÖSBAR ({e})")
+
+    if not args.skip_benders:
+        bounds = [max(10, 2 * c) for c in capacities]
+        t0 = time.perf_counter()
+        best = rollierender_horizont.benders_capacity_search(profiles, params, bounds, args.window_days, args.overlap_days, progress=False)
+        results['benders_s'] = time.perf_counter() - t0
+        results['benders_objective'] = best['objective']
+        results['benders_iterations'] = len(best['history'])
+        results['benders_converged'] = best['converged']
+        results['benders_gap_rel'] = (best['objective'] - full['objective']) / full['objective']
+        results['benders_surrogate_gap'] = best['history'][-1].get('surrogate_gap') if best['history'] else None
+        print(f"Benders (Auslegung, rollierend):    {results['benders_s']:8.2f} s  Zielwert {best['objective']:,.2f} €  Lücke {results['benders_gap_rel']:.4%}  ({results['benders_iterations']} Iterationen{'' if best['converged'] else ', Schrittkriterium nicht erreicht'})")
+        if results['benders_surrogate_gap'] is not None:
+            print(f"  Lücke zum Ersatzmodell (keine Schranke): {results['benders_surrogate_gap']:.3%}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
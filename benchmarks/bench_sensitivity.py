@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Sensitivitätsbericht aus Dualen gegen erneutes Lösen je Parameteränderung.
+
+Für jeden Parameter aus :data:`sensitivitaet.PARAMETERS` wird das LP an einem Wert
+innerhalb des Gültigkeitsbereichs (Mitte zwischen aktuellem Wert und Grenze, bei
+unbeschränktem Bereich +/-10 %) neu gelöst; die Schätzung erster Ordnung muss dort
+exakt sein. Ausgegeben werden außerdem die Abweichung außerhalb des Bereichs und die
+Zeiten von Bericht und Neulösung. Exit-Code 1 bei Abweichung im Bereich.
+
+    python benchmarks/bench_sensitivity.py --resolution 60
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import loeser
+import lp_matrix
+import sensitivitaet
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+TOLERANCE = 1e-7
+
+
+def resolve(params, name, value, solver):
+    changed = dict(params, **{name: value})
+    profiles = generate_profiles(changed, seed=0)
+    return loeser.solve(lp_matrix.build_system_lp(profiles, changed), solver)['objective']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=240, help='Auflösung in Minuten')
+    parser.add_argument('--solver', default='highspy', choices=loeser.SOLVERS)
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    profiles = generate_profiles(params, seed=0)
+    lp = lp_matrix.build_system_lp(profiles, params)
+    t0 = time.perf_counter()
+    solution = loeser.solve(lp, args.solver)
+    t1 = time.perf_counter()
+    report = sensitivitaet.sensitivity_report(lp, params, profiles, solution)
+    t2 = time.perf_counter()
+    print(f"{lp['num_timesteps']} Zeitschritte; Lösen {t1 - t0:.2f} s, Bericht {t2 - t1:.3f} s (Basis: {report['basis_source']})")
+    print(f"{'Parameter':<40}{'dK/dWert':>14}{'Abw. im Bereich':>17}{'Abw. außerhalb':>16}")
+
+    ok, results = True, {'timesteps': lp['num_timesteps'], 'solve_s': t1 - t0, 'report_s': t2 - t1, 'parameters': {}}
+    for name, entry in report['parameters'].items():
+        value, (lo, hi) = entry['value'], entry['range']
+        inside = (value + hi) / 2 if np.isfinite(hi) else value * 1.1
+        outside = value + 2 * (hi - value) + 0.1 * abs(value) if np.isfinite(hi) else None
+        errors = []
+        for target in (inside, outside):
+            if target is None: errors.append(None); continue
+            exact = resolve(params, name, target, args.solver)
+            errors.append(abs(sensitivitaet.estimate_objective(report, {name: target})[0] - exact) / abs(exact))
+        ok &= errors[0] <= TOLERANCE
+        results['parameters'][name] = {'gradient': entry['gradient'], 'range': entry['range'], 'error_inside': errors[0], 'error_outside': errors[1]}
+        print(f"{name:<40}{entry['gradient']:>14,.2f}{errors[0]:>17.1e}" + (f"{errors[1]:>16.1e}" if errors[1] is not None else f"{'-':>16}"))
+    print(f"Schätzung im Gültigkeitsbereich exakt: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Solver und Verfahren auf dem Auslegungs-LP mit Telemetrie je Lösung.
+
+Jeder Fall ``solver:verfahren[:nocrossover]`` löst dasselbe Matrix-LP über
+:func:`loeser.solve`; ausgegeben werden Größe nach Presolve, Iterationen sowie
+Schreib-, Lös- und Rücklesezeit. Alle Zielwerte müssen übereinstimmen (sonst Exit-Code 1).
+CBC mit ``ipm`` (Barrier ohne externe Cholesky-Bibliothek) ist schon bei 2190
+Zeitschritten sehr langsam und daher nicht in der Standardauswahl.
+
+    python benchmarks/bench_solver.py --resolution 15
+    python benchmarks/bench_solver.py --resolution 60 --cases highspy:ipm highspy:ipm:nocrossover --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import loeser
+import lp_matrix
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+DEFAULT_CASES = ('scipy:auto', 'scipy:ipm', 'highspy:simplex', 'highspy:ipm', 'highspy:ipm:nocrossover', 'cbc:simplex')
+
+
+def parse_case(text):
+    solver, _, rest = text.partition(':')
+    method, _, flag = (rest or 'auto').partition(':')
+    return solver, method, flag != 'nocrossover'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=60, help='Auflösung in Minuten (15 min = 35 040 Zeitschritte)')
+    parser.add_argument('--cases', nargs='+', default=DEFAULT_CASES, metavar='SOLVER:VERFAHREN[:nocrossover]')
+    parser.add_argument('--threads', type=int, default=None, help='Threads (nur highspy/cbc)')
+    parser.add_argument('--time-limit', type=float, default=None)
+    parser.add_argument('--json', help='Telemetrie aller Fälle zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    start = time.perf_counter()
+    lp = lp_matrix.build_system_lp(generate_profiles(params, seed=0), params)
+    build_s = time.perf_counter() - start
+    available = loeser.available_solvers()
+    print(f"{lp['num_timesteps']} Zeitschritte, {len(lp['c'])} Variablen, Aufbau {build_s:.2f} s; verfügbar: {', '.join(available)}")
+    print(f"{'Fall':<26}{'Presolve Zeilen/Spalten':>24}{'Iter. S/I/X':>14}{'Schreiben':>11}{'Lösen':>9}{'Lesen':>9}  Zielwert")
+
+    records, objectives = [], []
+    for case in args.cases:
+        solver, method, crossover = parse_case(case)
+        if solver not in available:
+            print(f"{case:<26} übersprungen (nicht verfügbar)"); continue
+        threads = args.threads if solver != 'scipy' else None
+        solution = loeser.solve(lp, solver, threads=threads, time_limit=args.time_limit, method=method, crossover=crossover)
+        t = dict(solution['telemetry'], case=case, build_s=build_s)
+        records.append(t)
+        presolved = f"{t['presolved_rows']}/{t['presolved_columns']}" if t['presolved_rows'] is not None else '-'
+        iterations = ' '.join(f"{label}{t[k]}" for label, k in (('S', 'simplex_iterations'), ('I', 'ipm_iterations'),
+                                                                ('X', 'crossover_iterations')) if t[k])
+        fmt = lambda v: f"{v:8.2f}s" if v is not None else f"{'-':>9}"
+        print(f"{case:<26}{presolved:>24}{iterations or '-':>14}  {fmt(t['write_s'])}{fmt(t['solve_s'])}{fmt(t['read_s'])}  "
+              + (f"{t['objective']:,.2f}" if t['status'] == 'Optimal' else t['status']))
+        if t['status'] == 'Optimal': objectives.append(t['objective'])
+
+    ok = bool(objectives) and max(objectives) - min(objectives) <= 1e-6 * abs(min(objectives))
+    print("S/I/X = Simplex-, Innere-Punkte- und Crossover-Iterationen")
+    print(f"Zielwerte übereinstimmend: {'ja' if ok else 'NEIN'}")
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(records, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Importzeit der Bibliotheksmodule im Nicht-Plot-Pfad gegen ein Zeitbudget.
+
+Jede Messung ist ein frischer Python-Prozess (``import <modul>``); gemessen wird der
+Median über ``--repeat`` Läufe abzüglich des leeren Interpreterstarts. Zusätzlich wird
+geprüft, dass der Import keine Plot-/Solver-/Excel-Abhängigkeiten lädt. Bei
+Budgetüberschreitung oder verbotenen Modulen endet das Skript mit Exit-Code 1.
+
+    python benchmarks/bench_startup.py --repeat 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Budget (ms) für den reinen Import ohne Interpreterstart; gemessen 340 ms bzw. 630 ms
+BUDGET_MS = {'systemoptimierung': 600, 'windparkohneverlust': 1000}
+# Dürfen im Nicht-Plot-Pfad nicht importiert werden
+FORBIDDEN = ('matplotlib', 'pulp', 'highspy', 'openpyxl', 'scipy.stats', 'scipy.optimize')
+# Vergleich: die bisher beim Skriptstart geladenen Abhängigkeiten
+REFERENCE = 'import pulp, pandas, matplotlib.pyplot, scipy.stats'
+
+
+def measure(code, repeat):
+    """Median der Wandzeit (ms) von ``python -c code`` und die Ausgabe des letzten Laufs."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    interpreter_ms, _ = measure('pass', args.repeat)
+    reference_ms, _ = measure(REFERENCE, args.repeat)
+    results = {'interpreter_ms': interpreter_ms, 'reference_ms': reference_ms - interpreter_ms, 'modules': {}}
+    print(f"Interpreterstart: {interpreter_ms:7.1f} ms")
+    print(f"Referenz ({REFERENCE}): {reference_ms - interpreter_ms:7.1f} ms")
+    ok = True
+    for module, budget in BUDGET_MS.items():
+        check = f"import sys, {module}; print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+        total_ms, loaded = measure(check, args.repeat)
+        import_ms = total_ms - interpreter_ms
+        loaded = [m for m in loaded.strip().split(',') if m]
+        passed = import_ms <= budget and not loaded
+        ok &= passed
+        results['modules'][module] = {'import_ms': import_ms, 'budget_ms': budget, 'forbidden_loaded': loaded, 'ok': passed}
+        print(f"{module:<22} {import_ms:7.1f} ms  (Budget {budget} ms)  {'OK' if passed else 'FEHLER'}"
+              + (f"  geladen: {', '.join(loaded)}" if loaded else ""))
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
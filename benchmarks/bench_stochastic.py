@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: stochastische Auslegung über S Vergütungsszenarien gegen S unabhängige Läufe.
+
+Verglichen werden das Block-LP (``extensive``), die Szenariozerlegung (``benders``) und
+S einzelne Auslegungen mit ``generate_profiles(params, seed=s)`` (bisheriges Vorgehen:
+Skript je Saat neu starten). Ausgegeben werden Laufzeiten, Kapazitäten, erwartete Kosten
+und das Mittel der Einzeloptima (vollständige Information, untere Schranke). Exit-Code 1,
+wenn Zerlegung und Block-LP um mehr als die Abbruchtoleranz abweichen oder das Mittel
+der Einzeloptima über dem stochastischen Optimum liegt.
+
+    python benchmarks/bench_stochastic.py --resolution 240 --scenarios 5 --workers 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import loeser
+import lp_matrix
+import stochastische_optimierung
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=240, help='Auflösung in Minuten')
+    parser.add_argument('--scenarios', type=int, default=5)
+    parser.add_argument('--methods', nargs='+', choices=stochastische_optimierung.METHODS, default=list(stochastische_optimierung.METHODS))
+    parser.add_argument('--workers', type=int, default=None, help="Worker-Prozesse für 'benders' (None = alle Kerne)")
+    parser.add_argument('--solver', default='highspy', choices=loeser.SOLVERS)
+    parser.add_argument('--tol', type=float, default=1e-4, help='Relative Abbruchlücke der Zerlegung')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    profiles = generate_profiles(params, seed=0)
+    print(f"{len(profiles['demand_profile_mwh'])} Zeitschritte, {args.scenarios} Szenarien")
+    print(f"{'Verfahren':<14}{'Zeit':>9}{'PV':>8}{'Wind':>8}{'MWh':>8}{'MW':>7}{'Erwartete Kosten':>20}")
+    results = {}
+
+    def row(name, seconds, capacities, cost):
+        print(f"{name:<14}{seconds:>8.1f}s" + ''.join(f"{c:>8.2f}" for c in capacities[:3]) + f"{capacities[3]:>7.2f}{cost:>18,.0f} €")
+        results[name] = {'seconds': seconds, 'capacities': list(map(float, capacities)), 'expected_cost': float(cost)}
+
+    for method in args.methods:
+        start = time.perf_counter()
+        result = stochastische_optimierung.optimize_stochastic(profiles, params, args.scenarios, seed=0, method=method, solver=args.solver,
+                                                               tol=args.tol, max_workers=args.workers)
+        row(method, time.perf_counter() - start, [result[name] for name in lp_matrix.CAPACITY_NAMES], result['objective'])
+        if method == 'benders': results[method]['iterations'] = result['iterations']
+
+    start = time.perf_counter()
+    single = []
+    for s in range(args.scenarios):
+        solution = loeser.solve(lp_matrix.build_system_lp(generate_profiles(params, seed=s), params), args.solver)
+        single.append((solution['x'][:4], solution['objective']))
+    capacities = np.array([c for c, _ in single])
+    row('einzeln', time.perf_counter() - start, capacities.mean(axis=0), np.mean([o for _, o in single]))
+    print(f"Einzeloptima: PV {capacities[:, 0].min():.2f}-{capacities[:, 0].max():.2f}, Wind {capacities[:, 1].min():.2f}-{capacities[:, 1].max():.2f} MW "
+          f"(Zeile 'einzeln': Mittel der Kapazitäten und Kosten)")
+
+    ok = True
+    stochastic = [results[m]['expected_cost'] for m in args.methods]
+    if len(stochastic) == 2: ok &= abs(stochastic[1] - stochastic[0]) <= 2 * args.tol * abs(stochastic[0])
+    ok &= results['einzeln']['expected_cost'] <= min(stochastic) * (1 + 1e-7)
+    print(f"Verfahren übereinstimmend, Einzeloptima untere Schranke: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""Benchmark-Suite: Laufzeit der Hot Paths beider Skripte mit JSON, Baseline-Vergleich und Profiling.
+
+Stufen (je in mehreren Größen bzw. Auflösungen, Auswahl über ``--preset``/``--cases``):
+
+    leistung          get_leistung auf 1e6 bis 1e8 Windgeschwindigkeiten
+    weibull           Jahresertrag aus monatlicher_energieertrag_weibull ('exakt' je Aufruf neu, 'bins')
+    profile           zeitreihen.generate_profiles
+    lp_build          lp_matrix.build_system_lp
+    solve             loeser.solve (highspy mit 1 Thread, sonst scipy)
+    extract           Lösungsarrays, Kennzahlen, Kostenaufschlüsselung und Zeitreihen-DataFrame
+    export            ergebnisse.export_timeseries als Parquet (pyarrow) und Excel (openpyxl)
+    landscape_point   ein Punkt der Kostenlandschaft, kalt und mit Warmstart
+
+Je Fall zählt der Median über ``--repeat`` Läufe nach ``--warmup`` Aufwärmläufen; Aufbau
+(Profile, LP, Lösung) ist nicht enthalten. Für wiederholbare Zahlen auf einem Linux-Rechner
+einen Kern festlegen (``taskset -c 0``) und sonst nichts laufen lassen. ``--baseline`` vergleicht
+mit einer früheren ``--json``-Datei; langsamer als ``--threshold`` (und mehr als ``--min-delta``)
+gilt als Regression (Exit-Code 1). ``--profile MUSTER`` führt passende Fälle einmal zusätzlich
+unter cProfile oder tracemalloc aus.
+
+    python benchmarks/bench_suite.py --json basis.json
+    python benchmarks/bench_suite.py --baseline basis.json --threshold 0.15
+    python benchmarks/bench_suite.py --cases 'solve*' --profile 'solve[60min]' --profiler cprofile
+    python benchmarks/bench_suite.py --preset full --repeat 5 --json voll.json
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+PRESETS = {
+    'quick': {'leistung': [1e6, 1e7], 'weibull': ['exakt', 'bins'], 'profile': [60, 15], 'lp_build': [60, 15],
+              'solve': [240, 60], 'extract': [60], 'export': [('parquet', 60), ('xlsx', 240)], 'landscape_point': [240, 60]},
+    'full': {'leistung': [1e6, 1e7, 1e8], 'weibull': ['exakt', 'bins'], 'profile': [60, 15, 5, 1], 'lp_build': [60, 15, 5],
+             'solve': [240, 60, 15], 'extract': [60, 15], 'export': [('parquet', 15), ('xlsx', 60)], 'landscape_point': [240, 60, 15]},
+}
+# Batterie und Kapazitäten des Kostenlandschafts-Punkts (nahe dem Optimum der Standardparameter)
+LANDSCAPE_POINT = {'pv_mw': 9.0, 'wind_mw': 10.0, 'batt_mwh': 12.0, 'batt_mw': 1.3}
+
+
+class Skip(Exception):
+    """Fall ist in dieser Umgebung nicht messbar (fehlende optionale Abhängigkeit)."""
+
+
+_shared = {}
+
+
+def shared(key, make):
+    """Aufbau einmal je Prozess (Profile, LP, Lösung je Auflösung)."""
+    if key not in _shared: _shared[key] = make()
+    return _shared[key]
+
+
+def params_at(minutes):
+    from systemparameter import default_params
+    return default_params(time_resolution_hours=minutes / 60)
+
+
+def profiles_at(minutes):
+    from zeitreihen import generate_profiles
+    return shared(('profiles', minutes), lambda: generate_profiles(params_at(minutes), seed=0))
+
+
+def lp_at(minutes):
+    import lp_matrix
+    return shared(('lp', minutes), lambda: lp_matrix.build_system_lp(profiles_at(minutes), params_at(minutes)))
+
+
+def solver_name():
+    import loeser
+    return 'highspy' if 'highspy' in loeser.available_solvers() else 'scipy'
+
+
+def solution_at(minutes):
+    import loeser
+    solver = solver_name()
+    return shared(('solution', minutes), lambda: loeser.solve(lp_at(minutes), solver, threads=1 if solver == 'highspy' else None))
+
+
+# --- Stufen: setup(größe, workdir) gibt die zu messende Funktion ohne Argumente zurück ---
+
+def setup_leistung(n, workdir):
+    import windparkohneverlust
+    kurve = windparkohneverlust.leistungskurve_winter_df
+    v = np.random.default_rng(0).weibull(2.0, int(n)) * 7.5
+    return lambda: windparkohneverlust.get_leistung(v, kurve)
+
+
+def setup_weibull(methode, workdir):
+    import windparkohneverlust
+    calls = iter(range(10 ** 9))
+    # 'exakt' ist je (Kurve, k, Lambda) gecacht; ein neues Lambda je Aufruf misst die Rechnung selbst
+    return lambda: windparkohneverlust.jahresertrag_weibull(lambda_param=windparkohneverlust.lambda_standort + 1e-9 * next(calls),
+                                                            methode=methode)
+
+
+def setup_profile(minutes, workdir):
+    from zeitreihen import generate_profiles
+    params = params_at(minutes)
+    return lambda: generate_profiles(params, seed=0)
+
+
+def setup_lp_build(minutes, workdir):
+    import lp_matrix
+    profiles, params = profiles_at(minutes), params_at(minutes)
+    return lambda: lp_matrix.build_system_lp(profiles, params)
+
+
+def setup_solve(minutes, workdir):
+    import loeser
+    lp, solver = lp_at(minutes), solver_name()
+    return lambda: loeser.solve(lp, solver, threads=1 if solver == 'highspy' else None)
+
+
+def setup_extract(minutes, workdir):
+    import ergebnisse
+    import lp_matrix
+    import systemoptimierung
+    lp, profiles, params, x = lp_at(minutes), profiles_at(minutes), params_at(minutes), solution_at(minutes)['x']
+
+    def extract():
+        solution = lp_matrix.split_solution(lp, x)
+        solution['objective'] = float(lp['c'] @ x)
+        kpis = ergebnisse.summary_kpis(profiles, solution)
+        systemoptimierung.cost_breakdown(params, solution, kpis)
+        return ergebnisse.timeseries_frame(profiles, solution, params['time_resolution_hours'])
+    return extract
+
+
+def setup_export(case, workdir):
+    import importlib.util
+    import ergebnisse
+    fmt, minutes = case
+    needed = {'parquet': 'pyarrow', 'xlsx': 'openpyxl'}[fmt]
+    if importlib.util.find_spec(needed) is None: raise Skip(f"{needed} fehlt")
+    frame = ergebnisse.timeseries_frame(profiles_at(minutes), solution_at(minutes), params_at(minutes)['time_resolution_hours'])
+    return lambda: ergebnisse.export_timeseries(frame, os.path.join(workdir, 'export'), fmt)
+
+
+def setup_landscape_point(minutes, workdir):
+    import kostenlandschaft
+    profiles, params, p = profiles_at(minutes), params_at(minutes), LANDSCAPE_POINT
+    return lambda: kostenlandschaft.calculate_total_cost_for_fixed_pv_wind_optimal_battery(
+        profiles, params, p['pv_mw'], p['wind_mw'], p['batt_mwh'], p['batt_mw'], solver_threads=1)
+
+
+def setup_landscape_point_warm(minutes, workdir):
+    import kostenlandschaft
+    p = LANDSCAPE_POINT
+    model = kostenlandschaft.OperationalModel(profiles_at(minutes), params_at(minutes), p['batt_mwh'], p['batt_mw'])
+    model.solve(p['pv_mw'], p['wind_mw'])
+    # Abwechselnd zwei Nachbarpunkte wie beim Ablaufen des Rasters
+    points = iter(range(10 ** 9))
+    return lambda: model.solve(p['pv_mw'] + 0.5 * (next(points) % 2), p['wind_mw'])
+
+
+SETUPS = {'leistung': setup_leistung, 'weibull': setup_weibull, 'profile': setup_profile, 'lp_build': setup_lp_build,
+          'solve': setup_solve, 'extract': setup_extract, 'export': setup_export, 'landscape_point': setup_landscape_point}
+
+
+def label(stage, size):
+    if stage == 'leistung': return f"{stage}[{size:.0e}]"
+    if stage == 'weibull': return f"{stage}[{size}]"
+    if stage == 'export': return f"{stage}[{size[0]}-{size[1]:g}min]"
+    return f"{stage}[{size:g}min]"
+
+
+def cases(preset):
+    """(Name, Setup-Funktion, Größe) aller Fälle eines Presets in fester Reihenfolge."""
+    result = []
+    for stage, sizes in PRESETS[preset].items():
+        for size in sizes:
+            result.append((label(stage, size), SETUPS[stage], size))
+            if stage == 'landscape_point': result.append((f"{stage}_warm[{size:g}min]", setup_landscape_point_warm, size))
+    return result
+
+
+def matches(name, patterns):
+    """Exakter Fallname (Klammern sind in fnmatch Zeichenklassen) oder Muster."""
+    return any(name == p or fnmatch.fnmatchcase(name, p) for p in patterns)
+
+
+def time_case(run, repeat, warmup):
+    for _ in range(warmup): run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'repeat': repeat}
+
+
+def profile_case(name, run, profiler, directory):
+    """Führt einen Fall einmal unter cProfile (Statistikdatei + Top 15) oder tracemalloc (Spitze + Top 10) aus."""
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+    if profiler == 'cprofile':
+        import cProfile
+        import pstats
+        profile = cProfile.Profile()
+        profile.runcall(run)
+        path = os.path.join(directory, f"{safe}.prof")
+        profile.dump_stats(path)
+        print(f"\n--- cProfile {name} (gespeichert: {path}) ---")
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(15)
+    else:
+        import tracemalloc
+        tracemalloc.start()
+        result = run() # bis zum Snapshot halten, sonst zeigt er nur Reste
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del result
+        print(f"\n--- tracemalloc {name}: Spitze {peak / 1e6:.1f} MB ---")
+        for stat in snapshot.statistics('lineno')[:10]: print(f"  {stat}")
+
+
+def environment():
+    """Kennung von Rechner und Softwarestand für die JSON-Datei."""
+    import scipy
+    meta = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'scipy': scipy.__version__, 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(), 'solver': solver_name()}
+    try:
+        meta['git_commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        meta['git_commit'] = None
+    return meta
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Faktor neu/alt je Fall und ob er als Regression zählt."""
+    verdicts = {}
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None or 'median_s' not in old or 'median_s' not in r: continue
+        ratio = r['median_s'] / old['median_s'] if old['median_s'] > 0 else np.inf
+        regression = ratio > 1 + threshold and r['median_s'] - old['median_s'] > min_delta
+        verdicts[name] = {'baseline_s': old['median_s'], 'ratio': ratio, 'regression': regression}
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--preset', choices=PRESETS, default='quick')
+    parser.add_argument('--cases', nargs='+', default=['*'], metavar='MUSTER', help="Fälle per Muster, z. B. 'solve*' 'leistung[1e+07]'")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--baseline', help='Frühere --json-Datei zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Erlaubte Verlangsamung des Medians (0.2 = 20 %%)')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='Kleinere Verlangsamungen (s) gelten als Rauschen')
+    parser.add_argument('--profile', nargs='+', default=[], metavar='MUSTER', help='Passende Fälle zusätzlich einmal profilieren')
+    parser.add_argument('--profiler', choices=('cprofile', 'tracemalloc'), default='cprofile')
+    parser.add_argument('--profile-dir', default='.', help='Verzeichnis für .prof-Dateien')
+    parser.add_argument('--json', help='Ergebnisse als JSON-Datei schreiben (Grundlage für --baseline)')
+    args = parser.parse_args()
+
+    selected = [c for c in cases(args.preset) if matches(c[0], args.cases)]
+    if not selected: parser.error("Keine Fälle passen zu --cases")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)['results']
+    meta = dict(environment(), preset=args.preset, repeat=args.repeat, warmup=args.warmup)
+    print(f"Python {meta['python']}, NumPy {meta['numpy']}, {meta['cpu_count']} Kerne, Solver {meta['solver']}, Stand {meta['git_commit']}")
+    print(f"{'Fall':<32}{'Median':>11}{'Min':>11}" + (f"{'Basis':>11}{'Faktor':>8}" if baseline else ''))
+
+    results, profiled = {}, []
+    with tempfile.TemporaryDirectory(prefix='bench_suite_') as workdir:
+        for name, setup, size in selected:
+            try:
+                run = setup(size, workdir)
+            except Skip as e:
+                results[name] = {'skipped': str(e)}
+                print(f"{name:<32}  übersprungen ({e})"); continue
+            r = results[name] = time_case(run, args.repeat, args.warmup)
+            line = f"{name:<32}{r['median_s']:>10.4f}s{r['min_s']:>10.4f}s"
+            if baseline:
+                verdict = compare({name: r}, baseline, args.threshold, args.min_delta).get(name)
+                if verdict:
+                    r.update(verdict)
+                    line += f"{verdict['baseline_s']:>10.4f}s{verdict['ratio']:>7.2f}x" + ('  REGRESSION' if verdict['regression'] else '')
+                else: line += f"{'neu':>11}"
+            print(line)
+            if matches(name, args.profile): profiled.append((name, run))
+        for name, run in profiled: profile_case(name, run, args.profiler, args.profile_dir)
+
+    regressions = [name for name, r in results.items() if r.get('regression')]
+    if baseline: print(f"Regressionen (> {args.threshold:.0%} und > {args.min_delta * 1000:.0f} ms): {', '.join(regressions) or 'keine'}")
+    if args.json:
+        with open(args.json, 'w') as f: json.dump({'meta': meta, 'results': results}, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Szenario-Lauf kalt, erneut (alles im Cache) und nach Änderung einer Zeile.
+
+Erwartung: der zweite Lauf löst kein Szenario, der dritte genau eines.
+
+    python benchmarks/bench_szenarien.py --scenarios 500 --resolution 240 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import szenarien
+
+
+def scenario_table(n, resolution_min, seed=0):
+    """Zufällige Szenarien über die typischerweise variierten Parameter."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'time_resolution_hours': resolution_min / 60,
+        'grid_purchase_price_eur_per_mwh': rng.uniform(120, 220, n).round(1),
+        'feed_in_tariff_eur_per_mwh': rng.uniform(20, 60, n).round(1),
+        'specific_capex_battery_eur_per_mw': rng.uniform(300e3, 600e3, n).round(-3),
+        'discount_rate': rng.uniform(0.03, 0.08, n).round(3),
+        'negative_price_hours': rng.integers(200, 800, n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=100)
+    parser.add_argument('--resolution', type=int, default=240, help='Auflösung in Minuten')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--cache-dir', help='Cache-Verzeichnis (Standard: temporär)')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    table = scenario_table(args.scenarios, args.resolution)
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix='szenario_cache_')
+    results = {'scenarios': args.scenarios, 'resolution_min': args.resolution, 'workers': args.workers}
+
+    def run(label):
+        t0 = time.perf_counter()
+        frame = szenarien.run_scenarios(table, cache_dir=cache_dir, max_workers=args.workers)
+        elapsed = time.perf_counter() - t0
+        solved = int((~frame['cache_hit']).sum())
+        results[f'{label}_s'] = elapsed; results[f'{label}_solves'] = solved
+        print(f"{label:<10} {elapsed:8.2f} s  gelöst: {solved:4d}  aus Cache: {len(frame) - solved:4d}")
+        return frame
+
+    print(f"{args.scenarios} Szenarien, {args.resolution} min, {args.workers} Prozess(e), Cache: {cache_dir}")
+    run('kalt')
+    run('warm')
+    table.loc[len(table) // 2, 'discount_rate'] += 0.001
+    frame = run('geaendert')
+    print(frame['status'].value_counts().to_string())
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Batch-Jahresertrag (N x 12) für viele (k, λ)-Kombinationen.
+
+Misst den Durchsatz von ``weibullertrag.batch_monatsertrag`` (Kombinationen je Minute)
+seriell und mit Thread-/Prozesspool und prüft eine Stichprobe gegen die skalare,
+gecachte Einzelauswertung.
+
+    python benchmarks/bench_weibull_batch.py --n 1000000 --workers 1 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import leistungskurven
+import weibullertrag
+
+ZIEL_PRO_MINUTE = 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=1_000_000, help='Anzahl Parameterkombinationen')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count()])
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--stichprobe', type=int, default=200, help='Zeilen für den Abgleich mit der Einzelauswertung')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    kurven = [leistungskurven.leistungskurve_sommer_df(), leistungskurven.leistungskurve_winter_df()]
+    monatskurve = np.array([0 if monat in leistungskurven.SOMMER_MONATE else 1 for monat in leistungskurven.MONATSNAMEN])
+    rng = np.random.default_rng(0)
+    k = rng.uniform(1.2, 3.5, args.n)
+    lambda_param = rng.uniform(3.0, 12.0, args.n)
+    nabenhoehe = rng.choice([120, 140, 164, 180], args.n)
+    results = {'n': args.n, 'chunk_size': args.chunk_size, 'executor': args.executor, 'runs': []}
+
+    print(f"{args.n:,} Kombinationen (k, λ, Nabenhöhe) x 12 Monate, Blockgröße {args.chunk_size:,}")
+    for workers in dict.fromkeys(args.workers):
+        t0 = time.perf_counter()
+        ertrag = weibullertrag.batch_monatsertrag(k, lambda_param, kurven, monatskurve, leistungskurven.STUNDEN_PRO_MONAT,
+                                                  verfuegbarkeitsfaktor=leistungskurven.VERFUEGBARKEITSFAKTOR,
+                                                  nabenhoehe=nabenhoehe, referenzhoehe=leistungskurven.NABENHOEHE,
+                                                  chunk_size=args.chunk_size, max_workers=workers, executor=args.executor)
+        dauer = time.perf_counter() - t0
+        pro_minute = args.n / dauer * 60
+        results['runs'].append({'workers': workers, 'seconds': dauer, 'per_minute': pro_minute})
+        print(f"  Worker {workers:>2}: {dauer:7.2f} s  -> {pro_minute:,.0f} Kombinationen/min {'(Ziel erreicht)' if pro_minute >= ZIEL_PRO_MINUTE else '(unter Ziel!)'}")
+
+    # Abgleich mit der skalaren Einzelauswertung
+    lambda_nabe = lambda_param * (nabenhoehe / leistungskurven.NABENHOEHE) ** 0.2
+    idx = rng.choice(args.n, min(args.stichprobe, args.n), replace=False)
+    t0 = time.perf_counter()
+    referenz = np.array([[weibullertrag.energieertrag_weibull(kurven[monatskurve[m]], k[i], lambda_nabe[i], stunden,
+                                                              verfuegbarkeitsfaktor=leistungskurven.VERFUEGBARKEITSFAKTOR)
+                          for m, stunden in enumerate(leistungskurven.STUNDEN_PRO_MONAT)] for i in idx])
+    results['scalar_per_minute'] = len(idx) / (time.perf_counter() - t0) * 60
+    results['max_rel_error_vs_scalar'] = float(np.max(np.abs(ertrag[idx] - referenz) / referenz))
+    print(f"Einzelauswertung: {results['scalar_per_minute']:,.0f} Kombinationen/min, max. rel. Abweichung Batch: {results['max_rel_error_vs_scalar']:.2e}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Genauigkeit und Laufzeit: exakter Weibull-Ertrag vs. Bin-Summe.
+
+  1. Genauigkeitsprüfung gegen hochgenaue Quadratur (scipy.integrate.quad je Kurvenabschnitt),
+     Exit-Code 1 bei Überschreitung von ``--rtol``,
+  2. Diskretisierungsfehler der bisherigen Mittelpunktsregel je Binanzahl,
+  3. Laufzeit der 12-Monats-Schleife (Bins vs. exakt mit Cache).
+
+    python benchmarks/bench_weibull_ertrag.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.integrate import quad
+from scipy.stats import weibull_min
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import leistungskurven
+import weibullertrag
+
+K_WERTE = [1.2, 1.6, 2.0, 2.5, 3.5]
+LAMBDA_WERTE = [3.0, 5.0, 6.77, 9.0, 12.0]
+
+
+def mittlere_leistung_bins(leistungskurve_df, k, lambda_param, anzahl_bins):
+    """Referenz: Mittelpunktsregel wie bisher in ``monatlicher_energieertrag_weibull``."""
+    ws = leistungskurve_df[weibullertrag.WS_SPALTE].to_numpy(float)
+    p = leistungskurve_df[weibullertrag.LEISTUNG_SPALTE].to_numpy(float)
+    windgeschwindigkeiten = np.linspace(0, weibullertrag.integrationsgrenze(ws), anzahl_bins)
+    bin_breite = windgeschwindigkeiten[1] - windgeschwindigkeiten[0]
+    v_mittelpunkte = windgeschwindigkeiten[:-1] + bin_breite / 2
+    leistungen = np.interp(v_mittelpunkte, ws, p, left=0.0, right=p[-1])
+    leistungen[v_mittelpunkte < ws[0]] = 0.0
+    return float(np.sum(leistungen * weibull_min.pdf(v_mittelpunkte, k, scale=lambda_param) * bin_breite))
+
+
+def mittlere_leistung_quad(leistungskurve_df, k, lambda_param):
+    """Referenz: adaptive Quadratur je linearem Abschnitt."""
+    grenzen, a, b = weibullertrag.leistungskurve_segmente(leistungskurve_df[weibullertrag.WS_SPALTE], leistungskurve_df[weibullertrag.LEISTUNG_SPALTE])
+    dichte = weibull_min(k, scale=lambda_param).pdf
+    return sum(quad(lambda v: (a[i] + b[i] * v) * dichte(v), grenzen[i], grenzen[i + 1], epsabs=0, epsrel=1e-13, limit=200)[0]
+               for i in range(len(a)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rtol', type=float, default=1e-9, help='Zulässiger relativer Fehler gegenüber der Quadratur')
+    parser.add_argument('--repeats', type=int, default=200, help='Wiederholungen der 12-Monats-Schleife')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+    kurven = {'Sommer': leistungskurven.leistungskurve_sommer_df(), 'Winter': leistungskurven.leistungskurve_winter_df()}
+    results = {}
+
+    # 1. Genauigkeit gegen Quadratur
+    max_fehler = 0.0
+    for kurve in kurven.values():
+        for k in K_WERTE:
+            for lam in LAMBDA_WERTE:
+                referenz = mittlere_leistung_quad(kurve, k, lam)
+                exakt = weibullertrag.mittlere_leistung_weibull(kurve, k, lam)
+                max_fehler = max(max_fehler, abs(exakt - referenz) / referenz)
+    results['max_rel_error_vs_quad'] = max_fehler
+    ok = max_fehler <= args.rtol
+    print(f"Genauigkeit exakt vs. Quadratur ({len(kurven) * len(K_WERTE) * len(LAMBDA_WERTE)} Fälle): max. rel. Fehler {max_fehler:.2e} {'(OK)' if ok else '(ÜBERSCHRITTEN!)'}")
+
+    # 2. Diskretisierungsfehler der Bin-Summe (Standort k=2, λ=6.77)
+    exakt = weibullertrag.mittlere_leistung_weibull(kurven['Winter'], leistungskurven.K_STANDORT, leistungskurven.LAMBDA_STANDORT)
+    results['bin_error_rel'] = {}
+    for anzahl_bins in [100, 1000, 10000]:
+        fehler = (mittlere_leistung_bins(kurven['Winter'], leistungskurven.K_STANDORT, leistungskurven.LAMBDA_STANDORT, anzahl_bins) - exakt) / exakt
+        results['bin_error_rel'][anzahl_bins] = fehler
+        print(f"Bin-Summe mit {anzahl_bins:>5} Bins: rel. Abweichung {fehler:+.3e}")
+
+    # 3. Laufzeit der 12-Monats-Schleife
+    def monatsschleife(funktion):
+        return sum(funktion(kurven['Sommer'] if monat in leistungskurven.SOMMER_MONATE else kurven['Winter']) * stunden
+                   for monat, stunden in zip(leistungskurven.MONATSNAMEN, leistungskurven.STUNDEN_PRO_MONAT))
+    k, lam = leistungskurven.K_STANDORT, leistungskurven.LAMBDA_STANDORT
+    for name, funktion in [('bins', lambda kurve: mittlere_leistung_bins(kurve, k, lam, 100)),
+                           ('exakt', lambda kurve: weibullertrag.mittlere_leistung_weibull(kurve, k, lam))]:
+        t0 = time.perf_counter()
+        for _ in range(args.repeats): jahresertrag = monatsschleife(funktion)
+        results[f'{name}_loop_ms'] = (time.perf_counter() - t0) / args.repeats * 1e3
+        print(f"12-Monats-Schleife ({name:5}): {results[f'{name}_loop_ms']:7.3f} ms, Jahresertrag {jahresertrag / 1e3:,.2f} MWh je Anlage")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
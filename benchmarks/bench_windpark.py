@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: Parkertrag mit Nachlaufverlusten für große Layouts.
+
+Rasterlayout (Abstände in Rotordurchmessern) über eine zufällige Windrose mit
+``--sektoren`` Sektoren und ``--klassen`` Geschwindigkeitsklassen, beide Nachlaufmodelle.
+
+    python benchmarks/bench_windpark.py --anlagen 200 --sektoren 36 --klassen 30
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import windpark
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--anlagen', type=int, default=200)
+    parser.add_argument('--sektoren', type=int, default=36)
+    parser.add_argument('--klassen', type=int, default=30)
+    parser.add_argument('--abstand-x', type=float, default=5.0, help='Abstand in Ost-West-Richtung (D)')
+    parser.add_argument('--abstand-y', type=float, default=7.0, help='Abstand in Nord-Süd-Richtung (D)')
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    spalten = int(np.ceil(np.sqrt(args.anlagen * 2)))
+    index = np.arange(args.anlagen)
+    x = (index % spalten) * args.abstand_x * windpark.ROTORDURCHMESSER
+    y = (index // spalten) * args.abstand_y * windpark.ROTORDURCHMESSER
+    rng = np.random.default_rng(0)
+    rose = windpark.windrose(rng.uniform(0.5, 2.0, args.sektoren), rng.uniform(1.8, 2.4, args.sektoren), rng.uniform(6.0, 8.0, args.sektoren))
+    results = {'anlagen': args.anlagen, 'sektoren': args.sektoren, 'klassen': args.klassen, 'modelle': {}}
+
+    print(f"{args.anlagen} Anlagen x {args.sektoren} Sektoren x {args.klassen} Geschwindigkeitsklassen")
+    for modell in windpark.NACHLAUF_MODELLE:
+        park = windpark.Windpark(x, y, modell=modell)
+        t0 = time.perf_counter(); park.paare(args.sektoren); geometrie_s = time.perf_counter() - t0
+        t0 = time.perf_counter(); ergebnis = windpark.park_ertrag(park, rose, geschwindigkeitsklassen=args.klassen); dauer = time.perf_counter() - t0
+        verlust = 1 - ergebnis['jahr'] / ergebnis['jahr_ohne_nachlauf']
+        results['modelle'][modell] = {'geometry_s': geometrie_s, 'seconds': dauer, 'wake_loss': verlust, 'annual_mwh': ergebnis['jahr'] / 1e3}
+        print(f"  {modell:10}: Geometrie {geometrie_s:5.2f} s, Ertrag {dauer:5.2f} s, Nachlaufverlust {verlust:.2%}, {ergebnis['jahr'] / 1e6:,.1f} GWh")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: synthetische Windzeitreihen (AR(1)/Gauß-Copula) gegen den monatsweise konstanten Windertrag.
+
+Erzeugt ``--years`` Jahre mit :func:`windsynthese.spezifischer_windertrag` in einem Aufruf
+(Laufzeit, Jahre pro Sekunde), prüft die Randverteilung (Weibull-Anpassung nach der
+Momentenmethode), die Autokorrelation und die Monatserträge gegen
+:func:`zeitreihen.generate_profiles`. Mit ``--optimize`` wird zusätzlich die Auslegung
+mit beiden Windprofilen verglichen (Batteriegröße, Kosten). Exit-Code 1, wenn k oder λ
+um mehr als 2 % abweichen oder ein Monatsertrag nicht exakt getroffen wird.
+
+    python benchmarks/bench_windsynthese.py --resolution 15 --years 100 --optimize
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import leistungskurven
+import loeser
+import lp_matrix
+import windsynthese
+from systemparameter import default_params
+from windzeitreihe import weibull_aus_momenten
+from zeitreihen import generate_profiles
+
+TOLERANZ = 0.02
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', type=float, default=15, help='Auflösung in Minuten')
+    parser.add_argument('--years', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--optimize', action='store_true', help='Auslegung mit beiden Windprofilen vergleichen (60 min)')
+    parser.add_argument('--solver', default='highspy', choices=loeser.SOLVERS)
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    args = parser.parse_args()
+
+    params = default_params(time_resolution_hours=args.resolution / 60)
+    start = time.perf_counter()
+    ertrag, v = windsynthese.spezifischer_windertrag(params, args.years, seed=args.seed, geschwindigkeiten=True)
+    seconds = time.perf_counter() - start
+    print(f"{args.years} Jahre x {ertrag.shape[1]:,} Zeitschritte in {seconds:.2f} s ({args.years / seconds:,.0f} Jahre pro Sekunde)")
+
+    k, lambda_param = weibull_aus_momenten(v.mean(), (v ** 2).mean())
+    abweichung = max(abs(k / leistungskurven.K_STANDORT - 1), abs(lambda_param / leistungskurven.LAMBDA_STANDORT - 1))
+    print(f"Weibull-Anpassung: k = {k:.3f} (Vorgabe {leistungskurven.K_STANDORT}), λ = {lambda_param:.3f} (Vorgabe {leistungskurven.LAMBDA_STANDORT})")
+    z = v - v.mean(axis=1, keepdims=True)
+    autokorrelation = {}
+    for stunden in (1, 6, 24, 72):
+        lag = max(int(round(stunden * 60 / args.resolution)), 1)
+        autokorrelation[stunden] = float((z[:, :-lag] * z[:, lag:]).mean() / z.var())
+    print("Autokorrelation: " + ', '.join(f"{h} h {r:.2f}" for h, r in autokorrelation.items()))
+
+    referenz = generate_profiles(params, seed=0)['specific_yield_wind_mwh_per_mw']
+    grenzen = windsynthese._monatsgrenzen(len(referenz), params['time_resolution_hours'])
+    monatsfehler = float(np.abs(np.add.reduceat(ertrag, grenzen[:-1], axis=1) - np.add.reduceat(referenz, grenzen[:-1])).max())
+    spitze = float(ertrag.max() / params['time_resolution_hours'])
+    print(f"Monatserträge: max. Abweichung {monatsfehler:.2e} MWh/MW; Spitzenleistung {spitze:.2f} MW/MW "
+          f"(konstant: {referenz.max() / params['time_resolution_hours']:.2f}), Anteil ohne Ertrag {np.mean(ertrag == 0):.1%}")
+    results = {'years': args.years, 'timesteps': int(ertrag.shape[1]), 'seconds': seconds, 'weibull_k': k, 'weibull_lambda': lambda_param,
+               'autocorrelation': autokorrelation, 'monthly_error_mwh_per_mw': monatsfehler}
+
+    if args.optimize:
+        p60 = default_params(time_resolution_hours=1.0)
+        profiles = generate_profiles(p60, seed=0)
+        print(f"{'Windprofil':<22}{'PV':>8}{'Wind':>8}{'MWh':>8}{'MW':>7}{'Kosten':>16}")
+        results['optimize'] = {}
+        for name, wind in (('monatlich konstant', None), ('synthetisch (Jahr 0)', windsynthese.spezifischer_windertrag(p60, seed=args.seed)[0])):
+            if wind is not None: profiles = dict(profiles, specific_yield_wind_mwh_per_mw=wind)
+            solution = loeser.solve(lp_matrix.build_system_lp(profiles, p60), args.solver)
+            caps = solution['x'][:4]
+            print(f"{name:<22}" + ''.join(f"{c:>8.2f}" for c in caps[:3]) + f"{caps[3]:>7.2f}{solution['objective']:>14,.0f} €")
+            results['optimize'][name] = {'capacities': list(map(float, caps)), 'objective': float(solution['objective'])}
+
+    ok = abweichung <= TOLERANZ and monatsfehler <= 1e-6
+    print(f"Weibull-Randverteilung und Monatserträge eingehalten: {'ja' if ok else 'NEIN'}")
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Ausdünnen langer Zeitreihen für Diagramme und gesammeltes Rendern (headless, optional parallel).
+
+Ein Liniendiagramm kann je Pixelspalte ohnehin nur einen senkrechten Strich zeigen.
+:func:`decimate` reduziert eine Reihe daher vor dem Zeichnen auf höchstens zwei Punkte
+je Pixelspalte ('minmax': Minimum und Maximum jeder Spalte in zeitlicher Reihenfolge,
+Spitzen bleiben exakt sichtbar) oder auf ebenso viele Punkte nach Largest-Triangle-
+Three-Buckets ('lttb', formtreu, glattere Linien). Die Zeichenzeit hängt damit von der
+Bildbreite ab, nicht von der Länge der Reihe (Mehrjahres- oder 5-min-Reihen).
+
+:func:`render_all` schreibt alle Diagramme eines Laufs in einem Durchgang, bei
+``max_workers > 1`` in einem Prozess-Pool mit dem Agg-Backend.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DECIMATION_METHODS = ('minmax', 'lttb', 'none')
+DEFAULT_DPI = 100
+
+
+def _as_float(x):
+    """x-Werte (Zahlen oder datetime64) als float64 relativ zum ersten Wert."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64): x = x.astype('datetime64[s]').astype(np.int64)
+    x = x.astype(float)
+    return x - x[0] if len(x) else x
+
+
+def minmax_indices(y, buckets):
+    """Indizes von Minimum und Maximum je Abschnitt (zeitlich sortiert), dazu erster und letzter Punkt."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * buckets: return np.arange(n)
+    size = -(-n // buckets); m = -(-n // size)
+    padded = np.empty(m * size); padded[:n] = y; padded[n:] = y[-1]
+    blocks = padded.reshape(m, size)
+    offsets = np.arange(m) * size
+    idx = np.stack([blocks.argmin(axis=1) + offsets, blocks.argmax(axis=1) + offsets], axis=1)
+    np.minimum(idx, n - 1, out=idx); idx.sort(axis=1)
+    return np.unique(np.concatenate([[0], idx.ravel(), [n - 1]]))
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: ``threshold`` Indizes, erster und letzter Punkt inklusive."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3: return np.arange(n)
+    x = _as_float(x)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    sum_x = np.concatenate([[0.0], np.cumsum(x)]); sum_y = np.concatenate([[0.0], np.cumsum(y)])
+    idx = np.empty(threshold, dtype=np.intp); idx[0] = 0; idx[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Mittelpunkt des nächsten Abschnitts (beim letzten: der letzte Punkt)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = (sum_x[next_hi] - sum_x[next_lo]) / (next_hi - next_lo)
+        avg_y = (sum_y[next_hi] - sum_y[next_lo]) / (next_hi - next_lo)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area)); idx[i + 1] = a
+    return idx
+
+
+def decimate(x, y, pixels, method='minmax'):
+    """Gibt ``(x, y)`` mit höchstens etwa ``2 * pixels`` Punkten zurück; ``method='none'`` lässt die Reihe unverändert."""
+    if method not in DECIMATION_METHODS: raise ValueError(f"Unbekanntes Verfahren '{method}' (erlaubt: {', '.join(DECIMATION_METHODS)})")
+    x = np.asarray(x); y = np.asarray(y)
+    if method == 'none': return x, y
+    idx = minmax_indices(y, pixels) if method == 'minmax' else lttb_indices(x, y, 2 * pixels)
+    return x[idx], y[idx]
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(job):
+    function, kwargs = job
+    try: return function(**kwargs), None
+    except Exception as e: return None, f"{type(e).__name__}: {e}"
+
+
+def render_all(jobs, max_workers=1):
+    """Rendert ``jobs`` = Liste ``(funktion, kwargs)``; gibt je Job ``(Rückgabewert, Fehlertext oder None)`` zurück.
+
+    Mit ``max_workers > 1`` (None = alle Kerne) parallel in Prozessen mit Agg; die
+    Funktionen müssen dann auf Modulebene liegen und Dateien schreiben ('save').
+    """
+    if max_workers is None: max_workers = os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) <= 1: return [_render(job) for job in jobs]
+    with ProcessPoolExecutor(min(max_workers, len(jobs)), initializer=_init_worker) as pool:
+        return list(pool.map(_render, jobs))
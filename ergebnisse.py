@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Ergebnisaufbereitung: Lösungsvektoren, Kennzahlen und Zeitreihen-Export.
+
+Alle Kennzahlen werden direkt auf den Lösungsarrays berechnet. Der Export schreibt
+standardmäßig ein spaltenorientiertes Format (Parquet/Feather, ohne pyarrow CSV);
+Excel bleibt als optionaler, langsamer Pfad erhalten.
+"""
+import datetime
+import os
+from operator import attrgetter
+
+import numpy as np
+
+import lp_matrix
+
+EXPORT_FORMATS = ('parquet', 'feather', 'csv', 'xlsx')
+
+
+def pulp_values(variables):
+    """Liest die Werte eines ``LpVariable.dicts`` in einem Durchlauf als Array."""
+    return np.fromiter(map(attrgetter('varValue'), variables.values()), dtype=float, count=len(variables))
+
+
+def solution_from_pulp(model, capacity_variables, series_variables):
+    """Baut aus einem gelösten PuLP-Modell ein Lösungs-Dict im Format von :func:`lp_matrix.solve_lp`.
+
+    ``capacity_variables``: Liste der 4 Kapazitätsvariablen (Reihenfolge wie
+    ``lp_matrix.CAPACITY_NAMES``); ``series_variables``: Dict Blockname -> ``LpVariable.dicts``.
+    """
+    import pulp
+    solution = {'status': pulp.LpStatus[model.status], 'objective': pulp.value(model.objective)}
+    for name, var in zip(lp_matrix.CAPACITY_NAMES, capacity_variables): solution[name] = var.varValue
+    for name, variables in series_variables.items(): solution[name] = pulp_values(variables)
+    return solution
+
+
+def summary_kpis(profiles, solution):
+    """Jahreswerte und Kennzahlen (Autarkie, Deckungsrate, Abregelung, Bilanz) aus den Lösungsarrays."""
+    demand = profiles['demand_profile_mwh']
+    pv_gen = profiles['specific_yield_pv_mwh_per_mw'] * solution['PV_Capacity_MWp']
+    wind_gen = profiles['specific_yield_wind_mwh_per_mw'] * solution['Wind_Capacity_MW']
+    k = {
+        'total_demand_mwh': float(np.sum(demand)),
+        'total_pv_gen_mwh': float(np.sum(pv_gen)),
+        'total_wind_gen_mwh': float(np.sum(wind_gen)),
+        'total_grid_import_mwh': float(np.sum(solution['Grid_Import'])),
+        'total_grid_export_mwh': float(np.sum(solution['Grid_Export'])),
+        'total_curtailment_mwh': float(np.sum(solution['Curtailment'])),
+        'total_battery_charge_mwh': float(np.sum(solution['Battery_Charge'])),
+        'total_battery_discharge_mwh': float(np.sum(solution['Battery_Discharge'])),
+        'total_feed_in_revenue_eur': float(np.dot(solution['Grid_Export'], profiles['feed_in_tariff_profile_eur_per_mwh'])),
+    }
+    k['total_generation_mwh'] = k['total_pv_gen_mwh'] + k['total_wind_gen_mwh']
+    k['total_sources_mwh'] = k['total_generation_mwh'] + k['total_grid_import_mwh'] + k['total_battery_discharge_mwh']
+    k['total_sinks_mwh'] = k['total_demand_mwh'] + k['total_grid_export_mwh'] + k['total_curtailment_mwh'] + k['total_battery_charge_mwh']
+    has_demand = k['total_demand_mwh'] > 1e-6
+    k['self_sufficiency_rate'] = (k['total_demand_mwh'] - k['total_grid_import_mwh']) / k['total_demand_mwh'] * 100 if has_demand else 0
+    k['renewable_coverage_rate'] = k['total_generation_mwh'] / k['total_demand_mwh'] * 100 if has_demand else 0
+    k['curtailment_share'] = k['total_curtailment_mwh'] / k['total_generation_mwh'] * 100 if k['total_generation_mwh'] > 1e-6 else 0
+    return k
+
+
+def timeseries_frame(profiles, solution, time_resolution_hours, start=datetime.datetime(2023, 1, 1)):
+    """DataFrame mit den Zeitreihen in der Spaltenbelegung der bisherigen Excel-Datei."""
+    import pandas as pd
+    demand = profiles['demand_profile_mwh']
+    grid_import = solution['Grid_Import']
+    return pd.DataFrame({
+        'Timestamp': pd.date_range(start, periods=len(demand), freq=pd.Timedelta(hours=time_resolution_hours)),
+        'Bedarf (MWh)': demand,
+        'PV Erzeugung (MWh)': profiles['specific_yield_pv_mwh_per_mw'] * solution['PV_Capacity_MWp'],
+        'Wind Erzeugung (MWh)': profiles['specific_yield_wind_mwh_per_mw'] * solution['Wind_Capacity_MW'],
+        'Netzbezug (MWh)': grid_import, 'Netzeinspeisung (MWh)': solution['Grid_Export'],
+        'Abregelung (MWh)': solution['Curtailment'], 'Batterie Ladung (MWh)': solution['Battery_Charge'],
+        'Batterie Entladung (MWh)': solution['Battery_Discharge'], 'Batterie SoC (MWh)': solution['Battery_SoC'][:-1],
+        'Eigenverbrauch (MWh)': np.maximum(0, demand - grid_import),
+    })
+
+
+def export_timeseries(frame, stem, fmt='parquet'):
+    """Schreibt die Zeitreihen nach ``<stem>.<fmt>`` und gibt den Pfad zurück.
+
+    Parquet/Feather benötigen pyarrow; fehlt es, wird auf CSV ausgewichen.
+    ``'xlsx'`` (openpyxl) ist deutlich langsamer und nur für manuelle Auswertung gedacht.
+    """
+    if fmt not in EXPORT_FORMATS: raise ValueError(f"Unbekanntes Exportformat '{fmt}' (erlaubt: {', '.join(EXPORT_FORMATS)})")
+    if fmt in ('parquet', 'feather'):
+        try:
+            path = f"{stem}.{fmt}"
+            if fmt == 'parquet': frame.to_parquet(path, index=False)
+            else: frame.to_feather(path)
+            return os.path.abspath(path)
+        except ImportError:
+            print(f"HINWEIS: '{fmt}' benötigt pyarrow (pip install pyarrow). Schreibe stattdessen CSV.")
+            fmt = 'csv'
+    path = f"{stem}.{fmt}"
+    if fmt == 'csv': frame.to_csv(path, index=False)
+    else: frame.to_excel(path, index=False, engine='openpyxl')
+    return os.path.abspath(path)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Monte-Carlo-Unsicherheit des Windertrags: P50/P75/P90 für Jahres- und Monatserträge.
+
+Jede Stichprobe ist ein mögliches Betriebsjahr mit gestörtem Windklima (λ, k),
+Verfügbarkeit und Leistungskurve. Alle Stichproben eines Blocks werden gemeinsam
+über :func:`weibullertrag.batch_monatsertrag` ausgewertet. Statt aller Einzelwerte
+werden je Block nur feine Histogramme und Summen behalten; der Speicherbedarf hängt
+damit nicht von der Stichprobenzahl ab (1e7 Stichproben und mehr).
+
+Jeder Block erhält einen eigenen Zufallsstrom aus ``np.random.SeedSequence(seed)``,
+die Ergebnisse sind deshalb unabhängig von Blockreihenfolge und Anzahl der Prozesse.
+"""
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import leistungskurven
+import weibullertrag
+
+# Relative Standardabweichungen (1 Sigma) der Unsicherheiten
+UNSICHERHEITEN_STANDARD = {
+    'lambda_jahr_rel': 0.06,       # zwischenjährliche Schwankung der Windgeschwindigkeit (alle Monate gemeinsam)
+    'lambda_monat_rel': 0.0,       # zusätzliche unabhängige Schwankung je Monat (> 0 kostet den Faktor 12 an Rechenzeit)
+    'k_rel': 0.05,                 # Formparameter
+    'verfuegbarkeit_std': 0.01,    # absolut, um den Mittelwert ``verfuegbarkeitsfaktor``
+    'leistungskurve_rel': 0.03,    # multiplikative Unsicherheit der Leistungskurve
+}
+
+# Überschreitungswahrscheinlichkeiten: P90 = Ertrag, der mit 90 % Wahrscheinlichkeit überschritten wird
+UEBERSCHREITUNG = (50, 75, 90)
+
+
+def _parameter(unsicherheiten):
+    werte = dict(UNSICHERHEITEN_STANDARD)
+    for key, value in (unsicherheiten or {}).items():
+        if key not in werte: raise KeyError(f"Unbekannte Unsicherheit: {key}")
+        werte[key] = value
+    return werte
+
+
+def _stichproben_block(aufgabe):
+    """Zieht und bewertet einen Block; gibt Histogramme (12 Monate + Jahr) und Summen zurück."""
+    saat, n, modell = aufgabe
+    rng = np.random.default_rng(saat)
+    u = modell['unsicherheiten']
+    monatlich = u['lambda_monat_rel'] > 0 or not modell['monatsgleich']
+    lambda_faktor = 1 + u['lambda_jahr_rel'] * rng.standard_normal(n)
+    k_faktor = 1 + u['k_rel'] * rng.standard_normal(n)
+    if monatlich:
+        lambda_faktor = lambda_faktor[:, None] * (1 + u['lambda_monat_rel'] * rng.standard_normal((n, 12)))
+        k = np.maximum(modell['k'] * k_faktor[:, None], 1.0)
+        lambda_param = np.maximum(modell['lambda'] * lambda_faktor, 0.1)
+    else:
+        k = np.maximum(modell['k'][0] * k_faktor, 1.0)
+        lambda_param = np.maximum(modell['lambda'][0] * lambda_faktor, 0.1)
+    verfuegbarkeit = np.clip(modell['verfuegbarkeitsfaktor'] + u['verfuegbarkeit_std'] * rng.standard_normal(n), 0.0, 1.0)
+    kurvenfaktor = np.maximum(1 + u['leistungskurve_rel'] * rng.standard_normal(n), 0.0)
+
+    ertrag = weibullertrag.batch_monatsertrag(k, lambda_param, modell['kurven'], modell['monatskurve'], modell['stunden'],
+                                              anzahl_anlagen=modell['anzahl_anlagen'], verfuegbarkeitsfaktor=1.0,
+                                              chunk_size=4_000 if monatlich else 50_000)
+    ertrag *= (verfuegbarkeit * kurvenfaktor)[:, None]
+    werte = np.column_stack([ertrag, ertrag.sum(axis=1)])
+    # Histogramm je Spalte über einen gemeinsamen Indexraum (Spalte * bins + Bin)
+    bins = modell['bins']
+    pos = np.clip((werte / modell['obergrenze'] * bins).astype(np.int64), 0, bins - 1)
+    hist = np.bincount((pos + np.arange(13) * bins).ravel(), minlength=13 * bins).reshape(13, bins)
+    return hist, werte.sum(axis=0), (werte ** 2).sum(axis=0)
+
+
+def _quantil_aus_histogramm(hist, obergrenze, anteil):
+    """Quantil mit linearer Interpolation innerhalb des Bins."""
+    kum = np.cumsum(hist)
+    ziel = anteil * kum[-1]
+    i = int(np.searchsorted(kum, ziel))
+    vorher = kum[i - 1] if i > 0 else 0
+    innerhalb = (ziel - vorher) / hist[i] if hist[i] else 0.0
+    return (i + innerhalb) * obergrenze / len(hist)
+
+
+def monte_carlo_ertrag(n_stichproben, seed=0, k=leistungskurven.K_STANDORT, lambda_param=leistungskurven.LAMBDA_STANDORT,
+                       unsicherheiten=None, kurven=None, monatskurve=None, stunden_pro_monat=None,
+                       anzahl_anlagen=1, verfuegbarkeitsfaktor=leistungskurven.VERFUEGBARKEITSFAKTOR,
+                       blockgroesse=200_000, bins=100_000, max_workers=1, progress=False):
+    """P50/P75/P90 des Jahres- und der Monatserträge (kWh) aus ``n_stichproben`` Betriebsjahren.
+
+    ``k`` und ``lambda_param`` sind Skalare oder je Monat (12,) gegeben; Standard sind die
+    Standortwerte aus windparkohneverlust.py mit Sommer-/Winterkurve. ``bins`` legt die
+    Auflösung der Histogramme fest (Spannweite 0 bis Nennleistung * Stunden * 1.5).
+    ``max_workers`` > 1 verteilt die Blöcke auf einen Prozesspool.
+
+    Gibt ein Dict mit ``jahr`` ({'P50': ..., 'P75': ..., 'P90': ..., 'mittelwert', 'std'}),
+    ``monate`` (DataFrame-fähiges Dict Monatsname -> gleiche Kennzahlen) und ``n_stichproben`` zurück.
+    """
+    if kurven is None: kurven = [leistungskurven.leistungskurve_winter_df(), leistungskurven.leistungskurve_sommer_df()]
+    if monatskurve is None: monatskurve = [1 if name in leistungskurven.SOMMER_MONATE else 0 for name in leistungskurven.MONATSNAMEN]
+    stunden = np.asarray(stunden_pro_monat if stunden_pro_monat is not None else leistungskurven.STUNDEN_PRO_MONAT, dtype=float)
+    k_monat = np.broadcast_to(np.asarray(k, dtype=float), (12,))
+    lambda_monat = np.broadcast_to(np.asarray(lambda_param, dtype=float), (12,))
+    nennleistung = max(kurve[weibullertrag.LEISTUNG_SPALTE].max() for kurve in kurven)
+    obergrenze = np.append(stunden, stunden.sum()) * nennleistung * anzahl_anlagen * 1.5
+    modell = {'unsicherheiten': _parameter(unsicherheiten), 'k': k_monat, 'lambda': lambda_monat,
+              'monatsgleich': bool(np.all(k_monat == k_monat[0]) and np.all(lambda_monat == lambda_monat[0])),
+              'kurven': kurven, 'monatskurve': np.asarray(monatskurve), 'stunden': stunden,
+              'anzahl_anlagen': anzahl_anlagen, 'verfuegbarkeitsfaktor': verfuegbarkeitsfaktor,
+              'bins': bins, 'obergrenze': obergrenze}
+
+    groessen = [min(blockgroesse, n_stichproben - start) for start in range(0, n_stichproben, blockgroesse)]
+    saaten = np.random.SeedSequence(seed).spawn(len(groessen))
+    aufgaben = [(saat, n, modell) for saat, n in zip(saaten, groessen)]
+    hist = np.zeros((13, bins), dtype=np.int64); summe = np.zeros(13); summe_quadrat = np.zeros(13)
+    start_time = datetime.datetime.now()
+
+    def sammeln(ergebnisse):
+        nonlocal summe, summe_quadrat
+        for i, (h, s1, s2) in enumerate(ergebnisse):
+            hist[...] += h; summe = summe + s1; summe_quadrat = summe_quadrat + s2
+            if progress: print(f"\rMonte Carlo: Block {i + 1}/{len(aufgaben)} ({datetime.datetime.now() - start_time})", end="", flush=True)
+        if progress: print()
+
+    if max_workers == 1 or len(aufgaben) <= 1:
+        sammeln(map(_stichproben_block, aufgaben))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool: sammeln(pool.map(_stichproben_block, aufgaben))
+
+    def kennzahlen(spalte):
+        mittel = summe[spalte] / n_stichproben
+        werte = {f'P{p}': float(_quantil_aus_histogramm(hist[spalte], obergrenze[spalte], 1 - p / 100)) for p in UEBERSCHREITUNG}
+        werte['mittelwert'] = float(mittel)
+        werte['std'] = float(np.sqrt(max(summe_quadrat[spalte] / n_stichproben - mittel ** 2, 0.0)))
+        return werte
+    return {'jahr': kennzahlen(12), 'monate': {name: kennzahlen(m) for m, name in enumerate(leistungskurven.MONATSNAMEN)},
+            'n_stichproben': n_stichproben}
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""Lokaler Jobdienst für Ertrags- und Optimierungsläufe (asyncio, nur Standardbibliothek).
+
+Ein HTTP-Dienst auf localhost (oder einem Unix-Socket) nimmt Jobs als JSON entgegen,
+verteilt sie auf einen begrenzten Pool von Solver-Prozessen und legt fertige
+Ergebnisse im inhaltsadressierten Ergebnisspeicher aus :mod:`szenarien` ab. Gleiche
+Jobs (gleiche Art und gleiche vollständige Parameter nach Ergänzung der Standardwerte)
+haben denselben Schlüssel: laufende Jobs werden nicht doppelt gerechnet, fertige
+direkt aus dem Speicher beantwortet.
+
+    python jobdienst.py serve --port 8765 --workers 2
+    python jobdienst.py submit optimization --param time_resolution_hours=1 --param landscape_steps=[5,5] --watch
+    python jobdienst.py submit yield --param k=2.1 --param monte_carlo=10000 --wait
+    python jobdienst.py status <id>
+
+Schnittstelle (JSON):
+
+    POST /jobs              {"kind": "yield" | "optimization", "params": {...}} -> Job
+                            (202 neu oder bereits laufend, 200 aus dem Speicher, 503 Warteschlange voll)
+    GET  /jobs/<id>         Job mit Status, letztem Fortschritt und (wenn fertig) Ergebnis
+    GET  /jobs/<id>/events  Fortschritt als JSON-Zeilen (chunked), bis der Job fertig ist
+    GET  /stats             Zähler: eingereicht, dedupliziert, Speichertreffer, gerechnet, Fehler
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from szenarien import ResultStore, normalize
+
+# Bei Änderungen an Jobarten oder Ergebnisformat erhöhen, damit alte Einträge nicht mehr passen
+JOB_VERSION = 1
+
+KINDS = ('yield', 'optimization')
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+DEFAULT_CACHE_DIR = 'job_cache'
+# Optionen eines Optimierungsjobs neben den Systemparametern (systemparameter.DEFAULT_PARAMS)
+OPTIMIZATION_OPTIONS = {'seed': 0, 'backend': 'matrix', 'solver': None, 'landscape_steps': None}
+_TERMINAL = ('done', 'failed')
+
+# Zustand der Worker-Prozesse (einmal pro Prozess über den Initializer gesetzt)
+_worker_state = {}
+
+
+def _yield_defaults():
+    import windparkohneverlust as wp
+    return {'k': wp.k_standort, 'lambda_param': wp.lambda_standort, 'anzahl_anlagen': wp.anzahl_windanlagen,
+            'verfuegbarkeitsfaktor': wp.verfuegbarkeitsfaktor, 'methode': 'exakt', 'monte_carlo': 0, 'seed': wp.monte_carlo_seed}
+
+
+def job_spec(request):
+    """Prüft einen Jobauftrag und ergänzt die Standardwerte; gibt ``(Schlüssel, vollständiger Auftrag)`` zurück.
+
+    Unbekannte Art -> ValueError, unbekannte Parameter -> KeyError.
+    """
+    kind = request.get('kind')
+    if kind not in KINDS: raise ValueError(f"Unbekannte Jobart '{kind}' (erlaubt: {', '.join(KINDS)})")
+    given = dict(request.get('params') or {})
+    if kind == 'yield':
+        params = _yield_defaults()
+        for name, value in given.items():
+            if name not in params: raise KeyError(f"Unbekannter Parameter: {name}")
+            params[name] = value
+    else:
+        from systemparameter import default_params
+        options = {name: given.pop(name, default) for name, default in OPTIMIZATION_OPTIONS.items()}
+        params = dict(default_params(**given), **options)
+    spec = {'kind': kind, 'params': params}
+    key = hashlib.sha256(json.dumps({'job_version': JOB_VERSION, 'kind': kind, 'params': normalize(params)},
+                                    sort_keys=True).encode()).hexdigest()
+    return key, spec
+
+
+def _jsonable(value):
+    if isinstance(value, dict): return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)): return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray): return _jsonable(value.tolist())
+    if isinstance(value, np.generic): return value.item()
+    if isinstance(value, float) and not np.isfinite(value): return None
+    return value
+
+
+# --- Ausführung im Worker-Prozess ---
+
+def _init_worker(events):
+    _worker_state['events'] = events
+
+
+def _report(key, **event):
+    _worker_state['events'].put((key, event))
+
+
+def _run_yield(key, p):
+    import windparkohneverlust as wp
+    _report(key, stage='weibull')
+    annual_kwh = wp.jahresertrag_weibull(p['k'], p['lambda_param'], p['anzahl_anlagen'], p['verfuegbarkeitsfaktor'], p['methode'])
+    result = {'annual_mwh': annual_kwh / 1e3, 'monthly_mwh': wp.monatliche_prognose(annual_kwh)}
+    if p['monte_carlo']:
+        _report(key, stage='monte_carlo', samples=p['monte_carlo'])
+        mc = wp.monte_carlo(p['monte_carlo'], p['seed'], p['k'], p['lambda_param'], p['anzahl_anlagen'], p['verfuegbarkeitsfaktor'])
+        result['monte_carlo_mwh'] = {name: value / 1e3 for name, value in mc['jahr'].items()}
+    return result
+
+
+def _run_optimization(key, p):
+    import lp_matrix
+    import systemoptimierung
+    options = {name: p[name] for name in OPTIMIZATION_OPTIONS}
+    params = {name: value for name, value in p.items() if name not in OPTIMIZATION_OPTIONS}
+    # JSON kennt nur Zeichenketten als Schlüssel: Monatswerte wieder mit ganzzahligen Monaten
+    params = {name: {int(m): v for m, v in value.items()} if isinstance(value, dict) else value for name, value in params.items()}
+    _report(key, stage='optimize')
+    result = systemoptimierung.optimize(params, options['backend'], seed=options['seed'], solver=options['solver'])
+    summary = {'status': result['status'], 'build_s': result['build_time'].total_seconds(), 'solve_s': result['solve_time'].total_seconds()}
+    if result['status'] != 'Optimal': return summary
+    solution = result['solution']
+    summary.update(objective_eur=solution['objective'], capacities={name: solution[name] for name in lp_matrix.CAPACITY_NAMES},
+                   kpis=result['kpis'], costs=result['costs'])
+    if options['landscape_steps']:
+        pv_steps, wind_steps = options['landscape_steps']
+        _report(key, stage='landscape', done=0, total=pv_steps * wind_steps)
+        # Im Worker seriell (Pool-Prozesse dürfen keine eigenen Prozesse starten)
+        pv_range, wind_range, cost_grid = systemoptimierung.cost_landscape(
+            result, pv_steps, wind_steps, max_workers=1, progress=lambda done, total: _report(key, stage='landscape', done=done, total=total))
+        summary['landscape'] = {'pv_range': pv_range, 'wind_range': wind_range, 'cost_grid': cost_grid}
+    return summary
+
+
+def _run_job(key, spec):
+    """Rechnet einen Job im Worker-Prozess; Fortschritt geht über die Ereigniswarteschlange an den Dienst."""
+    _report(key, status='running')
+    start = time.perf_counter()
+    result = (_run_yield if spec['kind'] == 'yield' else _run_optimization)(key, spec['params'])
+    return _jsonable(dict(result, run_s=time.perf_counter() - start))
+
+
+# --- Dienst ---
+
+class _Job:
+    def __init__(self, key, kind, status='queued'):
+        self.key, self.kind, self.status = key, kind, status
+        self.progress, self.error = None, None
+        self.submitted = time.time(); self.started = self.finished = None
+        self.changed = asyncio.Event()
+
+    def describe(self):
+        return {'id': self.key, 'kind': self.kind, 'status': self.status, 'progress': self.progress, 'error': self.error,
+                'submitted': self.submitted, 'started': self.started, 'finished': self.finished}
+
+
+class JobService:
+    """Warteschlange, Deduplizierung und Ergebnisspeicher; muss in einer laufenden Ereignisschleife gestartet werden."""
+
+    def __init__(self, workers=None, cache_dir=DEFAULT_CACHE_DIR, max_pending=1000, max_cache_bytes=256 * 1024 ** 2):
+        self.workers = workers or os.cpu_count() or 1
+        self.store = ResultStore(cache_dir, max_cache_bytes)
+        self.max_pending = max_pending
+        self.jobs = {}
+        self.counters = {'submitted': 0, 'deduplicated': 0, 'cache_hits': 0, 'computed': 0, 'failed': 0, 'rejected': 0}
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        # 'spawn': Worker starten ohne Kopie der Ereignisschleife und der Threads des Dienstes
+        context = multiprocessing.get_context('spawn')
+        self.events = context.Queue()
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker, initargs=(self.events,))
+        self.reader = threading.Thread(target=self._read_events, daemon=True)
+        self.reader.start()
+        return self
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.events.put(None)
+        self.reader.join()
+
+    def _read_events(self):
+        while (item := self.events.get()) is not None:
+            self.loop.call_soon_threadsafe(self._on_event, *item)
+
+    def _notify(self, job):
+        event, job.changed = job.changed, asyncio.Event()
+        event.set()
+
+    def _on_event(self, key, event):
+        job = self.jobs.get(key)
+        if job is None or job.status in _TERMINAL: return
+        if event.get('status') == 'running': job.status, job.started = 'running', time.time()
+        else: job.progress = event
+        self._notify(job)
+
+    def _on_done(self, job, future):
+        job.finished = time.time()
+        try:
+            self.store.put(job.key, future.result())
+            self.store.evict()
+            job.status = 'done'; self.counters['computed'] += 1
+        except Exception as e:
+            job.status, job.error = 'failed', f"{type(e).__name__}: {e}"; self.counters['failed'] += 1
+        self._notify(job)
+
+    def pending(self):
+        return sum(job.status not in _TERMINAL for job in self.jobs.values())
+
+    def submit(self, request):
+        """Reiht einen Job ein; gibt ``(Job, 'new' | 'deduplicated' | 'cached')`` zurück (Fehler siehe :func:`job_spec`)."""
+        key, spec = job_spec(request)
+        self.counters['submitted'] += 1
+        job = self.jobs.get(key)
+        if job is not None and job.status not in _TERMINAL:
+            self.counters['deduplicated'] += 1
+            return job, 'deduplicated'
+        if key in self.store:
+            self.counters['cache_hits'] += 1
+            job = self.jobs[key] = _Job(key, spec['kind'], 'done')
+            return job, 'cached'
+        if self.pending() >= self.max_pending:
+            self.counters['rejected'] += 1
+            raise OverflowError(f"Warteschlange voll ({self.max_pending} offene Jobs)")
+        job = self.jobs[key] = _Job(key, spec['kind'])
+        future = self.loop.run_in_executor(self.pool, _run_job, key, spec)
+        future.add_done_callback(lambda f: self._on_done(job, f))
+        return job, 'new'
+
+    def describe(self, key):
+        """Job als Dict mit Ergebnis, sofern fertig; auch für Jobs früherer Läufe aus dem Speicher. None, wenn unbekannt."""
+        job = self.jobs.get(key)
+        result = self.store.get(key) if job is None or job.status == 'done' else None
+        if job is None:
+            if result is None: return None
+            job = self.jobs[key] = _Job(key, None, 'done')
+        return dict(job.describe(), result=result)
+
+    def stats(self):
+        return dict(self.counters, pending=self.pending(), workers=self.workers)
+
+
+# --- HTTP ---
+
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 503: 'Service Unavailable'}
+
+
+def _response_head(status, headers):
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+
+async def _send_json(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(_response_head(status, {'Content-Type': 'application/json', 'Content-Length': len(body), 'Connection': 'close'}) + body)
+    await writer.drain()
+
+
+async def _stream_events(service, writer, key):
+    """Sendet den Job als JSON-Zeile bei jeder Änderung (chunked), zuletzt mit Ergebnis."""
+    writer.write(_response_head(200, {'Content-Type': 'application/x-ndjson', 'Transfer-Encoding': 'chunked', 'Connection': 'close'}))
+    while True:
+        job = service.jobs[key]
+        changed = job.changed
+        payload = service.describe(key) if job.status in _TERMINAL else job.describe()
+        line = (json.dumps(payload) + '\n').encode()
+        writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        await writer.drain()
+        if job.status in _TERMINAL: break
+        await changed.wait()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _handle(service, reader, writer):
+    try:
+        request_line = await reader.readline()
+        if not request_line: return
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length') or 0))
+        parts = target.split('?', 1)[0].strip('/').split('/')
+        if method == 'POST' and parts == ['jobs']:
+            try:
+                job, outcome = service.submit(json.loads(body or b'{}'))
+            except (ValueError, KeyError, TypeError) as e: await _send_json(writer, 400, {'error': str(e.args[0] if e.args else e)}); return
+            except OverflowError as e: await _send_json(writer, 503, {'error': str(e)}); return
+            await _send_json(writer, 200 if outcome == 'cached' else 202, dict(job.describe(), outcome=outcome))
+        elif method == 'GET' and parts == ['stats']:
+            await _send_json(writer, 200, service.stats())
+        elif method == 'GET' and len(parts) in (2, 3) and parts[0] == 'jobs' and parts[2:] in ([], ['events']):
+            job = service.describe(parts[1])
+            if job is None: await _send_json(writer, 404, {'error': f"Unbekannter Job {parts[1]}"})
+            elif len(parts) == 3: await _stream_events(service, writer, parts[1])
+            else: await _send_json(writer, 200, job)
+        else:
+            await _send_json(writer, 404, {'error': f"Unbekannter Pfad {method} {target}"})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except ValueError as e:
+        await _send_json(writer, 400, {'error': str(e)})
+    finally:
+        writer.close()
+
+
+async def start_server(service, address=DEFAULT_ADDRESS):
+    """Startet den Dienst und den HTTP-Server; ``address`` = 'host:port' (Port 0 = frei wählen) oder 'unix:/pfad'.
+
+    Gibt ``(server, tatsächliche Adresse)`` zurück.
+    """
+    service.start()
+    handler = lambda reader, writer: _handle(service, reader, writer)
+    if address.startswith('unix:'):
+        server = await asyncio.start_unix_server(handler, address[5:], backlog=1024)
+        return server, address
+    host, _, port = address.rpartition(':')
+    server = await asyncio.start_server(handler, host, int(port), backlog=1024)
+    return server, f"{host}:{server.sockets[0].getsockname()[1]}"
+
+
+async def serve(address=DEFAULT_ADDRESS, workers=None, cache_dir=DEFAULT_CACHE_DIR, max_pending=1000, ready=None):
+    """Läuft bis zum Abbruch; ``ready(adresse)`` wird nach dem Start aufgerufen."""
+    service = JobService(workers, cache_dir, max_pending)
+    server, address = await start_server(service, address)
+    if ready is not None: ready(address)
+    try:
+        async with server: await server.serve_forever()
+    finally:
+        service.close()
+
+
+# --- Client ---
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def _connection(address, timeout):
+    if address.startswith('unix:'): return _UnixHTTPConnection(address[5:], timeout)
+    host, _, port = address.rpartition(':')
+    return http.client.HTTPConnection(host, int(port), timeout=timeout)
+
+
+def request(address, method, path, payload=None, timeout=60):
+    """Eine Anfrage an den Dienst; gibt die JSON-Antwort zurück (Fehlerstatus -> RuntimeError)."""
+    connection = _connection(address, timeout)
+    try:
+        body = json.dumps(payload).encode() if payload is not None else None
+        connection.request(method, path, body, {'Content-Type': 'application/json'} if body is not None else {})
+        response = connection.getresponse()
+        data = json.loads(response.read() or b'null')
+        if response.status >= 400: raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+    finally:
+        connection.close()
+
+
+def submit(address, kind, params=None, timeout=60):
+    return request(address, 'POST', '/jobs', {'kind': kind, 'params': params or {}}, timeout)
+
+
+def watch(address, job_id, timeout=None):
+    """Liefert den Job bei jeder Änderung, zuletzt fertig mit Ergebnis."""
+    connection = _connection(address, timeout)
+    try:
+        connection.request('GET', f'/jobs/{job_id}/events')
+        response = connection.getresponse()
+        if response.status >= 400: raise RuntimeError(f"{response.status}: {json.loads(response.read()).get('error')}")
+        for line in response:
+            if line.strip(): yield json.loads(line)
+    finally:
+        connection.close()
+
+
+def _parse_param(text):
+    name, sep, value = text.partition('=')
+    if not sep: raise argparse.ArgumentTypeError(f"Erwartet NAME=WERT, erhalten: {text}")
+    try: return name, json.loads(value)
+    except ValueError: return name, value
+
+
+def _format_progress(job):
+    progress = job.get('progress') or {}
+    if 'total' in progress: return f"{job['status']} {progress['stage']} {progress['done']}/{progress['total']}"
+    return f"{job['status']} {progress.get('stage', '')}".strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lokaler Jobdienst für Ertrags- und Optimierungsläufe.')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help="'host:port' oder 'unix:/pfad'")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Dienst starten')
+    serve_parser.add_argument('--workers', type=int, default=None, help='Solver-Prozesse (Standard: alle Kerne)')
+    serve_parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    serve_parser.add_argument('--max-pending', type=int, default=1000, help='Maximal offene Jobs, darüber 503')
+    submit_parser = commands.add_parser('submit', help='Job einreichen')
+    submit_parser.add_argument('kind', choices=KINDS)
+    submit_parser.add_argument('--param', type=_parse_param, action='append', default=[], metavar='NAME=WERT',
+                               help='Parameter (Wert als JSON, sonst Zeichenkette), mehrfach möglich')
+    submit_parser.add_argument('--wait', action='store_true', help='Auf das Ergebnis warten und ausgeben')
+    submit_parser.add_argument('--watch', action='store_true', help='Fortschritt verfolgen und Ergebnis ausgeben')
+    for name in ('status', 'watch'):
+        commands.add_parser(name).add_argument('id')
+    commands.add_parser('stats')
+    args = parser.parse_args(argv)
+    try: _command(args)
+    except (RuntimeError, ConnectionError) as e: sys.exit(f"Fehler: {e}")
+
+
+def _command(args):
+    if args.command == 'serve':
+        ready = lambda address: print(f"Jobdienst läuft auf {address} (Worker: {args.workers or os.cpu_count()}, Speicher: {args.cache_dir})", flush=True)
+        try: asyncio.run(serve(args.address, args.workers, args.cache_dir, args.max_pending, ready))
+        except KeyboardInterrupt: print("\nJobdienst beendet.")
+        return
+    if args.command == 'stats':
+        print(json.dumps(request(args.address, 'GET', '/stats'), indent=2)); return
+    if args.command == 'status':
+        print(json.dumps(request(args.address, 'GET', f'/jobs/{args.id}'), indent=2)); return
+    if args.command == 'submit':
+        job = submit(args.address, args.kind, dict(args.param))
+        print(f"Job {job['id']} ({job['outcome']})", file=sys.stderr)
+        if not (args.wait or args.watch): return
+        job_id = job['id']
+    else: job_id = args.id
+    for job in watch(args.address, job_id):
+        if args.command == 'watch' or args.watch: print(f"\r{_format_progress(job):<40}", end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    print(json.dumps(job, indent=2))
+
+
+if __name__ == '__main__':
+    main()
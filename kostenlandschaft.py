@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""Kostenlandschaft PV/Wind bei fester (optimaler) Batteriegröße.
+
+Jeder Rasterpunkt ist eine Betriebsoptimierung mit fixierten Kapazitäten. Die
+Punkte sind unabhängig voneinander und werden auf einen Prozess-Pool verteilt;
+die Ergebnisse fließen in der Reihenfolge ihrer Fertigstellung in ``cost_grid``.
+"""
+import datetime
+import os
+from concurrent.futures import as_completed
+
+import numpy as np
+
+try:
+    import highspy # Optional: Warmstart der Betriebsoptimierung
+except ImportError:
+    highspy = None
+
+import loeser
+import lp_matrix
+from systemparameter import charge_discharge_factors, cost_coefficients
+
+# Unterhalb dieser Größe gilt die Batterie als nicht vorhanden (wie im Skript)
+MIN_BATTERY_SIZE = 1e-3
+
+# Zustand der Worker-Prozesse (einmal pro Prozess über den Initializer gesetzt)
+_worker_state = {}
+
+
+def calculate_total_cost_for_fixed_pv_wind_optimal_battery(profiles, params, fixed_pv_mw, fixed_wind_mw,
+                                                           fixed_batt_mwh, fixed_batt_mw, backend='matrix', solver_threads=1):
+    """ Berechnet min. Gesamtkosten für feste PV/Wind-Caps und feste Batteriegröße. Optimiert nur den Betrieb.
+
+    ``solver_threads`` gilt für CBC und, falls highspy installiert ist, für HiGHS im Matrix-Pfad;
+    ohne highspy löst ``scipy.optimize.linprog`` mit seinem Standard (Threads nicht einstellbar).
+    """
+    has_battery = fixed_batt_mwh >= MIN_BATTERY_SIZE and fixed_batt_mw >= MIN_BATTERY_SIZE
+    if not has_battery: fixed_batt_mwh = fixed_batt_mw = 0.0
+
+    if backend == 'matrix':
+        lp = lp_matrix.build_system_lp(profiles, params, fixed_capacities=(fixed_pv_mw, fixed_wind_mw, fixed_batt_mwh, fixed_batt_mw))
+        if highspy is not None:
+            h = lp_matrix.highs_model(lp, {'threads': solver_threads, 'output_flag': False})
+            h.run()
+            if h.getModelStatus() == highspy.HighsModelStatus.kOptimal: return h.getInfo().objective_function_value
+            status = h.modelStatusToString(h.getModelStatus())
+        else:
+            solution = lp_matrix.solve_lp(lp)
+            if solution['status'] == 'Optimal': return solution['objective']
+            status = solution['status']
+        print(f"W: Op failed PV={fixed_pv_mw:.1f} W={fixed_wind_mw:.1f} Status={status}"); return np.inf
+    return _operational_cost_pulp(profiles, params, fixed_pv_mw, fixed_wind_mw, fixed_batt_mwh, fixed_batt_mw, has_battery, solver_threads)
+
+
+def _operational_cost_pulp(profiles, params, fixed_pv_mw, fixed_wind_mw, fixed_batt_mwh, fixed_batt_mw, has_battery, solver_threads):
+    """Betriebsoptimierung mit PuLP/CBC (ursprünglicher Pfad aus "Lineare Optimierung.py")."""
+    import pulp
+    demand_profile_mwh = profiles['demand_profile_mwh']
+    feed_in_tariff_profile_eur_per_mwh = profiles['feed_in_tariff_profile_eur_per_mwh']
+    num_timesteps = len(demand_profile_mwh)
+    timesteps = range(num_timesteps); soc_timesteps = range(num_timesteps + 1)
+    time_resolution_hours = params['time_resolution_hours']
+    battery_soc_min_percent = params['battery_soc_min_percent']
+    grid_purchase_price_eur_per_mwh = params['grid_purchase_price_eur_per_mwh']
+    charge_discharge_eff_sqrt, charge_discharge_eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+    pv_gen_f = profiles['specific_yield_pv_mwh_per_mw'] * fixed_pv_mw
+    wind_gen_f = profiles['specific_yield_wind_mwh_per_mw'] * fixed_wind_mw
+    fixed_costs = fixed_pv_mw * costs['pv_eur_per_mw'] + fixed_wind_mw * costs['wind_eur_per_mw']
+    solver = pulp.PULP_CBC_CMD(msg=False, threads=solver_threads)
+
+    # Fall 1: Keine signifikante Batterie -> Kosten ohne Batteriebetrieb
+    if not has_battery:
+        op_model_nb = pulp.LpProblem(f"OpOptNoBatt_{fixed_pv_mw:.0f}PV_{fixed_wind_mw:.0f}W", pulp.LpMinimize)
+        grid_import_op_nb = pulp.LpVariable.dicts("GI_NB", timesteps, lowBound=0)
+        grid_export_op_nb = pulp.LpVariable.dicts("GE_NB", timesteps, lowBound=0)
+        curt_op_nb = pulp.LpVariable.dicts("Curt_NB", timesteps, lowBound=0)
+        grid_imp_cost = pulp.lpSum(grid_import_op_nb[t] * grid_purchase_price_eur_per_mwh for t in timesteps)
+        feed_in_rev = pulp.lpSum(grid_export_op_nb[t] * feed_in_tariff_profile_eur_per_mwh[t] for t in timesteps)
+        op_model_nb += fixed_costs + grid_imp_cost - feed_in_rev, "CostNoBatt"
+        for t in timesteps: op_model_nb += pv_gen_f[t] + wind_gen_f[t] + grid_import_op_nb[t] == demand_profile_mwh[t] + grid_export_op_nb[t] + curt_op_nb[t], f"BalNB_{t}"
+        op_model_nb.solve(solver=solver)
+        if pulp.LpStatus[op_model_nb.status] == 'Optimal': return pulp.value(op_model_nb.objective)
+        else: print(f"W: NoBatt-Op failed PV={fixed_pv_mw:.1f} W={fixed_wind_mw:.1f}"); return np.inf
+
+    # Fall 2: Batterie vorhanden -> Betriebsoptimierung mit fester Batteriegröße
+    op_model = pulp.LpProblem(f"OpOptWBatt_{fixed_pv_mw:.0f}PV_{fixed_wind_mw:.0f}W", pulp.LpMinimize)
+    grid_import_op = pulp.LpVariable.dicts("GI_Op", timesteps, lowBound=0)
+    grid_export_op = pulp.LpVariable.dicts("GE_Op", timesteps, lowBound=0)
+    curtailment_op = pulp.LpVariable.dicts("Curt_Op", timesteps, lowBound=0)
+    battery_charge_op = pulp.LpVariable.dicts("BC_Op", timesteps, lowBound=0)
+    battery_discharge_op = pulp.LpVariable.dicts("BD_Op", timesteps, lowBound=0)
+    battery_soc_op = pulp.LpVariable.dicts("BSOC_Op", soc_timesteps, lowBound=0)
+    # Fixkosten PV/Wind + Fixkosten der Batterie
+    fixed_costs += fixed_batt_mw * costs['battery_eur_per_mw'] + fixed_batt_mwh * costs['battery_eur_per_mwh']
+    grid_imp_cost = pulp.lpSum(grid_import_op[t] * grid_purchase_price_eur_per_mwh for t in timesteps)
+    feed_in_rev = pulp.lpSum(grid_export_op[t] * feed_in_tariff_profile_eur_per_mwh[t] for t in timesteps)
+    op_model += fixed_costs + grid_imp_cost - feed_in_rev, "TotalCostOp"
+    for t in timesteps:
+        op_model += pv_gen_f[t] + wind_gen_f[t] + grid_import_op[t] + battery_discharge_op[t] == demand_profile_mwh[t] + grid_export_op[t] + curtailment_op[t] + battery_charge_op[t], f"OpBal_{t}"
+        op_model += battery_soc_op[t+1] == battery_soc_op[t] + battery_charge_op[t] * charge_discharge_eff_sqrt - battery_discharge_op[t] * charge_discharge_eff_sqrt_inv, f"OpSoCUp_{t}"
+        op_model += battery_charge_op[t] <= fixed_batt_mw * time_resolution_hours, f"OpBCP_{t}"
+        op_model += battery_discharge_op[t] <= fixed_batt_mw * time_resolution_hours, f"OpBDP_{t}"
+        op_model += battery_soc_op[t] >= battery_soc_min_percent * fixed_batt_mwh, f"OpSoCMin_{t}"
+        op_model += battery_soc_op[t] <= fixed_batt_mwh, f"OpSoCMax_{t}"
+    op_model += battery_soc_op[num_timesteps] >= battery_soc_min_percent * fixed_batt_mwh, f"OpSoCMinN_{num_timesteps}"
+    op_model += battery_soc_op[num_timesteps] <= fixed_batt_mwh, f"OpSoCMaxN_{num_timesteps}"
+    op_model += battery_soc_op[num_timesteps] == battery_soc_op[0], "OpSoCCyc"
+    op_model.solve(solver=solver)
+    if pulp.LpStatus[op_model.status] == 'Optimal': return pulp.value(op_model.objective)
+    else: print(f"W: Batt-Op failed PV={fixed_pv_mw:.1f} W={fixed_wind_mw:.1f} Status={pulp.LpStatus[op_model.status]}"); return np.inf
+
+
+class OperationalModel:
+    """Einmal aufgebautes Betriebsmodell für beliebig viele (PV, Wind)-Punkte.
+
+    Die Batteriegröße ist fest; pro Punkt ändern sich nur die rechten Seiten der
+    Energiebilanz (PV- und Winderzeugung) und die Zielfunktionskonstante (Fixkosten).
+    Mit ``highspy`` bleibt die Simplex-Basis zwischen den Punkten erhalten und jeder
+    Punkt ist eine Dual-Simplex-Nachoptimierung; ohne ``highspy`` wird das reduzierte
+    LP jeweils kalt über scipy gelöst.
+    """
+
+    def __init__(self, profiles, params, batt_mwh, batt_mw, solver_threads=1):
+        if batt_mwh < MIN_BATTERY_SIZE or batt_mw < MIN_BATTERY_SIZE: batt_mwh = batt_mw = 0.0
+        self.batt_mwh, self.batt_mw = batt_mwh, batt_mw
+        full = lp_matrix.build_system_lp(profiles, params)
+        # Referenz bei PV = Wind = 0; Erzeugung wird pro Punkt von der Bilanz-RHS abgezogen
+        self.base = lp_matrix.fix_capacities(full, (0.0, 0.0, batt_mwh, batt_mw))
+        self.T = full['num_timesteps']
+        self.spv = full['A_eq'][:self.T, lp_matrix.PV].toarray().ravel()
+        self.swind = full['A_eq'][:self.T, lp_matrix.WIND].toarray().ravel()
+        self.cost_pv, self.cost_wind = full['c'][lp_matrix.PV], full['c'][lp_matrix.WIND]
+        self.demand = self.base['b_eq'][:self.T].copy()
+        self.iterations = 0
+        self.highs = None
+        if highspy is not None:
+            self.highs = lp_matrix.highs_model(self.base, {'solver': 'simplex', 'simplex_strategy': 1, 'threads': solver_threads})
+            self._rows = np.arange(self.T, dtype=np.int32)
+
+    @property
+    def warm_start(self):
+        return self.highs is not None
+
+    def solve(self, pv_mw, wind_mw, gradient=False):
+        """Minimale Gesamtkosten für die gegebenen PV-/Windkapazitäten.
+
+        Mit ``gradient=True`` wird ``(Kosten, dK/dPV, dK/dWind)`` zurückgegeben; die
+        Ableitungen (€/MW) folgen aus den Dualen der Energiebilanz.
+        """
+        rhs = self.demand - self.spv * pv_mw - self.swind * wind_mw
+        constant = self.base['objective_constant'] + self.cost_pv * pv_mw + self.cost_wind * wind_mw
+        if self.highs is None:
+            lp = dict(self.base, objective_constant=constant)
+            lp['b_eq'] = np.concatenate([rhs, self.base['b_eq'][self.T:]])
+            solution = lp_matrix.solve_lp(lp)
+            cost, duals = solution['objective'], solution.get('eq_duals')
+        else:
+            self.highs.changeRowsBounds(self.T, self._rows, rhs, rhs)
+            self.highs.changeObjectiveOffset(constant)
+            self.highs.run()
+            info = self.highs.getInfo()
+            self.iterations += info.simplex_iteration_count
+            if self.highs.getModelStatus() == highspy.HighsModelStatus.kOptimal:
+                cost = info.objective_function_value
+                duals = np.asarray(self.highs.getSolution().row_dual) if gradient else None
+            else:
+                print(f"W: Op failed PV={pv_mw:.1f} W={wind_mw:.1f} Status={self.highs.modelStatusToString(self.highs.getModelStatus())}")
+                cost, duals = np.inf, None
+        if not gradient: return cost
+        if duals is None: return cost, np.nan, np.nan
+        # Bilanz-RHS = Bedarf - spv * PV - swind * Wind
+        balance = duals[:self.T]
+        return cost, self.cost_pv - balance @ self.spv, self.cost_wind - balance @ self.swind
+
+
+def snake_order(num_rows, num_cols):
+    """Rasterindizes zeilenweise, jede zweite Zeile rückwärts (Nachbarpunkte folgen aufeinander)."""
+    order = []
+    for i in range(num_rows):
+        cols = range(num_cols) if i % 2 == 0 else range(num_cols - 1, -1, -1)
+        order.extend((i, j) for j in cols)
+    return order
+
+
+def _init_worker(profiles, params, options):
+    """Initializer: Profile einmal pro Prozess ablegen (Thread-Limits setzt :class:`loeser.ThreadLimitedPool`)."""
+    _worker_state.update(profiles=profiles, params=params, options=options)
+
+
+def _solve_points(points, profiles, params, options, op_model=None):
+    """Löst eine Folge von Rasterpunkten ``(i, j, pv, wind)`` und gibt ``(i, j, Kosten)`` zurück."""
+    if op_model is not None:
+        return [(i, j, op_model.solve(pv_mw, wind_mw, options.get('gradient', False))) for i, j, pv_mw, wind_mw in points]
+    return [(i, j, calculate_total_cost_for_fixed_pv_wind_optimal_battery(
+                profiles, params, pv_mw, wind_mw, options['batt_mwh'], options['batt_mw'],
+                backend=options['backend'], solver_threads=options['solver_threads']))
+            for i, j, pv_mw, wind_mw in points]
+
+
+def _worker_chunk(points):
+    s = _worker_state; opt = s['options']
+    if opt['warm_start'] and 'op_model' not in s:
+        s['op_model'] = OperationalModel(s['profiles'], s['params'], opt['batt_mwh'], opt['batt_mw'], opt['solver_threads'])
+    return _solve_points(points, s['profiles'], s['params'], opt, s.get('op_model'))
+
+
+class _Evaluator:
+    """Löst Rasterpunkte seriell (ein :class:`OperationalModel` bei Warmstart) oder in einem Prozess-Pool.
+
+    Der Pool bleibt über mehrere Aufrufe von :meth:`run` bestehen (adaptive Verfeinerung in Runden).
+    """
+
+    def __init__(self, profiles, params, options, max_workers):
+        self.profiles, self.params, self.options, self.max_workers = profiles, params, options, max_workers
+        self.op_model = self.pool = None
+
+    def __enter__(self):
+        opt = self.options
+        if self.max_workers == 1:
+            if opt['warm_start']:
+                self.op_model = OperationalModel(self.profiles, self.params, opt['batt_mwh'], opt['batt_mw'], opt['solver_threads'])
+        else:
+            self.pool = loeser.ThreadLimitedPool(self.max_workers, opt['solver_threads'], _init_worker,
+                                                 (self.profiles, self.params, opt))
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None: self.pool.shutdown()
+
+    def run(self, points):
+        """Liefert ``(i, j, Kosten)`` je Punkt ``(i, j, pv, wind)`` in der Reihenfolge der Fertigstellung."""
+        if self.pool is None:
+            for point in points:
+                yield from _solve_points([point], self.profiles, self.params, self.options, self.op_model)
+            return
+        # Kaltstart: ein Punkt je Auftrag. Warmstart: zusammenhängende Abschnitte der Schlangenlinie,
+        # damit aufeinanderfolgende Punkte eines Workers benachbart sind.
+        chunk_size = max(1, -(-len(points) // (4 * self.max_workers))) if self.options['warm_start'] else 1
+        chunks = [points[k:k + chunk_size] for k in range(0, len(points), chunk_size)]
+        futures = [self.pool.submit(_worker_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+class _Progress:
+    """Fortschritt und Restzeit auf Basis der tatsächlich fertigen Punkte.
+
+    ``enabled`` kann statt True/False eine Funktion ``f(fertig, gesamt)`` sein, die je
+    fertigem Punkt statt der Konsolenausgabe aufgerufen wird (z. B. vom Jobdienst).
+    """
+
+    def __init__(self, total, enabled):
+        self.total = total; self.done = 0
+        self.callback = enabled if callable(enabled) else None
+        self.enabled = bool(enabled) and self.callback is None
+        self.start = datetime.datetime.now()
+
+    def step(self):
+        self.done += 1
+        if self.callback is not None: self.callback(self.done, self.total)
+        if not self.enabled: return
+        elapsed = datetime.datetime.now() - self.start
+        if elapsed.total_seconds() > 1:
+            est_remaining = elapsed * (self.total / self.done) - elapsed
+            print(f"\rBerechne Kostenlandschaft: Punkt {self.done}/{self.total}. Verbleibend ca.: {str(est_remaining).split('.')[0]}", end="", flush=True)
+        else:
+            print(f"\rBerechne Kostenlandschaft: Punkt {self.done}/{self.total}...", end="", flush=True)
+
+
+def compute_cost_landscape(profiles, params, pv_range, wind_range, batt_mwh, batt_mw, backend='matrix',
+                           max_workers=None, solver_threads=1, progress=True, warm_start=False):
+    """Berechnet ``cost_grid[i, j]`` für ``wind_range[i]`` x ``pv_range[j]``.
+
+    ``max_workers=None`` nutzt alle Kerne, ``max_workers=1`` rechnet seriell im
+    aktuellen Prozess. Jeder Punkt wird mit derselben Funktion gelöst, die
+    Ergebnisse sind daher unabhängig von der Anzahl der Worker identisch.
+    ``solver_threads`` begrenzt die Threads je Solveraufruf. ``progress`` ist True/False
+    oder eine Funktion ``f(fertig, gesamt)``, die je gelöstem Punkt aufgerufen wird.
+
+    Mit ``warm_start=True`` (nur Backend ``'matrix'``) baut jeder Prozess ein
+    :class:`OperationalModel` einmal auf und läuft das Raster in Schlangenlinie ab;
+    die Kosten stimmen dann im Rahmen der Solver-Toleranz mit dem Kaltstart überein.
+    """
+    cost_grid = np.full((len(wind_range), len(pv_range)), np.nan)
+    warm_start = warm_start and backend == 'matrix'
+    order = snake_order(len(wind_range), len(pv_range)) if warm_start else \
+        [(i, j) for i in range(len(wind_range)) for j in range(len(pv_range))]
+    points = [(i, j, pv_range[j], wind_range[i]) for i, j in order]
+    tracker = _Progress(len(points), progress)
+    options = {'batt_mwh': batt_mwh, 'batt_mw': batt_mw, 'backend': backend, 'solver_threads': solver_threads, 'warm_start': warm_start}
+    if max_workers is None: max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(points)))
+
+    with _Evaluator(profiles, params, options, max_workers) as evaluator:
+        for i, j, cost in evaluator.run(points):
+            cost_grid[i, j] = cost
+            tracker.step()
+    if tracker.enabled: print()
+    return cost_grid
+
+
+
+# Adaptive Landschaft: Zellen nahe dem Minimum werden bevorzugt, je Runde nur Zellen ab diesem Anteil der größten Bewertung
+_NEAR_OPTIMUM_WEIGHT = 16
+_MARK_FRACTION = 0.25
+
+
+def _tangent_planes(points, costs, slopes, query):
+    """Maximum der Tangentialebenen: untere Schranke der konvexen Kostenfunktion, exakt in den Stützstellen."""
+    return np.max(costs + (query[:, None, 0] - points[:, 0]) * slopes[:, 0] + (query[:, None, 1] - points[:, 1]) * slopes[:, 1], axis=1)
+
+
+def compute_adaptive_landscape(profiles, params, pv_range, wind_range, batt_mwh, batt_mw, max_solves=None, coarse_steps=5,
+                               max_depth=3, tolerance=0.005, cutoff=2.0, output_steps=61, max_workers=None,
+                               solver_threads=1, progress=True):
+    """Adaptive Kostenlandschaft über dasselbe Gebiet wie ``pv_range`` x ``wind_range`` (nur Backend 'matrix').
+
+    Die Kosten sind als Wertfunktion des Betriebs-LP in (PV, Wind) konvex und stückweise
+    linear; jede Lösung liefert über die Duale der Energiebilanz zusätzlich eine
+    Tangentialebene. Das Ersatzmodell ist das Maximum dieser Ebenen, die Mittelung der
+    Eckwerte einer Zelle eine obere Schranke. Nach einem groben Startraster
+    ``coarse_steps`` x ``coarse_steps`` werden in Runden die Zellen mit der größten Lücke
+    zwischen beiden Schranken (Krümmung, relativ zu den Minimalkosten, ab ``tolerance``)
+    geviertelt, bis ``max_depth``; Zellen, deren untere Schranke unter dem besten Wert
+    liegt, zuerst. Zellen vollständig über ``cutoff`` x Minimalkosten (außerhalb der
+    Konturstufen) bleiben grob. ``max_solves`` (Standard: ein Drittel des gleichförmigen
+    Rasters) begrenzt die LP-Lösungen.
+
+    Gibt ein Dict mit ``pv_range``, ``wind_range`` und ``cost_grid`` (Ersatzmodell auf
+    ``output_steps`` Punkten je Achse), ``samples`` (gelöste Punkte als Zeilen PV, Wind,
+    Kosten), ``solves``, ``uniform_solves``, ``saved_solves``, ``rounds``, ``max_gap_rel``
+    (größte verbleibende Schrankenlücke im dargestellten Bereich) und
+    ``spacing_at_minimum`` (Rasterweite PV/Wind am besten Punkt) zurück.
+    """
+    uniform_solves = len(pv_range) * len(wind_range)
+    if max_solves is None: max_solves = -(-uniform_solves // 3)
+    if max_solves < coarse_steps ** 2:
+        raise ValueError(f"max_solves={max_solves} reicht nicht für das Startraster ({coarse_steps}x{coarse_steps})")
+    # Jeder Prozess löst über ein OperationalModel (Warmstart mit highspy), das auch die Duale liefert
+    options = {'batt_mwh': batt_mwh, 'batt_mw': batt_mw, 'backend': 'matrix', 'solver_threads': solver_threads,
+               'warm_start': True, 'gradient': True}
+    if max_workers is None: max_workers = os.cpu_count() or 1
+    tracker = _Progress(max_solves, progress)
+
+    # Punkte auf einem ganzzahligen Gitter der feinsten Stufe: a = PV-Index, b = Wind-Index (Einheitsquadrat a/L, b/L)
+    L = (coarse_steps - 1) * 2 ** max_depth
+    pv0, pv1, w0, w1 = pv_range[0], pv_range[-1], wind_range[0], wind_range[-1]
+    samples = {}
+    size = 2 ** max_depth
+    cells = [(a, b, size) for b in range(0, L, size) for a in range(0, L, size)]
+
+    def evaluate(keys):
+        points = [(b, a, pv0 + (pv1 - pv0) * a / L, w0 + (w1 - w0) * b / L) for a, b in keys]
+        for b, a, (cost, d_pv, d_wind) in evaluator.run(points):
+            samples[(a, b)] = (cost, d_pv * (pv1 - pv0), d_wind * (w1 - w0))
+            tracker.step()
+
+    def corners(a, b, s):
+        return ((a, b), (a + s, b), (a, b + s), (a + s, b + s))
+
+    with _Evaluator(profiles, params, options, max(1, min(max_workers, max_solves))) as evaluator:
+        evaluate([(j * size, i * size) for i, j in snake_order(coarse_steps, coarse_steps)])
+        rounds = 1
+        while True:
+            keys = [k for k, v in samples.items() if np.all(np.isfinite(v))]
+            values = np.array([samples[k] for k in keys])
+            points = np.array(keys) / L
+            best_key = keys[int(np.argmin(values[:, 0]))]
+            best = samples[best_key][0]; scale = abs(best) or 1.0
+            lower = _tangent_planes(points, values[:, 0], values[:, 1:], np.array([(a + s / 2, b + s / 2) for a, b, s in cells]) / L)
+            candidates, max_gap = [], 0.0
+            for (a, b, s), low in zip(cells, lower):
+                upper = np.mean([samples[k][0] for k in corners(a, b, s)])
+                if not np.isfinite(upper) or low > cutoff * best: continue
+                gap = (upper - low) / scale
+                max_gap = max(max_gap, gap)
+                if s > 1 and gap > tolerance: candidates.append((gap * (_NEAR_OPTIMUM_WEIGHT if low < best else 1), (a, b, s)))
+            # Größte Bewertung zuerst, solange das Budget für die bis zu 5 neuen Punkte der Zelle reicht
+            candidates.sort(key=lambda c: -c[0])
+            selected, new = [], set()
+            for score, (a, b, s) in candidates:
+                if score < _MARK_FRACTION * candidates[0][0]: break
+                h = s // 2
+                needed = {(a + h, b), (a, b + h), (a + s, b + h), (a + h, b + s), (a + h, b + h)} - samples.keys() - new
+                if len(samples) + len(new) + len(needed) > max_solves: continue
+                selected.append((a, b, s)); new |= needed
+            if not selected: break
+            evaluate(sorted(new, key=lambda k: (k[1], k[0] if k[1] % 2 == 0 else -k[0])))
+            rounds += 1
+            selected = set(selected)
+            cells = [c for c in cells if c not in selected] + [(a + da, b + db, s // 2) for a, b, s in selected
+                                                               for da in (0, s // 2) for db in (0, s // 2)]
+    if tracker.enabled: print()
+
+    u, v = np.meshgrid(np.linspace(0, 1, output_steps), np.linspace(0, 1, output_steps))
+    cost_grid = _tangent_planes(points, values[:, 0], values[:, 1:], np.column_stack([u.ravel(), v.ravel()])).reshape(output_steps, output_steps)
+    finest = min(s for a, b, s in cells if best_key in corners(a, b, s))
+    return {'pv_range': np.linspace(pv0, pv1, output_steps), 'wind_range': np.linspace(w0, w1, output_steps), 'cost_grid': cost_grid,
+            'samples': np.array([(pv0 + (pv1 - pv0) * a / L, w0 + (w1 - w0) * b / L, v[0]) for (a, b), v in samples.items()]),
+            'solves': len(samples), 'uniform_solves': uniform_solves, 'saved_solves': uniform_solves - len(samples),
+            'rounds': rounds, 'max_gap_rel': max_gap, 'spacing_at_minimum': ((pv1 - pv0) * finest / L, (w1 - w0) * finest / L)}
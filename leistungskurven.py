@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Leistungskurven und Standortannahmen der Windkraftanlage.
+
+Die Werte sind die Standardannahmen von windparkohneverlust.py und werden von den
+Ertragsmodulen und Benchmarks gemeinsam genutzt.
+"""
+import numpy as np
+import pandas as pd
+
+from weibullertrag import LEISTUNG_SPALTE, WS_SPALTE
+
+# --- Stützstellen ---
+WINDGESCHWINDIGKEITEN = [
+    3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10,
+    10.5, 11, 11.5, 12, 12.5, 13, 13.5, 14, 14.5, 15, 15.5, 16,
+    16.5, 17, 17.5, 18, 18.5, 19, 19.5, 20, 20.5, 21, 21.5, 22,
+    22.5, 23, 23.5, 24, 24.5, 25, 25.5, 26
+]
+LEISTUNG_SOMMER_KW = [
+    28, 127, 260, 427, 628, 865, 1145, 1473, 1855, 2294, 2795, 3356,
+    3950, 4545, 5126, 5656, 6066, 6364, 6572, 6707, 6780, 6799, 6800,
+    6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800,
+    6800, 6603, 6331, 6059, 5794, 5528, 5270, 5012, 4760, 4508, 4264,
+    4019, 3774
+]
+LEISTUNG_WINTER_KW = [
+    37, 143, 288, 469, 687, 944, 1248, 1604, 2018, 2494, 3036, 3627,
+    4230, 4820, 5382, 5864, 6218, 6472, 6644, 6749, 6795, 6800, 6800,
+    6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800,
+    6800, 6603, 6331, 6059, 5794, 5528, 5270, 5012, 4760, 4508, 4264,
+    4019, 3774
+]
+
+MONATSNAMEN = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+SOMMER_MONATE = ['Mai', 'Jun', 'Jul', 'Aug', 'Sep']
+STUNDEN_PRO_MONAT = [31*24, 28*24, 31*24, 30*24, 31*24, 30*24, 31*24, 31*24, 30*24, 31*24, 30*24, 31*24]
+K_STANDORT = 2
+LAMBDA_STANDORT = 6.77
+NABENHOEHE = 164
+VERFUEGBARKEITSFAKTOR = 0.97
+
+
+def leistungskurve_sommer_df():
+    return pd.DataFrame({WS_SPALTE: WINDGESCHWINDIGKEITEN, LEISTUNG_SPALTE: LEISTUNG_SOMMER_KW})
+
+
+def leistungskurve_winter_df():
+    return pd.DataFrame({WS_SPALTE: WINDGESCHWINDIGKEITEN, LEISTUNG_SPALTE: LEISTUNG_WINTER_KW})
+
+
+class KompilierteLeistungskurve:
+    """Einmal aufbereitete Leistungskurve für die Auswertung sehr vieler Windgeschwindigkeiten.
+
+    Hält Stützstellen, Leistungen und Steigungen als zusammenhängende float64-Arrays.
+    Bei gleichabständigen Stützstellen (hier 0.5 m/s) wird der Abschnitt per
+    Indexrechnung statt Binärsuche bestimmt. Ausgewertet wird blockweise, sodass die
+    Zwischenarrays im Cache bleiben. Das Ergebnis ist identisch zu ``get_leistung``:
+    0 unterhalb der Einschaltgeschwindigkeit, linear zwischen den Stützstellen, oberhalb
+    der letzten Stützstelle deren Leistung; optional 0 oberhalb von ``abschaltgeschwindigkeit``.
+    """
+
+    def __init__(self, windgeschwindigkeiten, leistungen, abschaltgeschwindigkeit=None, blockgroesse=32768):
+        self.ws = np.ascontiguousarray(windgeschwindigkeiten, dtype=float)
+        self.leistung = np.ascontiguousarray(leistungen, dtype=float)
+        schritte = np.diff(self.ws)
+        if len(self.ws) < 2 or np.any(schritte <= 0): raise ValueError("Leistungskurve braucht mindestens zwei streng steigende Stützstellen")
+        self.steigung = np.diff(self.leistung) / schritte
+        self.einschaltgeschwindigkeit = self.ws[0]
+        self.abschaltgeschwindigkeit = abschaltgeschwindigkeit
+        self.blockgroesse = blockgroesse
+        self.gleichabstand = bool(np.allclose(schritte, schritte[0], rtol=0, atol=1e-12))
+        self._inv_schritt = 1.0 / schritte[0]
+
+    @classmethod
+    def aus_dataframe(cls, leistungskurve_df, **kwargs):
+        return cls(leistungskurve_df[WS_SPALTE], leistungskurve_df[LEISTUNG_SPALTE], **kwargs)
+
+    def __call__(self, windgeschwindigkeit, out=None):
+        """Leistung (kW) je Windgeschwindigkeit; mit ``out`` wird in den übergebenen Puffer geschrieben."""
+        ws = np.asarray(windgeschwindigkeit, dtype=float)
+        if out is None: out = np.empty_like(ws)
+        elif out.shape != ws.shape or out.dtype != np.float64 or not out.flags.c_contiguous:
+            raise ValueError("out muss ein zusammenhängendes float64-Array mit der Form der Eingabe sein")
+        if np.may_share_memory(ws, out): raise ValueError("out darf sich nicht mit der Eingabe überlappen")
+        ws_flach = ws.reshape(-1); out_flach = out.reshape(-1)
+        n_abschnitte = len(self.steigung)
+        idx_puffer = np.empty(min(self.blockgroesse, len(ws_flach)), dtype=np.intp)
+        hilfs_puffer = np.empty(len(idx_puffer))
+        for start in range(0, len(ws_flach), self.blockgroesse):
+            v = ws_flach[start:start + self.blockgroesse]; o = out_flach[start:start + self.blockgroesse]
+            idx = idx_puffer[:len(v)]; hilf = hilfs_puffer[:len(v)]
+            # Abschnittsindex: direkte Indexrechnung auf dem gleichmäßigen Raster, sonst Binärsuche
+            if self.gleichabstand:
+                np.subtract(v, self.ws[0], out=o); o *= self._inv_schritt
+                with np.errstate(invalid='ignore'): idx[...] = o
+            else:
+                idx[...] = np.searchsorted(self.ws, v, side='right') - 1
+            np.clip(idx, 0, n_abschnitte - 1, out=idx)
+            # Gleiche Rechenvorschrift wie np.interp: Steigung * (v - v_i) + P_i
+            np.take(self.ws, idx, out=hilf); np.subtract(v, hilf, out=o)
+            np.take(self.steigung, idx, out=hilf); o *= hilf
+            np.take(self.leistung, idx, out=hilf); o += hilf
+            np.copyto(o, 0.0, where=v < self.einschaltgeschwindigkeit)
+            np.copyto(o, self.leistung[-1], where=v >= self.ws[-1])
+            if self.abschaltgeschwindigkeit is not None: np.copyto(o, 0.0, where=v > self.abschaltgeschwindigkeit)
+        return out
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""Austauschbare Solver-Schicht für das Matrix-LP aus :mod:`lp_matrix` mit Telemetrie je Lösung.
+
+Solver: ``'scipy'`` (HiGHS über ``scipy.optimize.linprog``, bisheriger Standard),
+``'highspy'`` (HiGHS direkt, alle Optionen) und ``'cbc'`` (CBC-Programm aus PuLP über
+eine MPS-Datei). Je Lösung steuerbar sind Threads, Zeitlimit, Presolve und Verfahren
+(Simplex oder Innere-Punkte-Verfahren, Crossover an/aus). Jede Lösung trägt unter
+``telemetry`` ein JSON-fähiges Dict mit Modellgröße, Größe nach Presolve, Iterationen
+sowie Schreib-, Lös- und Rücklesezeit; :func:`write_telemetry` hängt es an eine
+JSON-Lines-Datei an.
+
+    solution = loeser.solve(lp, solver='highspy', method='ipm', crossover=False, threads=4)
+    loeser.write_telemetry(solution['telemetry'], 'telemetrie.jsonl')
+
+Lange Horizonte ohne Matrizen im Speicher: :func:`lp_matrix.write_system_mps` schreibt das
+LP blockweise als MPS-Datei, :func:`solve_mps` löst sie.
+"""
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import lp_matrix
+
+SOLVERS = ('scipy', 'highspy', 'cbc')
+# 'auto' überlässt die Wahl dem Solver; 'ipm' = Innere-Punkte-Verfahren (mit oder ohne Crossover)
+METHODS = ('auto', 'simplex', 'ipm')
+
+_SCIPY_METHOD = {'auto': 'highs', 'simplex': 'highs-ds', 'ipm': 'highs-ipm'}
+_HIGHS_METHOD = {'auto': 'choose', 'simplex': 'simplex', 'ipm': 'ipm'}
+# CBC: 'auto' = Standardlauf (-solve bzw. -branch in PuLP)
+_CBC_METHOD = {'auto': [], 'simplex': ['-dualS'], 'ipm': ['-barrier']}
+# Thread-Variablen der BLAS-/OpenMP-Bibliotheken; wirksam nur, wenn sie beim Laden (Import von numpy) gesetzt sind
+THREAD_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+_HIGHS_PRESOLVE = re.compile(r"Presolve reductions: rows (\d+)\([^)]*\); columns (\d+)\([^)]*\); nonzeros (\d+)")
+_CBC_PRESOLVE = re.compile(r"Presolve (\d+) \([-+]?\d+\) rows, (\d+) \([-+]?\d+\) columns and (\d+) \([-+]?\d+\) elements")
+_CBC_ITERATIONS = re.compile(r"objective \S+ - (\d+) iterations")
+# PuLP-kompatible Statusbezeichnungen nach dem ersten Wort der CBC-Lösungsdatei
+_CBC_STATUS = {'Optimal': 'Optimal', 'Infeasible': 'Infeasible', 'Unbounded': 'Unbounded', 'Stopped': 'Not Solved'}
+
+
+def cbc_path():
+    """Pfad des mit PuLP ausgelieferten CBC-Programms oder None."""
+    try:
+        import pulp
+    except ImportError:
+        return None
+    solver = pulp.PULP_CBC_CMD()
+    return solver.path if solver.available() else None
+
+
+def available_solvers():
+    """Die lokal nutzbaren Solver aus :data:`SOLVERS`."""
+    solvers = ['scipy']
+    try:
+        import highspy # noqa: F401
+        solvers.append('highspy')
+    except ImportError:
+        pass
+    if cbc_path(): solvers.append('cbc')
+    return solvers
+
+
+def write_telemetry(telemetry, path):
+    """Hängt einen Telemetrie-Datensatz als JSON-Zeile an ``path`` an."""
+    with open(path, 'a') as f:
+        f.write(json.dumps(telemetry) + '\n')
+    return path
+
+
+def _check_options(method, crossover):
+    if method not in METHODS: raise ValueError(f"Unbekanntes Verfahren '{method}' (erlaubt: {', '.join(METHODS)})")
+    if not crossover and method != 'ipm': raise ValueError("Crossover aus ist nur mit method='ipm' möglich")
+
+
+def _telemetry(rows, columns, nonzeros, solver, threads, time_limit, presolve, method, crossover):
+    return {'solver': solver, 'method': method, 'crossover': crossover, 'threads': threads, 'time_limit': time_limit,
+            'presolve': presolve, 'rows': rows, 'columns': columns, 'nonzeros': nonzeros,
+            'presolved_rows': None, 'presolved_columns': None, 'presolved_nonzeros': None, 'simplex_iterations': None, 'ipm_iterations': None, 'crossover_iterations': None,
+            'build_s': None, 'write_s': None, 'solve_s': None, 'read_s': None, 'status': None, 'objective': None}
+
+
+def _sizes(lp):
+    """(Gleichungen, Zeilen, Spalten) eines Matrix-LP oder eines Layouts aus :func:`lp_matrix.system_layout`."""
+    if 'A_eq' in lp: return lp['A_eq'].shape[0], lp['A_eq'].shape[0] + lp['A_ub'].shape[0], len(lp['c'])
+    return lp['num_eq'], lp['num_rows'], lp['offsets']['num_cols']
+
+
+def _finish(lp, solution, x, eq_duals, ub_duals, reduced_costs):
+    """Ergänzt ein optimales Ergebnis um Lösungsvektor, Duale und die zerlegten Arrays wie :func:`lp_matrix.solve_lp`."""
+    solution['x'] = x
+    if 'offsets' in lp: solution.update(lp_matrix.split_solution(lp, x))
+    solution['eq_duals'], solution['ub_duals'], solution['reduced_costs'] = eq_duals, ub_duals, reduced_costs
+    return solution
+
+
+def _solve_scipy(lp, telemetry, threads, time_limit, presolve, method, crossover, msg):
+    if threads is not None or not crossover:
+        raise ValueError("Solver 'scipy' unterstützt weder Threads noch Crossover aus (dafür Solver 'highspy')")
+    options = {'presolve': presolve}
+    if time_limit is not None: options['time_limit'] = time_limit
+    start = time.perf_counter()
+    solution = lp_matrix.solve_lp(lp, msg=msg, options=options, method=_SCIPY_METHOD[method])
+    telemetry['solve_s'] = time.perf_counter() - start
+    telemetry['ipm_iterations' if method == 'ipm' else 'simplex_iterations'] = solution['iterations']
+    telemetry['crossover_iterations'] = solution['crossover_iterations']
+    return solution
+
+
+def _solve_highspy(lp, telemetry, threads, time_limit, presolve, method, crossover, msg):
+    import highspy
+    options = {'presolve': 'on' if presolve else 'off', 'solver': _HIGHS_METHOD[method], 'run_crossover': 'on' if crossover else 'off'}
+    if threads is not None: options['threads'] = threads
+    if time_limit is not None: options['time_limit'] = float(time_limit)
+    with tempfile.TemporaryDirectory(prefix='highs_') as workdir:
+        log_path = os.path.join(workdir, 'highs.log')
+        options.update({'output_flag': True, 'log_to_console': msg, 'log_file': log_path})
+        start = time.perf_counter()
+        if 'mps_path' in lp:
+            h = highspy.Highs()
+            for key, value in options.items(): h.setOptionValue(key, value)
+            h.readModel(lp['mps_path'])
+        else: h = lp_matrix.highs_model(lp, options)
+        telemetry['write_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        h.run()
+        telemetry['solve_s'] = time.perf_counter() - start
+        h.setOptionValue('log_file', '') # Log schließen, bevor das Verzeichnis gelöscht wird
+        with open(log_path) as f: match = _HIGHS_PRESOLVE.search(f.read())
+    if match: telemetry['presolved_rows'], telemetry['presolved_columns'], telemetry['presolved_nonzeros'] = map(int, match.groups())
+    info = h.getInfo()
+    telemetry['simplex_iterations'], telemetry['ipm_iterations'] = info.simplex_iteration_count, info.ipm_iteration_count
+    telemetry['crossover_iterations'] = info.crossover_iteration_count
+    model_status = h.getModelStatus()
+    status = {highspy.HighsModelStatus.kOptimal: 'Optimal', highspy.HighsModelStatus.kInfeasible: 'Infeasible',
+              highspy.HighsModelStatus.kUnbounded: 'Unbounded', highspy.HighsModelStatus.kTimeLimit: 'Not Solved',
+              highspy.HighsModelStatus.kIterationLimit: 'Not Solved'}.get(model_status, 'Undefined')
+    solution = {'status': status, 'objective': np.inf}
+    if status == 'Optimal':
+        start = time.perf_counter()
+        hs = h.getSolution()
+        row_dual = np.asarray(hs.row_dual)
+        m_eq, _, n = _sizes(lp)
+        solution['objective'] = info.objective_function_value
+        _finish(lp, solution, np.asarray(hs.col_value), row_dual[:m_eq], row_dual[m_eq:], np.asarray(hs.col_dual))
+        # Optimale Basis für Bereichsanalysen (sensitivitaet.sensitivity_report)
+        basis = h.getBasis()
+        if basis.valid: solution['basis'] = (np.fromiter(map(int, basis.col_status), dtype=np.int8, count=n),
+                                             np.fromiter(map(int, basis.row_status), dtype=np.int8, count=h.getNumRow()))
+        telemetry['read_s'] = time.perf_counter() - start
+    return solution
+
+
+def _parse_cbc_log(log, telemetry):
+    """Übernimmt Größe nach Presolve und Simplex-Iterationen aus der CBC-Ausgabe in die Telemetrie."""
+    match = _CBC_PRESOLVE.search(log)
+    if match: telemetry['presolved_rows'], telemetry['presolved_columns'], telemetry['presolved_nonzeros'] = map(int, match.groups())
+    match = _CBC_ITERATIONS.search(log)
+    if match: telemetry['simplex_iterations'] = int(match.group(1))
+
+
+def cbc_options(threads=None, time_limit=None, presolve=True, method='auto', crossover=True):
+    """Kommandozeilenoptionen für CBC (auch für ``pulp.PULP_CBC_CMD(options=...)``)."""
+    args = ['-timeMode', 'elapsed', '-presolve', 'on' if presolve else 'off']
+    if threads is not None: args += ['-threads', str(threads)]
+    if time_limit is not None: args += ['-sec', str(time_limit)]
+    if method == 'ipm': args += ['-crossover', 'on' if crossover else 'off']
+    return args + _CBC_METHOD[method]
+
+
+def _solve_cbc(lp, telemetry, threads, time_limit, presolve, method, crossover, msg):
+    path = cbc_path()
+    if path is None: raise ValueError("CBC ist nicht verfügbar (PuLP mit CBC installieren)")
+    m_eq, m, n = _sizes(lp)
+    with tempfile.TemporaryDirectory(prefix='cbc_') as workdir:
+        mps_path, solution_path = lp.get('mps_path', os.path.join(workdir, 'model.mps')), os.path.join(workdir, 'solution.txt')
+        if 'mps_path' not in lp:
+            start = time.perf_counter()
+            lp_matrix.write_mps(lp, mps_path)
+            telemetry['write_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        args = cbc_options(threads, time_limit, presolve, method, crossover) + (['-solve'] if method == 'auto' else [])
+        run = subprocess.run([path, mps_path] + args + ['-printingOptions', 'all', '-solu', solution_path],
+                             capture_output=True, text=True)
+        telemetry['solve_s'] = time.perf_counter() - start
+        if msg: print(run.stdout)
+        _parse_cbc_log(run.stdout, telemetry)
+        if not os.path.exists(solution_path): return {'status': 'Undefined', 'objective': np.inf}
+        start = time.perf_counter()
+        values = np.empty((m + n, 2))
+        with open(solution_path) as f:
+            header = f.readline()
+            # Je Zeile "[**] Index Name Wert Dual"; erst alle Zeilen, dann alle Spalten des LP (zeilenweise, ohne Zwischenliste)
+            for i, line in enumerate(f): values[i] = line.rsplit(None, 2)[1:]
+    status = _CBC_STATUS.get(header.split(' ', 1)[0], 'Undefined')
+    solution = {'status': status, 'objective': np.inf}
+    if status == 'Optimal':
+        solution['objective'] = float(header.rsplit(None, 1)[1]) + lp.get('objective_constant', 0.0)
+        _finish(lp, solution, values[m:, 0], values[:m_eq, 1], values[m_eq:m, 1], values[m:, 1])
+    telemetry['read_s'] = time.perf_counter() - start
+    return solution
+
+
+_BACKENDS = {'scipy': _solve_scipy, 'highspy': _solve_highspy, 'cbc': _solve_cbc}
+
+
+def solve(lp, solver='scipy', threads=None, time_limit=None, presolve=True, method='auto', crossover=True, msg=False):
+    """Löst das Matrix-LP mit dem gewählten Solver; Ergebnis im Format von :func:`lp_matrix.solve_lp` plus ``telemetry``.
+
+    ``threads``/``time_limit`` (s) None = Solver-Standard. ``crossover=False`` liefert
+    mit ``method='ipm'`` die (nicht basische) Innere-Punkte-Lösung. highspy legt die optimale
+    Basis zusätzlich unter ``basis`` ab (Spalten- und Zeilenstatus, siehe :mod:`sensitivitaet`).
+    """
+    if solver not in _BACKENDS: raise ValueError(f"Unbekannter Solver '{solver}' (erlaubt: {', '.join(SOLVERS)})")
+    _check_options(method, crossover)
+    telemetry = _telemetry(lp['A_eq'].shape[0] + lp['A_ub'].shape[0], len(lp['c']), lp['A_eq'].nnz + lp['A_ub'].nnz,
+                           solver, threads, time_limit, presolve, method, crossover)
+    return _run(lp, solver, telemetry, threads, time_limit, presolve, method, crossover, msg)
+
+
+def solve_mps(path, num_timesteps, solver='highspy', threads=None, time_limit=None, presolve=True, method='auto', crossover=True, msg=False):
+    """Löst eine MPS-Datei des Auslegungs-LP aus :func:`lp_matrix.write_system_mps` mit ``'highspy'`` oder ``'cbc'``.
+
+    Das LP liegt dabei nur im Solver vor; Ergebnis wie :func:`solve` (zerlegte Arrays über
+    ``num_timesteps``), die Telemetrie enthält keine Nicht-Null-Einträge.
+    """
+    if solver not in ('highspy', 'cbc'): raise ValueError(f"MPS-Dateien nur mit 'highspy' oder 'cbc' lösbar, nicht '{solver}'")
+    _check_options(method, crossover)
+    layout = dict(lp_matrix.system_layout(num_timesteps), mps_path=path)
+    telemetry = _telemetry(layout['num_rows'], layout['offsets']['num_cols'], None, solver, threads, time_limit, presolve, method, crossover)
+    return _run(layout, solver, telemetry, threads, time_limit, presolve, method, crossover, msg)
+
+
+def _run(lp, solver, telemetry, threads, time_limit, presolve, method, crossover, msg):
+    solution = _BACKENDS[solver](lp, telemetry, threads, time_limit, presolve, method, crossover, msg)
+    telemetry['status'] = solution['status']
+    telemetry['objective'] = solution['objective'] if solution['status'] == 'Optimal' else None
+    solution['telemetry'] = telemetry
+    return solution
+
+
+def pulp_solver(solver='cbc', threads=None, time_limit=None, presolve=True, method='auto', crossover=True, msg=False, log_path=None):
+    """PuLP-Solverobjekt für das Backend 'pulp': ``'cbc'`` mit allen Optionen oder ein anderer lokal verfügbarer PuLP-Solver.
+
+    Andere PuLP-Solver (``pulp.listSolvers(onlyAvailable=True)``) erhalten nur Threads und Zeitlimit.
+    """
+    import pulp
+    _check_options(method, crossover)
+    if solver == 'cbc':
+        return pulp.PULP_CBC_CMD(msg=msg, logPath=log_path, options=cbc_options(threads, time_limit, presolve, method, crossover))
+    if method != 'auto' or not presolve or not crossover:
+        raise ValueError(f"PuLP-Solver '{solver}' unterstützt nur Threads und Zeitlimit")
+    available = pulp.listSolvers(onlyAvailable=True)
+    if solver not in available: raise ValueError(f"PuLP-Solver '{solver}' nicht verfügbar (verfügbar: cbc, {', '.join(available)})")
+    return pulp.getSolver(solver, msg=msg, threads=threads, timeLimit=time_limit)
+
+
+def solve_pulp(model, solver='cbc', threads=None, time_limit=None, presolve=True, method='auto', crossover=True, msg=False):
+    """Löst ein PuLP-Modell; gibt ``(Status, telemetry)`` zurück (Schreiben/Lesen steckt in ``solve_s``)."""
+    import pulp
+    telemetry = _telemetry(model.numConstraints(), model.numVariables(), None, solver, threads, time_limit, presolve, method, crossover)
+    with tempfile.TemporaryDirectory(prefix='pulp_') as workdir:
+        log_path = os.path.join(workdir, 'cbc.log') if solver == 'cbc' else None
+        start = time.perf_counter()
+        model.solve(pulp_solver(solver, threads, time_limit, presolve, method, crossover, msg, log_path))
+        telemetry['solve_s'] = time.perf_counter() - start
+        if log_path and os.path.exists(log_path):
+            with open(log_path) as f: _parse_cbc_log(f.read(), telemetry)
+    return pulp.LpStatus[model.status], telemetry
+
+
+class ThreadLimitedPool(ProcessPoolExecutor):
+    """Prozess-Pool, dessen Worker BLAS/OpenMP auf ``threads`` Threads je Prozess begrenzen.
+
+    Die Variablen aus :data:`THREAD_VARIABLES` werden nur beim Laden der Bibliotheken
+    gelesen; in einem Initializer gesetzt (numpy ist dann längst importiert) bleiben sie
+    wirkungslos. Die Worker werden daher mit 'spawn' neu gestartet und erben die Variablen
+    aus dem Elternprozess, wo sie für die Lebensdauer des Pools gesetzt sind
+    (:meth:`shutdown` stellt die vorherigen Werte wieder her). Initializer und Argumente
+    müssen dafür picklebar sein.
+    """
+
+    def __init__(self, max_workers, threads, initializer=None, initargs=()):
+        self._saved_environ = {var: os.environ.get(var) for var in THREAD_VARIABLES}
+        os.environ.update(dict.fromkeys(THREAD_VARIABLES, str(threads)))
+        super().__init__(max_workers, mp_context=multiprocessing.get_context('spawn'), initializer=initializer, initargs=initargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        super().shutdown(wait, cancel_futures=cancel_futures)
+        for var, value in self._saved_environ.items():
+            if value is None: os.environ.pop(var, None)
+            else: os.environ[var] = value
+        self._saved_environ = {}
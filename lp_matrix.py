@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""Vektorisierter Aufbau des Batterie-Auslegungs-LP als dünnbesetzte Matrizen.
+
+Das Modell ist mathematisch identisch zum PuLP-Modell (systemoptimierung.build_pulp_model),
+wird aber blockweise direkt aus den NumPy-Profilen als CSR-Matrizen erzeugt und
+über eine Matrix-Schnittstelle gelöst (scipy/HiGHS oder MPS-Datei).
+
+Spaltenreihenfolge: 4 Kapazitäten, dann je ``T`` Werte für Netzbezug, Einspeisung,
+Abregelung, Laden, Entladen und ``T + 1`` Werte für den Ladezustand.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from systemparameter import charge_discharge_factors, cost_coefficients
+
+CAPACITY_NAMES = ['PV_Capacity_MWp', 'Wind_Capacity_MW', 'Battery_Capacity_MWh', 'Battery_Power_MW']
+PV, WIND, BATT_MWH, BATT_MW = range(4)
+# Zeitreihen-Variablenblöcke (Name, Länge T bzw. T + 1 für den SoC)
+SERIES_NAMES = ['Grid_Import', 'Grid_Export', 'Curtailment', 'Battery_Charge', 'Battery_Discharge', 'Battery_SoC']
+
+# PuLP-kompatible Statusbezeichnungen für scipy.optimize.linprog
+_LINPROG_STATUS = {0: 'Optimal', 1: 'Not Solved', 2: 'Infeasible', 3: 'Unbounded', 4: 'Undefined'}
+
+
+def column_offsets(num_timesteps):
+    """Startindex jedes Variablenblocks im Spaltenvektor."""
+    offsets = {}
+    col = len(CAPACITY_NAMES)
+    for name in SERIES_NAMES:
+        offsets[name] = col
+        col += num_timesteps + 1 if name == 'Battery_SoC' else num_timesteps
+    offsets['num_cols'] = col
+    return offsets
+
+
+def system_layout(num_timesteps):
+    """Spalten- und Zeilenaufteilung des Auslegungs-LP ohne Matrizen (für :func:`split_solution` und MPS-Lösungen)."""
+    return {'num_timesteps': num_timesteps, 'offsets': column_offsets(num_timesteps),
+            'num_eq': 2 * num_timesteps + 1, 'num_rows': 6 * num_timesteps + 3}
+
+
+def build_system_lp(profiles, params, fixed_capacities=None):
+    """Baut das Auslegungs-LP (Zielfunktion, Gleichungen, Ungleichungen, Schranken).
+
+    ``profiles`` enthält die Arrays aus :func:`zeitreihen.generate_profiles`.
+    Mit ``fixed_capacities`` (PV MW, Wind MW, Batterie MWh, Batterie MW) werden die
+    Kapazitäten über Schranken fixiert; das LP entspricht dann der Betriebsoptimierung
+    der Kostenlandschaft inklusive der Fixkosten.
+    """
+    demand = np.asarray(profiles['demand_profile_mwh'], dtype=float)
+    spv = np.asarray(profiles['specific_yield_pv_mwh_per_mw'], dtype=float)
+    swind = np.asarray(profiles['specific_yield_wind_mwh_per_mw'], dtype=float)
+    tariff = np.asarray(profiles['feed_in_tariff_profile_eur_per_mwh'], dtype=float)
+    T = len(demand)
+    dt = params['time_resolution_hours']
+    soc_min = params['battery_soc_min_percent']
+    eff_sqrt, eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+
+    off = column_offsets(T)
+    n = off['num_cols']
+    t = np.arange(T)
+    imp, exp, curt = off['Grid_Import'] + t, off['Grid_Export'] + t, off['Curtailment'] + t
+    ch, dis = off['Battery_Charge'] + t, off['Battery_Discharge'] + t
+    soc = off['Battery_SoC'] + np.arange(T + 1)
+    ones = np.ones(T)
+
+    # Zielfunktion
+    c = np.zeros(n)
+    c[PV] = costs['pv_eur_per_mw']; c[WIND] = costs['wind_eur_per_mw']
+    c[BATT_MWH] = costs['battery_eur_per_mwh']; c[BATT_MW] = costs['battery_eur_per_mw']
+    c[imp] = params['grid_purchase_price_eur_per_mwh']
+    c[exp] = -tariff
+
+    # Gleichungen: Energiebilanz (T), SoC-Fortschreibung (T), zyklischer SoC (1)
+    bal_rows = np.tile(t, 7)
+    bal_cols = np.concatenate([np.full(T, PV), np.full(T, WIND), imp, exp, curt, dis, ch])
+    bal_vals = np.concatenate([spv, swind, ones, -ones, -ones, ones, -ones])
+    soc_rows = T + np.tile(t, 4)
+    soc_cols = np.concatenate([soc[1:], soc[:-1], ch, dis])
+    soc_vals = np.concatenate([ones, -ones, np.full(T, -eff_sqrt), np.full(T, eff_sqrt_inv)])
+    A_eq = sp.coo_matrix(
+        (np.concatenate([bal_vals, soc_vals, [1.0, -1.0]]),
+         (np.concatenate([bal_rows, soc_rows, [2 * T, 2 * T]]),
+          np.concatenate([bal_cols, soc_cols, [soc[T], soc[0]]]))),
+        shape=(2 * T + 1, n)).tocsr()
+    A_eq.eliminate_zeros()
+    b_eq = np.concatenate([demand, np.zeros(T + 1)])
+
+    # Ungleichungen: Lade-/Entladeleistung (je T), SoC-Min/-Max (je T + 1)
+    ts = np.arange(T + 1)
+    ub_rows = np.concatenate([t, t, T + t, T + t, 2 * T + ts, 2 * T + ts, 3 * T + 1 + ts, 3 * T + 1 + ts])
+    ub_cols = np.concatenate([ch, np.full(T, BATT_MW), dis, np.full(T, BATT_MW),
+                              soc, np.full(T + 1, BATT_MWH), soc, np.full(T + 1, BATT_MWH)])
+    ub_vals = np.concatenate([ones, np.full(T, -dt), ones, np.full(T, -dt),
+                              -np.ones(T + 1), np.full(T + 1, soc_min), np.ones(T + 1), -np.ones(T + 1)])
+    A_ub = sp.coo_matrix((ub_vals, (ub_rows, ub_cols)), shape=(4 * T + 2, n)).tocsr()
+    A_ub.eliminate_zeros()
+    b_ub = np.zeros(4 * T + 2)
+
+    lb = np.zeros(n); ub = np.full(n, np.inf)
+    if fixed_capacities is not None:
+        lb[:4] = ub[:4] = np.asarray(fixed_capacities, dtype=float)
+
+    return {'c': c, 'A_eq': A_eq, 'b_eq': b_eq, 'A_ub': A_ub, 'b_ub': b_ub, 'lb': lb, 'ub': ub,
+            'num_timesteps': T, 'offsets': off}
+
+
+def split_solution(lp, x):
+    """Zerlegt den Lösungsvektor in Kapazitäten und Zeitreihen-Arrays (Views, keine Kopien)."""
+    T = lp['num_timesteps']; off = lp['offsets']
+    result = {name: float(x[i]) for i, name in enumerate(CAPACITY_NAMES)}
+    for name in SERIES_NAMES:
+        length = T + 1 if name == 'Battery_SoC' else T
+        result[name] = x[off[name]:off[name] + length]
+    return result
+
+
+def solve_lp(lp, msg=False, options=None, method='highs'):
+    """Löst das Matrix-LP mit HiGHS über ``scipy.optimize.linprog`` (``method``: 'highs', 'highs-ds', 'highs-ipm').
+
+    Gibt ein Dict mit ``status`` (PuLP-Bezeichnung), ``objective``, ``x``, den
+    Iterationszahlen und den zerlegten Lösungsarrays zurück; die Duale der
+    Gleichungen/Ungleichungen liegen unter ``eq_duals``/``ub_duals``, die reduzierten
+    Kosten unter ``reduced_costs``. Andere Solver: :func:`loeser.solve`.
+    """
+    from scipy.optimize import linprog
+    solver_options = {'disp': msg}
+    if options: solver_options.update(options)
+    res = linprog(lp['c'], A_ub=lp['A_ub'], b_ub=lp['b_ub'], A_eq=lp['A_eq'], b_eq=lp['b_eq'],
+                  bounds=np.column_stack([lp['lb'], lp['ub']]), method=method, options=solver_options)
+    status = _LINPROG_STATUS.get(res.status, 'Undefined')
+    objective = float(res.fun) + lp.get('objective_constant', 0.0) if status == 'Optimal' else np.inf
+    solution = {'status': status, 'objective': objective, 'x': res.x,
+                'iterations': int(res.nit), 'crossover_iterations': int(getattr(res, 'crossover_nit', 0))}
+    if status == 'Optimal':
+        if 'offsets' in lp: solution.update(split_solution(lp, res.x))
+        solution['eq_duals'] = res.eqlin.marginals
+        solution['ub_duals'] = res.ineqlin.marginals
+        solution['reduced_costs'] = res.lower.marginals + res.upper.marginals
+    return solution
+
+
+def fix_capacities(lp, capacities):
+    """Eliminiert die 4 Kapazitätsspalten mit festen Werten aus dem LP.
+
+    Ihr Beitrag wandert in die rechten Seiten (bei PV/Wind genau die Erzeugung in
+    der Energiebilanz) und in ``objective_constant``. Das reduzierte LP enthält nur
+    noch den Betrieb und eignet sich für wiederholtes Lösen mit geänderter RHS.
+    """
+    caps = np.asarray(capacities, dtype=float)
+    return {'c': lp['c'][4:], 'A_eq': lp['A_eq'][:, 4:].tocsr(), 'b_eq': lp['b_eq'] - lp['A_eq'][:, :4] @ caps,
+            'A_ub': lp['A_ub'][:, 4:].tocsr(), 'b_ub': lp['b_ub'] - lp['A_ub'][:, :4] @ caps,
+            'lb': lp['lb'][4:], 'ub': lp['ub'][4:], 'objective_constant': float(lp['c'][:4] @ caps),
+            'num_timesteps': lp['num_timesteps'], 'fixed_capacities': caps}
+
+
+def highs_model(lp, options=None):
+    """Übergibt das Matrix-LP an eine ``highspy.Highs``-Instanz (Zeilen: erst Gleichungen, dann Ungleichungen).
+
+    Die Instanz behält nach dem Lösen ihre Basis, so dass Änderungen an Schranken
+    oder rechten Seiten per Dual-Simplex warmgestartet nachoptimiert werden.
+    """
+    import highspy
+    A = sp.vstack([lp['A_eq'], lp['A_ub']]).tocsc()
+    model = highspy.HighsLp()
+    model.num_col_, model.num_row_ = A.shape[1], A.shape[0]
+    model.col_cost_ = lp['c']; model.col_lower_ = lp['lb']; model.col_upper_ = lp['ub']
+    model.row_lower_ = np.concatenate([lp['b_eq'], np.full(len(lp['b_ub']), -np.inf)])
+    model.row_upper_ = np.concatenate([lp['b_eq'], lp['b_ub']])
+    model.offset_ = lp.get('objective_constant', 0.0)
+    model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    model.a_matrix_.start_ = A.indptr; model.a_matrix_.index_ = A.indices; model.a_matrix_.value_ = A.data
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    for key, value in (options or {}).items(): h.setOptionValue(key, value)
+    h.passModel(model)
+    return h
+
+
+def _row_names(T):
+    t = np.arange(T).astype(str); ts = np.arange(T + 1).astype(str)
+    eq = np.concatenate([np.char.add('Energy_Balance_', t), np.char.add('Battery_SoC_Update_', t), ['Battery_Cyclic_SoC']])
+    ub = np.concatenate([np.char.add('Battery_Charge_Power_Limit_', t), np.char.add('Battery_Discharge_Power_Limit_', t),
+                         np.char.add('Battery_SoC_Min_Limit_', ts), np.char.add('Battery_SoC_Max_Limit_', ts)])
+    return eq, ub
+
+
+def _column_names(T):
+    t = np.arange(T).astype(str); ts = np.arange(T + 1).astype(str)
+    blocks = [np.array(CAPACITY_NAMES)]
+    for name in SERIES_NAMES:
+        blocks.append(np.char.add(name + '_', ts if name == 'Battery_SoC' else t))
+    return np.concatenate(blocks)
+
+
+def write_mps(lp, path, name='Renewable_Energy_System_Optimization_with_Battery'):
+    """Schreibt das Matrix-LP als (freies) MPS direkt aus den Sparse-Matrizen.
+
+    Zeilen- und Spaltennamen folgen den PuLP-Namen des Skripts, so dass die Datei
+    mit jedem MPS-fähigen Solver (CBC, HiGHS, ...) gelöst werden kann. Andere LPs
+    (fixierte Kapazitäten, Typtage) erhalten generische Namen ``E``/``L``/``C`` + Index.
+    """
+    if 'offsets' in lp:
+        T = lp['num_timesteps']
+        eq_names, ub_names = _row_names(T)
+        col_names = _column_names(T)
+    else:
+        eq_names = np.char.add('E', np.arange(lp['A_eq'].shape[0]).astype(str))
+        ub_names = np.char.add('L', np.arange(lp['A_ub'].shape[0]).astype(str))
+        col_names = np.char.add('C', np.arange(len(lp['c'])).astype(str))
+    row_names = np.concatenate([['OBJ'], eq_names, ub_names])
+    # Zielfunktion als Zeile 0, danach Gleichungen und Ungleichungen, spaltenweise (CSC)
+    A = sp.vstack([sp.csr_matrix(lp['c']), lp['A_eq'], lp['A_ub']]).tocsc()
+    A.eliminate_zeros()
+    cols = np.repeat(np.arange(A.shape[1]), np.diff(A.indptr))
+
+    with open(path, 'w') as f:
+        # "FREE" verhindert, dass CBC kurze Namen als festes Spaltenformat liest
+        f.write(f"NAME {name} FREE\nROWS\n N OBJ\n")
+        f.write(''.join(f" E {r}\n" for r in eq_names))
+        f.write(''.join(f" L {r}\n" for r in ub_names))
+        f.write("COLUMNS\n")
+        f.write(''.join(f" {c} {r} {v:.12g}\n" for c, r, v in zip(col_names[cols], row_names[A.indices], A.data)))
+        f.write("RHS\n")
+        rhs = np.concatenate([lp['b_eq'], lp['b_ub']])
+        nz = np.flatnonzero(rhs)
+        f.write(''.join(f" RHS {r} {v:.12g}\n" for r, v in zip(row_names[1 + nz], rhs[nz])))
+        f.write("BOUNDS\n")
+        lb, ub = lp['lb'], lp['ub']
+        fixed = np.flatnonzero(lb == ub)
+        f.write(''.join(f" FX BND {col_names[j]} {lb[j]:.12g}\n" for j in fixed))
+        for j in np.flatnonzero((lb != ub) & (lb != 0)):
+            f.write(f" LO BND {col_names[j]} {lb[j]:.12g}\n" if np.isfinite(lb[j]) else f" MI BND {col_names[j]}\n")
+        for j in np.flatnonzero((lb != ub) & np.isfinite(ub)):
+            f.write(f" UP BND {col_names[j]} {ub[j]:.12g}\n")
+        f.write("ENDATA\n")
+    return path
+
+
+def write_system_mps(profiles, params, path, chunk_timesteps=8760, name='Renewable_Energy_System_Optimization_with_Battery'):
+    """Schreibt das Auslegungs-LP als MPS direkt aus den Profilen, ohne Matrizen aufzubauen.
+
+    Die Datei ist identisch zu ``write_mps(build_system_lp(profiles, params), path)``. Zeilen
+    und Spalten werden blockweise für je ``chunk_timesteps`` Zeitschritte formatiert und
+    geschrieben; neben den Profilen bleibt der Speicherbedarf damit unabhängig vom Horizont.
+    """
+    demand = np.asarray(profiles['demand_profile_mwh'], dtype=float)
+    spv = np.asarray(profiles['specific_yield_pv_mwh_per_mw'], dtype=float)
+    swind = np.asarray(profiles['specific_yield_wind_mwh_per_mw'], dtype=float)
+    tariff = np.asarray(profiles['feed_in_tariff_profile_eur_per_mwh'], dtype=float)
+    T = len(demand)
+    dt = params['time_resolution_hours']
+    soc_min = params['battery_soc_min_percent']
+    eff_sqrt, eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+    price = params['grid_purchase_price_eur_per_mwh']
+
+    def chunks(count):
+        for start in range(0, count, chunk_timesteps): yield start, min(count, start + chunk_timesteps)
+
+    def objective(column, value):
+        return f" {column} OBJ {value:.12g}\n" if value != 0 else ''
+
+    def profile_column(column, values):
+        # Kapazitätsspalte über alle Energiebilanzen (Nullwerte entfallen wie bei eliminate_zeros)
+        for start, stop in chunks(T):
+            nz = start + np.flatnonzero(values[start:stop])
+            f.write(''.join(f" {column} Energy_Balance_{t} {v:.12g}\n" for t, v in zip(nz, values[nz])))
+
+    with open(path, 'w') as f:
+        f.write(f"NAME {name} FREE\nROWS\n N OBJ\n")
+        for kind, prefix, count in (('E', 'Energy_Balance_', T), ('E', 'Battery_SoC_Update_', T), ('E', 'Battery_Cyclic_SoC', None),
+                                    ('L', 'Battery_Charge_Power_Limit_', T), ('L', 'Battery_Discharge_Power_Limit_', T),
+                                    ('L', 'Battery_SoC_Min_Limit_', T + 1), ('L', 'Battery_SoC_Max_Limit_', T + 1)):
+            if count is None: f.write(f" {kind} {prefix}\n"); continue
+            for start, stop in chunks(count): f.write(''.join(f" {kind} {prefix}{t}\n" for t in range(start, stop)))
+
+        f.write("COLUMNS\n")
+        f.write(objective(CAPACITY_NAMES[PV], costs['pv_eur_per_mw'])); profile_column(CAPACITY_NAMES[PV], spv)
+        f.write(objective(CAPACITY_NAMES[WIND], costs['wind_eur_per_mw'])); profile_column(CAPACITY_NAMES[WIND], swind)
+        column = CAPACITY_NAMES[BATT_MWH]
+        f.write(objective(column, costs['battery_eur_per_mwh']))
+        for prefix, value in (('Battery_SoC_Min_Limit_', soc_min), ('Battery_SoC_Max_Limit_', -1.0)):
+            if value == 0: continue
+            for start, stop in chunks(T + 1): f.write(''.join(f" {column} {prefix}{t} {value:.12g}\n" for t in range(start, stop)))
+        column = CAPACITY_NAMES[BATT_MW]
+        f.write(objective(column, costs['battery_eur_per_mw']))
+        for prefix in ('Battery_Charge_Power_Limit_', 'Battery_Discharge_Power_Limit_'):
+            for start, stop in chunks(T): f.write(''.join(f" {column} {prefix}{t} {-dt:.12g}\n" for t in range(start, stop)))
+
+        # Zeitreihen-Spalten; je Spalte alle Einträge in Zeilenreihenfolge (Zielfunktion, Gleichungen, Ungleichungen)
+        import_cost = objective('{}', price)
+        charge, discharge = f"{-eff_sqrt:.12g}", f"{eff_sqrt_inv:.12g}"
+        for start, stop in chunks(T):
+            f.write(''.join(import_cost.format(f"Grid_Import_{t}") + f" Grid_Import_{t} Energy_Balance_{t} 1\n" for t in range(start, stop)))
+        for start, stop in chunks(T):
+            f.write(''.join((f" Grid_Export_{t} OBJ {-v:.12g}\n" if v != 0 else '') + f" Grid_Export_{t} Energy_Balance_{t} -1\n"
+                            for t, v in zip(range(start, stop), tariff[start:stop])))
+        for start, stop in chunks(T):
+            f.write(''.join(f" Curtailment_{t} Energy_Balance_{t} -1\n" for t in range(start, stop)))
+        for start, stop in chunks(T):
+            f.write(''.join(f" Battery_Charge_{t} Energy_Balance_{t} -1\n Battery_Charge_{t} Battery_SoC_Update_{t} {charge}\n"
+                            f" Battery_Charge_{t} Battery_Charge_Power_Limit_{t} 1\n" for t in range(start, stop)))
+        for start, stop in chunks(T):
+            f.write(''.join(f" Battery_Discharge_{t} Energy_Balance_{t} 1\n Battery_Discharge_{t} Battery_SoC_Update_{t} {discharge}\n"
+                            f" Battery_Discharge_{t} Battery_Discharge_Power_Limit_{t} 1\n" for t in range(start, stop)))
+        for start, stop in chunks(T + 1):
+            f.write(''.join((f" Battery_SoC_{t} Battery_SoC_Update_{t - 1} 1\n" if t > 0 else '')
+                            + (f" Battery_SoC_{t} Battery_SoC_Update_{t} -1\n" if t < T else '')
+                            + (f" Battery_SoC_{t} Battery_Cyclic_SoC -1\n" if t == 0 else f" Battery_SoC_{t} Battery_Cyclic_SoC 1\n" if t == T else '')
+                            + f" Battery_SoC_{t} Battery_SoC_Min_Limit_{t} -1\n Battery_SoC_{t} Battery_SoC_Max_Limit_{t} 1\n"
+                            for t in range(start, stop)))
+
+        f.write("RHS\n")
+        for start, stop in chunks(T):
+            nz = start + np.flatnonzero(demand[start:stop])
+            f.write(''.join(f" RHS Energy_Balance_{t} {v:.12g}\n" for t, v in zip(nz, demand[nz])))
+        # Alle Variablen >= 0 ohne obere Schranke: keine Einträge
+        f.write("BOUNDS\nENDATA\n")
+    return path
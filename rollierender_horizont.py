@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Rollierender Horizont für lange und hoch aufgelöste Dispatch-Rechnungen.
+
+Statt eines monolithischen LP mit zyklischem SoC über die gesamte Zeitreihe werden
+überlappende Fenster (z.B. 7 Tage + 1 Tag Vorschau) nacheinander gelöst. Nur der
+Fensteranfang wird übernommen, der SoC am Übergabezeitpunkt wird in das nächste
+Fenster weitergereicht. Der Speicherbedarf hängt damit nur von der Fensterlänge ab.
+
+Für Kapazitätsentscheidungen löst :func:`benders_capacity_search` ein kleines
+Master-LP über die vier Kapazitäten mit Schnitten aus den reduzierten Kosten der
+fixierten Kapazitätsspalten in den Fenster-LPs. Mit mehreren Fenstern sind diese
+Schnitte eine Näherung (keine gültigen unteren Schranken).
+"""
+import datetime
+
+import numpy as np
+from scipy.optimize import linprog
+
+import lp_matrix
+from systemparameter import cost_coefficients
+
+_PROFILE_KEYS = ['demand_profile_mwh', 'specific_yield_pv_mwh_per_mw', 'specific_yield_wind_mwh_per_mw', 'feed_in_tariff_profile_eur_per_mwh']
+
+
+def _window_lp(profiles, params, start, stop, capacities, soc_start, cyclic=False):
+    """Fenster-LP mit festen Kapazitäten, festem Anfangs-SoC und ohne zyklische Bedingung.
+
+    ``cyclic=True`` behält die zyklische Bedingung des Vollmodells (ein einziges Fenster
+    über den ganzen Horizont, Anfangs-SoC frei).
+    """
+    window = {key: profiles[key][start:stop] for key in _PROFILE_KEYS}
+    lp = lp_matrix.build_system_lp(window, params, fixed_capacities=capacities)
+    Tw = stop - start
+    if not cyclic: lp['A_eq'] = lp['A_eq'][:2 * Tw]; lp['b_eq'] = lp['b_eq'][:2 * Tw]  # Battery_Cyclic_SoC entfernen
+    lp['c'][:4] = 0.0  # Kapazitätskosten werden außerhalb der Fenster einmal gezählt
+    soc = lp['offsets']['Battery_SoC']
+    if soc_start is not None: lp['lb'][soc] = lp['ub'][soc] = soc_start
+    return lp
+
+
+def rolling_dispatch(profiles, params, capacities, window_days=7, overlap_days=1, progress=False):
+    """Betriebsoptimierung mit festen Kapazitäten über einen rollierenden Horizont.
+
+    ``capacities`` = (PV MW, Wind MW, Batterie MWh, Batterie MW). Der Speicher beginnt
+    beim Mindest-SoC (``battery_soc_min_percent`` x MWh); da er nie darunter fällt, endet
+    er mindestens auf dem Anfangsstand (Ersatz für die zyklische Bedingung des
+    Vollmodells, in jedem Fenster erreichbar). Passt der ganze Horizont in ein Fenster,
+    gilt die zyklische Bedingung unverändert (identisch zum Vollmodell).
+
+    Gibt die Zeitreihen (wie :func:`lp_matrix.solve_lp`), die Betriebskosten
+    ``operating_cost`` (Netzbezug - Einspeiseerlöse über den gesamten Horizont) und
+    ``capacity_gradient`` zurück: die reduzierten Kosten der Kapazitäten je Fenster,
+    anteilig zum übernommenen Teil summiert. Nur bei einem Fenster ist das ein
+    Subgradient der Betriebskosten, sonst eine Näherung.
+    """
+    T = len(profiles['demand_profile_mwh'])
+    steps_per_day = int(round(24 / params['time_resolution_hours']))
+    commit_len = window_days * steps_per_day
+    lookahead = overlap_days * steps_per_day
+    caps = np.asarray(capacities, dtype=float)
+
+    result = {name: np.zeros(T) for name in lp_matrix.SERIES_NAMES[:-1]}
+    result['Battery_SoC'] = np.zeros(T + 1)
+    gradient = np.zeros(4)
+    soc_start = params['battery_soc_min_percent'] * caps[2]
+    num_windows = -(-T // commit_len)
+    start_time = datetime.datetime.now()
+    for w, start in enumerate(range(0, T, commit_len)):
+        stop = min(start + commit_len + lookahead, T)
+        commit_stop = min(start + commit_len, T)
+        last = commit_stop == T
+        # Ein Fenster über den ganzen Horizont: zyklisch mit freiem Anfangs-SoC wie im Vollmodell
+        single = last and start == 0
+        lp = _window_lp(profiles, params, start, stop, caps, None if single else soc_start, cyclic=single)
+        solution = lp_matrix.solve_lp(lp)
+        if solution['status'] != 'Optimal':
+            raise RuntimeError(f"Fenster {w + 1}/{num_windows} (Schritte {start}-{stop}) nicht lösbar: {solution['status']}")
+        n = commit_stop - start
+        for name in lp_matrix.SERIES_NAMES[:-1]:
+            result[name][start:commit_stop] = solution[name][:n]
+        result['Battery_SoC'][start:commit_stop + 1] = solution['Battery_SoC'][:n + 1]
+        # Reduzierte Kosten anteilig zum übernommenen Teil des Fensters
+        gradient += solution['reduced_costs'][:4] * n / (stop - start)
+        soc_start = solution['Battery_SoC'][n]
+        if progress:
+            print(f"\rRollierender Horizont: Fenster {w + 1}/{num_windows} ({datetime.datetime.now() - start_time})", end="", flush=True)
+    if progress: print()
+
+    tariff = profiles['feed_in_tariff_profile_eur_per_mwh']
+    result['operating_cost'] = float(np.sum(result['Grid_Import']) * params['grid_purchase_price_eur_per_mwh']
+                                     - np.dot(result['Grid_Export'], tariff))
+    result['capacity_gradient'] = gradient
+    for i, name in enumerate(lp_matrix.CAPACITY_NAMES): result[name] = float(caps[i])
+    return result
+
+
+def annualized_cost(params, capacities, operating_cost, num_timesteps):
+    """Annualisierte Gesamtkosten: Kapazitätskosten + Betriebskosten je Jahr."""
+    costs = cost_coefficients(params)
+    capacity_cost = np.array([costs['pv_eur_per_mw'], costs['wind_eur_per_mw'], costs['battery_eur_per_mwh'], costs['battery_eur_per_mw']])
+    years = num_timesteps * params['time_resolution_hours'] / params['hours_in_year']
+    return float(capacity_cost @ np.asarray(capacities, dtype=float) + operating_cost / years)
+
+
+def benders_capacity_search(profiles, params, capacity_bounds, window_days=7, overlap_days=1,
+                            max_iter=30, tol=1e-3, initial_capacities=None, progress=True):
+    """Kapazitätsoptimierung mit Benders-artigen Schnitten über den rollierenden Dispatch.
+
+    Master: min Kapazitätskosten + theta, theta >= Q(x_k) + g_k (x - x_k), mit den
+    Betriebskosten je Jahr Q und ``capacity_gradient`` g aus :func:`rolling_dispatch`.
+    ``capacity_bounds`` gibt die Obergrenzen (PV, Wind, MWh, MW) vor. Nur bei einem
+    einzigen Fenster (zyklischer SoC wie im Vollmodell) sind die Schnitte gültig; mit
+    rollierenden Fenstern ist der Master ein Ersatzmodell, sein Zielwert
+    ``surrogate_bound`` und die Lücke ``surrogate_gap`` sind daher keine Schranken. Abbruch,
+    sobald sich der Vorschlag des Masters um höchstens ``tol`` (relativ zur Obergrenze)
+    ändert (``converged``); zurückgegeben wird die beste tatsächlich bewertete Auslegung. Ist ein Fenster
+    nicht lösbar, wird der Punkt übersprungen und halbwegs zur besten Auslegung gegangen.
+    """
+    T = len(profiles['demand_profile_mwh'])
+    years = T * params['time_resolution_hours'] / params['hours_in_year']
+    costs = cost_coefficients(params)
+    capacity_cost = np.array([costs['pv_eur_per_mw'], costs['wind_eur_per_mw'], costs['battery_eur_per_mwh'], costs['battery_eur_per_mw']])
+    upper = np.asarray(capacity_bounds, dtype=float)
+    x = np.asarray(initial_capacities, dtype=float) if initial_capacities is not None else upper / 2
+    cuts_A, cuts_b = [], []
+    best = None; surrogate_bound = -np.inf
+    history = []
+    for it in range(max_iter):
+        try:
+            dispatch = rolling_dispatch(profiles, params, x, window_days, overlap_days)
+        except RuntimeError as e:
+            history.append({'iteration': it + 1, 'capacities': x.copy(), 'error': str(e)})
+            if progress: print(f"Benders {it + 1}: PV={x[0]:.2f} Wind={x[1]:.2f} MWh={x[2]:.2f} MW={x[3]:.2f} übersprungen ({e})")
+            if best is None: raise
+            x = (x + np.array([best[name] for name in lp_matrix.CAPACITY_NAMES])) / 2
+            continue
+        q = dispatch['operating_cost'] / years
+        g = dispatch['capacity_gradient'] / years
+        total = float(capacity_cost @ x + q)
+        if best is None or total < best['objective']:
+            best = dict(dispatch, objective=total)
+        # Schnitt: g.x - theta <= g.x_k - q
+        cuts_A.append(np.append(g, -1.0)); cuts_b.append(float(g @ x - q))
+        # Master-LP (theta nach unten durch 0 Betriebskosten-Untergrenze nicht beschränkt)
+        res = linprog(np.append(capacity_cost, 1.0), A_ub=np.array(cuts_A), b_ub=np.array(cuts_b),
+                      bounds=[(0, u) for u in upper] + [(None, None)], method='highs')
+        if res.status != 0: break
+        surrogate_bound = res.fun
+        gap = (best['objective'] - surrogate_bound) / abs(best['objective'])
+        step = float(np.max(np.abs(res.x[:4] - x) / np.maximum(upper, 1e-9)))
+        history.append({'iteration': it + 1, 'capacities': x.copy(), 'objective': total, 'surrogate_bound': surrogate_bound,
+                        'surrogate_gap': gap, 'step': step})
+        if progress:
+            print(f"Benders {it + 1}: PV={x[0]:.2f} Wind={x[1]:.2f} MWh={x[2]:.2f} MW={x[3]:.2f} Kosten={total:,.0f} € "
+                  f"Ersatzmodell={surrogate_bound:,.0f} € (Lücke {gap:.3%}) Schritt={step:.2e}")
+        if step <= tol: break
+        x = res.x[:4]
+    best['surrogate_bound'] = surrogate_bound
+    best['converged'] = bool(history) and history[-1].get('step', np.inf) <= tol
+    best['history'] = history
+    return best
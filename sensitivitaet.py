@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Parametrische Sensitivität des Auslegungs-LP aus Dualen und reduzierten Kosten.
+
+Statt das LP für jede gestörte Eingabe neu zu lösen, liefert eine optimale Lösung
+die Ableitungen der Gesamtkosten erster Ordnung: Duale der Energiebilanz
+(``Energy_Balance_t``) = Grenzwert der Energie je Zeitschritt, Lösungswerte =
+Ableitung nach Kostenkoeffizienten, reduzierte Kosten = Grenzwert der Kapazitäten.
+Mit der optimalen Basis folgt je Parameter zusätzlich der Bereich, in dem die Basis
+optimal bleibt; darin sind die Gesamtkosten exakt linear im Parameter.
+
+    report = sensitivity_report(lp, params, profiles, solution)
+    estimate_objective(report, {'grid_purchase_price_eur_per_mwh': 185})
+"""
+import numpy as np
+import scipy.sparse as sp
+
+import loeser
+import lp_matrix
+from systemparameter import cost_coefficients
+
+# Skalare Parameter mit Ableitung und Gültigkeitsbereich (Kostenkoeffizienten bzw. rechte Seiten des LP)
+PARAMETERS = ('grid_purchase_price_eur_per_mwh', 'feed_in_tariff_eur_per_mwh',
+              'specific_capex_pv_eur_per_mw', 'specific_opex_pv_eur_per_mw_pa',
+              'specific_capex_wind_eur_per_mw', 'specific_opex_wind_eur_per_mw_pa',
+              'specific_capex_battery_eur_per_mw', 'specific_opex_battery_eur_per_mwh_pa',
+              'demand_per_hour_kwh')
+# HighsBasisStatus: kLower, kBasic, kUpper, kZero (freie Nichtbasisvariable)
+_LOWER, _BASIC, _UPPER, _ZERO = range(4)
+_TOL = 1e-9
+
+
+def parameter_directions(lp, params, profiles):
+    """Änderung des LP je Einheit jedes Parameters aus :data:`PARAMETERS`.
+
+    Gibt ``{name: ('cost', dc)}`` (Zielfunktionskoeffizienten der Spalten) bzw.
+    ``{name: ('rhs', db)}`` (rechte Seiten der Zeilen, erst Gleichungen, dann
+    Ungleichungen) zurück.
+    """
+    T = lp['num_timesteps']; off = lp['offsets']
+    n, m = len(lp['c']), lp['A_eq'].shape[0] + lp['A_ub'].shape[0]
+    t = np.arange(T)
+    costs = cost_coefficients(params)
+    tariff = np.asarray(profiles['feed_in_tariff_profile_eur_per_mwh'], dtype=float)
+
+    def cost(columns, values):
+        dc = np.zeros(n); dc[columns] = values
+        return 'cost', dc
+
+    db = np.zeros(m)
+    db[:T] = np.asarray(profiles['demand_profile_mwh'], dtype=float) / params['demand_per_hour_kwh']
+    return {
+        'grid_purchase_price_eur_per_mwh': cost(off['Grid_Import'] + t, 1.0),
+        # Zeitschritte mit 0 € Vergütung bleiben bei 0
+        'feed_in_tariff_eur_per_mwh': cost(off['Grid_Export'] + t, -(tariff != 0).astype(float)),
+        'specific_capex_pv_eur_per_mw': cost(lp_matrix.PV, costs['af_pv_wind']),
+        'specific_opex_pv_eur_per_mw_pa': cost(lp_matrix.PV, 1.0),
+        'specific_capex_wind_eur_per_mw': cost(lp_matrix.WIND, costs['af_pv_wind']),
+        'specific_opex_wind_eur_per_mw_pa': cost(lp_matrix.WIND, 1.0),
+        'specific_capex_battery_eur_per_mw': cost(lp_matrix.BATT_MW, costs['af_battery']),
+        'specific_opex_battery_eur_per_mwh_pa': cost(lp_matrix.BATT_MWH, 1.0),
+        'demand_per_hour_kwh': ('rhs', db),
+    }
+
+
+def optimal_basis(lp):
+    """Optimale Basis über highspy; ``(Spaltenstatus, Zeilenstatus)`` als int-Arrays (HighsBasisStatus)."""
+    solution = loeser.solve(lp, 'highspy', method='simplex')
+    if 'basis' not in solution: raise ValueError(f"Keine optimale Basis (Status {solution['status']})")
+    return solution['basis']
+
+
+class _Basis:
+    """Faktorisierte Basis von ``[A, -I] v = 0`` mit ``v = (x, Zeilenaktivität)`` und Schranken für beide Teile."""
+
+    def __init__(self, lp, basis):
+        A = sp.vstack([lp['A_eq'], lp['A_ub']]).tocsc()
+        m, n = A.shape
+        self.n = n
+        self.M = sp.hstack([A, -sp.identity(m, format='csc')]).tocsc()
+        self.cost = np.concatenate([lp['c'], np.zeros(m)])
+        self.lower = np.concatenate([lp['lb'], lp['b_eq'], np.full(len(lp['b_ub']), -np.inf)])
+        self.upper = np.concatenate([lp['ub'], lp['b_eq'], lp['b_ub']])
+        self.status = np.concatenate(basis).astype(np.int8)
+        self.basic = np.flatnonzero(self.status == _BASIC)
+        if len(self.basic) != m: raise ValueError(f"Ungültige Basis: {len(self.basic)} Basisvariablen für {m} Zeilen")
+        self.nonbasic = np.flatnonzero(self.status != _BASIC)
+        from scipy.sparse.linalg import splu
+        self.lu = splu(self.M[:, self.basic].tocsc())
+        # Nichtbasisvariablen auf ihrer Schranke, Basisvariablen aus B v_B = -N v_N
+        self.value = np.zeros(n + m)
+        status_n = self.status[self.nonbasic]
+        self.value[self.nonbasic] = np.where(status_n == _LOWER, self.lower[self.nonbasic],
+                                             np.where(status_n == _UPPER, self.upper[self.nonbasic], 0.0))
+        self.value[self.basic] = self.lu.solve(-(self.M[:, self.nonbasic] @ self.value[self.nonbasic]))
+        self.duals = self.lu.solve(self.cost[self.basic], trans='T')
+        self.reduced = self.cost - self.M.T @ self.duals
+
+    def cost_range(self, dc):
+        """Ableitung und Bereich ``(θ_min, θ_max)`` für Zielfunktionskoeffizienten ``c + θ dc`` (Basis bleibt dual zulässig)."""
+        dc = np.concatenate([dc, np.zeros(len(self.cost) - self.n)])
+        d_reduced = dc - self.M.T @ self.lu.solve(dc[self.basic], trans='T')
+        j = self.nonbasic[self.lower[self.nonbasic] < self.upper[self.nonbasic]]
+        at_lower, at_upper = self.status[j] == _LOWER, self.status[j] == _UPPER
+        free = ~(at_lower | at_upper)
+        # Nichtbasis an unterer Schranke: d >= 0, an oberer: d <= 0, frei: d = 0
+        a = np.concatenate([self.reduced[j][at_lower | free], -self.reduced[j][at_upper | free]])
+        s = np.concatenate([d_reduced[j][at_lower | free], -d_reduced[j][at_upper | free]])
+        return float(dc @ self.value), _ratio_interval(a, s)
+
+    def rhs_range(self, db):
+        """Ableitung und Bereich ``(θ_min, θ_max)`` für Zeilenschranken ``b + θ db`` (Basis bleibt primal zulässig)."""
+        shift = np.concatenate([np.zeros(self.n), db])
+        d_value = np.zeros_like(shift)
+        d_value[self.nonbasic] = shift[self.nonbasic]
+        d_value[self.basic] = self.lu.solve(-(self.M[:, self.nonbasic] @ d_value[self.nonbasic]))
+        b = self.basic
+        low, up = np.isfinite(self.lower[b]), np.isfinite(self.upper[b])
+        a = np.concatenate([(self.value[b] - self.lower[b])[low], (self.upper[b] - self.value[b])[up]])
+        s = np.concatenate([(d_value[b] - shift[b])[low], (shift[b] - d_value[b])[up]])
+        return float(self.reduced[self.nonbasic] @ d_value[self.nonbasic]), _ratio_interval(a, s)
+
+
+def _ratio_interval(a, s):
+    """Bereich von θ mit ``a + θ s >= 0`` für alle Einträge (``a`` >= 0 bis auf Rundung)."""
+    a = np.maximum(a, 0.0)
+    scale = max(1.0, np.abs(s).max(initial=0.0))
+    rising, falling = s > _TOL * scale, s < -_TOL * scale
+    theta_min = float(np.max(-a[rising] / s[rising], initial=-np.inf))
+    theta_max = float(np.min(-a[falling] / s[falling], initial=np.inf))
+    return theta_min, theta_max
+
+
+def sensitivity_report(lp, params, profiles, solution, ranges=True):
+    """Ableitungen der Gesamtkosten nach den Parametern und Grenzwerte je Zeitschritt.
+
+    ``lp`` ist das volle Matrix-LP (:func:`lp_matrix.build_system_lp`), ``solution`` seine
+    optimale Lösung aus :func:`loeser.solve`. Ohne ``ranges`` kommen alle Werte direkt aus
+    Lösung und Dualen. Mit ``ranges`` wird die optimale Basis faktorisiert (aus
+    ``solution['basis']`` von highspy, sonst ein zusätzlicher highspy-Lauf); Ableitungen
+    und Bereiche beziehen sich dann auf diese Basis. Bei entarteten LPs kann der Bereich
+    einseitig sein (eine Grenze gleich dem aktuellen Wert).
+
+    Gibt ein Dict mit ``objective``, ``parameters`` (je Name ``value``, ``gradient`` in €/a
+    je Einheit und ``range`` als Parameterwerte), ``energy_value_eur_per_mwh`` (Duale der
+    Energiebilanz), ``feed_in_tariff_gradient`` (-Einspeisung je Zeitschritt, €/a je €/MWh),
+    ``capacity_reduced_costs`` und ``basis_source`` zurück.
+    """
+    if 'offsets' not in lp: raise ValueError("Sensitivitätsbericht nur für das volle Matrix-LP (nicht für Typtage)")
+    if solution['status'] != 'Optimal': raise ValueError(f"Keine optimale Lösung (Status {solution['status']})")
+    T = lp['num_timesteps']
+    directions = parameter_directions(lp, params, profiles)
+    report = {'objective': solution['objective'], 'parameters': {}, 'basis_source': None}
+    if ranges:
+        report['basis_source'] = 'solution' if 'basis' in solution else 'highspy'
+        basis = _Basis(lp, solution['basis'] if 'basis' in solution else optimal_basis(lp))
+        x, duals, reduced = basis.value[:basis.n], basis.duals[:lp['A_eq'].shape[0]], basis.reduced[:basis.n]
+        for name, (kind, direction) in directions.items():
+            gradient, (lo, hi) = basis.cost_range(direction) if kind == 'cost' else basis.rhs_range(direction)
+            report['parameters'][name] = {'value': params[name], 'gradient': gradient, 'range': (params[name] + lo, params[name] + hi)}
+    else:
+        x, duals, reduced = solution['x'], solution['eq_duals'], solution['reduced_costs']
+        for name, (kind, direction) in directions.items():
+            gradient = direction @ x if kind == 'cost' else direction[:len(duals)] @ duals
+            report['parameters'][name] = {'value': params[name], 'gradient': float(gradient), 'range': None}
+    report['energy_value_eur_per_mwh'] = np.asarray(duals[:T])
+    report['feed_in_tariff_gradient'] = -np.asarray(x[lp['offsets']['Grid_Export']:lp['offsets']['Grid_Export'] + T])
+    report['capacity_reduced_costs'] = {name: float(reduced[i]) for i, name in enumerate(lp_matrix.CAPACITY_NAMES)}
+    return report
+
+
+def estimate_objective(report, changes):
+    """Gesamtkosten erster Ordnung für geänderte Parameter ``{name: neuer Wert}``.
+
+    Gibt ``(Schätzung, gültig)`` zurück; ``gültig`` heißt, dass jeder geänderte Wert in
+    seinem Bereich liegt (für eine einzelne Änderung ist die Schätzung dann exakt, für
+    mehrere gleichzeitig nur eine Näherung).
+    """
+    objective, valid = report['objective'], True
+    for name, value in changes.items():
+        if name not in report['parameters']: raise KeyError(f"Keine Sensitivität für Parameter: {name}")
+        entry = report['parameters'][name]
+        objective += entry['gradient'] * (value - entry['value'])
+        valid &= entry['range'] is not None and entry['range'][0] <= value <= entry['range'][1]
+    return objective, bool(valid)
+
+
+def format_report(report):
+    """Tabelle der Parameter-Sensitivitäten als Text."""
+    lines = [f"{'Parameter':<40}{'Wert':>14}{'dK/dWert (€/a)':>18}{'gültig von':>16}{'bis':>16}"]
+    for name, entry in report['parameters'].items():
+        lo, hi = entry['range'] if entry['range'] is not None else (np.nan, np.nan)
+        lines.append(f"{name:<40}{entry['value']:>14,.2f}{entry['gradient']:>18,.2f}{lo:>16,.2f}{hi:>16,.2f}")
+    value = report['energy_value_eur_per_mwh']
+    lines.append(f"Grenzwert Energie (Dual der Energiebilanz): Mittel {value.mean():.2f}, min {value.min():.2f}, max {value.max():.2f} €/MWh")
+    return '\n'.join(lines)
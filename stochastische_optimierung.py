@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""Zweistufige stochastische Auslegung über mehrere Realisierungen der Einspeisevergütung.
+
+Die Zeitschritte mit 0 €-Vergütung sind zufällig; eine einzelne Realisierung legt die
+Auslegung auf eine beliebige Ziehung fest. Hier teilen sich ``S`` Szenarien (Saaten
+``seed, seed + 1, ...``) die vier Kapazitäten (erste Stufe), jedes Szenario hat einen
+eigenen Betriebsblock (zweite Stufe). Minimiert werden die erwarteten Gesamtkosten.
+
+* ``method='extensive'``: ein LP in Blockform - die Kapazitätsspalten untereinander
+  für alle Szenarien, die Betriebsblöcke blockdiagonal (``kron(I_S, A_Betrieb)``) -
+  einmal gelöst (:func:`build_stochastic_lp`).
+* ``method='benders'``: Szenariozerlegung mit je einem Schnitt pro Szenario; die
+  Betriebs-LPs der Szenarien werden je Iteration mit den festen Kapazitäten im
+  Prozess-Pool gelöst (mit ``highspy`` warmgestartet über die Kapazitätsschranken).
+
+    result = optimize_stochastic(profiles, params, num_scenarios=10, method='benders', max_workers=4)
+"""
+import datetime
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+try:
+    import highspy # Optional: Warmstart der Szenario-LPs in der Zerlegung
+except ImportError:
+    highspy = None
+
+import loeser
+import lp_matrix
+
+METHODS = ('extensive', 'benders')
+
+# Zustand der Worker-Prozesse (einmal pro Prozess über den Initializer gesetzt)
+_worker_state = {}
+
+
+def tariff_scenarios(profiles, params, num_scenarios, seed=0):
+    """Vergütungsprofile (S x T) für die Saaten ``seed`` bis ``seed + num_scenarios - 1``.
+
+    Szenario ``s`` entspricht der Vergütung aus ``generate_profiles(params, seed=seed + s)``:
+    Grundvergütung mit ebenso vielen zufälligen 0 €-Zeitschritten.
+    """
+    T = len(profiles['demand_profile_mwh'])
+    num_negative_timesteps = int(params['negative_price_hours'] / params['hours_in_year'] * T)
+    tariffs = np.full((num_scenarios, T), float(params['feed_in_tariff_eur_per_mwh']))
+    for s in range(num_scenarios):
+        tariffs[s, np.random.default_rng(seed + s).choice(T, num_negative_timesteps, replace=False)] = 0
+    return tariffs
+
+
+def _probabilities(probabilities, num_scenarios):
+    if probabilities is None: return np.full(num_scenarios, 1 / num_scenarios)
+    p = np.asarray(probabilities, dtype=float)
+    if p.shape != (num_scenarios,) or np.any(p < 0) or not np.isclose(p.sum(), 1):
+        raise ValueError(f"Je Szenario eine nicht negative Wahrscheinlichkeit mit Summe 1 erwartet ({num_scenarios} Szenarien)")
+    return p
+
+
+def build_stochastic_lp(profiles, params, tariffs, probabilities=None):
+    """Deterministisches Äquivalent in Blockform: 4 Kapazitäten, dann je Szenario alle Betriebsspalten.
+
+    Zielfunktion: Kapazitätskosten + Summe der mit ``probabilities`` (Standard: gleich)
+    gewichteten Betriebskosten der Szenarien. Zeilen: erst alle Gleichungen, dann alle
+    Ungleichungen, jeweils szenarioweise wie in :func:`lp_matrix.build_system_lp`.
+    """
+    tariffs = np.atleast_2d(np.asarray(tariffs, dtype=float))
+    S, T = tariffs.shape
+    p = _probabilities(probabilities, S)
+    base = lp_matrix.build_system_lp(dict(profiles, feed_in_tariff_profile_eur_per_mwh=tariffs[0]), params)
+    off = base['offsets']
+
+    def expand(A):
+        return sp.hstack([sp.vstack([A[:, :4]] * S), sp.kron(sp.identity(S, format='csr'), A[:, 4:])], format='csr')
+
+    c_ops = np.tile(base['c'][4:], (S, 1))
+    exp = off['Grid_Export'] - 4
+    c_ops[:, exp:exp + T] = -tariffs
+    return {'c': np.concatenate([base['c'][:4], (p[:, None] * c_ops).ravel()]),
+            'A_eq': expand(base['A_eq']), 'b_eq': np.tile(base['b_eq'], S),
+            'A_ub': expand(base['A_ub']), 'b_ub': np.tile(base['b_ub'], S),
+            'lb': np.concatenate([base['lb'][:4], np.tile(base['lb'][4:], S)]),
+            'ub': np.concatenate([base['ub'][:4], np.tile(base['ub'][4:], S)]),
+            'num_timesteps': T, 'num_scenarios': S, 'probabilities': p, 'scenario_offsets': off,
+            'scenario_costs': c_ops}
+
+
+def split_scenarios(lp, x):
+    """Kapazitäten und je Szenario die Zeitreihen (wie :func:`lp_matrix.split_solution`) aus dem Lösungsvektor."""
+    layout = {'num_timesteps': lp['num_timesteps'], 'offsets': lp['scenario_offsets']}
+    n_ops = layout['offsets']['num_cols'] - 4
+    blocks = x[4:].reshape(lp['num_scenarios'], n_ops)
+    return [lp_matrix.split_solution(layout, np.concatenate([x[:4], block])) for block in blocks]
+
+
+class _ScenarioModels:
+    """Betriebs-LPs der Szenarien mit festen Kapazitäten; mit ``highspy`` einmal aufgebaut und warmgestartet."""
+
+    def __init__(self, profiles, params, tariffs, solver_threads=1):
+        self.profiles, self.params, self.tariffs, self.threads = profiles, params, tariffs, solver_threads
+        self.models = {}
+
+    def _lp(self, s, capacities):
+        profiles = dict(self.profiles, feed_in_tariff_profile_eur_per_mwh=self.tariffs[s])
+        return lp_matrix.build_system_lp(profiles, self.params, fixed_capacities=capacities)
+
+    def solve(self, s, capacities, dispatch=False):
+        """Gibt ``(s, Gesamtkosten, Subgradient nach den Kapazitäten, Zeitreihen oder None)`` zurück."""
+        caps = np.asarray(capacities, dtype=float)
+        if highspy is None:
+            lp = self._lp(s, caps)
+            solution = loeser.solve(lp, 'scipy')
+            if solution['status'] != 'Optimal': raise RuntimeError(f"Szenario {s}: Betriebs-LP {solution['status']}")
+            return s, solution['objective'], solution['reduced_costs'][:4], lp_matrix.split_solution(lp, solution['x']) if dispatch else None
+        if s not in self.models:
+            lp = self._lp(s, caps)
+            self.models[s] = (lp_matrix.highs_model(lp, {'threads': self.threads}), {'num_timesteps': lp['num_timesteps'], 'offsets': lp['offsets']})
+        h, layout = self.models[s]
+        h.changeColsBounds(4, np.arange(4, dtype=np.int32), caps, caps)
+        h.run()
+        if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(f"Szenario {s}: Betriebs-LP {h.modelStatusToString(h.getModelStatus())}")
+        hs = h.getSolution()
+        gradient = np.asarray(hs.col_dual[:4])
+        series = lp_matrix.split_solution(layout, np.array(hs.col_value)) if dispatch else None
+        return s, h.getInfo().objective_function_value, gradient, series
+
+
+def _init_worker(profiles, params, tariffs, solver_threads):
+    _worker_state['models'] = _ScenarioModels(profiles, params, tariffs, solver_threads)
+
+
+def _worker_solve(s, capacities, dispatch):
+    return _worker_state['models'].solve(s, capacities, dispatch)
+
+
+def _evaluate(pool, models, capacities, num_scenarios, dispatch=False):
+    """Löst alle Szenarien bei festen Kapazitäten; Ergebnisse nach Szenario sortiert."""
+    if pool is None: results = [models.solve(s, capacities, dispatch) for s in range(num_scenarios)]
+    else: results = list(pool.map(_worker_solve, range(num_scenarios), [capacities] * num_scenarios, [dispatch] * num_scenarios))
+    results.sort(key=lambda r: r[0])
+    return np.array([r[1] for r in results]), np.array([r[2] for r in results]), [r[3] for r in results]
+
+
+def _master(cuts_A, cuts_b, p, lower, upper):
+    """Master-LP über Kapazitäten und theta_s; gibt (Schranke, Kapazitäten) oder None zurück."""
+    S = len(p)
+    res = linprog(np.concatenate([np.zeros(4), p]), A_ub=np.array(cuts_A), b_ub=np.array(cuts_b),
+                  bounds=list(zip(lower, upper)) + [(None, None)] * S, method='highs')
+    return (res.fun, res.x[:4]) if res.status == 0 else None
+
+
+def _benders(profiles, params, tariffs, p, capacity_bounds, initial_capacities, max_iter, tol, trust_region,
+             max_workers, solver_threads, progress, expand_bounds=False):
+    """Mehrschnitt-Benders mit Vertrauensbereich um die beste bisher bewertete Auslegung.
+
+    Der Master schlägt nur Kapazitäten innerhalb von +/- ``radius`` um die beste Auslegung
+    vor (verdoppelt nach einer Verbesserung, sonst halbiert); die untere Schranke für das
+    Abbruchkriterium stammt aus demselben Master ohne Vertrauensbereich. Mit
+    ``expand_bounds`` wird eine Obergrenze, an der die Lösung bei Konvergenz liegt,
+    verdoppelt und weitergesucht (die Schnitte gelten unabhängig von den Grenzen).
+
+    ``status``: 'Optimal' (Lücke <= ``tol``), 'Not converged' (``max_iter`` erreicht) oder
+    'Master failed' (Master-LP nicht lösbar); die letzte Lücke steht in ``gap``.
+    """
+    S = len(p)
+    upper = np.array(capacity_bounds, dtype=float)
+    x = np.minimum(np.asarray(initial_capacities, dtype=float), upper)
+    radius = trust_region * upper
+    cuts_A, cuts_b, history = [], [], []
+    best_x, best = x, np.inf
+    lower_bound, gap, status, expansions = -np.inf, np.inf, 'Not converged', 0
+    pool = None if max_workers == 1 else loeser.ThreadLimitedPool(max_workers, solver_threads, _init_worker,
+                                                                  (profiles, params, tariffs, solver_threads))
+    models = _ScenarioModels(profiles, params, tariffs, solver_threads) if pool is None else None
+    try:
+        for it in range(max_iter):
+            q, g, _ = _evaluate(pool, models, x, S)
+            expected = float(p @ q)
+            if expected < best: best_x, best, radius = x.copy(), expected, np.minimum(2 * radius, upper)
+            else: radius = radius / 2
+            # Schnitt je Szenario: g_s.x - theta_s <= g_s.x_k - q_s
+            for s in range(S):
+                row = np.zeros(4 + S); row[:4] = g[s]; row[4 + s] = -1.0
+                cuts_A.append(row); cuts_b.append(float(g[s] @ x - q[s]))
+            bound = _master(cuts_A, cuts_b, p, np.zeros(4), upper)
+            step = _master(cuts_A, cuts_b, p, np.maximum(best_x - radius, 0), np.minimum(best_x + radius, upper))
+            if bound is None or step is None:
+                status = 'Master failed'; break
+            lower_bound = bound[0]
+            gap = (best - lower_bound) / abs(best)
+            history.append({'iteration': it + 1, 'capacities': x.copy(), 'expected_cost': expected, 'lower_bound': lower_bound, 'gap': gap})
+            if progress:
+                print(f"Benders {it + 1}: PV={x[0]:.2f} Wind={x[1]:.2f} MWh={x[2]:.2f} MW={x[3]:.2f} "
+                      f"Erwartungskosten={expected:,.0f} € Schranke={lower_bound:,.0f} € Lücke={gap:.3%}")
+            if gap <= tol:
+                at_bound = best_x >= upper * (1 - 1e-6)
+                if not (expand_bounds and at_bound.any()):
+                    status = 'Optimal'; break
+                # Optimum liegt am Rand der Box: Grenze verdoppeln, Schranke gilt nur innerhalb der Box
+                upper[at_bound] *= 2; radius[at_bound] = trust_region * upper[at_bound]; expansions += 1
+                if progress: print(f"Benders: Obergrenze erreicht, erweitert auf {', '.join(f'{u:.1f}' for u in upper)}")
+                step = _master(cuts_A, cuts_b, p, np.maximum(best_x - radius, 0), np.minimum(best_x + radius, upper))
+                if step is None:
+                    status = 'Master failed'; break
+            x = step[1]
+        q, _, series = _evaluate(pool, models, best_x, S, dispatch=True)
+    finally:
+        if pool is not None: pool.shutdown()
+    at_bound = [name for name, c, u in zip(lp_matrix.CAPACITY_NAMES, best_x, upper) if c >= u * (1 - 1e-6)]
+    return best_x, q, series, {'status': status, 'gap': gap, 'lower_bound': lower_bound, 'iterations': len(history), 'history': history,
+                               'capacity_bounds': upper, 'bound_expansions': expansions, 'at_capacity_bound': at_bound}
+
+
+def optimize_stochastic(profiles, params, num_scenarios=None, seed=0, tariffs=None, probabilities=None, method='benders',
+                        solver='highspy', solver_options=None, capacity_bounds=None, initial_capacities=None,
+                        max_iter=50, tol=1e-4, trust_region=0.05, max_workers=None, solver_threads=1, progress=False):
+    """Auslegung mit minimalen erwarteten Kosten über die Vergütungsszenarien.
+
+    ``tariffs`` (S x T) ersetzt die Szenarien aus :func:`tariff_scenarios` (``num_scenarios``,
+    ``seed``). ``'extensive'`` löst das Block-LP mit ``solver``/``solver_options`` (siehe
+    :func:`loeser.solve`). ``'benders'`` startet bei der Auslegung für die mittlere Vergütung
+    (oder ``initial_capacities``) innerhalb von ``capacity_bounds`` (Standard: doppelte
+    Startauslegung, mindestens 10 MW bzw. MWh; liegt die Lösung an dieser Grenze, wird sie
+    verdoppelt), sucht in einem Vertrauensbereich (``trust_region`` x Obergrenze) und bricht
+    bei relativer Lücke ``tol`` ab; ``max_workers=1`` löst die Szenarien seriell. Nur bei
+    erreichter Lücke ist ``status`` 'Optimal', sonst 'Not converged' bzw. 'Master failed'
+    (beste bewertete Auslegung, Lücke in ``gap``); ``at_capacity_bound`` nennt Kapazitäten an
+    einer vorgegebenen Obergrenze (Optimum dann nur innerhalb der Grenzen).
+
+    Gibt ein Dict mit ``status``, ``objective`` (Erwartungswert), den Kapazitäten,
+    ``scenario_costs`` (Gesamtkosten je Szenario), ``scenarios`` (Zeitreihen je Szenario),
+    ``probabilities``, ``tariffs``, ``method`` und ``solve_time`` zurück.
+    """
+    if method not in METHODS: raise ValueError(f"Unbekanntes Verfahren '{method}' (erlaubt: {', '.join(METHODS)})")
+    if tariffs is None:
+        if num_scenarios is None: raise ValueError("num_scenarios oder tariffs angeben")
+        tariffs = tariff_scenarios(profiles, params, num_scenarios, seed)
+    tariffs = np.atleast_2d(np.asarray(tariffs, dtype=float))
+    p = _probabilities(probabilities, len(tariffs))
+    start = datetime.datetime.now()
+    result = {'method': method, 'probabilities': p, 'tariffs': tariffs}
+
+    if method == 'extensive':
+        lp = build_stochastic_lp(profiles, params, tariffs, p)
+        solution = loeser.solve(lp, solver, **(solver_options or {}))
+        result.update(status=solution['status'], objective=solution['objective'], telemetry=solution['telemetry'])
+        if solution['status'] != 'Optimal': return dict(result, solve_time=datetime.datetime.now() - start)
+        x = solution['x']
+        scenarios = split_scenarios(lp, x)
+        capacity_cost = float(lp['c'][:4] @ x[:4])
+        n_ops = lp['scenario_offsets']['num_cols'] - 4
+        scenario_costs = capacity_cost + np.einsum('sj,sj->s', lp['scenario_costs'], x[4:].reshape(len(p), n_ops))
+        capacities = x[:4]
+    else:
+        if initial_capacities is None:
+            mean = lp_matrix.build_system_lp(dict(profiles, feed_in_tariff_profile_eur_per_mwh=p @ tariffs), params)
+            mean_solution = loeser.solve(mean, solver, **(solver_options or {}))
+            if mean_solution['status'] != 'Optimal': raise RuntimeError(f"Startauslegung (mittlere Vergütung): {mean_solution['status']}")
+            initial_capacities = mean_solution['x'][:4]
+        expand_bounds = capacity_bounds is None
+        if expand_bounds: capacity_bounds = np.maximum(2 * np.asarray(initial_capacities, dtype=float), 10.0)
+        capacities, scenario_costs, scenarios, info = _benders(profiles, params, tariffs, p, capacity_bounds, initial_capacities,
+                                                               max_iter, tol, trust_region, max_workers, solver_threads, progress,
+                                                               expand_bounds)
+        result.update(objective=float(p @ scenario_costs), **info)
+
+    for i, name in enumerate(lp_matrix.CAPACITY_NAMES): result[name] = float(capacities[i])
+    result.update(scenario_costs=scenario_costs, scenarios=scenarios, solve_time=datetime.datetime.now() - start)
+    return result
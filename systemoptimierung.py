@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+"""Auslegungsoptimierung PV/Wind/Batterie als importierbare Bibliothek und Kommandozeilenprogramm.
+
+Die Schritte aus "Lineare Optimierung.py" stehen als Funktionen ohne Nebenwirkungen
+beim Import bereit: Profile erzeugen (:func:`zeitreihen.generate_profiles`), Modell
+aufbauen und lösen (:func:`build_model`, :func:`solve_model`, :func:`optimize`; Solver
+und Optionen über :mod:`loeser`), Kosten aufschlüsseln und Kostenlandschaft rechnen. PuLP, pandas, highspy und
+matplotlib werden erst in den Funktionen geladen, die sie brauchen; Diagramme
+entstehen nur auf Anforderung (``--plots save`` schreibt headless über Agg, lange
+Zeitreihen werden vorher auf die Bildbreite ausgedünnt, siehe :mod:`diagramme`).
+
+    python systemoptimierung.py --resolution 60 --no-landscape --plots none
+    python systemoptimierung.py --param grid_purchase_price_eur_per_mwh=185 --export-format csv
+    python systemoptimierung.py --resolution 15 --solver highspy --method ipm --no-crossover --telemetry telemetrie.jsonl
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+
+import numpy as np
+
+import diagramme
+import ergebnisse
+import loeser
+import lp_matrix
+from systemparameter import DEFAULT_PARAMS, annuity_factor, charge_discharge_factors, cost_coefficients, default_params
+from zeitreihen import generate_calendar_profiles, generate_profiles
+
+# Modellaufbau: 'matrix' (Sparse-Matrizen + HiGHS, schnell), 'pulp' (Einzel-Nebenbedingungen + CBC)
+# 'typtage' (LP nur über repräsentative Tage, Auslegung wird auf der vollen Zeitreihe betrieben)
+# oder 'mps' (LP blockweise direkt in eine MPS-Datei, Speicher unabhängig vom Horizont; highspy/CBC)
+BACKENDS = ('matrix', 'pulp', 'typtage', 'mps')
+# Diagramme: 'show' (speichern und anzeigen, wie bisher), 'save' (headless über Agg), 'none' (kein matplotlib)
+PLOT_MODES = ('show', 'save', 'none')
+WIND_TURBINE_SIZE_MW = 6.8
+
+
+def build_pulp_model(profiles, params):
+    """PuLP-Modell mit Einzel-Nebenbedingungen (ursprünglicher Aufbau aus "Lineare Optimierung.py").
+
+    Gibt ``(model, capacity_variables, series_variables)`` im Format von
+    :func:`ergebnisse.solution_from_pulp` zurück.
+    """
+    import pulp
+    demand_profile_mwh = profiles['demand_profile_mwh']
+    specific_yield_pv_mwh_per_mw = profiles['specific_yield_pv_mwh_per_mw']
+    specific_yield_wind_mwh_per_mw = profiles['specific_yield_wind_mwh_per_mw']
+    feed_in_tariff_profile_eur_per_mwh = profiles['feed_in_tariff_profile_eur_per_mwh']
+    num_timesteps = len(demand_profile_mwh)
+    time_resolution_hours = params['time_resolution_hours']
+    battery_soc_min_percent = params['battery_soc_min_percent']
+    charge_discharge_eff_sqrt, charge_discharge_eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+    timesteps = range(num_timesteps)
+    soc_timesteps = range(num_timesteps + 1)
+
+    model = pulp.LpProblem("Renewable_Energy_System_Optimization_with_Battery", pulp.LpMinimize)
+    # Variablen
+    pv_capacity_mw = pulp.LpVariable("PV_Capacity_MWp", lowBound=0)
+    wind_capacity_mw = pulp.LpVariable("Wind_Capacity_MW", lowBound=0)
+    battery_capacity_mwh = pulp.LpVariable("Battery_Capacity_MWh", lowBound=0)
+    battery_power_mw = pulp.LpVariable("Battery_Power_MW", lowBound=0)
+    grid_import = pulp.LpVariable.dicts("Grid_Import", timesteps, lowBound=0)
+    grid_export = pulp.LpVariable.dicts("Grid_Export", timesteps, lowBound=0)
+    curtailment = pulp.LpVariable.dicts("Curtailment", timesteps, lowBound=0)
+    battery_soc = pulp.LpVariable.dicts("Battery_SoC", soc_timesteps, lowBound=0)
+    battery_charge = pulp.LpVariable.dicts("Battery_Charge", timesteps, lowBound=0)
+    battery_discharge = pulp.LpVariable.dicts("Battery_Discharge", timesteps, lowBound=0)
+    # Zielfunktion: annualisierte CAPEX + OPEX + Netzbezug - Einspeiseerlöse
+    model += (pv_capacity_mw * costs['pv_eur_per_mw'] + wind_capacity_mw * costs['wind_eur_per_mw']
+              + battery_capacity_mwh * costs['battery_eur_per_mwh'] + battery_power_mw * costs['battery_eur_per_mw']
+              + pulp.lpSum(grid_import[t] * params['grid_purchase_price_eur_per_mwh'] for t in timesteps)
+              - pulp.lpSum(grid_export[t] * feed_in_tariff_profile_eur_per_mwh[t] for t in timesteps)), "Total_Annualized_System_Cost_with_Battery"
+    # 1. Energiebilanz
+    for t in timesteps:
+        model += specific_yield_pv_mwh_per_mw[t] * pv_capacity_mw + specific_yield_wind_mwh_per_mw[t] * wind_capacity_mw + grid_import[t] + battery_discharge[t] == demand_profile_mwh[t] + grid_export[t] + curtailment[t] + battery_charge[t], f"Energy_Balance_{t}"
+    # 2. Batterie-Nebenbedingungen
+    for t in timesteps:
+        model += battery_soc[t+1] == battery_soc[t] + battery_charge[t] * charge_discharge_eff_sqrt - battery_discharge[t] * charge_discharge_eff_sqrt_inv, f"Battery_SoC_Update_{t}"
+        model += battery_charge[t] <= battery_power_mw * time_resolution_hours, f"Battery_Charge_Power_Limit_{t}"
+        model += battery_discharge[t] <= battery_power_mw * time_resolution_hours, f"Battery_Discharge_Power_Limit_{t}"
+        model += battery_soc[t] >= battery_soc_min_percent * battery_capacity_mwh, f"Battery_SoC_Min_Limit_{t}"
+        model += battery_soc[t] <= battery_capacity_mwh, f"Battery_SoC_Max_Limit_{t}"
+    model += battery_soc[num_timesteps] >= battery_soc_min_percent * battery_capacity_mwh, f"Battery_SoC_Min_Limit_{num_timesteps}"
+    model += battery_soc[num_timesteps] <= battery_capacity_mwh, f"Battery_SoC_Max_Limit_{num_timesteps}"
+    # 3. Zyklische Bedingung
+    model += battery_soc[num_timesteps] == battery_soc[0], "Battery_Cyclic_SoC"
+    series_variables = {'Grid_Import': grid_import, 'Grid_Export': grid_export, 'Curtailment': curtailment,
+                        'Battery_Charge': battery_charge, 'Battery_Discharge': battery_discharge, 'Battery_SoC': battery_soc}
+    return model, [pv_capacity_mw, wind_capacity_mw, battery_capacity_mwh, battery_power_mw], series_variables
+
+
+def build_model(profiles, params, backend='matrix', representative_days=None):
+    """Baut das Auslegungsmodell; gibt ein Dict mit ``backend``, ``size`` und den Backend-Objekten zurück.
+
+    ``representative_days`` gilt nur für ``'typtage'``: None = identische Tage
+    zusammenfassen, n = n typische Tage per k-Medoids.
+    """
+    if backend == 'matrix':
+        lp = lp_matrix.build_system_lp(profiles, params)
+        size = {'variables': len(lp['c']), 'constraints': lp['A_eq'].shape[0] + lp['A_ub'].shape[0], 'nonzeros': lp['A_eq'].nnz + lp['A_ub'].nnz}
+        return {'backend': backend, 'lp': lp, 'size': size}
+    if backend == 'typtage':
+        import zeitaggregation
+        aggregation = zeitaggregation.aggregate_days(profiles, params, n_days=representative_days)
+        lp = zeitaggregation.build_aggregated_lp(aggregation, params)
+        return {'backend': backend, 'lp': lp, 'aggregation': aggregation, 'size': zeitaggregation.lp_size(lp),
+                'profiles': profiles, 'params': params} # für den Betrieb auf der vollen Zeitreihe
+    if backend == 'mps':
+        import tempfile
+        T = len(profiles['demand_profile_mwh'])
+        workdir = tempfile.TemporaryDirectory(prefix='mps_') # wird mit dem Dict aufgeräumt
+        path = lp_matrix.write_system_mps(profiles, params, os.path.join(workdir.name, 'model.mps'))
+        layout = lp_matrix.system_layout(T)
+        size = {'variables': layout['offsets']['num_cols'], 'constraints': layout['num_rows'], 'nonzeros': None}
+        return {'backend': backend, 'path': path, 'workdir': workdir, 'num_timesteps': T, 'size': size}
+    if backend == 'pulp':
+        model, capacity_variables, series_variables = build_pulp_model(profiles, params)
+        size = {'variables': model.numVariables(), 'constraints': model.numConstraints(), 'nonzeros': None}
+        return {'backend': backend, 'model': model, 'capacity_variables': capacity_variables,
+                'series_variables': series_variables, 'size': size}
+    raise ValueError(f"Unbekanntes Backend '{backend}' (erlaubt: {', '.join(BACKENDS)})")
+
+
+def solve_model(built, msg=False, solver=None, solver_options=None):
+    """Löst ein Modell aus :func:`build_model`; Ergebnis im Format von :func:`lp_matrix.solve_lp` für alle Backends.
+
+    ``solver`` None = bisheriger Standard ('cbc' für 'pulp', highspy oder CBC für 'mps', sonst 'scipy'); ``solver_options``
+    (threads, time_limit, presolve, method, crossover) siehe :func:`loeser.solve`. Die
+    Telemetrie der Lösung steht unter ``telemetry``.
+    """
+    solver_options = solver_options or {}
+    if built['backend'] == 'pulp':
+        model = built['model']
+        status, telemetry = loeser.solve_pulp(model, solver or 'cbc', msg=msg, **solver_options)
+        if status != 'Optimal': return {'status': status, 'objective': np.inf, 'telemetry': dict(telemetry, status=status)}
+        start = time.perf_counter()
+        # Alle Werte eines Variablenblocks in einem Durchlauf als Array
+        solution = ergebnisse.solution_from_pulp(model, built['capacity_variables'], built['series_variables'])
+        telemetry.update(read_s=time.perf_counter() - start, status=status, objective=solution['objective'])
+        solution['telemetry'] = telemetry
+        return solution
+    if built['backend'] == 'mps':
+        solver = solver or ('highspy' if 'highspy' in loeser.available_solvers() else 'cbc')
+        return loeser.solve_mps(built['path'], built['num_timesteps'], solver, msg=msg, **solver_options)
+    solution = loeser.solve(built['lp'], solver or 'scipy', msg=msg, **solver_options)
+    if built['backend'] == 'typtage' and solution['status'] == 'Optimal':
+        import zeitaggregation
+        zeitaggregation.expand_solution(built['aggregation'], built['lp'], solution, built['profiles'], built['params'])
+    return solution
+
+
+def cost_breakdown(params, solution, kpis):
+    """Jährliche Kosten und Erlöse der Lösung je Technologie (€/a), Kontrollsumme und LCOE (€/MWh)."""
+    af_pv_wind = annuity_factor(params['discount_rate'], params['lifetime_pv_wind_years'])
+    af_battery = annuity_factor(params['discount_rate'], params['lifetime_battery_years'])
+    pv, wind = solution['PV_Capacity_MWp'], solution['Wind_Capacity_MW']
+    batt_mwh, batt_mw = solution['Battery_Capacity_MWh'], solution['Battery_Power_MW']
+    c = {
+        'capex_pv': af_pv_wind * pv * params['specific_capex_pv_eur_per_mw'] if pv > 0 else 0,
+        'opex_pv': pv * params['specific_opex_pv_eur_per_mw_pa'] if pv > 0 else 0,
+        'capex_wind': af_pv_wind * wind * params['specific_capex_wind_eur_per_mw'] if wind > 0 else 0,
+        'opex_wind': wind * params['specific_opex_wind_eur_per_mw_pa'] if wind > 0 else 0,
+        'capex_battery': af_battery * (batt_mw * params['specific_capex_battery_eur_per_mw']) if batt_mwh > 0 else 0,
+        'opex_battery': batt_mwh * params['specific_opex_battery_eur_per_mwh_pa'] if batt_mwh > 0 else 0,
+        'grid_import_cost': kpis['total_grid_import_mwh'] * params['grid_purchase_price_eur_per_mwh'],
+        'feed_in_revenue': kpis['total_feed_in_revenue_eur'],
+    }
+    c['annualized_capex'] = c['capex_pv'] + c['capex_wind'] + c['capex_battery']
+    c['total_opex'] = c['opex_pv'] + c['opex_wind'] + c['opex_battery']
+    c['control_sum'] = c['annualized_capex'] + c['total_opex'] + c['grid_import_cost'] - c['feed_in_revenue']
+    c['lcoe_eur_per_mwh'] = solution['objective'] / kpis['total_demand_mwh'] if kpis['total_demand_mwh'] > 1e-6 else np.nan
+    return c
+
+
+def optimize(params=None, backend='matrix', seed=None, representative_days=None, msg=False, profiles=None,
+             solver=None, solver_options=None):
+    """Profile erzeugen, Modell aufbauen und lösen (Solver siehe :func:`solve_model`).
+
+    Gibt ein Dict mit ``params``, ``profiles``, ``model`` (aus :func:`build_model`),
+    ``solution``, ``status``, ``build_time``, ``solve_time`` und ``telemetry`` zurück; bei
+    optimaler Lösung zusätzlich ``kpis`` und ``costs`` (sowie ``aggregation_report`` für 'typtage').
+    """
+    params = params if params is not None else default_params()
+    if profiles is None: profiles = generate_profiles(params, seed=seed)
+    start = datetime.datetime.now()
+    built = build_model(profiles, params, backend, representative_days)
+    build_time = datetime.datetime.now() - start
+    start = datetime.datetime.now()
+    solution = solve_model(built, msg=msg, solver=solver, solver_options=solver_options)
+    telemetry = solution['telemetry']
+    telemetry.update(backend=backend, build_s=build_time.total_seconds())
+    result = {'params': params, 'profiles': profiles, 'model': built, 'solution': solution, 'status': solution['status'],
+              'build_time': build_time, 'solve_time': datetime.datetime.now() - start, 'telemetry': telemetry}
+    if solution['status'] == 'Optimal':
+        result['kpis'] = ergebnisse.summary_kpis(profiles, solution) # Jahreswerte und Kennzahlen direkt auf den Lösungsarrays
+        result['costs'] = cost_breakdown(params, solution, result['kpis'])
+        if backend == 'typtage':
+            # Zeitreihen stammen aus dem Betrieb der Auslegung im Vollmodell -> obere Schranke und Aggregationsfehler
+            import zeitaggregation
+            result['aggregation_report'] = zeitaggregation.aggregation_error(profiles, params, solution)
+    return result
+
+
+def landscape_ranges(solution, pv_steps=15, wind_steps=15):
+    """PV-/Wind-Raster der Kostenlandschaft um das Optimum (bis 150 %, mindestens 10 bzw. 50 MW)."""
+    opt_pv_mw, opt_wind_mw = solution['PV_Capacity_MWp'], solution['Wind_Capacity_MW']
+    max_pv_plot = max(10, opt_pv_mw * 1.5); max_wind_plot = max(10, opt_wind_mw * 1.5)
+    if opt_pv_mw < 1: max_pv_plot = max(max_pv_plot, 50)
+    if opt_wind_mw < 1: max_wind_plot = max(max_wind_plot, 50)
+    return np.linspace(0, max_pv_plot, pv_steps), np.linspace(0, max_wind_plot, wind_steps)
+
+
+def cost_landscape(result, pv_steps=15, wind_steps=15, max_workers=None, solver_threads=1, warm_start=True, progress=True):
+    """Kostenlandschaft PV/Wind bei der optimalen Batterie aus :func:`optimize`; gibt ``(pv_range, wind_range, cost_grid)`` zurück."""
+    import kostenlandschaft # Parallele Berechnung der Kostenlandschaft (highspy optional)
+    solution = result['solution']
+    pv_range, wind_range = landscape_ranges(solution, pv_steps, wind_steps)
+    cost_grid = kostenlandschaft.compute_cost_landscape(
+        result['profiles'], result['params'], pv_range, wind_range, solution['Battery_Capacity_MWh'], solution['Battery_Power_MW'],
+        backend='pulp' if result['model']['backend'] == 'pulp' else 'matrix', max_workers=max_workers,
+        solver_threads=solver_threads, progress=progress, warm_start=warm_start)
+    return pv_range, wind_range, cost_grid
+
+
+def adaptive_cost_landscape(result, pv_steps=15, wind_steps=15, max_solves=None, max_workers=None, solver_threads=1, progress=True):
+    """Adaptive Kostenlandschaft (:func:`kostenlandschaft.compute_adaptive_landscape`) über dasselbe Gebiet wie :func:`cost_landscape`."""
+    import kostenlandschaft
+    if result['model']['backend'] == 'pulp': raise ValueError("Adaptive Kostenlandschaft nur mit Matrix-Backend")
+    solution = result['solution']
+    pv_range, wind_range = landscape_ranges(solution, pv_steps, wind_steps)
+    return kostenlandschaft.compute_adaptive_landscape(
+        result['profiles'], result['params'], pv_range, wind_range, solution['Battery_Capacity_MWh'], solution['Battery_Power_MW'],
+        max_solves=max_solves, max_workers=max_workers, solver_threads=solver_threads, progress=progress)
+
+
+def _pyplot(mode):
+    import matplotlib
+    if mode == 'save': matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_timeseries(frame, time_resolution_hours, path, mode='save', decimation='minmax', dpi=None):
+    """Diagramm Lastprofil und EE-Erzeugung aus :func:`ergebnisse.timeseries_frame`.
+
+    Die Reihen werden vor dem Zeichnen auf die Bildbreite ausgedünnt (:func:`diagramme.decimate`,
+    ``decimation='none'`` zeichnet alle Punkte); die Dauer hängt damit kaum von der Länge ab.
+    """
+    plt = _pyplot(mode)
+    dpi = dpi or diagramme.DEFAULT_DPI
+    width_in = 15
+    time_index_plot = frame['Timestamp'].to_numpy()
+
+    def series(column):
+        return diagramme.decimate(time_index_plot, frame[column].to_numpy(), width_in * dpi, decimation)
+
+    plt.figure(figsize=(width_in, 7), dpi=dpi)
+    plt.plot(*series('Bedarf (MWh)'), label='Bedarf', color='black', linewidth=1.5)
+    plt.plot(*series('PV Erzeugung (MWh)'), label='PV Erzeugung', color='orange', linewidth=0.8, alpha=0.8)
+    plt.plot(*series('Wind Erzeugung (MWh)'), label='Wind Erzeugung', color='deepskyblue', linewidth=0.8, alpha=0.8)
+    plt.title('Lastprofil und Erneuerbare Erzeugung über das Beispieljahr')
+    plt.xlabel('Datum'); plt.ylabel(f'Energie (MWh pro {time_resolution_hours*60:.0f} min)')
+    plt.grid(True, linestyle=':', alpha=0.7); plt.legend(loc='upper left')
+    plt.ylim(bottom=0); plt.tight_layout()
+    plt.savefig(path)
+    if mode == 'save': plt.close()
+    return path
+
+
+def plot_cost_landscape(pv_range, wind_range, cost_grid, solution, path, mode='save', samples=None):
+    """Konturdiagramm der Kostenlandschaft mit markiertem Optimum; None, wenn keine gültigen Kosten vorliegen.
+
+    ``samples`` (Zeilen PV, Wind, ...) markiert die tatsächlich gelösten Punkte einer adaptiven Landschaft.
+    """
+    if np.all(np.isnan(cost_grid)) or not np.any(np.isfinite(cost_grid)): return None
+    plt = _pyplot(mode)
+    opt_pv_mw, opt_wind_mw = solution['PV_Capacity_MWp'], solution['Wind_Capacity_MW']
+    plt.figure(figsize=(10, 8))
+    cost_grid_mio = cost_grid / 1_000_000
+    pv_mesh, wind_mesh = np.meshgrid(pv_range, wind_range)
+    # Filtern von Inf-Werten für die Plot-Skala
+    finite_costs = cost_grid_mio[np.isfinite(cost_grid_mio)]
+    levels = np.linspace(np.min(finite_costs), np.min(finite_costs) * 2, 20) if len(finite_costs) > 0 else 20 # Levels anpassen
+    contour = plt.contourf(pv_mesh, wind_mesh, cost_grid_mio, levels=levels, cmap='viridis_r', extend='max') # Inf Werte werden von contourf oft ignoriert oder speziell behandelt
+    plt.colorbar(contour, label='Anualisierte jährliche Gesamtkosten (Mio. €)')
+    if samples is not None:
+        plt.scatter(samples[:, 0], samples[:, 1], color='white', edgecolors='black', s=12, linewidths=0.5, label=f'Gelöste Punkte ({len(samples)})')
+    # Optimum markieren
+    plt.scatter(opt_pv_mw, opt_wind_mw, color='red', s=150, edgecolors='black', marker='*', label=f'Optimum ({opt_pv_mw:.1f} MW PV, {opt_wind_mw:.1f} MW Wind)\nKosten: {solution["objective"]/1_000_000:.2f} Mio. €')
+    plt.xlabel('Installierte PV-Leistung (MWp)'); plt.ylabel('Installierte Wind-Leistung (MW)')
+    plt.title(f'Kostenlandschaft (PV/Wind) bei optimaler Batterie ({solution["Battery_Capacity_MWh"]:.1f} MWh / {solution["Battery_Power_MW"]:.1f} MW)')
+    plt.legend(); plt.grid(True, linestyle=':', alpha=0.6); plt.tight_layout()
+    plt.savefig(path)
+    if mode == 'save': plt.close()
+    return path
+
+
+def _parse_param(text):
+    """``name=wert`` für ``--param``; Werte als JSON (Zahlen, Dicts), sonst als Text."""
+    name, sep, value = text.partition('=')
+    if not sep or name not in DEFAULT_PARAMS: raise argparse.ArgumentTypeError(f"Unbekannter Parameter oder Format (name=wert erwartet): {text}")
+    try: value = json.loads(value)
+    except ValueError: pass
+    if isinstance(value, dict): value = {int(k) if k.isdigit() else k: v for k, v in value.items()}
+    return name, value
+
+
+def _print_parameters(params, profiles):
+    p = params
+    num_timesteps = len(profiles['demand_profile_mwh'])
+    print("--- Initialisiere Modellparameter ---")
+    print(f"Zeitschritte pro Jahr: {num_timesteps} (Auflösung: {p['time_resolution_hours']*60:.0f} min)")
+    print(f"Jährlicher Gesamtbedarf: {np.sum(profiles['demand_profile_mwh']):,.2f} MWh (konstant {profiles['demand_profile_mwh'][0]:.4f} MWh pro Zeitschritt)")
+    print(f"Ziel-spez. Jahresertrag PV: {p['target_annual_specific_yield_pv_mwh_per_mw']} MWh/MWp")
+    print(f"Ziel-spez. Jahresertrag Wind: {p['target_annual_specific_yield_wind_mwh_per_mw']} MWh/MW")
+    print(f"Annahme Batterie OPEX: {p['specific_opex_battery_eur_per_mwh_pa']/1000:.1f} k€/MWh/Jahr")
+    print(f"Diskontierungsrate: {p['discount_rate']:.1%}")
+    print(f"Lebensdauer PV/Wind: {p['lifetime_pv_wind_years']} Jahre")
+    print(f"Annahme Lebensdauer Batterie: {p['lifetime_battery_years']} Jahre")
+    print(f"Annahme Batterie Wirkungsgrad (round-trip): {p['battery_efficiency']:.1%}")
+    print(f"Annahme Min. Ladezustand (SoC): {p['battery_soc_min_percent']:.1%}")
+    print(f"Netzbezugspreis: {p['grid_purchase_price_eur_per_mwh']:.2f} €/MWh")
+    print(f"Einspeisevergütung: {p['feed_in_tariff_eur_per_mwh']:.2f} €/MWh")
+    print(f"Stunden mit neg. Preisen (Vergütung=0): {p['negative_price_hours']} h")
+    print("\n--- Generiere Erzeugungsprofile ---")
+    print(f"Kontrolle Jahresertrag PV pro MW: {np.sum(profiles['specific_yield_pv_mwh_per_mw']):.2f} MWh")
+    print(f"Kontrolle Jahresertrag Wind pro MW: {np.sum(profiles['specific_yield_wind_mwh_per_mw']):.2f} MWh")
+    print(f"Einspeiseprofil: {int(np.sum(profiles['feed_in_tariff_profile_eur_per_mwh'] == 0))} Zeitschritte mit 0 € Vergütung.")
+    af_pv_wind = annuity_factor(p['discount_rate'], p['lifetime_pv_wind_years'])
+    af_battery = annuity_factor(p['discount_rate'], p['lifetime_battery_years'])
+    print(f"Annuitätsfaktor PV/Wind (r={p['discount_rate']:.1%}, n={p['lifetime_pv_wind_years']}): {af_pv_wind:.4f}")
+    print(f"Annuitätsfaktor Batterie (r={p['discount_rate']:.1%}, n={p['lifetime_battery_years']}): {af_battery:.4f}")
+
+
+def _print_results(result):
+    solution, kpis, c, params = result['solution'], result['kpis'], result['costs'], result['params']
+    print(f"\nOptimale Kapazitäten:")
+    print(f"  PV Leistung: {solution['PV_Capacity_MWp']:.2f} MWp")
+    print(f"  Wind Leistung: {solution['Wind_Capacity_MW']:.2f} MW")
+    print(f"  Batterie Energie: {solution['Battery_Capacity_MWh']:.2f} MWh")
+    print(f"  Batterie Leistung: {solution['Battery_Power_MW']:.2f} MW")
+    if 'aggregation_report' in result:
+        report = result['aggregation_report']
+        print(f"  Typtage-Zielwert: {report['aggregated_objective']:,.2f} €, Betrieb auf voller Zeitreihe: {report['full_upper_bound']:,.2f} € (Abweichung {report['objective_error_rel']:.2%})")
+    if solution['Wind_Capacity_MW'] > 1e-3: print(f"  -> Hinweis Wind: Entspricht ideal {solution['Wind_Capacity_MW'] / WIND_TURBINE_SIZE_MW:.2f} Anlagen á {WIND_TURBINE_SIZE_MW} MW.")
+
+    print(f"\nJährliche Kosten und Erlöse:")
+    print(f"  Annualisierte Gesamtkosten (Zielwert): {solution['objective']:,.2f} €")
+    print(f"    - Ann. CAPEX: {c['annualized_capex']:,.2f} € (PV: {c['capex_pv']:,.0f}, Wind: {c['capex_wind']:,.0f}, Batt: {c['capex_battery']:,.0f})")
+    print(f"    - Jhrl. OPEX: {c['total_opex']:,.2f} € (PV: {c['opex_pv']:,.0f}, Wind: {c['opex_wind']:,.0f}, Batt: {c['opex_battery']:,.0f})")
+    print(f"    - Jhrl. Netzbezugskosten: {c['grid_import_cost']:,.2f} €")
+    print(f"    - Jhrl. Einspeiseerlöse: {c['feed_in_revenue']:,.2f} €")
+    print(f"    -> Kontrollsumme: {c['control_sum']:,.2f} € {'(OK)' if abs(c['control_sum'] - solution['objective']) < 1 else '(Abweichung!)'}")
+
+    print(f"\nEnergiejahresbilanz:")
+    print(f"  Gesamtjahresbedarf: {kpis['total_demand_mwh']:,.2f} MWh")
+    print(f"  Gesamte PV Erzeugung: {kpis['total_pv_gen_mwh']:,.2f} MWh")
+    print(f"  Gesamte Wind Erzeugung: {kpis['total_wind_gen_mwh']:,.2f} MWh")
+    print(f"  Gesamte Erzeugung (PV+Wind): {kpis['total_generation_mwh']:,.2f} MWh")
+    print(f"  Gesamter Netzbezug: {kpis['total_grid_import_mwh']:,.2f} MWh")
+    print(f"  Gesamte Netzeinspeisung: {kpis['total_grid_export_mwh']:,.2f} MWh")
+    print(f"  Gesamte Abregelung: {kpis['total_curtailment_mwh']:,.2f} MWh")
+    print(f"  Gesamte Batterieladung: {kpis['total_battery_charge_mwh']:,.2f} MWh")
+    print(f"  Gesamte Batterieentladung: {kpis['total_battery_discharge_mwh']:,.2f} MWh")
+    total_sources = kpis['total_sources_mwh']; total_sinks = kpis['total_sinks_mwh']
+    print(f"  -> Bilanz-Check: Quellen={total_sources:,.2f} MWh, Senken={total_sinks:,.2f} MWh {'(OK)' if abs(total_sources - total_sinks) < 1 else '(Abweichung!)'}")
+
+    if np.isfinite(c['lcoe_eur_per_mwh']):
+        print(f"\nLCOE (auf Bedarf bezogen): {c['lcoe_eur_per_mwh']:.2f} €/MWh ({c['lcoe_eur_per_mwh'] / 10:.2f} ct/kWh)")
+        print(f"  Vergleich Netzbezugspreis: {params['grid_purchase_price_eur_per_mwh']:.2f} €/MWh")
+    else: print("\nLCOE nicht berechenbar.")
+    print(f"\nAutarkiegrad: {kpis['self_sufficiency_rate']:.2f}%")
+    print(f"Erneuerbare Deckungsrate: {kpis['renewable_coverage_rate']:.2f}%")
+    print(f"Abregelungsanteil: {kpis['curtailment_share']:.2f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Kostenoptimale Auslegung von PV, Wind und Batterie (LP).')
+    parser.add_argument('--resolution', type=float, default=DEFAULT_PARAMS['time_resolution_hours'] * 60, help='Zeitliche Auflösung in Minuten')
+    parser.add_argument('--param', type=_parse_param, action='append', default=[], metavar='NAME=WERT',
+                        help='Standardparameter überschreiben (mehrfach möglich), z.B. discount_rate=0.05')
+    parser.add_argument('--seed', type=int, default=None, help='Saat für die Zeitschritte mit 0 €-Vergütung')
+    parser.add_argument('--calendar-year', type=int, default=None, help='Kalendergenaue Profile für dieses Jahr (mit Schalttag)')
+    parser.add_argument('--pv-shape', choices=('box', 'solar'), default='box', help="PV-Tagesgang: 06-20 Uhr ('box') oder Sonnenstand ('solar')")
+    parser.add_argument('--wind-profile', choices=('monthly', 'synthetic'), default='monthly',
+                        help="Windertrag monatsweise konstant oder als autokorrelierte Weibull-Zeitreihe (windsynthese.py, gleiche Monatserträge)")
+    parser.add_argument('--wind-seed', type=int, default=0, help="Nur 'synthetic': Saat der Windzeitreihe")
+    parser.add_argument('--backend', choices=BACKENDS, default='matrix')
+    parser.add_argument('--representative-days', type=int, default=None, help="Nur 'typtage': Anzahl typischer Tage")
+    parser.add_argument('--solver', default=None,
+                        help="scipy (Standard), highspy oder cbc; Backend 'pulp': cbc (Standard) oder ein verfügbarer PuLP-Solver")
+    parser.add_argument('--method', choices=loeser.METHODS, default='auto', help="Simplex, Innere-Punkte-Verfahren ('ipm') oder Wahl des Solvers")
+    parser.add_argument('--no-crossover', dest='crossover', action='store_false', help='Nur mit --method ipm: ohne Crossover')
+    parser.add_argument('--threads', type=int, default=None, help='Threads des Solvers (Standard: Solver-Vorgabe)')
+    parser.add_argument('--time-limit', type=float, default=None, help='Zeitlimit des Solvers in Sekunden')
+    parser.add_argument('--no-presolve', dest='presolve', action='store_false')
+    parser.add_argument('--telemetry', metavar='DATEI', help='Telemetrie der Lösung als JSON-Zeile an diese Datei anhängen')
+    parser.add_argument('--sensitivity', action='store_true', help='Ableitungen und Gültigkeitsbereiche der Kosten nach Preisen, CAPEX und Bedarf (Backend matrix)')
+    parser.add_argument('--tariff-scenarios', type=int, default=None, metavar='S',
+                        help='Zusätzlich zweistufig stochastisch über S Vergütungsszenarien (Saaten seed..seed+S-1) auslegen')
+    parser.add_argument('--scenario-method', choices=('extensive', 'benders'), default='benders',
+                        help="Block-LP auf einmal ('extensive') oder Szenariozerlegung ('benders')")
+    parser.add_argument('--scenario-workers', type=int, default=None, help="Nur 'benders': Worker-Prozesse (None = alle Kerne, 1 = seriell)")
+    parser.add_argument('--no-landscape', dest='landscape', action='store_false', help='Kostenlandschaft nicht berechnen')
+    parser.add_argument('--landscape-steps', type=int, nargs=2, default=(15, 15), metavar=('PV', 'WIND'))
+    parser.add_argument('--landscape-mode', choices=('grid', 'adaptive'), default='grid',
+                        help="'adaptive' verfeinert nur um das Optimum und an Knicken (Budget: --landscape-max-solves)")
+    parser.add_argument('--landscape-max-solves', type=int, default=None, help="Nur 'adaptive': maximale LP-Lösungen (Standard: ein Drittel des Rasters)")
+    parser.add_argument('--landscape-workers', type=int, default=None, help='Worker-Prozesse (None = alle Kerne, 1 = seriell)')
+    parser.add_argument('--landscape-solver-threads', type=int, default=1)
+    parser.add_argument('--no-warm-start', dest='warm_start', action='store_false', help='Kostenlandschaft ohne Warmstart (highspy)')
+    parser.add_argument('--export-format', choices=ergebnisse.EXPORT_FORMATS + ('none',), default='parquet')
+    parser.add_argument('--plots', choices=PLOT_MODES, default='show', help="'save' schreibt PNGs headless (Agg), 'none' lädt kein matplotlib")
+    parser.add_argument('--plot-decimation', choices=diagramme.DECIMATION_METHODS, default='minmax',
+                        help="Zeitreihen vor dem Zeichnen auf die Bildbreite ausdünnen (Min/Max je Pixel oder LTTB)")
+    parser.add_argument('--plot-workers', type=int, default=1, help="Nur 'save': Diagramme parallel in Prozessen schreiben (0 = alle Kerne)")
+    parser.add_argument('--output-dir', default='.', help='Verzeichnis für Diagramme und Export')
+    args = parser.parse_args(argv)
+
+    if args.sensitivity and args.backend != 'matrix':
+        parser.error("--sensitivity erfordert --backend matrix")
+    if args.landscape and args.landscape_mode == 'adaptive' and args.backend == 'pulp':
+        parser.error("--landscape-mode adaptive erfordert ein Matrix-Backend")
+    params = default_params(time_resolution_hours=args.resolution / 60, **dict(args.param))
+    if args.calendar_year is not None or args.pv_shape != 'box':
+        start = datetime.datetime(args.calendar_year or 2023, 1, 1)
+        profiles = generate_calendar_profiles(params, start=start.date().isoformat(), pv_shape=args.pv_shape, seed=args.seed)
+    else:
+        start = datetime.datetime(2023, 1, 1)
+        profiles = generate_profiles(params, seed=args.seed)
+    if args.wind_profile == 'synthetic':
+        import windsynthese # Autokorrelierte Windzeitreihe mit Weibull-Randverteilung
+        wind = windsynthese.spezifischer_windertrag(params, seed=args.wind_seed)[0]
+        if len(wind) != len(profiles['specific_yield_wind_mwh_per_mw']): parser.error("--wind-profile synthetic nur für Jahre mit 365 Tagen")
+        profiles['specific_yield_wind_mwh_per_mw'] = wind
+    _print_parameters(params, profiles)
+    if args.plots != 'none' or args.export_format != 'none': os.makedirs(args.output_dir, exist_ok=True)
+
+    print("\n--- Definiere und löse Optimierungsmodell (kann einige Zeit dauern) ---")
+    solver_options = {'threads': args.threads, 'time_limit': args.time_limit, 'presolve': args.presolve,
+                      'method': args.method, 'crossover': args.crossover}
+    try:
+        result = optimize(params, args.backend, representative_days=args.representative_days, msg=True, profiles=profiles,
+                          solver=args.solver, solver_options=solver_options)
+    except ValueError as e: parser.error(str(e)) # Solver-Optionen, die der gewählte Solver nicht kennt
+    size = result['model']['size']
+    print(f"Modell ({args.backend}): {size['variables']} Variablen, {size['constraints']} Nebenbedingungen"
+          + (f", {size['nonzeros']} Nicht-Null-Einträge." if size['nonzeros'] is not None else "."))
+    print(f"Modellaufbau abgeschlossen. Dauer: {result['build_time']}")
+    print(f"Optimierung abgeschlossen. Dauer: {result['solve_time']}")
+    t = result['telemetry']
+    iterations = ', '.join(f"{name} {t[key]}" for name, key in (('Simplex', 'simplex_iterations'), ('IPM', 'ipm_iterations'),
+                                                                ('Crossover', 'crossover_iterations')) if t[key])
+    print(f"Solver: {t['solver']} (Verfahren: {t['method']}{'' if t['crossover'] else ', ohne Crossover'}), Iterationen: {iterations or 'k. A.'}"
+          + (f", nach Presolve {t['presolved_rows']} Zeilen / {t['presolved_columns']} Spalten" if t['presolved_rows'] is not None else ""))
+    if args.telemetry: print(f"Telemetrie angehängt an '{loeser.write_telemetry(t, args.telemetry)}'.")
+
+    print("\n--- Optimierungsergebnisse ---")
+    print(f"Status: {result['status']}")
+    if result['status'] != 'Optimal':
+        print("Optimierung nicht erfolgreich. Status:", result['status'])
+        print("Es werden keine detaillierten Ergebnisse, Diagramme oder Exportdateien generiert.")
+        return result
+    _print_results(result)
+    solution = result['solution']
+    time_resolution_hours = params['time_resolution_hours']
+
+    if args.sensitivity:
+        import sensitivitaet
+        print("\n--- Sensitivität aus Dualen (ohne erneutes Lösen) ---")
+        start_time_sens = datetime.datetime.now()
+        result['sensitivity'] = sensitivitaet.sensitivity_report(result['model']['lp'], params, profiles, solution)
+        print(sensitivitaet.format_report(result['sensitivity']))
+        print(f"Basis aus: {result['sensitivity']['basis_source']}. Dauer: {datetime.datetime.now() - start_time_sens}")
+
+    if args.tariff_scenarios:
+        import stochastische_optimierung
+        print(f"\n--- Stochastische Auslegung über {args.tariff_scenarios} Vergütungsszenarien ({args.scenario_method}) ---")
+        stochastic = stochastische_optimierung.optimize_stochastic(
+            profiles, params, args.tariff_scenarios, seed=args.seed or 0, method=args.scenario_method,
+            solver=args.solver if args.solver in loeser.SOLVERS else 'highspy', max_workers=args.scenario_workers, progress=True)
+        result['stochastic'] = stochastic
+        if stochastic['status'] in ('Optimal', 'Not converged', 'Master failed'):
+            if stochastic['status'] != 'Optimal':
+                print(f"WARNUNG: Zerlegung nicht konvergiert ({stochastic['status']}, Lücke {stochastic['gap']:.3%}); beste bewertete Auslegung:")
+            for name, unit in zip(lp_matrix.CAPACITY_NAMES, ('MWp', 'MW', 'MWh', 'MW')):
+                print(f"{name}: {stochastic[name]:.2f} {unit} (deterministisch {solution[name]:.2f})")
+            if stochastic.get('at_capacity_bound'): print(f"WARNUNG: an der Obergrenze: {', '.join(stochastic['at_capacity_bound'])}")
+            costs = stochastic['scenario_costs']
+            print(f"Erwartete Gesamtkosten: {stochastic['objective']:,.2f} € (Szenarien {costs.min():,.0f} bis {costs.max():,.0f} €)")
+        else: print("Stochastische Auslegung nicht erfolgreich. Status:", stochastic['status'])
+        print(f"Dauer: {stochastic['solve_time']}")
+
+    # Zeitreihen als DataFrame (Grundlage für Diagramm und Export)
+    if args.plots != 'none' or args.export_format != 'none':
+        df_export = ergebnisse.timeseries_frame(profiles, solution, time_resolution_hours, start)
+    # Diagramme werden gesammelt und am Ende in einem Durchgang geschrieben (diagramme.render_all)
+    figures = []
+    if args.plots != 'none':
+        figures.append(('Lastprofil/Erzeugung', plot_timeseries,
+                        {'frame': df_export[['Timestamp', 'Bedarf (MWh)', 'PV Erzeugung (MWh)', 'Wind Erzeugung (MWh)']],
+                         'time_resolution_hours': time_resolution_hours, 'mode': args.plots, 'decimation': args.plot_decimation,
+                         'path': os.path.join(args.output_dir, "lastprofil_erzeugung_jahr_mit_batterie.png")}))
+
+    if args.export_format != 'none':
+        # Zeitreihen-Export (spaltenorientiert; 'xlsx' nur bei Bedarf, deutlich langsamer)
+        print(f"\nExportiere Zeitreihen ({args.export_format})...")
+        try:
+            start_time_export = datetime.datetime.now()
+            stem = os.path.join(args.output_dir, f"energiebilanz_{time_resolution_hours*60:.0f}min_mit_batterie")
+            export_path = ergebnisse.export_timeseries(df_export, stem, args.export_format)
+            print(f"Datei '{os.path.basename(export_path)}' erfolgreich erstellt. Dauer: {datetime.datetime.now() - start_time_export}")
+            print(f"Pfad: {export_path}")
+        except ImportError: print("\nFEHLER: 'openpyxl' fehlt. Installieren mit: pip install openpyxl")
+        except Exception as e: print(f"Fehler beim Export der Zeitreihen: {e}")
+
+    if args.landscape:
+        # --- Kostenlandschaft (PV vs Wind, bei optimaler Batterie) --- ACHTUNG: Sehr rechenintensiv!
+        print("\n--- Erstelle Visualisierung der Kostenlandschaft (PV/Wind bei opt. Batterie) ---")
+        print(f"Hinweis: Verwendet feste Batteriegröße (MWh={solution['Battery_Capacity_MWh']:.1f}, MW={solution['Battery_Power_MW']:.1f}) aus Hauptoptimierung.")
+        pv_steps, wind_steps = args.landscape_steps
+        start_time_sens = datetime.datetime.now()
+        samples = None
+        if args.landscape_mode == 'adaptive':
+            print(f"Starte adaptive Berechnung der Kostenlandschaft (Gebiet {pv_steps}x{wind_steps}, Worker: {args.landscape_workers or os.cpu_count()})...")
+            landscape = adaptive_cost_landscape(result, pv_steps, wind_steps, args.landscape_max_solves, args.landscape_workers,
+                                                args.landscape_solver_threads)
+            pv_range, wind_range, cost_grid, samples = (landscape[k] for k in ('pv_range', 'wind_range', 'cost_grid', 'samples'))
+            result['landscape'] = landscape
+            print(f"{landscape['solves']} LP-Lösungen statt {landscape['uniform_solves']} (eingespart {landscape['saved_solves']}), "
+                  f"{landscape['rounds']} Runden, Raster am Optimum {landscape['spacing_at_minimum'][0]:.2f}/{landscape['spacing_at_minimum'][1]:.2f} MW")
+        else:
+            print(f"Starte Berechnung der Kostenlandschaft ({pv_steps * wind_steps} Punkte, Worker: {args.landscape_workers or os.cpu_count()})...")
+            pv_range, wind_range, cost_grid = cost_landscape(result, pv_steps, wind_steps, args.landscape_workers,
+                                                             args.landscape_solver_threads, args.warm_start)
+            result['landscape'] = {'pv_range': pv_range, 'wind_range': wind_range, 'cost_grid': cost_grid}
+        print(f"Berechnung der Kostenlandschaft abgeschlossen. Dauer: {datetime.datetime.now() - start_time_sens}")
+        if args.plots != 'none':
+            figures.append(('Kostenlandschaft', plot_cost_landscape,
+                            {'pv_range': pv_range, 'wind_range': wind_range, 'cost_grid': cost_grid, 'solution': solution, 'mode': args.plots,
+                             'samples': samples, 'path': os.path.join(args.output_dir, "kostenlandschaft_optimierung_mit_batterie.png")}))
+
+    if figures:
+        print(f"\nErstelle {len(figures)} Diagramm(e)...")
+        start_time_plots = datetime.datetime.now()
+        # Parallel nur headless; 'show' zeichnet im Hauptprozess, damit die Fenster am Ende erscheinen
+        workers = (args.plot_workers or None) if args.plots == 'save' else 1
+        for (name, _, _), (path, error) in zip(figures, diagramme.render_all([(f, kw) for _, f, kw in figures], workers)):
+            if error: print(f"Fehler beim Erstellen des Diagramms {name}: {error}")
+            elif path: print(f"Diagramm '{path}' gespeichert.")
+            else: print(f"Diagramm {name} konnte nicht erstellt werden (keine gültigen Kosten berechnet).")
+        print(f"Diagramme erstellt. Dauer: {datetime.datetime.now() - start_time_plots}")
+
+    print("\n**WICHTIGER HINWEIS:** Ergebnisse basieren auf skalierten Monatsprofilen. Batterieparameter sind Annahmen.")
+    if args.plots == 'show':
+        # Alle erstellten Diagramme am Ende gesammelt anzeigen
+        _pyplot('show').show()
+    return result
+
+
+if __name__ == '__main__':
+    main()
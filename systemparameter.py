@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Standardparameter und ökonomische Hilfsfunktionen für die Systemoptimierung.
+
+Die Werte sind die Standardannahmen von "Lineare Optimierung.py" (systemoptimierung.py) und werden von
+den Matrix-Modellen, den Profilgeneratoren und den Benchmarks gemeinsam genutzt.
+"""
+import copy
+import math
+
+# --- Standardannahmen (Vorgaben der Kommandozeile, überschreibbar mit --param) ---
+DEFAULT_PARAMS = {
+    # Zeitliche Auflösung
+    'time_resolution_hours': 0.25,
+    'hours_in_year': 8760,
+    # Konstantes Lastprofil
+    'demand_per_hour_kwh': 3629,
+    # Monatliche Erträge (MWh) - Relative Verteilung
+    'monthly_yield_pv_mwh_relative': {1: 534, 2: 638, 3: 1404, 4: 1567, 5: 2136, 6: 1994, 7: 1954, 8: 2072, 9: 1683, 10: 1528, 11: 638, 12: 425},
+    'monthly_yield_wind_mwh_relative': {1: 2107, 2: 1914, 3: 1345, 4: 1310, 5: 877, 6: 820, 7: 820, 8: 751, 9: 1230, 10: 1207, 11: 1424, 12: 1846},
+    # Spezifische Jahreserträge
+    'target_annual_specific_yield_pv_mwh_per_mw': 1280,
+    'target_annual_specific_yield_wind_mwh_per_mw': 2302,
+    # Kosten PV & Wind
+    'specific_capex_pv_eur_per_mw': 800 * 1000,
+    'specific_opex_pv_eur_per_mw_pa': 13.3 * 1000,
+    'specific_capex_wind_eur_per_mw': 1600 * 1000,
+    'specific_opex_wind_eur_per_mw_pa': 32 * 1000,
+    # Kosten Batterie
+    'specific_capex_battery_eur_per_mw': 500 * 1000,
+    'specific_opex_battery_eur_per_mwh_pa': 6.65 * 1000,
+    # Ökonomische Parameter
+    'discount_rate': 0.06,
+    'lifetime_pv_wind_years': 20,
+    'lifetime_battery_years': 15,
+    # Batterie Technische Parameter
+    'battery_efficiency': 0.88,
+    'battery_soc_min_percent': 0.10,
+    # Netzinteraktion
+    'grid_purchase_price_eur_per_mwh': 169.9,
+    'feed_in_tariff_eur_per_mwh': 50,
+    'negative_price_hours': 459,
+}
+
+
+def default_params(**overrides):
+    """Liefert eine unabhängige Kopie der Standardparameter, optional mit Überschreibungen."""
+    params = copy.deepcopy(DEFAULT_PARAMS)
+    for key, value in overrides.items():
+        if key not in params: raise KeyError(f"Unbekannter Parameter: {key}")
+        params[key] = value
+    return params
+
+
+# --- Annuitätenfaktor ---
+def annuity_factor(rate, years):
+    if years <= 0: return 0;
+    if rate == 0: return 1 / years
+    if rate < 1e-9: rate = 1e-9
+    q = 1 + rate
+    try: qn = q**years; denominator = qn - 1
+    except OverflowError: print(f"ERROR: Overflow annuity factor (r={rate}, n={years})."); return 0
+    except Exception as e: print(f"ERROR: annuity factor: {e}"); return 0
+    if abs(denominator) < 1e-9: return 1 / years
+    return (rate * qn) / denominator
+
+
+# --- Lade-/Entladewirkungsgrad ---
+def charge_discharge_factors(battery_efficiency):
+    """Gibt (sqrt(eta), 1/sqrt(eta)) zurück; bei ungültigem Wirkungsgrad wie im Skript 100%."""
+    try:
+        if not (0 <= battery_efficiency <= 1): raise ValueError("Batteriewirkungsgrad muss zwischen 0 und 1 liegen.")
+        eff_sqrt = math.sqrt(battery_efficiency)
+        if eff_sqrt > 1e-9: eff_sqrt_inv = 1.0 / eff_sqrt
+        elif battery_efficiency == 0: print("WARNUNG: Batteriewirkungsgrad ist 0."); eff_sqrt_inv = 1e12
+        else: print("WARNUNG: Batteriewirkungsgrad nahe Null!"); eff_sqrt_inv = 1.0 / 1e-9
+    except ValueError as e:
+        print(f"WARNUNG: Ungültiger Batteriewirkungsgrad ({battery_efficiency}). Verwende 100%. Fehler: {e}")
+        eff_sqrt = 1.0; eff_sqrt_inv = 1.0
+    return eff_sqrt, eff_sqrt_inv
+
+
+def cost_coefficients(params):
+    """Lineare Kostenkoeffizienten der Kapazitätsvariablen (€/a pro MW bzw. MWh)."""
+    af_pv_wind = annuity_factor(params['discount_rate'], params['lifetime_pv_wind_years'])
+    af_battery = annuity_factor(params['discount_rate'], params['lifetime_battery_years'])
+    return {
+        'af_pv_wind': af_pv_wind,
+        'af_battery': af_battery,
+        'pv_eur_per_mw': af_pv_wind * params['specific_capex_pv_eur_per_mw'] + params['specific_opex_pv_eur_per_mw_pa'],
+        'wind_eur_per_mw': af_pv_wind * params['specific_capex_wind_eur_per_mw'] + params['specific_opex_wind_eur_per_mw_pa'],
+        'battery_eur_per_mwh': params['specific_opex_battery_eur_per_mwh_pa'],
+        'battery_eur_per_mw': af_battery * params['specific_capex_battery_eur_per_mw'],
+    }
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Szenario-Läufe der Systemoptimierung mit inhaltsadressiertem Ergebnis-Cache.
+
+Jede Zeile einer Szenario-Tabelle überschreibt einzelne Standardparameter (z. B.
+Netzbezugspreis, Einspeisevergütung, Batterie-CAPEX, Zinssatz, Stunden mit 0 €-
+Vergütung). Der Cache-Schlüssel ist ein SHA-256 über die normalisierten Parameter,
+die daraus erzeugten Profile und die Modellversion. Bereits gelöste Szenarien
+werden aus dem Ergebnisspeicher (ein JSON je Schlüssel, Verdrängung der am längsten
+nicht genutzten Einträge über einer Größengrenze) gelesen, nur die übrigen werden
+gelöst - bei ``max_workers`` > 1 in einem Prozess-Pool.
+"""
+import copy
+import datetime
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import ergebnisse
+import lp_matrix
+from systemparameter import default_params
+from zeitreihen import generate_profiles
+
+# Bei Änderungen an Modell oder Ergebnisformat erhöhen, damit alte Einträge nicht mehr passen
+MODEL_VERSION = 1
+
+DEFAULT_CACHE_DIR = 'szenario_cache'
+DEFAULT_CACHE_BYTES = 256 * 1024 ** 2
+
+# Ergebnisspalten der Kennzahlen aus ergebnisse.summary_kpis
+KPI_NAMES = ('total_grid_import_mwh', 'total_grid_export_mwh', 'total_curtailment_mwh', 'total_battery_discharge_mwh',
+             'total_feed_in_revenue_eur', 'self_sufficiency_rate', 'renewable_coverage_rate', 'curtailment_share')
+
+
+def normalize(value):
+    """JSON-fähige, typunabhängige Form eines Parameterwerts (50, 50.0 und np.float64(50) sind gleich)."""
+    if isinstance(value, dict): return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)): return [normalize(v) for v in value]
+    if isinstance(value, np.generic): value = value.item()
+    if isinstance(value, bool) or value is None or isinstance(value, str): return value
+    return repr(float(value))
+
+
+def scenario_key(params, profiles, seed):
+    """Inhaltsadressierter Schlüssel aus Parametern, Profil-Arrays, Saat und Modellversion."""
+    h = hashlib.sha256()
+    h.update(json.dumps({'model_version': MODEL_VERSION, 'seed': seed, 'params': normalize(params)}, sort_keys=True).encode())
+    for name in sorted(profiles):
+        array = np.ascontiguousarray(profiles[name], dtype=float)
+        h.update(name.encode()); h.update(str(array.shape).encode()); h.update(array.tobytes())
+    return h.hexdigest()
+
+
+class ResultStore:
+    """Ergebnisspeicher auf der Platte: eine JSON-Datei je Schlüssel.
+
+    Ein Treffer setzt die Änderungszeit der Datei neu; :meth:`evict` löscht die am
+    längsten nicht genutzten Einträge, bis die Gesamtgröße unter ``max_bytes`` liegt.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory; self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def __contains__(self, key):
+        """True, wenn zu ``key`` ein Eintrag vorliegt (ohne ihn zu lesen oder seine Nutzung zu vermerken)."""
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f: result = json.load(f)
+        except (OSError, ValueError): return None
+        os.utime(path)
+        return result
+
+    def put(self, key, result):
+        # Erst temporär schreiben, dann atomar umbenennen (keine halben Dateien bei Abbruch)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f: json.dump(result, f)
+        os.replace(tmp, self._path(key))
+
+    def entries(self):
+        """Liste ``(mtime, Größe, Pfad)`` aller Einträge."""
+        result = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    st = entry.stat(); result.append((st.st_mtime, st.st_size, entry.path))
+        return result
+
+    def evict(self):
+        """Verdrängt die ältesten Einträge über ``max_bytes``; gibt die Anzahl gelöschter Einträge zurück."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes: break
+            try: os.remove(path)
+            except OSError: continue
+            total -= size; removed += 1
+        return removed
+
+
+def _solve_scenario(task):
+    """Erzeugt die Profile neu (deterministisch über ``seed``), baut und löst das LP; gibt nur Skalare zurück."""
+    key, params, seed = task
+    t0 = time.perf_counter()
+    profiles = generate_profiles(params, seed=seed)
+    solution = lp_matrix.solve_lp(lp_matrix.build_system_lp(profiles, params))
+    result = {'status': solution['status'], 'objective_eur': solution['objective'] if solution['status'] == 'Optimal' else None}
+    if solution['status'] == 'Optimal':
+        result.update({name: solution[name] for name in lp_matrix.CAPACITY_NAMES})
+        kpis = ergebnisse.summary_kpis(profiles, solution)
+        result.update({name: kpis[name] for name in KPI_NAMES})
+    result['solve_s'] = time.perf_counter() - t0
+    return key, result
+
+
+def _scenario_rows(scenarios):
+    """Zeilen der Szenario-Tabelle als Dicts; fehlende Werte (NaN/None) bedeuten Standardwert."""
+    frame = scenarios if isinstance(scenarios, pd.DataFrame) else pd.DataFrame(list(scenarios))
+    rows = []
+    for record in frame.to_dict('records'):
+        rows.append({k: v for k, v in record.items()
+                     if v is not None and not (isinstance(v, float) and math.isnan(v))})
+    return frame, rows
+
+
+def run_scenarios(scenarios, base_params=None, seed=0, cache_dir=DEFAULT_CACHE_DIR, max_cache_bytes=DEFAULT_CACHE_BYTES,
+                  max_workers=1, progress=False):
+    """Löst alle Szenarien einer Tabelle und gibt eine Ergebnistabelle (eine Zeile je Szenario) zurück.
+
+    ``scenarios``: DataFrame oder Liste von Dicts; Spalten sind Schlüssel aus
+    ``systemparameter.DEFAULT_PARAMS`` (unbekannte Namen -> KeyError). ``base_params``
+    ersetzt die Standardparameter als Ausgangspunkt. ``seed`` legt die Zeitschritte mit
+    0 €-Vergütung fest und gehört zum Schlüssel. ``cache_dir=None`` schaltet den Cache ab.
+
+    Die Ergebnistabelle enthält die Eingangsspalten, ``cache_key``, ``cache_hit``,
+    ``status``, ``objective_eur``, die Kapazitäten, die Kennzahlen aus ``KPI_NAMES``
+    und ``solve_s`` (Rechenzeit des ursprünglichen Laufs).
+    """
+    frame, rows = _scenario_rows(scenarios)
+    base = base_params if base_params is not None else default_params()
+    store = ResultStore(cache_dir, max_cache_bytes) if cache_dir is not None else None
+
+    keys, tasks, results, hits = [], {}, {}, set()
+    for row in rows:
+        params = copy.deepcopy(base)
+        for name, value in row.items():
+            if name not in params: raise KeyError(f"Unbekannter Parameter: {name}")
+            params[name] = value.item() if isinstance(value, np.generic) else value
+        key = scenario_key(params, generate_profiles(params, seed=seed), seed)
+        keys.append(key)
+        if key in results or key in tasks: continue
+        cached = store.get(key) if store is not None else None
+        if cached is not None: results[key] = cached; hits.add(key)
+        else: tasks[key] = (key, params, seed)
+
+    start_time = datetime.datetime.now()
+
+    def collect(finished):
+        for i, (key, result) in enumerate(finished):
+            results[key] = result
+            if store is not None: store.put(key, result)
+            if progress: print(f"\rSzenarien: {i + 1}/{len(tasks)} gelöst ({datetime.datetime.now() - start_time})", end="", flush=True)
+        if progress and tasks: print()
+
+    if max_workers == 1 or len(tasks) <= 1:
+        collect(map(_solve_scenario, tasks.values()))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            collect(f.result() for f in as_completed([pool.submit(_solve_scenario, task) for task in tasks.values()]))
+    if store is not None: store.evict()
+
+    table = frame.reset_index(drop=True).copy()
+    table['cache_key'] = keys
+    table['cache_hit'] = [key in hits for key in keys]
+    result_frame = pd.DataFrame([results[key] for key in keys])
+    return pd.concat([table, result_frame], axis=1)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Jobdienst auf localhost unter vielen gleichzeitigen Jobs (Deduplizierung und Ergebnisspeicher).
+
+Verkleinerte Fassung von ``benchmarks/bench_jobdienst.py``: 200 Ertragsjobs mit 5
+verschiedenen Parametersätzen aus 32 Verbindungen gleichzeitig, danach dieselben Jobs
+noch einmal.
+"""
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jobdienst
+
+JOBS = 200
+DISTINCT = 5
+
+
+@pytest.fixture
+def address(tmp_path):
+    """Startet den Dienst mit einem Worker in einem eigenen Thread und beendet ihn nach dem Test."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event(); result = []
+    task = loop.create_task(jobdienst.serve('127.0.0.1:0', 1, str(tmp_path / 'cache'), ready=lambda a: (result.append(a), started.set())))
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.gather(task, return_exceptions=True)), daemon=True)
+    thread.start()
+    assert started.wait(60), "Jobdienst nicht gestartet"
+    yield result[0]
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(60)
+    loop.close()
+
+
+def _run_all(address, requests):
+    def run(request):
+        job = jobdienst.submit(address, request['kind'], request['params'])
+        return job, list(jobdienst.watch(address, job['id']))
+    with ThreadPoolExecutor(32) as pool: return list(pool.map(run, requests))
+
+
+def test_concurrent_jobs_computed_once_and_cached(address):
+    requests = [{'kind': 'yield', 'params': {'k': 1.8 + 0.02 * (i % DISTINCT), 'monte_carlo': 2000}} for i in range(JOBS)]
+
+    first = _run_all(address, requests)
+    assert all(events[-1]['status'] == 'done' for _, events in first)
+    stats = jobdienst.request(address, 'GET', '/stats')
+    assert stats['computed'] == DISTINCT
+    assert stats['failed'] == 0
+
+    second = _run_all(address, requests)
+    assert all(job['outcome'] == 'cached' for job, _ in second)
+    assert jobdienst.request(address, 'GET', '/stats')['computed'] == DISTINCT
+    # Gleiche Parameter liefern dasselbe Ergebnis, gleich ob gerechnet oder aus dem Speicher
+    results = {}
+    for job, events in first + second:
+        results.setdefault(job['id'], []).append(events[-1].get('result'))
+    assert len(results) == DISTINCT
+    assert all(rs[0] is not None and r == rs[0] for rs in results.values() for r in rs)
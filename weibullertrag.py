@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Exakter Weibull-Energieertrag für stückweise lineare Leistungskurven.
+
+Auf jedem Kurvenabschnitt [v_i, v_i+1] gilt P(v) = a + b*v. Mit der Weibull-CDF F
+und dem Teilmoment G(x) = ∫_0^x v f(v) dv = λ Γ(1+1/k) P(1+1/k, (x/λ)^k)
+(regularisierte unvollständige Gammafunktion P) ergibt sich der Beitrag des
+Abschnitts geschlossen zu a*(F(v_i+1) - F(v_i)) + b*(G(v_i+1) - G(v_i)).
+Es gibt also keinen Diskretisierungsfehler und keine Abhängigkeit von einer Binanzahl.
+
+Die Interpolation entspricht ``get_leistung`` aus windparkohneverlust.py:
+0 unterhalb der ersten Stützstelle, linear zwischen den Stützstellen, oberhalb
+der letzten Stützstelle konstant bis zur Integrationsgrenze ``v_max``.
+
+Für Massenauswertungen (:func:`batch_monatsertrag`) werden die Abschnittsbeiträge
+teleskopiert: Der Ertrag jeder Kurve ist eine Linearkombination von F und G an den
+Stützstellen. F und G werden je (k, λ) nur einmal auf der Vereinigung aller
+Stützstellen ausgewertet, die Kurven ergeben sich dann per Matrixprodukt.
+"""
+import concurrent.futures
+import functools
+
+import numpy as np
+from scipy.special import gamma, gammainc
+
+WS_SPALTE = 'Windgeschwindigkeit (m/s)'
+LEISTUNG_SPALTE = 'Leistung (kW)'
+
+
+def integrationsgrenze(windgeschwindigkeiten):
+    """Obere Integrationsgrenze wie in ``monatlicher_energieertrag_weibull``: max(30, v_max Kurve + 5)."""
+    return max(30.0, float(np.max(windgeschwindigkeiten)) + 5)
+
+
+def leistungskurve_segmente(windgeschwindigkeiten, leistungen, v_max=None):
+    """Zerlegt die Leistungskurve in lineare Abschnitte.
+
+    Gibt (grenzen, a, b) zurück: Abschnitt i reicht von grenzen[i] bis grenzen[i+1]
+    mit P(v) = a[i] + b[i]*v (kW). Der letzte Abschnitt hält die letzte Leistung bis ``v_max``.
+    """
+    v = np.asarray(windgeschwindigkeiten, dtype=float)
+    p = np.asarray(leistungen, dtype=float)
+    if v_max is None: v_max = integrationsgrenze(v)
+    if v_max <= v[-1]: raise ValueError(f"Integrationsgrenze {v_max} muss oberhalb der letzten Stützstelle ({v[-1]} m/s) liegen")
+    grenzen = np.append(v, v_max)
+    p_ende = np.append(p, p[-1])
+    b = np.diff(p_ende) / np.diff(grenzen)
+    a = p_ende[:-1] - b * grenzen[:-1]
+    return grenzen, a, b
+
+
+def mittlere_leistung(grenzen, a, b, k, lambda_param):
+    """Erwartete Leistung (kW) für Weibull(k, λ); k und λ dürfen Arrays gleicher Form sein."""
+    k = np.asarray(k, dtype=float)[..., None]
+    lambda_param = np.asarray(lambda_param, dtype=float)[..., None]
+    z = (grenzen / lambda_param) ** k
+    cdf = -np.expm1(-z)
+    teilmoment = lambda_param * gamma(1 + 1 / k) * gammainc(1 + 1 / k, z)
+    return np.sum(a * np.diff(cdf, axis=-1) + b * np.diff(teilmoment, axis=-1), axis=-1)
+
+
+def kurve_schluessel(leistungskurve_df):
+    """Hashbarer Schlüssel einer Leistungskurve (Rohbytes der Stützstellen und Leistungen)."""
+    return (leistungskurve_df[WS_SPALTE].to_numpy(dtype=float).tobytes(), leistungskurve_df[LEISTUNG_SPALTE].to_numpy(dtype=float).tobytes())
+
+
+@functools.lru_cache(maxsize=256)
+def _segmente_cached(kurve, v_max):
+    return leistungskurve_segmente(np.frombuffer(kurve[0]), np.frombuffer(kurve[1]), v_max)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mittlere_leistung_cached(kurve, k, lambda_param, v_max):
+    return float(mittlere_leistung(*_segmente_cached(kurve, v_max), k, lambda_param))
+
+
+def mittlere_leistung_weibull(leistungskurve_df, k, lambda_param, v_max=None):
+    """Erwartete Leistung einer Anlage (kW), gecacht über (Kurve, k, λ, v_max)."""
+    kurve = kurve_schluessel(leistungskurve_df)
+    if v_max is None: v_max = integrationsgrenze(np.frombuffer(kurve[0]))
+    return _mittlere_leistung_cached(kurve, float(k), float(lambda_param), float(v_max))
+
+
+def energieertrag_weibull(leistungskurve_df, k, lambda_param, stunden, anzahl_anlagen=1, verfuegbarkeitsfaktor=0.97, v_max=None):
+    """Energieertrag des Parks (kWh) über ``stunden`` Stunden."""
+    return mittlere_leistung_weibull(leistungskurve_df, k, lambda_param, v_max) * stunden * anzahl_anlagen * verfuegbarkeitsfaktor
+
+
+def kurven_tabelle(kurven, v_max=None):
+    """Vorberechnete Koeffizienten für mehrere Leistungskurven (Liste von DataFrames).
+
+    Gibt ein Dict mit den Stützstellen ``knoten_cdf``/``knoten_moment`` und den
+    Koeffizientenmatrizen ``koeff_cdf``/``koeff_moment`` (Stützstellen x Kurven) zurück,
+    sodass mittlere Leistung = F(knoten_cdf) @ koeff_cdf + G(knoten_moment) @ koeff_moment.
+    Stützstellen, an denen sich für keine Kurve etwas ändert (z.B. Nennleistungsplateau), entfallen.
+    """
+    segmente = []
+    for kurve in kurven:
+        ws = kurve[WS_SPALTE].to_numpy(dtype=float)
+        segmente.append(leistungskurve_segmente(ws, kurve[LEISTUNG_SPALTE], v_max if v_max is not None else integrationsgrenze(ws)))
+    knoten = np.unique(np.concatenate([grenzen for grenzen, _, _ in segmente]))
+    koeff_cdf = np.zeros((len(knoten), len(kurven)))
+    koeff_moment = np.zeros((len(knoten), len(kurven)))
+    for c, (grenzen, a, b) in enumerate(segmente):
+        idx = np.searchsorted(knoten, grenzen)
+        # Beitrag a_i*(F(g_i+1) - F(g_i)) -> Koeffizient von F(g_j) ist a_j-1 - a_j (analog für G mit b)
+        koeff_cdf[idx, c] = -np.diff(np.concatenate(([0.0], a, [0.0])))
+        koeff_moment[idx, c] = -np.diff(np.concatenate(([0.0], b, [0.0])))
+    nutzen_cdf = np.any(koeff_cdf != 0, axis=1)
+    nutzen_moment = np.any(koeff_moment != 0, axis=1)
+    return {'knoten_cdf': knoten[nutzen_cdf], 'koeff_cdf': koeff_cdf[nutzen_cdf],
+            'knoten_moment': knoten[nutzen_moment], 'koeff_moment': koeff_moment[nutzen_moment],
+            'anzahl_kurven': len(kurven)}
+
+
+def mittlere_leistung_tabelle(tabelle, k, lambda_param):
+    """Erwartete Leistung (kW) für alle Kurven der Tabelle; k und λ mit Form (...), Ergebnis (..., Kurven)."""
+    k = np.asarray(k, dtype=float)[..., None]
+    lambda_param = np.asarray(lambda_param, dtype=float)[..., None]
+    cdf = -np.expm1(-(tabelle['knoten_cdf'] / lambda_param) ** k)
+    s = 1 + 1 / k
+    moment = lambda_param * gamma(s) * gammainc(s, (tabelle['knoten_moment'] / lambda_param) ** k)
+    return cdf @ tabelle['koeff_cdf'] + moment @ tabelle['koeff_moment']
+
+
+def _batch_chunk(tabelle, k, lambda_param, monatskurve, faktor):
+    leistung = mittlere_leistung_tabelle(tabelle, k, lambda_param)
+    if k.ndim == 1:
+        if monatskurve.ndim == 1: return leistung[:, monatskurve] * faktor
+        return np.take_along_axis(leistung, monatskurve, axis=1) * faktor
+    monatskurve = np.broadcast_to(monatskurve, k.shape)
+    return np.take_along_axis(leistung, monatskurve[..., None], axis=-1)[..., 0] * faktor
+
+
+def batch_monatsertrag(k, lambda_param, kurven, monatskurve, stunden_pro_monat, anzahl_anlagen=1, verfuegbarkeitsfaktor=0.97,
+                       nabenhoehe=None, referenzhoehe=None, scherungsexponent=0.2, v_max=None,
+                       chunk_size=50_000, max_workers=1, executor='thread'):
+    """Monatliche Parkerträge (kWh) als Matrix (N x 12) für viele Parameterkombinationen.
+
+    ``k``, ``lambda_param``: Form (N,) oder (N, 12) (monatsweise Parameter).
+    ``kurven``: Liste von Leistungskurven (DataFrames), ``monatskurve``: Kurvenindex je
+    Monat, Form (12,) oder (N, 12). Mit ``nabenhoehe`` (N,) und ``referenzhoehe`` wird λ
+    nach dem Potenzgesetz λ * (h / h_ref)^``scherungsexponent`` auf Nabenhöhe skaliert.
+    Die Rechnung läuft in Blöcken zu ``chunk_size`` Zeilen (begrenzt den Speicher);
+    ``max_workers`` > 1 verteilt die Blöcke auf einen Thread- oder Prozesspool.
+    """
+    k = np.asarray(k, dtype=float)
+    lambda_param = np.asarray(lambda_param, dtype=float)
+    if nabenhoehe is not None:
+        if referenzhoehe is None: raise ValueError("Für die Höhenumrechnung wird 'referenzhoehe' benötigt")
+        skalierung = (np.asarray(nabenhoehe, dtype=float) / referenzhoehe) ** scherungsexponent
+        lambda_param = lambda_param * (skalierung if lambda_param.ndim == 1 else skalierung[:, None])
+    if k.ndim != lambda_param.ndim:  # (N,) gegen (N, 12): gleicher Wert für alle Monate
+        k, lambda_param = (x[:, None] if x.ndim == 1 else x for x in (k, lambda_param))
+    k, lambda_param = np.broadcast_arrays(k, lambda_param)
+    monatskurve = np.asarray(monatskurve, dtype=np.intp)
+    if monatskurve.max() >= len(kurven): raise ValueError(f"Kurvenindex {monatskurve.max()} außerhalb von {len(kurven)} Kurven")
+    faktor = np.asarray(stunden_pro_monat, dtype=float) * anzahl_anlagen * verfuegbarkeitsfaktor
+    tabelle = kurven_tabelle(kurven, v_max)
+
+    n = len(k)
+    ergebnis = np.empty((n, len(faktor)))
+    bloecke = [slice(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    def argumente(block):
+        return (tabelle, k[block], lambda_param[block], monatskurve if monatskurve.ndim == 1 else monatskurve[block], faktor)
+    if max_workers == 1 or len(bloecke) <= 1:
+        for block in bloecke: ergebnis[block] = _batch_chunk(*argumente(block))
+        return ergebnis
+    pool_klasse = concurrent.futures.ThreadPoolExecutor if executor == 'thread' else concurrent.futures.ProcessPoolExecutor
+    with pool_klasse(max_workers=max_workers) as pool:
+        futures = {pool.submit(_batch_chunk, *argumente(block)): block for block in bloecke}
+        for future in concurrent.futures.as_completed(futures): ergebnis[futures[future]] = future.result()
+    return ergebnis
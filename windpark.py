@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Windpark mit mehreren Anlagen und Nachlaufverlusten (Jensen bzw. Bastankhah).
+
+Die Geometrie (Abstand in und quer zur Windrichtung für alle Anlagenpaare und
+Sektoren) wird je Layout einmal berechnet und im :class:`Windpark` gecacht. Je
+Sektor werden alle Geschwindigkeitsklassen und die relevanten Anlagenpaare (stromab,
+im Nachlaufbereich) gemeinsam als Array (Klassen x Paare) ausgewertet; Defizite
+werden quadratisch überlagert.
+
+Der Schubbeiwert Ct hängt von der Anströmung der verursachenden Anlage ab. Er wird
+zunächst bei freier Anströmung bestimmt und anschließend ``iterationen``-mal mit den
+berechneten effektiven Geschwindigkeiten nachgeführt.
+
+Die Energie wird mit den saisonalen Leistungskurven integriert. Die Geschwindigkeitsklassen
+(Mittelpunktsregel) bestimmen nur den Parkwirkungsgrad; der Bruttoertrag ohne
+Nachlauf kommt exakt aus :mod:`weibullertrag`.
+"""
+import numpy as np
+
+import leistungskurven
+import weibullertrag
+
+LUFTDICHTE = 1.225  # kg/m³
+ROTORDURCHMESSER = 162.0  # m, 6.8-MW-Anlage der Leistungskurven
+NACHLAUF_MODELLE = ('jensen', 'bastankhah')
+
+
+def ct_aus_leistungskurve(windgeschwindigkeiten, leistungen_kw, rotordurchmesser=ROTORDURCHMESSER, luftdichte=LUFTDICHTE):
+    """Näherung des Schubbeiwerts aus der Leistungskurve über die Impulstheorie.
+
+    Cp = P / (0.5 ρ A v³) = 4a(1-a)² wird nach der axialen Induktion a (<= 1/3)
+    aufgelöst, Ct = 4a(1-a). Gibt Ct an den Stützstellen der Leistungskurve zurück.
+    """
+    v = np.asarray(windgeschwindigkeiten, dtype=float)
+    flaeche = np.pi * rotordurchmesser ** 2 / 4
+    cp = np.asarray(leistungen_kw, dtype=float) * 1e3 / (0.5 * luftdichte * flaeche * v ** 3)
+    a_raster = np.linspace(0, 1 / 3, 2001)
+    a = np.interp(np.minimum(cp, 16 / 27), 4 * a_raster * (1 - a_raster) ** 2, a_raster)
+    return 4 * a * (1 - a)
+
+
+def windrose(haeufigkeit, k, lambda_param):
+    """Windrose aus Sektorhäufigkeiten (werden normiert) und Weibull-Parametern je Sektor.
+
+    Sektor s ist um s * 360/S Grad zentriert (Richtung, aus der der Wind kommt, im Uhrzeigersinn ab Nord).
+    """
+    haeufigkeit = np.asarray(haeufigkeit, dtype=float)
+    anzahl = len(haeufigkeit)
+    return {'haeufigkeit': haeufigkeit / haeufigkeit.sum(),
+            'k': np.broadcast_to(np.asarray(k, dtype=float), (anzahl,)).copy(),
+            'lambda': np.broadcast_to(np.asarray(lambda_param, dtype=float), (anzahl,)).copy()}
+
+
+def gleichverteilte_windrose(anzahl_sektoren=36, k=leistungskurven.K_STANDORT, lambda_param=leistungskurven.LAMBDA_STANDORT):
+    return windrose(np.ones(anzahl_sektoren), k, lambda_param)
+
+
+class Windpark:
+    """Anlagenlayout (x nach Osten, y nach Norden, in m) mit gecachter Paargeometrie je Sektorzahl."""
+
+    def __init__(self, x, y, rotordurchmesser=ROTORDURCHMESSER, modell='bastankhah', wake_expansion=None, iterationen=1):
+        if modell not in NACHLAUF_MODELLE: raise ValueError(f"Unbekanntes Nachlaufmodell '{modell}' (erlaubt: {', '.join(NACHLAUF_MODELLE)})")
+        self.x = np.asarray(x, dtype=float); self.y = np.asarray(y, dtype=float)
+        if self.x.shape != self.y.shape or self.x.ndim != 1: raise ValueError("x und y müssen gleich lange 1D-Arrays sein")
+        self.rotordurchmesser = rotordurchmesser
+        self.modell = modell
+        # Typische Aufweitungsraten: Jensen k = 0.05 (onshore), Bastankhah k* = 0.04
+        self.wake_expansion = wake_expansion if wake_expansion is not None else (0.05 if modell == 'jensen' else 0.04)
+        self.iterationen = iterationen
+        self._geometrie = {}
+
+    @property
+    def anzahl_anlagen(self):
+        return len(self.x)
+
+    def geometrie(self, anzahl_sektoren):
+        """(dx, dy) mit Form (Sektoren, i, j): Abstand von Anlage j hinter Anlage i in und quer zur Windrichtung."""
+        if anzahl_sektoren not in self._geometrie:
+            richtung = np.deg2rad(np.arange(anzahl_sektoren) * 360 / anzahl_sektoren)
+            # Wind aus Richtung θ weht in Richtung (-sin θ, -cos θ)
+            ex, ey = -np.sin(richtung)[:, None, None], -np.cos(richtung)[:, None, None]
+            ddx = self.x[None, :] - self.x[:, None]; ddy = self.y[None, :] - self.y[:, None]
+            dx = ddx * ex + ddy * ey
+            dy = np.abs(-ddx * ey + ddy * ex)
+            self._geometrie[anzahl_sektoren] = (dx, dy)
+        return self._geometrie[anzahl_sektoren]
+
+    def paare(self, anzahl_sektoren):
+        """Je Sektor die relevanten Paare (i, j, dx, dy, Startindizes je j), nach j sortiert und gecacht.
+
+        Berücksichtigt werden nur Anlagen stromab, beim Jensen-Modell innerhalb des
+        Nachlaufkegels, beim Gauß-Profil innerhalb von 6 σ (σ mit dem größten ε bei Ct = 0.999).
+        """
+        schluessel = ('paare', anzahl_sektoren)
+        if schluessel not in self._geometrie:
+            dx_alle, dy_alle = self.geometrie(anzahl_sektoren)
+            d = self.rotordurchmesser
+            liste = []
+            for dx, dy in zip(dx_alle, dy_alle):
+                if self.modell == 'jensen': relevant = (dx > 0) & (dy < d / 2 + self.wake_expansion * dx)
+                else: relevant = (dx > 0) & (dy < 6 * (self.wake_expansion * dx + 0.81 * d))
+                j, i = np.nonzero(relevant.T)  # nach j sortiert
+                ziele, start = np.unique(j, return_index=True)
+                liste.append((i, j, dx[i, j], dy[i, j], ziele, start))
+            self._geometrie[schluessel] = liste
+        return self._geometrie[schluessel]
+
+    def _defizit(self, ct, dx, dy):
+        """Defizite (Klassen, Paare) für Ct der verursachenden Anlagen (Klassen, Paare)."""
+        d = self.rotordurchmesser
+        wurzel = np.sqrt(1 - np.minimum(ct, 0.999))
+        if self.modell == 'jensen':
+            return (1 - wurzel) * (d / (d + 2 * self.wake_expansion * dx)) ** 2
+        epsilon = 0.2 * np.sqrt(0.5 * (1 + wurzel) / wurzel)
+        sigma_d = self.wake_expansion * dx / d + epsilon
+        mitte = 1 - np.sqrt(np.maximum(1 - ct / (8 * sigma_d ** 2), 0.0))
+        return mitte * np.exp(-0.5 * (dy / (sigma_d * d)) ** 2)
+
+    def effektive_geschwindigkeiten(self, v_frei, ct_kurve, sektor, anzahl_sektoren):
+        """Effektive Anströmung (Klassen, Anlagen) im Sektor für freie Geschwindigkeiten ``v_frei`` (Klassen,)."""
+        i, j, dx, dy, ziele, start = self.paare(anzahl_sektoren)[sektor]
+        ws_ct, ct_werte = ct_kurve
+        v_frei = np.asarray(v_frei, dtype=float)
+        v = np.repeat(v_frei[:, None], self.anzahl_anlagen, axis=1)
+        if len(i) == 0: return v
+        for _ in range(self.iterationen + 1):
+            ct = np.interp(v[:, i], ws_ct, ct_werte, left=0.0, right=0.0)
+            defizit = self._defizit(ct, dx, dy)
+            # Quadratische Überlagerung aller Defizite je betroffener Anlage j
+            summe = np.add.reduceat(defizit * defizit, start, axis=1)
+            v = np.repeat(v_frei[:, None], self.anzahl_anlagen, axis=1)
+            v[:, ziele] *= 1 - np.sqrt(summe)
+        return v
+
+
+def park_ertrag(park, rose, kurven=None, monatskurve=None, stunden_pro_monat=None, verfuegbarkeitsfaktor=leistungskurven.VERFUEGBARKEITSFAKTOR,
+                geschwindigkeitsklassen=30, v_max=30.0, ct_kurven=None):
+    """Monats- und Jahresertrag (kWh) des Parks mit Nachlaufverlusten.
+
+    ``kurven``/``monatskurve`` wie in :func:`weibullertrag.batch_monatsertrag` (Standard:
+    Winter-/Sommerkurve). ``ct_kurven``: je Kurve (Windgeschwindigkeiten, Ct); Standard
+    ist die Näherung :func:`ct_aus_leistungskurve`.
+
+    Gibt ``monate`` (Monatsname -> kWh), ``jahr``, ``jahr_ohne_nachlauf``, den
+    Parkwirkungsgrad je Kurve ``wirkungsgrad`` und die mittlere Leistung je Anlage
+    und Kurve ``leistung_je_anlage_kw`` (Kurven x Anlagen) zurück.
+    """
+    if kurven is None: kurven = [leistungskurven.leistungskurve_winter_df(), leistungskurven.leistungskurve_sommer_df()]
+    if monatskurve is None: monatskurve = [1 if name in leistungskurven.SOMMER_MONATE else 0 for name in leistungskurven.MONATSNAMEN]
+    stunden = np.asarray(stunden_pro_monat if stunden_pro_monat is not None else leistungskurven.STUNDEN_PRO_MONAT, dtype=float)
+    if ct_kurven is None:
+        ct_kurven = [(kurve[weibullertrag.WS_SPALTE].to_numpy(dtype=float),
+                      ct_aus_leistungskurve(kurve[weibullertrag.WS_SPALTE], kurve[weibullertrag.LEISTUNG_SPALTE], park.rotordurchmesser))
+                     for kurve in kurven]
+    anzahl_sektoren = len(rose['haeufigkeit'])
+    grenzen = np.linspace(0, v_max, geschwindigkeitsklassen + 1)
+    v_klassen = (grenzen[:-1] + grenzen[1:]) / 2
+
+    leistung_je_anlage = np.zeros((len(kurven), park.anzahl_anlagen))
+    brutto_klassen = np.zeros(len(kurven))
+    tabelle = weibullertrag.kurven_tabelle(kurven)
+    for c, kurve in enumerate(kurven):
+        leistung = leistungskurven.KompilierteLeistungskurve.aus_dataframe(kurve)
+        p_frei = leistung(v_klassen)
+        for s in range(anzahl_sektoren):
+            k, lam = rose['k'][s], rose['lambda'][s]
+            wahrscheinlichkeit = rose['haeufigkeit'][s] * np.diff(-np.expm1(-(grenzen / lam) ** k))
+            v_eff = park.effektive_geschwindigkeiten(v_klassen, ct_kurven[c], s, anzahl_sektoren)
+            leistung_je_anlage[c] += wahrscheinlichkeit @ leistung(v_eff)
+            brutto_klassen[c] += wahrscheinlichkeit @ p_frei
+    # Exakter Bruttoertrag je Kurve (ohne Klassenfehler), gewichtet über die Sektoren
+    brutto_exakt = rose['haeufigkeit'] @ weibullertrag.mittlere_leistung_tabelle(tabelle, rose['k'], rose['lambda'])
+    wirkungsgrad = leistung_je_anlage.sum(axis=1) / (brutto_klassen * park.anzahl_anlagen)
+    park_leistung = brutto_exakt * park.anzahl_anlagen * wirkungsgrad
+    monate = park_leistung[np.asarray(monatskurve)] * stunden * verfuegbarkeitsfaktor
+    monate_brutto = brutto_exakt[np.asarray(monatskurve)] * park.anzahl_anlagen * stunden * verfuegbarkeitsfaktor
+    return {'monate': dict(zip(leistungskurven.MONATSNAMEN, monate)), 'jahr': float(monate.sum()),
+            'jahr_ohne_nachlauf': float(monate_brutto.sum()), 'wirkungsgrad': wirkungsgrad,
+            'leistung_je_anlage_kw': leistung_je_anlage}
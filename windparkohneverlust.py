@@ -1,48 +1,29 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import weibull_min
+# -*- coding: utf-8 -*-
+"""Windenergieertrag (Weibull mit festem Lambda, saisonale Leistungskurven) als Bibliothek und Skript.
+
+Beim Import wird nichts gerechnet, ausgegeben oder geplottet. matplotlib, scipy.stats
+und die optionalen Module (Messdaten, Monte Carlo, Windpark) werden erst in den
+Funktionen geladen, die sie brauchen.
+
+    python windparkohneverlust.py                      # wie bisher: Ausgabe + Diagramme anzeigen
+    python windparkohneverlust.py --plots save --output-dir plots   # headless (Agg), PNGs schreiben
+    python windparkohneverlust.py --plots none --monte-carlo 1000000
+"""
+import argparse
 import math
+import os
+
+import numpy as np
+
+import leistungskurven
+import weibullertrag # Exakter Weibull-Ertrag für stückweise lineare Leistungskurven
 
 # ------------------------------------------------------------------------------
 # 1. Definition der SPEZIFISCHEN Leistungskurven (Sommer & Winter)
-#    (Unverändert)
-# ------------------------------------------------------------------------------
-# Leistungskurve für Sommermonate
-leistungskurve_sommer_daten = {
-    'Windgeschwindigkeit (m/s)': [
-        3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10,
-        10.5, 11, 11.5, 12, 12.5, 13, 13.5, 14, 14.5, 15, 15.5, 16,
-        16.5, 17, 17.5, 18, 18.5, 19, 19.5, 20, 20.5, 21, 21.5, 22,
-        22.5, 23, 23.5, 24, 24.5, 25, 25.5, 26
-    ],
-    'Leistung (kW)': [
-        28, 127, 260, 427, 628, 865, 1145, 1473, 1855, 2294, 2795, 3356,
-        3950, 4545, 5126, 5656, 6066, 6364, 6572, 6707, 6780, 6799, 6800,
-        6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800,
-        6800, 6603, 6331, 6059, 5794, 5528, 5270, 5012, 4760, 4508, 4264,
-        4019, 3774
-    ]
-}
-leistungskurve_sommer_df = pd.DataFrame(leistungskurve_sommer_daten)
-
-# Leistungskurve für Wintermonate
-leistungskurve_winter_daten = {
-    'Windgeschwindigkeit (m/s)': [
-        3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10,
-        10.5, 11, 11.5, 12, 12.5, 13, 13.5, 14, 14.5, 15, 15.5, 16,
-        16.5, 17, 17.5, 18, 18.5, 19, 19.5, 20, 20.5, 21, 21.5, 22,
-        22.5, 23, 23.5, 24, 24.5, 25, 25.5, 26
-    ],
-    'Leistung (kW)': [
-        37, 143, 288, 469, 687, 944, 1248, 1604, 2018, 2494, 3036, 3627,
-        4230, 4820, 5382, 5864, 6218, 6472, 6644, 6749, 6795, 6800, 6800,
-        6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800, 6800,
-        6800, 6603, 6331, 6059, 5794, 5528, 5270, 5012, 4760, 4508, 4264,
-        4019, 3774
-    ]
-}
-leistungskurve_winter_df = pd.DataFrame(leistungskurve_winter_daten)
+#    (Stützstellen aus leistungskurven.py)
+# ------------------------------------------------------------------------------
+leistungskurve_sommer_df = leistungskurven.leistungskurve_sommer_df()
+leistungskurve_winter_df = leistungskurven.leistungskurve_winter_df()
 
 # Funktion zur Leistungsinterpolation (Unverändert)
 def get_leistung(windgeschwindigkeit, leistungskurve_df):
@@ -64,39 +45,70 @@ monatliche_durchschnittsgeschwindigkeiten = {
     'Jan': 8.5, 'Feb': 8.0, 'Mär': 7.8, 'Apr': 7.2, 'Mai': 6.5, 'Jun': 5.8,
     'Jul': 5.5, 'Aug': 5.7, 'Sep': 6.3, 'Okt': 7.0, 'Nov': 7.8, 'Dez': 8.2
 }
-sommer_monate = ['Mai', 'Jun', 'Jul', 'Aug', 'Sep']
-nabenhoehe = 164
-k_standort = 2 # Formparameter k bleibt bei 2
-stunden_pro_monat = {'Jan': 31*24, 'Feb': 28*24, 'Mär': 31*24, 'Apr': 30*24, 'Mai': 31*24, 'Jun': 30*24,
-                   'Jul': 31*24, 'Aug': 31*24, 'Sep': 30*24, 'Okt': 31*24, 'Nov': 30*24, 'Dez': 31*24}
+sommer_monate = list(leistungskurven.SOMMER_MONATE)
+nabenhoehe = leistungskurven.NABENHOEHE
+k_standort = leistungskurven.K_STANDORT # Formparameter k bleibt bei 2
+lambda_standort = leistungskurven.LAMBDA_STANDORT # Fester Skalenparameter
+stunden_pro_monat = dict(zip(leistungskurven.MONATSNAMEN, leistungskurven.STUNDEN_PRO_MONAT))
 monatsnamen = list(monatliche_durchschnittsgeschwindigkeiten.keys())
 
+# Prozentuale Verteilung des Jahresertrags auf die Monate (Schritt 5.2)
+monatliche_prozentuale_verteilung = {
+    'Jan': 13.46 / 100, 'Feb': 12.23 / 100, 'Mär': 8.59 / 100,
+    'Apr': 8.37 / 100, 'Mai': 5.60 / 100, 'Jun': 5.24 / 100,
+    'Jul': 5.24 / 100, 'Aug': 4.80 / 100, 'Sep': 7.86 / 100,
+    'Okt': 7.71 / 100, 'Nov': 9.10 / 100, 'Dez': 11.79 / 100
+}
+
 # ------------------------------------------------------------------------------
-# 3. Windpark- und Anlagenparameter (Unverändert)
+# 3. Windpark- und Anlagenparameter (Standardwerte der Kommandozeile)
 # ------------------------------------------------------------------------------
 anzahl_windanlagen = 1
-verfuegbarkeitsfaktor = 0.97
+verfuegbarkeitsfaktor = leistungskurven.VERFUEGBARKEITSFAKTOR
+
+# Optional: gemessene Windgeschwindigkeiten (Messmast/SCADA-CSV) statt Weibull mit festem Lambda
+windmessdaten_csv = None # Pfad oder Liste von Pfaden; None = Weibull-Rechnung
+windmessdaten_zeitspalte = 'Zeit'
+windmessdaten_wsspalte = 'Windgeschwindigkeit (m/s)'
+windmessdaten_zeitschritt_stunden = 1 / 6 # 10-Minuten-Werte
+
+# Optional: Monte-Carlo-Unsicherheit (P50/P75/P90) mit n Stichproben; 0 = aus
+monte_carlo_stichproben = 0
+monte_carlo_seed = 42
+
+# Optional: Parklayout mit Nachlaufverlusten; Liste von (x, y) in m (x Ost, y Nord), None = ohne Nachlauf
+turbinen_koordinaten = None
+nachlauf_modell = 'bastankhah' # 'jensen' oder 'bastankhah'
+windrose_sektoren = 36 # gleichverteilte Windrose mit k_standort und festem Lambda
+
+# Diagramme: 'show' (anzeigen, wie bisher), 'save' (headless über Agg als PNG schreiben), 'none'
+PLOT_MODI = ('show', 'save', 'none')
 
 # ------------------------------------------------------------------------------
 # 4. Funktion zur Berechnung des monatlichen Energieertrags mit Weibull-Verteilung
-#    --> JETZT MIT FESTEM LAMBDA <--
-# ------------------------------------------------------------------------------
-def monatlicher_energieertrag_weibull(avg_windgeschwindigkeit, k, leistungskurve_df_aktuell, anzahl_anlagen, stunden_im_monat, anzahl_bins=100, verfuegbarkeitsfaktor=0.97):
-    
-    # FESTES LAMBDA verwenden
-    lambda_param = 6.77
-    
-    # Die ursprüngliche Berechnung basierend auf avg_windgeschwindigkeit wird nicht mehr verwendet:
+#    --> MIT FESTEM LAMBDA <--
+# ------------------------------------------------------------------------------
+def monatlicher_energieertrag_weibull(avg_windgeschwindigkeit, k, leistungskurve_df_aktuell, anzahl_anlagen, stunden_im_monat, anzahl_bins=100, verfuegbarkeitsfaktor=0.97, methode='exakt',
+                                      lambda_param=lambda_standort):
+
+    # FESTES LAMBDA verwenden (avg_windgeschwindigkeit wird nicht mehr verwendet):
     # if avg_windgeschwindigkeit <= 0: return 0.0
     # lambda_param = avg_windgeschwindigkeit / math.gamma(1 + 1/k)
 
     max_ws_kurve = leistungskurve_df_aktuell['Windgeschwindigkeit (m/s)'].max()
     max_ws_integration = max(30, max_ws_kurve + 5)
+
+    if methode == 'exakt':
+        # Exakte Integration über die linearen Kurvenabschnitte (ohne Bins, Ergebnis je Kurve/k/Lambda gecacht)
+        return weibullertrag.energieertrag_weibull(leistungskurve_df_aktuell, k, lambda_param, stunden_im_monat,
+                                                   anzahl_anlagen, verfuegbarkeitsfaktor, v_max=max_ws_integration)
+
+    # methode='bins': ursprüngliche Mittelpunktsregel mit anzahl_bins Stützstellen
+    from scipy.stats import weibull_min
     windgeschwindigkeiten = np.linspace(0, max_ws_integration, anzahl_bins)
     bin_breite = windgeschwindigkeiten[1] - windgeschwindigkeiten[0]
     v_mittelpunkte = windgeschwindigkeiten[:-1] + bin_breite / 2
 
-    
     wahrscheinlichkeiten_pdf = weibull_min.pdf(v_mittelpunkte, k, scale=lambda_param)
 
     wahrscheinlichkeiten_bin = wahrscheinlichkeiten_pdf * bin_breite
@@ -108,131 +120,240 @@ def monatlicher_energieertrag_weibull(avg_windgeschwindigkeit, k, leistungskurve
 
 # ------------------------------------------------------------------------------
 # 5. Berechnung des jährlichen und monatlichen Energieertrags
-#   
 # ------------------------------------------------------------------------------
+def aktuelle_leistungskurve(monat):
+    """Sommer- oder Winterkurve je Monatsname."""
+    return leistungskurve_sommer_df if monat in sommer_monate else leistungskurve_winter_df
+
+
+def monatskurven_index():
+    """Kurvenindex je Monat für die Batch-Module (0 = Winter, 1 = Sommer)."""
+    return [1 if monat in sommer_monate else 0 for monat in monatsnamen]
+
 
-# --- SCHRITT 5.1: Berechne den jährlichen Gesamtertrag  ---
-jährlicher_ertrag_kwh_simuliert = 0
-print("Berechne simulierten jährlichen Gesamtertrag (mit festem Lambda = 6.77)...")
-for monat, avg_wind in monatliche_durchschnittsgeschwindigkeiten.items(): # Loop über Monate bleibt für Auswahl der Kurve und Stundenanzahl
-    if monat in sommer_monate:
-        aktuelle_leistungskurve_df = leistungskurve_sommer_df
+def jahresertrag_weibull(k=k_standort, lambda_param=lambda_standort, anzahl_anlagen=anzahl_windanlagen,
+                         verfuegbarkeitsfaktor=verfuegbarkeitsfaktor, methode='exakt'):
+    """Simulierter Jahresertrag (kWh) als Summe der Monatserträge mit saisonaler Leistungskurve (Schritt 5.1)."""
+    jährlicher_ertrag_kwh = 0
+    for monat, avg_wind in monatliche_durchschnittsgeschwindigkeiten.items(): # Loop über Monate für Auswahl der Kurve und Stundenanzahl
+        jährlicher_ertrag_kwh += monatlicher_energieertrag_weibull(
+            avg_wind, k, aktuelle_leistungskurve(monat), anzahl_anlagen, stunden_pro_monat[monat],
+            verfuegbarkeitsfaktor=verfuegbarkeitsfaktor, methode=methode, lambda_param=lambda_param)
+    return jährlicher_ertrag_kwh
+
+
+def jahresertrag_messdaten(pfade, zeitspalte=windmessdaten_zeitspalte, wsspalte=windmessdaten_wsspalte,
+                           zeitschritt_stunden=windmessdaten_zeitschritt_stunden, anzahl_anlagen=anzahl_windanlagen,
+                           verfuegbarkeitsfaktor=verfuegbarkeitsfaktor, cache_pfad=None, progress=False):
+    """Liest Messdaten blockweise und gibt den :class:`windzeitreihe.WindErtragAkkumulator` zurück.
+
+    Mit ``cache_pfad`` werden die CSV-Dateien einmal in einen Binär-Cache geschrieben (fehlt
+    er noch) und danach per memmap gelesen; ``pfade`` darf dann None sein.
+    """
+    import windzeitreihe # Blockweise Ertragsrechnung aus gemessenen Windzeitreihen
+    pfade = [pfade] if isinstance(pfade, str) else pfade
+    if cache_pfad is not None:
+        if not os.path.exists(cache_pfad):
+            if not pfade: raise ValueError(f"Binär-Cache {cache_pfad} fehlt und keine CSV-Dateien angegeben")
+            windzeitreihe.erzeuge_binaercache(pfade, cache_pfad, zeitspalte, wsspalte)
+        bloecke = windzeitreihe.lese_binaercache(cache_pfad)
     else:
-        aktuelle_leistungskurve_df = leistungskurve_winter_df
-
-    # Berechne den simulierten Ertrag für diesen Monat
-    # avg_wind wird an die Funktion übergeben, aber intern nicht mehr für Lambda verwendet
-    monatlicher_ertrag_kwh_sim = monatlicher_energieertrag_weibull(
-        avg_wind, # Dieser Wert wird ignoriert für Lambda-Berechnung
-        k_standort,
-        aktuelle_leistungskurve_df,
-        anzahl_windanlagen,
-        stunden_pro_monat[monat],
-        verfuegbarkeitsfaktor=verfuegbarkeitsfaktor
-    )
-    jährlicher_ertrag_kwh_simuliert += monatlicher_ertrag_kwh_sim
-
-# Umrechnung des simulierten Jahresertrags in MWh
-jährlicher_ertrag_mwh_simuliert = jährlicher_ertrag_kwh_simuliert / 1e3
-
-print(f"\nSimulierter jährlicher Gesamtenergieertrag: {jährlicher_ertrag_mwh_simuliert:.2f} MWh")
-
-# --- SCHRITT 5.2: Definiere die gewünschte prozentuale Verteilung  ---
-monatliche_prozentuale_verteilung = {
-    'Jan': 13.46 / 100, 'Feb': 12.23 / 100, 'Mär': 8.59 / 100,
-    'Apr': 8.37 / 100, 'Mai': 5.60 / 100, 'Jun': 5.24 / 100,
-    'Jul': 5.24 / 100, 'Aug': 4.80 / 100, 'Sep': 7.86 / 100,
-    'Okt': 7.71 / 100, 'Nov': 9.10 / 100, 'Dez': 11.79 / 100
-}
-summe_prozente = sum(monatliche_prozentuale_verteilung.values()) * 100
-print(f"Summe der definierten Prozentsätze: {summe_prozente:.2f}%")
-if not math.isclose(summe_prozente, 100.0, abs_tol=0.1):
-    print("WARNUNG: Die Summe der Prozentsätze weicht signifikant von 100% ab!")
-
-# --- SCHRITT 5.3: Berechne die monatlichen Erträge basierend auf den Prozenten ) ---
-monatliche_erträge_gwh_prognose = {}
-print("\nBerechne monatliche Erträge basierend auf prozentualer Verteilung:")
-for monat, prozent in monatliche_prozentuale_verteilung.items():
-    monatlicher_ertrag_kwh_prognose = jährlicher_ertrag_kwh_simuliert * prozent
-    monatliche_erträge_gwh_prognose[monat] = monatlicher_ertrag_kwh_prognose / 1e3
-
-# --- SCHRITT 5.4: Gib die prognostizierten monatlichen Erträge aus  ---
-print("\nPrognostizierter monatlicher Energieertrag (GWh) basierend auf Verteilung:")
-for monat in monatsnamen:
-    ertrag = monatliche_erträge_gwh_prognose.get(monat, 0.0)
-    print(f"{monat}: {ertrag:.4f} MWh")
-
-# ------------------------------------------------------------------------------
-# 6. Erstellung eines beispielhaften Tageslastprofils 
-# ------------------------------------------------------------------------------
-mittlere_windgeschwindigkeit_jahr = np.mean(list(monatliche_durchschnittsgeschwindigkeiten.values()))
-stunden_am_tag = np.arange(24)
-windgeschwindigkeit_tagesprofil = mittlere_windgeschwindigkeit_jahr + 2 * np.sin(2 * np.pi * stunden_am_tag / 24)
-windgeschwindigkeit_tagesprofil = np.maximum(0, windgeschwindigkeit_tagesprofil)
-windparkleistung_tagesprofil_mw = get_leistung(windgeschwindigkeit_tagesprofil, leistungskurve_winter_df) * anzahl_windanlagen / 1000
-
-plt.figure(figsize=(10, 5))
-plt.plot(stunden_am_tag, windparkleistung_tagesprofil_mw, label='Beispiel-Windparkleistung (Winterkurve)')
-plt.xlabel('Stunde des Tages')
-plt.ylabel('Leistung (MW)')
-plt.title(f'Beispielhaftes Tageslastprofil (basierend auf Jahresmittelwind {mittlere_windgeschwindigkeit_jahr:.2f} m/s)')
-plt.grid(True)
-plt.legend()
-plt.xticks(np.arange(0, 24, 2))
-plt.tight_layout()
-plt.show()
-
-# ------------------------------------------------------------------------------
-# 7. Visualisierung des monatlichen Ertrags 
-# ------------------------------------------------------------------------------
-plt.figure(figsize=(10, 6))
-plot_werte = [monatliche_erträge_gwh_prognose.get(m, 0.0) for m in monatsnamen]
-plt.bar(monatsnamen, plot_werte, color=['lightblue']*12)
-plt.xlabel('Monat')
-plt.ylabel('Energieertrag (GWh)')
-plt.title('Prognostizierter monatlicher Energieertrag (basierend auf fester %-Verteilung)')
-plt.grid(axis='y')
-plt.tight_layout()
-plt.show()
-
-# ------------------------------------------------------------------------------
-# 8. Visualisierung der Leistungskurven 
-# ------------------------------------------------------------------------------
-plt.figure(figsize=(10, 6))
-plt.plot(leistungskurve_sommer_df['Windgeschwindigkeit (m/s)'],
-         leistungskurve_sommer_df['Leistung (kW)'],
-         marker='o', linestyle='-', color='orange', label='Leistungskurve Sommer')
-plt.plot(leistungskurve_winter_df['Windgeschwindigkeit (m/s)'],
-         leistungskurve_winter_df['Leistung (kW)'],
-         marker='x', linestyle='--', color='blue', label='Leistungskurve Winter')
-plt.xlabel('Windgeschwindigkeit (m/s)')
-plt.ylabel('Leistung (kW)')
-plt.title('Leistungskurven der Windkraftanlage (Sommer vs. Winter)')
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.show()
-
-# ------------------------------------------------------------------------------
-# 9. Visualisierung der Weibull-Verteilung
-#    
-# ------------------------------------------------------------------------------
-
-lambda_fest = 6.77
-
-windgeschwindigkeiten_weibull = np.linspace(0, 30, 200)
-# Berechne PDF mit festem Lambda
-weibull_pdf = weibull_min.pdf(windgeschwindigkeiten_weibull, k_standort, scale=lambda_fest)
-
-plt.figure(figsize=(8, 5))
-
-plt.plot(windgeschwindigkeiten_weibull, weibull_pdf, label=f'Weibull (k={k_standort}, λ={lambda_fest})')
-plt.xlabel('Windgeschwindigkeit (m/s)')
-plt.ylabel('Wahrscheinlichkeitsdichte')
-plt.title('Weibull-Verteilung der Windgeschwindigkeit (mit festem Lambda)')
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.show()
-
-print("\nCode-Ausführung abgeschlossen.")
+        bloecke = (block for pfad in pfade for block in windzeitreihe.lese_csv_chunks(pfad, zeitspalte, wsspalte))
+    return windzeitreihe.streaming_ertrag(
+        bloecke, progress=progress,
+        leistungskurve_sommer_df=leistungskurve_sommer_df, leistungskurve_winter_df=leistungskurve_winter_df,
+        sommer_monate=sommer_monate, zeitschritt_stunden=zeitschritt_stunden,
+        anzahl_anlagen=anzahl_anlagen, verfuegbarkeitsfaktor=verfuegbarkeitsfaktor)
+
+
+def monte_carlo(n_stichproben, seed=monte_carlo_seed, k=k_standort, lambda_param=lambda_standort,
+                anzahl_anlagen=anzahl_windanlagen, verfuegbarkeitsfaktor=verfuegbarkeitsfaktor, progress=False):
+    """P50/P75/P90 aus :func:`ertragsunsicherheit.monte_carlo_ertrag` mit den Kurven und Monaten dieses Skripts."""
+    import ertragsunsicherheit # Monte-Carlo P50/P75/P90
+    return ertragsunsicherheit.monte_carlo_ertrag(
+        n_stichproben, seed=seed, k=k, lambda_param=lambda_param,
+        kurven=[leistungskurve_winter_df, leistungskurve_sommer_df], monatskurve=monatskurven_index(),
+        stunden_pro_monat=[stunden_pro_monat[monat] for monat in monatsnamen],
+        anzahl_anlagen=anzahl_anlagen, verfuegbarkeitsfaktor=verfuegbarkeitsfaktor, progress=progress)
+
+
+def parkertrag(koordinaten, modell=nachlauf_modell, sektoren=windrose_sektoren, k=k_standort, lambda_param=lambda_standort,
+               verfuegbarkeitsfaktor=verfuegbarkeitsfaktor):
+    """Ertrag eines Parks aus (x, y)-Koordinaten mit Nachlaufverlusten; gibt ``(park, ergebnis)`` zurück."""
+    import windpark # Mehrere Anlagen mit Nachlaufverlusten
+    park = windpark.Windpark([x for x, _ in koordinaten], [y for _, y in koordinaten], modell=modell)
+    ergebnis = windpark.park_ertrag(
+        park, windpark.gleichverteilte_windrose(sektoren, k, lambda_param),
+        kurven=[leistungskurve_winter_df, leistungskurve_sommer_df], monatskurve=monatskurven_index(),
+        stunden_pro_monat=[stunden_pro_monat[monat] for monat in monatsnamen], verfuegbarkeitsfaktor=verfuegbarkeitsfaktor)
+    return park, ergebnis
+
+
+def monatliche_prognose(jährlicher_ertrag_kwh, verteilung=monatliche_prozentuale_verteilung):
+    """Verteilt den Jahresertrag prozentual auf die Monate (Schritt 5.3); Werte in kWh / 1e3."""
+    return {monat: jährlicher_ertrag_kwh * prozent / 1e3 for monat, prozent in verteilung.items()}
+
+# ------------------------------------------------------------------------------
+# 6. Beispielhaftes Tageslastprofil
+# ------------------------------------------------------------------------------
+def tagesprofil(anzahl_anlagen=anzahl_windanlagen):
+    """Sinusförmiger Tagesgang um den Jahresmittelwind mit Winterkurve: (Stunden, Leistung MW, Mittelwind)."""
+    mittlere_windgeschwindigkeit_jahr = np.mean(list(monatliche_durchschnittsgeschwindigkeiten.values()))
+    stunden_am_tag = np.arange(24)
+    windgeschwindigkeit_tagesprofil = mittlere_windgeschwindigkeit_jahr + 2 * np.sin(2 * np.pi * stunden_am_tag / 24)
+    windgeschwindigkeit_tagesprofil = np.maximum(0, windgeschwindigkeit_tagesprofil)
+    leistung_mw = get_leistung(windgeschwindigkeit_tagesprofil, leistungskurve_winter_df) * anzahl_anlagen / 1000
+    return stunden_am_tag, leistung_mw, mittlere_windgeschwindigkeit_jahr
+
+# ------------------------------------------------------------------------------
+# 7.-9. Visualisierung (matplotlib wird erst hier geladen)
+# ------------------------------------------------------------------------------
+def _pyplot(modus):
+    import matplotlib
+    if modus == 'save': matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def erstelle_diagramme(monatliche_erträge_gwh_prognose, modus='show', ausgabe_verzeichnis='.', k=k_standort, lambda_param=lambda_standort,
+                       anzahl_anlagen=anzahl_windanlagen):
+    """Tagesprofil, Monatsertrag, Leistungskurven und Weibull-PDF; gibt die Pfade geschriebener Dateien zurück."""
+    if modus == 'none': return []
+    plt = _pyplot(modus)
+    from scipy.stats import weibull_min
+    pfade = []
+
+    def fertig(name):
+        plt.tight_layout()
+        if modus == 'save':
+            pfad = os.path.join(ausgabe_verzeichnis, name); plt.savefig(pfad); plt.close(); pfade.append(pfad)
+
+    stunden_am_tag, leistung_mw, mittelwind = tagesprofil(anzahl_anlagen)
+    plt.figure(figsize=(10, 5))
+    plt.plot(stunden_am_tag, leistung_mw, label='Beispiel-Windparkleistung (Winterkurve)')
+    plt.xlabel('Stunde des Tages'); plt.ylabel('Leistung (MW)')
+    plt.title(f'Beispielhaftes Tageslastprofil (basierend auf Jahresmittelwind {mittelwind:.2f} m/s)')
+    plt.grid(True); plt.legend(); plt.xticks(np.arange(0, 24, 2))
+    fertig('tagesprofil.png')
+
+    plt.figure(figsize=(10, 6))
+    plot_werte = [monatliche_erträge_gwh_prognose.get(m, 0.0) for m in monatsnamen]
+    plt.bar(monatsnamen, plot_werte, color=['lightblue']*12)
+    plt.xlabel('Monat'); plt.ylabel('Energieertrag (GWh)')
+    plt.title('Prognostizierter monatlicher Energieertrag (basierend auf fester %-Verteilung)')
+    plt.grid(axis='y')
+    fertig('monatsertrag.png')
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(leistungskurve_sommer_df['Windgeschwindigkeit (m/s)'], leistungskurve_sommer_df['Leistung (kW)'],
+             marker='o', linestyle='-', color='orange', label='Leistungskurve Sommer')
+    plt.plot(leistungskurve_winter_df['Windgeschwindigkeit (m/s)'], leistungskurve_winter_df['Leistung (kW)'],
+             marker='x', linestyle='--', color='blue', label='Leistungskurve Winter')
+    plt.xlabel('Windgeschwindigkeit (m/s)'); plt.ylabel('Leistung (kW)')
+    plt.title('Leistungskurven der Windkraftanlage (Sommer vs. Winter)')
+    plt.grid(True); plt.legend()
+    fertig('leistungskurven.png')
+
+    windgeschwindigkeiten_weibull = np.linspace(0, 30, 200)
+    weibull_pdf = weibull_min.pdf(windgeschwindigkeiten_weibull, k, scale=lambda_param)
+    plt.figure(figsize=(8, 5))
+    plt.plot(windgeschwindigkeiten_weibull, weibull_pdf, label=f'Weibull (k={k}, λ={lambda_param})')
+    plt.xlabel('Windgeschwindigkeit (m/s)'); plt.ylabel('Wahrscheinlichkeitsdichte')
+    plt.title('Weibull-Verteilung der Windgeschwindigkeit (mit festem Lambda)')
+    plt.grid(True); plt.legend()
+    fertig('weibull_verteilung.png')
+    if modus == 'show': plt.show() # Alle Fenster gemeinsam am Ende statt blockierend nach jedem Diagramm
+    return pfade
+
+# ------------------------------------------------------------------------------
+# Kommandozeile
+# ------------------------------------------------------------------------------
+def _koordinaten(pfad):
+    """Turbinenkoordinaten aus einer CSV-Datei mit zwei Spalten x, y (m), Kopfzeile optional."""
+    daten = np.genfromtxt(pfad, delimiter=',', dtype=float, ndmin=2)
+    daten = daten[~np.isnan(daten).any(axis=1)]
+    return [tuple(zeile) for zeile in daten]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Windenergieertrag mit Weibull-Verteilung (festes Lambda) und saisonalen Leistungskurven.')
+    parser.add_argument('--anlagen', type=int, default=anzahl_windanlagen, help='Anzahl Windanlagen')
+    parser.add_argument('--verfuegbarkeit', type=float, default=verfuegbarkeitsfaktor)
+    parser.add_argument('--k', type=float, default=k_standort, help='Weibull-Formparameter')
+    parser.add_argument('--lambda', dest='lambda_param', type=float, default=lambda_standort, help='Weibull-Skalenparameter (m/s)')
+    parser.add_argument('--methode', choices=('exakt', 'bins'), default='exakt')
+    parser.add_argument('--messdaten', nargs='+', default=windmessdaten_csv, help='CSV-Datei(en) mit Windmessdaten statt Weibull')
+    parser.add_argument('--messdaten-cache', help='Binär-Cache der Messdaten (wird aus --messdaten erzeugt, falls nicht vorhanden)')
+    parser.add_argument('--monte-carlo', type=int, default=monte_carlo_stichproben, help='Anzahl Monte-Carlo-Stichproben (0 = aus)')
+    parser.add_argument('--seed', type=int, default=monte_carlo_seed)
+    parser.add_argument('--turbinen', help='CSV-Datei mit Turbinenkoordinaten x, y (m) für die Nachlaufrechnung')
+    parser.add_argument('--nachlauf-modell', choices=('jensen', 'bastankhah'), default=nachlauf_modell)
+    parser.add_argument('--plots', choices=PLOT_MODI, default='show', help="'save' schreibt PNGs headless (Agg), 'none' lädt kein matplotlib")
+    parser.add_argument('--output-dir', default='.', help='Verzeichnis für Diagramme (--plots save)')
+    args = parser.parse_args(argv)
+
+    # --- SCHRITT 5.1: Berechne den jährlichen Gesamtertrag  ---
+    if args.messdaten is not None or args.messdaten_cache is not None:
+        # Messdaten blockweise lesen, Leistungskurve je Zeitstempel (Sommer/Winter) anwenden und monatlich aufsummieren
+        print("Berechne jährlichen Gesamtertrag aus Windmessdaten (blockweise)...")
+        wind_akkumulator = jahresertrag_messdaten(args.messdaten, anzahl_anlagen=args.anlagen, verfuegbarkeitsfaktor=args.verfuegbarkeit,
+                                                  cache_pfad=args.messdaten_cache, progress=True)
+        if wind_akkumulator.ohne_zeitstempel: print(f"  Hinweis: {wind_akkumulator.ohne_zeitstempel:,} Werte ohne gültigen Zeitstempel verworfen")
+        abdeckung = wind_akkumulator.datenabdeckung()
+        for jahr, ertrag in wind_akkumulator.jahresertraege().items(): print(f"  {jahr}: {ertrag / 1e3:.2f} MWh (Datenabdeckung {abdeckung[jahr]:.0%})")
+        # Mittlere Leistung je Kalendermonat x Stunden im Normjahr: angebrochene Jahre zählen nicht als volle Jahre
+        jährlicher_ertrag_kwh_simuliert = wind_akkumulator.mittlerer_jahresertrag()
+        if np.isnan(jährlicher_ertrag_kwh_simuliert): raise SystemExit("Fehler: Messdaten decken nicht alle zwölf Kalendermonate ab")
+        print(f"  Jahresertrag aus Monatsmitteln: {jährlicher_ertrag_kwh_simuliert / 1e3:.2f} MWh")
+        print("Angepasste Weibull-Parameter je Monat (Momentenmethode):")
+        for monat, (k_monat, lambda_monat) in wind_akkumulator.weibull_je_monat().items():
+            print(f"  {monat}: k = {k_monat:.2f}, λ = {lambda_monat:.2f} m/s")
+    else:
+        print(f"Berechne simulierten jährlichen Gesamtertrag (mit festem Lambda = {args.lambda_param})...")
+        jährlicher_ertrag_kwh_simuliert = jahresertrag_weibull(args.k, args.lambda_param, args.anlagen, args.verfuegbarkeit, args.methode)
+
+    # Umrechnung des simulierten Jahresertrags in MWh
+    jährlicher_ertrag_mwh_simuliert = jährlicher_ertrag_kwh_simuliert / 1e3
+    print(f"\nSimulierter jährlicher Gesamtenergieertrag: {jährlicher_ertrag_mwh_simuliert:.2f} MWh")
+
+    if args.monte_carlo > 0:
+        # Unsicherheit von Windklima, Verfügbarkeit und Leistungskurve (Weibull-Rechnung mit festem Lambda)
+        print(f"\nMonte-Carlo-Unsicherheit mit {args.monte_carlo:,} Stichproben...")
+        mc_ergebnis = monte_carlo(args.monte_carlo, args.seed, args.k, args.lambda_param, args.anlagen, args.verfuegbarkeit, progress=True)
+        for p, wert in mc_ergebnis['jahr'].items(): print(f"  {p}: {wert / 1e3:.2f} MWh")
+
+    koordinaten = _koordinaten(args.turbinen) if args.turbinen else turbinen_koordinaten
+    if koordinaten is not None:
+        # Jede Anlage sieht die durch die Nachläufe der anderen Anlagen reduzierte Anströmung
+        park, park_ergebnis = parkertrag(koordinaten, args.nachlauf_modell, k=args.k, lambda_param=args.lambda_param,
+                                         verfuegbarkeitsfaktor=args.verfuegbarkeit)
+        print(f"\nWindpark mit {park.anzahl_anlagen} Anlagen ({args.nachlauf_modell}):")
+        print(f"  Ertrag ohne Nachlauf: {park_ergebnis['jahr_ohne_nachlauf'] / 1e3:.2f} MWh, mit Nachlauf: {park_ergebnis['jahr'] / 1e3:.2f} MWh")
+        print(f"  Nachlaufverlust: {1 - park_ergebnis['jahr'] / park_ergebnis['jahr_ohne_nachlauf']:.2%}")
+
+    # --- SCHRITT 5.2: Prüfe die prozentuale Verteilung  ---
+    summe_prozente = sum(monatliche_prozentuale_verteilung.values()) * 100
+    print(f"Summe der definierten Prozentsätze: {summe_prozente:.2f}%")
+    if not math.isclose(summe_prozente, 100.0, abs_tol=0.1):
+        print("WARNUNG: Die Summe der Prozentsätze weicht signifikant von 100% ab!")
+
+    # --- SCHRITT 5.3: Berechne die monatlichen Erträge basierend auf den Prozenten ---
+    print("\nBerechne monatliche Erträge basierend auf prozentualer Verteilung:")
+    monatliche_erträge_gwh_prognose = monatliche_prognose(jährlicher_ertrag_kwh_simuliert)
+
+    # --- SCHRITT 5.4: Gib die prognostizierten monatlichen Erträge aus  ---
+    print("\nPrognostizierter monatlicher Energieertrag (GWh) basierend auf Verteilung:")
+    for monat in monatsnamen:
+        ertrag = monatliche_erträge_gwh_prognose.get(monat, 0.0)
+        print(f"{monat}: {ertrag:.4f} MWh")
+
+    if args.plots == 'save': os.makedirs(args.output_dir, exist_ok=True)
+    for pfad in erstelle_diagramme(monatliche_erträge_gwh_prognose, args.plots, args.output_dir, args.k, args.lambda_param, args.anlagen):
+        print(f"Diagramm '{pfad}' gespeichert.")
+
+    print("\nCode-Ausführung abgeschlossen.")
+    return jährlicher_ertrag_kwh_simuliert
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Synthetische Windzeitreihen mit Weibull-Randverteilung für die Systemoptimierung.
+
+Statt eines monatsweise konstanten Windertrags entsteht je Jahr eine autokorrelierte
+Windgeschwindigkeitsreihe: ein stationärer AR(1)-Prozess z_t = φ z_{t-1} + √(1-φ²) ε_t
+(φ = exp(-Δt / Korrelationszeit)) wird über die Gauß-Copula v = λ (-ln(1 - Φ(z)))^(1/k)
+exakt auf die Weibull-Verteilung (k, λ) aus windparkohneverlust.py abgebildet und mit
+der saisonalen Leistungskurve (Sommer/Winter je Monat) in spezifischen Ertrag je MW
+umgerechnet. Alle Jahre werden gemeinsam gerechnet (Filter und Transformation über
+ganze Arrays, keine Schleife über Zeitschritte).
+
+Jahr j verwendet den Zufallsstrom ``SeedSequence(seed, spawn_key=(j,))`` und ist damit
+unabhängig davon, wie viele Jahre in einem Aufruf erzeugt werden.
+"""
+import numpy as np
+from scipy.signal import lfilter
+from scipy.special import log_ndtr
+
+import leistungskurven
+import weibullertrag
+from zeitreihen import days_in_month
+
+# Korrelationszeit der Windgeschwindigkeit (synoptische Skala, typisch 1-2 Tage)
+KORRELATIONSZEIT_STUNDEN = 24.0
+NORMIERUNGEN = ('monat', None)
+
+
+def windgeschwindigkeiten(n_jahre, zeitschritte, zeitschritt_stunden=0.25, k=leistungskurven.K_STANDORT,
+                          lambda_param=leistungskurven.LAMBDA_STANDORT, korrelationszeit_stunden=KORRELATIONSZEIT_STUNDEN,
+                          seed=0, erstes_jahr=0):
+    """Windgeschwindigkeiten (m/s) als Array ``(n_jahre, zeitschritte)``; je Jahr stationär gestartet."""
+    if korrelationszeit_stunden <= 0: raise ValueError(f"Korrelationszeit muss positiv sein, nicht {korrelationszeit_stunden}")
+    phi = np.exp(-zeitschritt_stunden / korrelationszeit_stunden)
+    z = np.empty((n_jahre, zeitschritte))
+    start = np.empty(n_jahre)
+    for j in range(n_jahre):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(erstes_jahr + j,)))
+        start[j] = rng.standard_normal()
+        rng.standard_normal(out=z[j])
+    # AR(1) als IIR-Filter; Anfangszustand φ·z_0 mit z_0 ~ N(0, 1) -> von Beginn an stationär
+    z = lfilter([np.sqrt(1 - phi ** 2)], [1.0, -phi], z, axis=1, zi=(phi * start)[:, None])[0]
+    # Gauß-Copula: -ln(1 - Φ(z)) = -ln Φ(-z), numerisch stabil auch in den Rändern
+    v = np.negative(log_ndtr(np.negative(z, out=z)), out=z)
+    v **= 1.0 / k
+    v *= lambda_param
+    return v
+
+
+def _monatsgrenzen(zeitschritte, zeitschritt_stunden):
+    """Erster Zeitschritt je Monat wie in :func:`zeitreihen.generate_profiles` (Rest zählt zum Dezember)."""
+    grenzen = np.concatenate([[0], np.cumsum([int(days_in_month[m] * 24 / zeitschritt_stunden) for m in range(1, 13)])])
+    grenzen = np.minimum(grenzen, zeitschritte); grenzen[-1] = zeitschritte
+    return grenzen
+
+
+def _monat_skalieren(ertrag, ziel, obergrenze, monat):
+    """Skaliert jede Zeile auf die Summe ``ziel``, ohne ``obergrenze`` je Zeitschritt zu überschreiten.
+
+    Gesucht ist f mit Σ min(f·e_i, obergrenze) = ziel: nach Größe sortiert sind die r
+    größten Werte gekappt und f = (ziel - r·obergrenze) / Σ(übrige); r ist das kleinste,
+    bei dem der größte ungekappte Wert unter der Grenze bleibt. Zeilen ohne Ertrag (oder mit
+    zu wenigen windigen Zeitschritten für das Ziel) werden gleichmäßig verteilt.
+    """
+    n = ertrag.shape[1]
+    if ziel > n * obergrenze * (1 + 1e-12): raise ValueError(f"Monatsertrag {monat} ({ziel:.1f} MWh/MW) über der Nennleistung")
+    absteigend = -np.sort(-ertrag, axis=1)
+    oben = np.zeros((len(ertrag), n + 1)); np.cumsum(absteigend, axis=1, out=oben[:, 1:])
+    r = np.arange(n)
+    rest = oben[:, -1:] - oben[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = (ziel - r * obergrenze) / rest
+        gueltig = (rest > 0) & (f * absteigend <= obergrenze * (1 + 1e-12))
+    machbar = gueltig.any(axis=1)
+    faktor = np.where(machbar, f[np.arange(len(ertrag)), np.argmax(gueltig, axis=1)], 0.0)
+    ergebnis = np.minimum(ertrag * faktor[:, None], obergrenze)
+    ergebnis[~machbar] = ziel / n
+    return ergebnis
+
+
+def spezifischer_windertrag(params, n_jahre=1, seed=0, erstes_jahr=0, k=leistungskurven.K_STANDORT,
+                            lambda_param=leistungskurven.LAMBDA_STANDORT, korrelationszeit_stunden=KORRELATIONSZEIT_STUNDEN,
+                            normierung='monat', verfuegbarkeitsfaktor=leistungskurven.VERFUEGBARKEITSFAKTOR,
+                            sommer_monate=None, kurven=None, geschwindigkeiten=False):
+    """Spezifischer Windertrag (MWh je MW und Zeitschritt) als Array ``(n_jahre, T)``.
+
+    Jede Zeile ersetzt ``profiles['specific_yield_wind_mwh_per_mw']`` aus
+    :func:`zeitreihen.generate_profiles` (gleiche Auflösung und Länge aus ``params``).
+    ``kurven`` = (Winter-, Sommer-Leistungskurve) als DataFrames, Standard aus
+    :mod:`leistungskurven`; Leistung relativ zur Nennleistung der Kurve.
+
+    ``normierung``:
+      * ``'monat'``: jeder Monat jedes Jahres trifft exakt den Monatsertrag aus
+        ``monthly_yield_wind_mwh_relative`` und ``target_annual_specific_yield_wind_mwh_per_mw``
+        (nur die Verteilung innerhalb des Monats ändert sich). Die Saisonalität der
+        Vorgaben wird dabei über einen Faktor je Monat aufgeprägt, gekappt bei
+        Nennleistung (1 MW je MW), damit windreiche Stunden nicht darüber hinaus wachsen,
+      * ``None``: physikalischer Ertrag der Anlage mit ``verfuegbarkeitsfaktor``.
+
+    Mit ``geschwindigkeiten=True`` wird ``(ertrag, windgeschwindigkeiten)`` zurückgegeben.
+    """
+    if normierung not in NORMIERUNGEN: raise ValueError(f"Unbekannte Normierung: {normierung} (erlaubt: monat, None)")
+    dt = params['time_resolution_hours']
+    zeitschritte = int(params['hours_in_year'] / dt)
+    winter_df, sommer_df = kurven if kurven is not None else (leistungskurven.leistungskurve_winter_df(), leistungskurven.leistungskurve_sommer_df())
+    sommer_monate = sommer_monate if sommer_monate is not None else leistungskurven.SOMMER_MONATE
+    monatskurve = [1 if name in sommer_monate else 0 for name in leistungskurven.MONATSNAMEN]
+    nennleistung = max(winter_df[weibullertrag.LEISTUNG_SPALTE].max(), sommer_df[weibullertrag.LEISTUNG_SPALTE].max())
+    kompiliert = [leistungskurven.KompilierteLeistungskurve.aus_dataframe(df) for df in (winter_df, sommer_df)]
+
+    v = windgeschwindigkeiten(n_jahre, zeitschritte, dt, k, lambda_param, korrelationszeit_stunden, seed, erstes_jahr)
+    ertrag = np.empty_like(v)
+    grenzen = _monatsgrenzen(zeitschritte, dt)
+    # Zusammenhängende Monatsblöcke mit gleicher Kurve gemeinsam auswerten (Winter | Sommer | Winter)
+    wechsel = [0] + [m for m in range(1, 12) if monatskurve[m] != monatskurve[m - 1]] + [12]
+    for a, b in zip(wechsel[:-1], wechsel[1:]):
+        lo, hi = grenzen[a], grenzen[b]
+        if hi > lo: ertrag[:, lo:hi] = kompiliert[monatskurve[a]](np.ascontiguousarray(v[:, lo:hi]))
+    ertrag *= dt / nennleistung # kW -> MWh je MW Nennleistung und Zeitschritt
+
+    if normierung is None:
+        ertrag *= verfuegbarkeitsfaktor
+    else:
+        relativ = np.array([params['monthly_yield_wind_mwh_relative'][m] for m in range(1, 13)], dtype=float)
+        ziel = relativ / relativ.sum() * params['target_annual_specific_yield_wind_mwh_per_mw'] if relativ.sum() > 0 else np.zeros(12)
+        for m in range(12):
+            lo, hi = grenzen[m], grenzen[m + 1]
+            if hi > lo: ertrag[:, lo:hi] = _monat_skalieren(ertrag[:, lo:hi], ziel[m], dt, leistungskurven.MONATSNAMEN[m])
+    return (ertrag, v) if geschwindigkeiten else ertrag
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Ertragsrechnung aus gemessenen Windgeschwindigkeits-Zeitreihen (Messmast/SCADA).
+
+Die Messdaten werden blockweise gelesen (CSV in Chunks oder ein per ``np.memmap``
+eingeblendeter Binär-Cache) und nie vollständig in den Speicher geladen. Je
+Zeitstempel wird die saisonale Leistungskurve (Sommer/Winter nach Monat) wie in
+``get_leistung`` angewendet; Monats- und Jahreserträge sowie die Momente für die
+monatliche Weibull-Anpassung werden inkrementell aufsummiert.
+"""
+import calendar
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+from scipy.special import gammaln
+
+import leistungskurven
+
+# Binär-Cache: Zeitstempel (ns seit Epoche) und Windgeschwindigkeit je Datensatz
+CACHE_DTYPE = np.dtype([('zeit', '<i8'), ('ws', '<f4')])
+
+
+def lese_csv_chunks(pfad, zeitspalte, wsspalte, chunksize=1_000_000, **read_csv_kwargs):
+    """Liest eine CSV-Datei blockweise; liefert je Block (Zeitstempel datetime64[ns], Windgeschwindigkeit)."""
+    for chunk in pd.read_csv(pfad, usecols=[zeitspalte, wsspalte], chunksize=chunksize, **read_csv_kwargs):
+        zeit = pd.to_datetime(chunk[zeitspalte]).to_numpy(dtype='datetime64[ns]')
+        yield zeit, pd.to_numeric(chunk[wsspalte], errors='coerce').to_numpy(dtype=float)
+
+
+def erzeuge_binaercache(pfade, cache_pfad, zeitspalte, wsspalte, chunksize=1_000_000, **read_csv_kwargs):
+    """Schreibt eine oder mehrere CSV-Dateien blockweise in einen Binär-Cache; gibt die Anzahl Datensätze zurück."""
+    if isinstance(pfade, (str, os.PathLike)): pfade = [pfade]
+    anzahl = 0
+    with open(cache_pfad, 'wb') as f:
+        for pfad in pfade:
+            for zeit, ws in lese_csv_chunks(pfad, zeitspalte, wsspalte, chunksize, **read_csv_kwargs):
+                block = np.empty(len(ws), dtype=CACHE_DTYPE)
+                block['zeit'] = zeit.view('i8'); block['ws'] = ws
+                block.tofile(f)
+                anzahl += len(block)
+    return anzahl
+
+
+def lese_binaercache(cache_pfad, chunksize=5_000_000):
+    """Blendet den Binär-Cache per memmap ein und liefert ihn blockweise wie :func:`lese_csv_chunks`."""
+    daten = np.memmap(cache_pfad, dtype=CACHE_DTYPE, mode='r')
+    for start in range(0, len(daten), chunksize):
+        block = daten[start:start + chunksize]
+        yield block['zeit'].view('datetime64[ns]'), block['ws'].astype(float)
+
+
+def weibull_aus_momenten(mittelwert, mittel_quadrat):
+    """Weibull-Parameter (k, λ) nach der Momentenmethode aus E[v] und E[v²]."""
+    varianz = mittel_quadrat - mittelwert ** 2
+    if not mittelwert > 0 or not varianz > 0: return np.nan, np.nan
+    # E[v²]/E[v]² = Γ(1+2/k) / Γ(1+1/k)² ist streng monoton fallend in k
+    ziel = np.log(mittel_quadrat / mittelwert ** 2)
+    k = brentq(lambda k: gammaln(1 + 2 / k) - 2 * gammaln(1 + 1 / k) - ziel, 0.05, 50.0)
+    return float(k), float(mittelwert / np.exp(gammaln(1 + 1 / k)))
+
+
+class WindErtragAkkumulator:
+    """Summiert Energie und Windmomente blockweise je Kalendermonat auf.
+
+    ``zeitschritt_stunden``: Dauer je Messwert (10-min-Daten: 1/6 h). Fehlende Werte
+    (NaN) gehen weder in Energie noch in die Weibull-Momente ein und werden gezählt.
+    Werte ohne gültigen Zeitstempel (NaT) lassen sich keinem Monat zuordnen; sie werden
+    verworfen und unter ``ohne_zeitstempel`` gezählt.
+    """
+
+    def __init__(self, leistungskurve_sommer_df=None, leistungskurve_winter_df=None, sommer_monate=None,
+                 zeitschritt_stunden=1 / 6, anzahl_anlagen=1, verfuegbarkeitsfaktor=0.97):
+        sommer_df = leistungskurve_sommer_df if leistungskurve_sommer_df is not None else leistungskurven.leistungskurve_sommer_df()
+        winter_df = leistungskurve_winter_df if leistungskurve_winter_df is not None else leistungskurven.leistungskurve_winter_df()
+        self.kurven = [leistungskurven.KompilierteLeistungskurve.aus_dataframe(df) for df in (winter_df, sommer_df)]
+        sommer_monate = sommer_monate if sommer_monate is not None else leistungskurven.SOMMER_MONATE
+        # Kurvenindex je Kalendermonat (0 = Winter, 1 = Sommer)
+        self.monatskurve = np.array([1 if name in sommer_monate else 0 for name in leistungskurven.MONATSNAMEN])
+        self.zeitschritt_stunden = zeitschritt_stunden
+        self.faktor = anzahl_anlagen * verfuegbarkeitsfaktor
+        # Je Monat seit Epoche: [Energie kWh, gültige Werte, fehlende Werte, Σv, Σv²]
+        self._summen = {}
+        self.anzahl_werte = 0
+        self.ohne_zeitstempel = 0
+
+    def update(self, zeit, windgeschwindigkeit):
+        """Verarbeitet einen Block (Zeitstempel datetime64, Windgeschwindigkeit in m/s)."""
+        ws = np.asarray(windgeschwindigkeit, dtype=float)
+        zeit = np.asarray(zeit)
+        self.anzahl_werte += len(ws)
+        mit_zeit = ~np.isnat(zeit)
+        if not mit_zeit.all():
+            self.ohne_zeitstempel += int(len(ws) - mit_zeit.sum())
+            zeit, ws = zeit[mit_zeit], ws[mit_zeit]
+        if not len(ws): return
+        monat_epoche = zeit.astype('datetime64[M]').astype(np.int64)
+        gueltig = ~np.isnan(ws)
+        kurve = self.monatskurve[monat_epoche % 12]
+        leistung = np.zeros_like(ws)
+        for c in range(len(self.kurven)):
+            maske = gueltig & (kurve == c)
+            leistung[maske] = self.kurven[c](ws[maske])
+        ws0 = np.where(gueltig, ws, 0.0)
+        basis = monat_epoche.min()
+        idx = monat_epoche - basis
+        spalten = [np.bincount(idx, weights=leistung), np.bincount(idx, weights=gueltig),
+                   np.bincount(idx, weights=~gueltig), np.bincount(idx, weights=ws0), np.bincount(idx, weights=ws0 * ws0)]
+        for i in np.flatnonzero(spalten[1] + spalten[2]):
+            summe = self._summen.setdefault(int(basis + i), np.zeros(5))
+            summe += [s[i] for s in spalten]
+
+    def monatsergebnisse(self):
+        """DataFrame je Jahr/Monat mit Energie (kWh), Verfügbarkeit der Daten, Mittelwind und Weibull-Parametern."""
+        zeilen = []
+        for monat_epoche in sorted(self._summen):
+            leistung, n, fehlend, s1, s2 = self._summen[monat_epoche]
+            k, lam = weibull_aus_momenten(s1 / n, s2 / n) if n > 1 else (np.nan, np.nan)
+            zeilen.append({'Jahr': 1970 + monat_epoche // 12, 'Monat': leistungskurven.MONATSNAMEN[monat_epoche % 12],
+                           'Energie (kWh)': leistung * self.zeitschritt_stunden * self.faktor,
+                           'Messwerte': int(n), 'Fehlende Werte': int(fehlend),
+                           'Mittelwind (m/s)': s1 / n if n else np.nan, 'k': k, 'Lambda (m/s)': lam})
+        return pd.DataFrame(zeilen)
+
+    def jahresertraege(self):
+        """Energie (kWh) je Kalenderjahr, nur über die vorhandenen Messwerte summiert (siehe :meth:`datenabdeckung`)."""
+        monate = self.monatsergebnisse()
+        return monate.groupby('Jahr')['Energie (kWh)'].sum() if len(monate) else pd.Series(dtype=float)
+
+    def datenabdeckung(self):
+        """Anteil der Stunden je Kalenderjahr mit gültigem Messwert (1 = vollständiges Jahr)."""
+        stunden = {}
+        for monat_epoche, summe in self._summen.items():
+            jahr = 1970 + monat_epoche // 12
+            stunden[jahr] = stunden.get(jahr, 0.0) + summe[1] * self.zeitschritt_stunden
+        return pd.Series({jahr: h / (8784 if calendar.isleap(jahr) else 8760) for jahr, h in sorted(stunden.items())}, dtype=float)
+
+    def mittlerer_jahresertrag(self):
+        """Jahresertrag (kWh) aus den mittleren Leistungen je Kalendermonat über alle Jahre.
+
+        Jeder Monat zählt mit seinen Stunden im Normjahr (:data:`leistungskurven.STUNDEN_PRO_MONAT`),
+        unabhängig davon, wie viele Jahre oder Werte gemessen wurden; angebrochene Jahre und
+        Lücken verzerren das Ergebnis damit nicht. NaN, wenn ein Kalendermonat ganz fehlt.
+        """
+        summen = np.zeros((12, 5))
+        for monat_epoche, summe in self._summen.items(): summen[monat_epoche % 12] += summe
+        if not (summen[:, 1] > 0).all(): return np.nan
+        mittlere_leistung = summen[:, 0] / summen[:, 1]
+        return float(mittlere_leistung @ np.asarray(leistungskurven.STUNDEN_PRO_MONAT, dtype=float) * self.faktor)
+
+    def weibull_je_monat(self):
+        """Über alle Jahre gepoolte Weibull-Parameter je Kalendermonat: {Monatsname: (k, λ)}."""
+        summen = np.zeros((12, 5))
+        for monat_epoche, summe in self._summen.items(): summen[monat_epoche % 12] += summe
+        return {name: (weibull_aus_momenten(s[3] / s[1], s[4] / s[1]) if s[1] > 1 else (np.nan, np.nan))
+                for name, s in zip(leistungskurven.MONATSNAMEN, summen)}
+
+
+def streaming_ertrag(bloecke, progress=False, **akkumulator_kwargs):
+    """Verarbeitet alle Blöcke eines Generators (:func:`lese_csv_chunks`, :func:`lese_binaercache`)."""
+    akkumulator = WindErtragAkkumulator(**akkumulator_kwargs)
+    start_time = datetime.datetime.now()
+    for zeit, ws in bloecke:
+        akkumulator.update(zeit, ws)
+        if progress:
+            print(f"\rWindzeitreihe: {akkumulator.anzahl_werte:,} Werte verarbeitet ({datetime.datetime.now() - start_time})", end="", flush=True)
+    if progress: print()
+    return akkumulator
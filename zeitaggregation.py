@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Zeitliche Aggregation: Auslegungs-LP über typische Tage statt über das volle Jahr.
+
+Die Tage des Jahres werden zu Gruppen zusammengefasst (exakt identische Tage oder
+k-Medoids auf den Tagesprofilen von Bedarf, PV, Wind und Vergütung). Das LP enthält
+den Betrieb nur für die repräsentativen Tage, gewichtet mit der Anzahl ihrer
+Mitglieder. Der Batteriespeicher wird über eine tagesübergreifende SoC-Kette
+verknüpft (Speicherstand am Tagesbeginn für jeden Originaltag + Intra-Tages-SoC des
+repräsentativen Tages), so dass saisonale Speicherung möglich bleibt und die
+SoC-Grenzen für jeden Originaltag eingehalten werden.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+import lp_matrix
+from systemparameter import charge_discharge_factors, cost_coefficients
+
+_FEATURES = ['demand_profile_mwh', 'specific_yield_pv_mwh_per_mw', 'specific_yield_wind_mwh_per_mw', 'feed_in_tariff_profile_eur_per_mwh']
+
+
+def _k_medoids(X, k, seed=0, max_iter=100):
+    """Einfaches k-Medoids (Voronoi-Iteration) mit k-means++-Initialisierung."""
+    rng = np.random.default_rng(seed)
+    sq = np.sum(X**2, axis=1)
+    dist = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2 * X @ X.T, 0))
+    medoids = [int(rng.integers(len(X)))]
+    for _ in range(1, k):
+        d2 = np.min(dist[:, medoids], axis=1)**2
+        if d2.sum() <= 0: break
+        medoids.append(int(rng.choice(len(X), p=d2 / d2.sum())))
+    medoids = np.array(medoids)
+    for _ in range(max_iter):
+        labels = np.argmin(dist[:, medoids], axis=1)
+        new_medoids = medoids.copy()
+        for c in range(len(medoids)):
+            members = np.flatnonzero(labels == c)
+            if len(members): new_medoids[c] = members[np.argmin(dist[np.ix_(members, members)].sum(axis=1))]
+        if np.array_equal(new_medoids, medoids): break
+        medoids = new_medoids
+    return medoids, np.argmin(dist[:, medoids], axis=1)
+
+
+def aggregate_days(profiles, params, n_days=None, representation='mean', seed=0):
+    """Fasst die Tage des Profils zu repräsentativen Tagen zusammen.
+
+    ``n_days=None`` gruppiert exakt identische Tage (Bedarf, PV, Wind); die
+    Vergütung wird innerhalb der Gruppe gemittelt. Mit ``n_days`` werden so viele
+    Cluster per k-Medoids über alle vier Profile gebildet. ``representation``
+    ``'mean'`` (Gruppenmittel, erhält die Jahressummen exakt) oder ``'medoid'``.
+
+    Gibt ein Dict mit ``day_profiles`` (je Feature ein Array K x Intervalle),
+    ``weights`` (Tage je Gruppe) und ``assignment`` (Gruppe je Originaltag) zurück.
+    """
+    intervals_per_day = int(round(24 / params['time_resolution_hours']))
+    T = len(profiles['demand_profile_mwh'])
+    if T % intervals_per_day: raise ValueError(f"Zeitreihe ({T} Schritte) ist kein Vielfaches eines Tages ({intervals_per_day}).")
+    num_days = T // intervals_per_day
+    daily = {name: np.asarray(profiles[name], dtype=float).reshape(num_days, intervals_per_day) for name in _FEATURES}
+
+    if n_days is None:
+        keys = np.hstack([daily[name] for name in _FEATURES[:3]])
+        _, first, assignment = np.unique(np.round(keys, 12), axis=0, return_index=True, return_inverse=True)
+        medoids = first
+    else:
+        # Jedes Profil auf sein Maximum normieren, damit alle Merkmale vergleichbar gewichtet sind
+        X = np.hstack([daily[name] / max(np.max(np.abs(daily[name])), 1e-12) for name in _FEATURES])
+        medoids, assignment = _k_medoids(X, n_days, seed=seed)
+    assignment = assignment.ravel()
+    K = len(medoids)
+    weights = np.bincount(assignment, minlength=K).astype(float)
+
+    day_profiles = {}
+    for name in _FEATURES:
+        if representation == 'medoid':
+            day_profiles[name] = daily[name][medoids]
+        else:
+            sums = np.zeros((K, intervals_per_day))
+            np.add.at(sums, assignment, daily[name])
+            day_profiles[name] = sums / weights[:, None]
+    return {'day_profiles': day_profiles, 'weights': weights, 'assignment': assignment,
+            'num_days': num_days, 'intervals_per_day': intervals_per_day}
+
+
+def build_aggregated_lp(aggregation, params):
+    """Auslegungs-LP über die repräsentativen Tage mit tagesübergreifender SoC-Kette.
+
+    Spalten: 4 Kapazitäten | je K*I Netzbezug, Einspeisung, Abregelung, Laden,
+    Entladen | K*(I+1) Intra-Tages-SoC (Start 0) | K Intra-Max | K Intra-Min |
+    D+1 Speicherstand am Tagesbeginn.
+    """
+    dp = aggregation['day_profiles']; w = aggregation['weights']; assign = aggregation['assignment']
+    K, I = dp['demand_profile_mwh'].shape
+    D = aggregation['num_days']
+    KI = K * I
+    dt = params['time_resolution_hours']; soc_min = params['battery_soc_min_percent']
+    eff_sqrt, eff_sqrt_inv = charge_discharge_factors(params['battery_efficiency'])
+    costs = cost_coefficients(params)
+
+    imp = 4 + np.arange(KI); exp = imp + KI; curt = exp + KI; ch = curt + KI; dis = ch + KI
+    soc0 = 4 + 5 * KI
+    soc = soc0 + np.arange(K * (I + 1)).reshape(K, I + 1)
+    smax = soc0 + K * (I + 1) + np.arange(K); smin = smax + K
+    inter = smin[-1] + 1 + np.arange(D + 1)
+    n = inter[-1] + 1
+
+    c = np.zeros(n)
+    c[lp_matrix.PV] = costs['pv_eur_per_mw']; c[lp_matrix.WIND] = costs['wind_eur_per_mw']
+    c[lp_matrix.BATT_MWH] = costs['battery_eur_per_mwh']; c[lp_matrix.BATT_MW] = costs['battery_eur_per_mw']
+    wi = np.repeat(w, I)
+    c[imp] = wi * params['grid_purchase_price_eur_per_mwh']
+    c[exp] = -wi * dp['feed_in_tariff_profile_eur_per_mwh'].ravel()
+
+    r = np.arange(KI); ones = np.ones(KI)
+    s_from = soc[:, :-1].ravel(); s_to = soc[:, 1:].ravel()
+    d = np.arange(D)
+    rows, cols, vals = [], [], []
+    def add(rr, cc, vv):
+        rows.append(np.asarray(rr)); cols.append(np.asarray(cc)); vals.append(np.broadcast_to(vv, np.shape(rr)).astype(float))
+    # Energiebilanz je (Tag, Intervall)
+    add(r, np.full(KI, lp_matrix.PV), dp['specific_yield_pv_mwh_per_mw'].ravel())
+    add(r, np.full(KI, lp_matrix.WIND), dp['specific_yield_wind_mwh_per_mw'].ravel())
+    for col, sign in ((imp, 1.0), (exp, -1.0), (curt, -1.0), (dis, 1.0), (ch, -1.0)): add(r, col, sign * ones)
+    # Intra-Tages-SoC-Fortschreibung, Start bei 0
+    add(KI + r, s_to, 1.0); add(KI + r, s_from, -1.0); add(KI + r, ch, -eff_sqrt); add(KI + r, dis, eff_sqrt_inv)
+    add(2 * KI + np.arange(K), soc[:, 0], 1.0)
+    # Speicherstand am Tagesbeginn: S[d+1] = S[d] + SoC-Änderung des repräsentativen Tages
+    row0 = 2 * KI + K
+    add(row0 + d, inter[1:], 1.0); add(row0 + d, inter[:-1], -1.0); add(row0 + d, soc[assign, I], -1.0)
+    # Zyklische Bedingung über das Jahr
+    add([row0 + D, row0 + D], [inter[D], inter[0]], [1.0, -1.0])
+    m_eq = row0 + D + 1
+    A_eq = sp.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(m_eq, n)).tocsr()
+    A_eq.eliminate_zeros()
+    b_eq = np.concatenate([dp['demand_profile_mwh'].ravel(), np.zeros(m_eq - KI)])
+
+    rows, cols, vals = [], [], []
+    # Lade-/Entladeleistung
+    add(r, ch, 1.0); add(r, np.full(KI, lp_matrix.BATT_MW), -dt)
+    add(KI + r, dis, 1.0); add(KI + r, np.full(KI, lp_matrix.BATT_MW), -dt)
+    # Intra-Max/-Min je repräsentativem Tag
+    rs = np.arange(K * (I + 1)); k_of = np.repeat(np.arange(K), I + 1)
+    add(2 * KI + rs, soc.ravel(), 1.0); add(2 * KI + rs, smax[k_of], -1.0)
+    row1 = 2 * KI + K * (I + 1)
+    add(row1 + rs, soc.ravel(), -1.0); add(row1 + rs, smin[k_of], 1.0)
+    # SoC-Grenzen je Originaltag: S[d] + Intra-Max <= E, S[d] + Intra-Min >= soc_min * E
+    row2 = row1 + K * (I + 1)
+    add(row2 + d, inter[:-1], 1.0); add(row2 + d, smax[assign], 1.0); add(row2 + d, np.full(D, lp_matrix.BATT_MWH), -1.0)
+    add(row2 + D + d, inter[:-1], -1.0); add(row2 + D + d, smin[assign], -1.0); add(row2 + D + d, np.full(D, lp_matrix.BATT_MWH), soc_min)
+    # Endstand (= Anfangsstand durch zyklische Bedingung)
+    add([row2 + 2 * D] * 2, [inter[D], lp_matrix.BATT_MWH], [1.0, -1.0])
+    m_ub = row2 + 2 * D + 1
+    A_ub = sp.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(m_ub, n)).tocsr()
+    A_ub.eliminate_zeros()
+    b_ub = np.zeros(m_ub)
+
+    lb = np.zeros(n); ub = np.full(n, np.inf)
+    lb[soc0:inter[0]] = -np.inf  # Intra-Tages-SoC und Extremwerte sind relative Größen
+    return {'c': c, 'A_eq': A_eq, 'b_eq': b_eq, 'A_ub': A_ub, 'b_ub': b_ub, 'lb': lb, 'ub': ub,
+            'aggregation_columns': {'imp': imp, 'exp': exp, 'curt': curt, 'ch': ch, 'dis': dis, 'soc': soc, 'inter': inter}}
+
+
+def _representative_dispatch(aggregation, lp, x):
+    """Betrieb der repräsentativen Tage auf die volle Zeitreihe übertragen (jeder Originaltag übernimmt den seines Typtags).
+
+    Der SoC ergibt sich aus dem Speicherstand am Tagesbeginn plus Intra-Tages-SoC. Bei
+    k-Medoids gilt die Energiebilanz damit nur für die Profile der repräsentativen Tage,
+    nicht für die Originalprofile.
+    """
+    cols = lp['aggregation_columns']; assign = aggregation['assignment']
+    K, I = aggregation['day_profiles']['demand_profile_mwh'].shape
+    dispatch = {}
+    for key, name in (('imp', 'Grid_Import'), ('exp', 'Grid_Export'), ('curt', 'Curtailment'),
+                      ('ch', 'Battery_Charge'), ('dis', 'Battery_Discharge')):
+        dispatch[name] = x[cols[key]].reshape(K, I)[assign].ravel()
+    intra = x[cols['soc']]
+    day_start = x[cols['inter']]
+    soc_full = (day_start[:-1, None] + intra[assign, :I]).ravel()
+    dispatch['Battery_SoC'] = np.append(soc_full, day_start[-1])
+    return dispatch
+
+
+def redispatch(profiles, params, capacities, msg=False):
+    """Betriebsoptimierung über die volle Zeitreihe mit festen Kapazitäten (Ergebnis wie :func:`lp_matrix.solve_lp`)."""
+    return lp_matrix.solve_lp(lp_matrix.build_system_lp(profiles, params, fixed_capacities=capacities), msg=msg)
+
+
+def expand_solution(aggregation, lp, solution, profiles, params):
+    """Überträgt die aggregierte Auslegung auf die volle Zeitreihe.
+
+    Die Kapazitäten stammen aus dem aggregierten LP; Zeitreihen und ``objective`` aus
+    :func:`redispatch` über die Originalprofile, so dass Energiebilanz, KPIs und Kosten für
+    jeden Zeitschritt stimmen. Der Zielwert des aggregierten LP bleibt unter
+    ``aggregated_objective``, der übertragene Betrieb der repräsentativen Tage unter
+    ``representative_dispatch`` (nur zur Analyse).
+    """
+    x = solution['x']
+    capacities = x[:4]
+    full = redispatch(profiles, params, capacities)
+    if full['status'] != 'Optimal': raise RuntimeError(f"Betrieb der Typtage-Auslegung auf voller Zeitreihe: {full['status']}")
+    solution['aggregated_objective'] = solution['objective']
+    solution['representative_dispatch'] = _representative_dispatch(aggregation, lp, x)
+    for i, name in enumerate(lp_matrix.CAPACITY_NAMES): solution[name] = float(capacities[i])
+    for name in lp_matrix.SERIES_NAMES: solution[name] = full[name]
+    solution['objective'] = full['objective']
+    return solution
+
+
+def lp_size(lp):
+    return {'variables': len(lp['c']), 'constraints': lp['A_eq'].shape[0] + lp['A_ub'].shape[0],
+            'nonzeros': lp['A_eq'].nnz + lp['A_ub'].nnz}
+
+
+def solve_aggregated(profiles, params, n_days=None, representation='mean', seed=0, msg=False):
+    """Löst das aggregierte Auslegungs-LP und betreibt die Auslegung auf der vollen Zeitreihe.
+
+    Das Ergebnis hat dasselbe Format wie :func:`lp_matrix.solve_lp` (Kapazitäten,
+    Zeitreihen der Länge T bzw. T + 1, siehe :func:`expand_solution`) und zusätzlich
+    ``aggregation`` und ``lp_size``.
+    """
+    aggregation = aggregate_days(profiles, params, n_days=n_days, representation=representation, seed=seed)
+    lp = build_aggregated_lp(aggregation, params)
+    solution = lp_matrix.solve_lp(lp, msg=msg)
+    solution['aggregation'] = aggregation
+    solution['lp_size'] = lp_size(lp)
+    if solution['status'] == 'Optimal': expand_solution(aggregation, lp, solution, profiles, params)
+    return solution
+
+
+def aggregation_error(profiles, params, solution, full_objective=None):
+    """Quantifiziert den Aggregationsfehler gegenüber dem Vollmodell.
+
+    Die aggregierte Auslegung wird mit fester Kapazität über die volle Zeitreihe
+    betrieben (nach :func:`expand_solution` bereits geschehen); diese Kosten sind eine
+    obere Schranke für das Optimum des Vollmodells. Ist ``full_objective`` (Optimum des
+    Vollmodells) bekannt, wird zusätzlich der Mehrkostenanteil der aggregierten
+    Auslegung ausgewiesen.
+    """
+    if 'aggregated_objective' in solution:
+        aggregated, design_cost = solution['aggregated_objective'], solution['objective']
+    else:
+        aggregated = solution['objective']
+        full = redispatch(profiles, params, [solution[name] for name in lp_matrix.CAPACITY_NAMES])
+        design_cost = full['objective']
+    report = {'aggregated_objective': aggregated, 'full_upper_bound': design_cost,
+              'objective_error_rel': abs(design_cost - aggregated) / abs(design_cost)}
+    if full_objective is not None:
+        report['full_objective'] = full_objective
+        report['design_regret_rel'] = (design_cost - full_objective) / abs(full_objective)
+    return report
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Erzeugung der Last-, Erzeugungs- und Vergütungsprofile für die Systemoptimierung."""
+import numpy as np
+
+days_in_month = { 1: 31, 2: 28, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31 }
+
+
+def _monthly_constant_profile(monthly_relative, target_annual_yield, num_timesteps, time_resolution_hours):
+    """Verteilt den Jahresertrag monatsweise konstant auf die Zeitschritte."""
+    total_relative = sum(monthly_relative.values())
+    profile = np.zeros(num_timesteps)
+    current_timestep = 0; spec_yield_per_ts = 0
+    for month in range(1, 13):
+        num_days = days_in_month[month]; timesteps_in_month = int(num_days * 24 / time_resolution_hours)
+        monthly_fraction = monthly_relative[month] / total_relative if total_relative > 0 else 0
+        absolute_yield_per_mw_month = monthly_fraction * target_annual_yield
+        spec_yield_per_ts = absolute_yield_per_mw_month / timesteps_in_month if timesteps_in_month > 0 else 0
+        end_timestep = min(current_timestep + timesteps_in_month, num_timesteps)
+        profile[current_timestep:end_timestep] = spec_yield_per_ts
+        current_timestep = end_timestep
+    profile[current_timestep:] = spec_yield_per_ts
+    return profile
+
+
+def generate_profiles(params, seed=None):
+    """Erzeugt Bedarf, spez. PV-/Winderträge und Einspeisevergütung wie in "Lineare Optimierung.py".
+
+    Gibt ein Dict mit den Arrays ``demand_profile_mwh``, ``specific_yield_pv_mwh_per_mw``,
+    ``specific_yield_wind_mwh_per_mw`` und ``feed_in_tariff_profile_eur_per_mwh`` zurück.
+    ``seed`` legt die Zeitschritte mit 0 €-Vergütung reproduzierbar fest.
+    """
+    time_resolution_hours = params['time_resolution_hours']
+    hours_in_year = params['hours_in_year']
+    num_timesteps = int(hours_in_year / time_resolution_hours)
+
+    # Konstantes Lastprofil
+    demand_per_timestep_mwh = params['demand_per_hour_kwh'] * time_resolution_hours / 1000
+    demand_profile_mwh = np.full(num_timesteps, demand_per_timestep_mwh)
+
+    # Wind Profil
+    specific_yield_wind_mwh_per_mw = _monthly_constant_profile(
+        params['monthly_yield_wind_mwh_relative'], params['target_annual_specific_yield_wind_mwh_per_mw'],
+        num_timesteps, time_resolution_hours)
+
+    # PV Profil (nur tagsüber 06-20 Uhr, auf Zieljahresertrag skaliert)
+    target_pv = params['target_annual_specific_yield_pv_mwh_per_mw']
+    initial_specific_yield_pv_mwh_per_mw = _monthly_constant_profile(
+        params['monthly_yield_pv_mwh_relative'], target_pv, num_timesteps, time_resolution_hours)
+    intervals_per_day = int(24 / time_resolution_hours)
+    start_day_index = int(6 / time_resolution_hours); end_day_index = int(20 / time_resolution_hours)
+    interval_of_day = np.arange(num_timesteps) % intervals_per_day
+    is_daytime = (interval_of_day >= start_day_index) & (interval_of_day < end_day_index)
+    total_daytime_yield_initial = np.sum(initial_specific_yield_pv_mwh_per_mw[is_daytime])
+    scaling_factor = 1.0
+    if total_daytime_yield_initial > 1e-6: scaling_factor = target_pv / total_daytime_yield_initial
+    specific_yield_pv_mwh_per_mw = initial_specific_yield_pv_mwh_per_mw * is_daytime * scaling_factor
+
+    # Einspeisevergütungsprofil
+    negative_price_share = params['negative_price_hours'] / hours_in_year
+    feed_in_tariff_profile_eur_per_mwh = np.full(num_timesteps, float(params['feed_in_tariff_eur_per_mwh']))
+    num_negative_timesteps = int(negative_price_share * num_timesteps)
+    rng = np.random.default_rng(seed)
+    random_indices = rng.choice(num_timesteps, num_negative_timesteps, replace=False)
+    feed_in_tariff_profile_eur_per_mwh[random_indices] = 0
+
+    return {
+        'demand_profile_mwh': demand_profile_mwh,
+        'specific_yield_pv_mwh_per_mw': specific_yield_pv_mwh_per_mw,
+        'specific_yield_wind_mwh_per_mw': specific_yield_wind_mwh_per_mw,
+        'feed_in_tariff_profile_eur_per_mwh': feed_in_tariff_profile_eur_per_mwh,
+    }
+
+
+def _segment_starts(boundaries_min, step_min, num_timesteps):
+    """Index des ersten Zeitschritts ab jeder Grenze (Minuten relativ zum Start), begrenzt auf [0, T]."""
+    return np.clip(-(-np.asarray(boundaries_min, dtype=np.int64) // step_min), 0, num_timesteps)
+
+
+def _solar_shape(stamps_min, step_min, latitude, longitude, utc_offset_hours, dtype):
+    """Kosinus des Sonnenzenitwinkels zur Intervallmitte (0 bei Nacht), Zeitstempel in Ortsstandardzeit."""
+    day = stamps_min // 1440
+    first_day = int(day[0]); days = np.arange(first_day, int(day[-1]) + 1)
+    day_of_year = (days - days.astype('M8[D]').astype('M8[Y]').astype('M8[D]').astype(np.int64)).astype(float)
+    gamma = 2 * np.pi * day_of_year / 365.0
+    # Deklination und Zeitgleichung (Spencer) je Kalendertag
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma) - 0.006758 * np.cos(2 * gamma)
+                   + 0.000907 * np.sin(2 * gamma) - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    equation_of_time_min = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                     - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    phi = np.radians(latitude)
+    a = (np.sin(phi) * np.sin(declination)).astype(dtype)
+    b = (np.cos(phi) * np.cos(declination)).astype(dtype)
+    # Wahre Ortszeit in Minuten: Ortszeit + 4 min/° Längendifferenz zur Zonenmitte + Zeitgleichung
+    correction = (equation_of_time_min + 4 * longitude - 60 * utc_offset_hours).astype(dtype)
+    d = day - first_day
+    solar_minute = (stamps_min % 1440).astype(dtype)
+    solar_minute += dtype(step_min / 2)
+    solar_minute += correction[d]
+    hour_angle = np.multiply(solar_minute - dtype(720), dtype(np.pi / 720), out=solar_minute)
+    shape = np.cos(hour_angle, out=hour_angle)
+    shape *= b[d]; shape += a[d]
+    return np.maximum(shape, 0, out=shape)
+
+
+def generate_calendar_profiles(params, start='2023-01-01', years=1, pv_shape='box', latitude=51.0, longitude=10.0,
+                               utc_offset_hours=1.0, dtype=np.float64, seed=None):
+    """Kalendergenaue Profile ab ``start`` über ``years`` Jahre (Schaltjahre, Auflösung ab 1 Minute).
+
+    Gleiche Schlüssel wie :func:`generate_profiles`, zusätzlich ``timestamps``
+    (datetime64[m], Ortsstandardzeit). Jeder Kalendermonat erhält seinen Anteil am
+    Jahresertrag, verteilt auf seine tatsächliche Anzahl Zeitschritte; für 2023 in
+    15-min-Auflösung ist das Ergebnis identisch zu :func:`generate_profiles`.
+
+    ``pv_shape='box'`` wie bisher (06-20 Uhr, je Jahr auf den Zielertrag skaliert),
+    ``'solar'`` formt PV nach dem Sonnenstand (``latitude``/``longitude`` in Grad,
+    ``utc_offset_hours`` der Zeitstempel) und hält dabei jeden Monatsertrag exakt ein.
+    ``dtype=np.float32`` halbiert den Speicherbedarf. Rein vektoriell, ohne Schleifen
+    über Zeitschritte oder Monate.
+    """
+    step = params['time_resolution_hours'] * 60
+    if step < 1 or abs(step - round(step)) > 1e-9: raise ValueError(f"Auflösung muss ein ganzzahliges Vielfaches von 1 Minute sein, nicht {step} min")
+    if pv_shape not in ('box', 'solar'): raise ValueError(f"Unbekannte PV-Form: {pv_shape} (erlaubt: box, solar)")
+    step = int(round(step)); dtype = np.dtype(dtype).type
+    start = np.datetime64(start, 'm')
+    start_month = start.astype('M8[M]')
+    end = (start_month + 12 * years).astype('M8[m]') + (start - start_month.astype('M8[m]'))
+    total_min = int((end - start).astype(np.int64))
+    num_timesteps = -(-total_min // step)
+    stamps = np.arange(start.astype(np.int64), start.astype(np.int64) + num_timesteps * step, step, dtype=np.int64)
+
+    # Kalendermonate als zusammenhängende Abschnitte der Zeitachse
+    months = np.arange(start_month, start_month + 12 * years + 1)
+    bounds = _segment_starts((months.astype('M8[m]') - start).astype(np.int64), step, num_timesteps)
+    bounds[0] = 0; bounds[-1] = num_timesteps
+    counts = np.diff(bounds)
+    month_of_year = months[:-1].astype(np.int64) % 12 + 1
+    year_of_month = np.arange(len(counts)) // 12
+
+    def monthly_energy(relative, target):
+        rel = np.array([relative[m] for m in range(1, 13)], dtype=float)
+        share = rel / rel.sum() if rel.sum() > 0 else np.zeros(12)
+        return share[month_of_year - 1] * target
+
+    def per_step(values):
+        return np.repeat(np.asarray(values).astype(dtype), counts)
+
+    def safe_div(a, b):
+        return np.divide(a, b, out=np.zeros(len(a)), where=b > 0)
+
+    dt = step / 60
+    demand = np.full(num_timesteps, params['demand_per_hour_kwh'] * dt / 1000, dtype=dtype)
+    wind = per_step(safe_div(monthly_energy(params['monthly_yield_wind_mwh_relative'], params['target_annual_specific_yield_wind_mwh_per_mw']), counts))
+
+    target_pv = params['target_annual_specific_yield_pv_mwh_per_mw']
+    energy_pv = monthly_energy(params['monthly_yield_pv_mwh_relative'], target_pv)
+    starts = bounds[:-1][counts > 0]
+    if pv_shape == 'box':
+        minute_of_day = stamps % 1440
+        is_daytime = (minute_of_day >= 360) & (minute_of_day < 1200)
+        day_steps = np.zeros(len(counts)); day_steps[counts > 0] = np.add.reduceat(is_daytime, starts)
+        initial = safe_div(energy_pv, counts)
+        # Skalierung je Jahr auf den Zielertrag (wie generate_profiles über das ganze Jahr)
+        daytime_yield = np.bincount(year_of_month, weights=initial * day_steps)
+        scaling = np.where(daytime_yield > 1e-6, target_pv / np.where(daytime_yield > 1e-6, daytime_yield, 1), 1.0)
+        pv = per_step(initial * scaling[year_of_month])
+        pv *= is_daytime
+    else:
+        pv = _solar_shape(stamps, step, latitude, longitude, utc_offset_hours, dtype)
+        shape_sum = np.zeros(len(counts)); shape_sum[counts > 0] = np.add.reduceat(pv, starts, dtype=float)
+        pv *= per_step(safe_div(energy_pv, shape_sum))
+
+    tariff = np.full(num_timesteps, float(params['feed_in_tariff_eur_per_mwh']), dtype=dtype)
+    num_negative_timesteps = int(params['negative_price_hours'] / params['hours_in_year'] * num_timesteps)
+    rng = np.random.default_rng(seed)
+    tariff[rng.choice(num_timesteps, num_negative_timesteps, replace=False)] = 0
+
+    return {
+        'demand_profile_mwh': demand,
+        'specific_yield_pv_mwh_per_mw': pv,
+        'specific_yield_wind_mwh_per_mw': wind,
+        'feed_in_tariff_profile_eur_per_mwh': tariff,
+        'timestamps': stamps.view('datetime64[m]'),
+    }